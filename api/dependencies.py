@@ -6,6 +6,8 @@ from fastapi import Depends, HTTPException, Request
 
 from api.services.asset_details_service import AssetDetailsService
 from api.services.backtest import BacktestService
+from api.services.backtest.jobs import BacktestJobRunner
+from api.services.backtest.run_store import RunStore
 from api.services.binance_report_service import BinanceReportService
 from api.services.report_service import ReportService
 from api.services.trade_republic_service import TradeRepublicService
@@ -144,6 +146,13 @@ def get_backtest_service(
     return BacktestService(candles_service, dynamodb_client)
 
 
+@lru_cache()
+def get_backtest_job_runner() -> BacktestJobRunner:
+    """Process-wide: the jobs and the runs they share outlive the
+    request that submitted them."""
+    return BacktestJobRunner(RunStore())
+
+
 def get_asset_details_service(
     dynamodb_client: DynamoDBClient = Depends(get_dynamodb_client),
 ) -> AssetDetailsService:
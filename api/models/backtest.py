@@ -3,18 +3,21 @@
 import csv
 import datetime
 import io
-from typing import Any, List, Optional
+import json
+from typing import Any, AsyncIterator, List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PositiveFloat
 
 from model import (
     BacktestDefinition,
+    BacktestJob,
     BacktestParameters,
     BacktestRunResult,
     BacktestSummary,
     Candle,
     DayResult,
     DayResultSummary,
+    SweepResult,
     Trade,
 )
 
@@ -93,6 +96,46 @@ class BacktestRunResponse(BaseModel):
     days: List[DayResultSummaryResponse] = []
 
 
+class BacktestSweepRequest(BaseModel):
+    """A parameter grid: every combination of the listed values is run. An
+    empty list keeps the definition's default for that parameter."""
+
+    definition: str = Field(..., description="Backtest definition code")
+    start_date: str = Field(..., description="Start date (YYYY-MM-DD)")
+    end_date: str = Field(..., description="End date (YYYY-MM-DD)")
+    stop_loss_points: List[PositiveFloat] = []
+    take_profit_offset_points: List[PositiveFloat] = []
+    break_even_trigger_points: List[PositiveFloat] = []
+    max_entry_distance_points: List[PositiveFloat] = []
+    top: Optional[int] = Field(
+        None, description="Only return the best combinations", ge=1
+    )
+
+
+class BacktestJobResponse(BaseModel):
+    job_id: str
+    status: str
+    definition_code: str
+    start_date: datetime.date
+    end_date: datetime.date
+    parameters: BacktestParametersResponse
+    days_done: int
+    days_total: int
+    last_date: Optional[datetime.date] = None
+    memoized: bool
+    error: Optional[str] = None
+
+
+class BacktestSweepResultResponse(BaseModel):
+    parameters: BacktestParametersResponse
+    summary: BacktestSummaryResponse
+
+
+class BacktestSweepResponse(BaseModel):
+    combinations: int
+    results: List[BacktestSweepResultResponse]
+
+
 def backtest_definition_to_response(
     definition: BacktestDefinition,
 ) -> BacktestDefinitionResponse:
@@ -102,12 +145,7 @@ def backtest_definition_to_response(
         display_name=definition.display_name,
         instrument=definition.instrument,
         double_take_profit=definition.double_take_profit,
-        default_parameters=BacktestParametersResponse(
-            stop_loss_points=defaults.stop_loss_points,
-            take_profit_offset_points=defaults.take_profit_offset_points,
-            break_even_trigger_points=defaults.break_even_trigger_points,
-            max_entry_distance_points=defaults.max_entry_distance_points,
-        ),
+        default_parameters=_parameters_to_response(defaults),
     )
 
 
@@ -188,6 +226,59 @@ def backtest_run_result_to_response(
     )
 
 
+def _parameters_to_response(
+    params: BacktestParameters,
+) -> BacktestParametersResponse:
+    return BacktestParametersResponse(
+        stop_loss_points=params.stop_loss_points,
+        take_profit_offset_points=params.take_profit_offset_points,
+        break_even_trigger_points=params.break_even_trigger_points,
+        max_entry_distance_points=params.max_entry_distance_points,
+    )
+
+
+def backtest_job_to_response(job: BacktestJob) -> BacktestJobResponse:
+    return BacktestJobResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        definition_code=job.definition_code,
+        start_date=job.start_date,
+        end_date=job.end_date,
+        parameters=_parameters_to_response(job.params),
+        days_done=job.days_done,
+        days_total=job.days_total,
+        last_date=job.last_date,
+        memoized=job.memoized,
+        error=job.error,
+    )
+
+
+async def stream_backtest_job_ndjson(
+    progress: AsyncIterator[BacktestJob],
+) -> AsyncIterator[str]:
+    """A job's progress as newline-delimited JSON, one
+    BacktestJobResponse line per change, the finished job last."""
+    async for job in progress:
+        yield backtest_job_to_response(job).model_dump_json() + "\n"
+
+
+def sweep_results_to_response(
+    results: List[SweepResult], top: Optional[int] = None
+) -> BacktestSweepResponse:
+    """The ranked combinations, best first, cut to the `top` first ones
+    when asked."""
+    return BacktestSweepResponse(
+        combinations=len(results),
+        results=[
+            BacktestSweepResultResponse(
+                parameters=_parameters_to_response(result.params),
+                summary=_backtest_summary_to_response(result.summary),
+            )
+            for result in results[:top]
+        ],
+    )
+
+
 def _write_parameters_block(writer: Any, params: BacktestParameters) -> None:
     """Leading block echoing the run parameters so an exported CSV is
     self-describing about the thresholds it was produced with."""
@@ -205,6 +296,42 @@ def _write_parameters_block(writer: Any, params: BacktestParameters) -> None:
     writer.writerow([])
 
 
+RUN_CSV_HEADER = [
+    "date",
+    "status",
+    "trade_count",
+    "points",
+    "h1_high",
+    "h1_low",
+    "h1_range",
+    "mm50_slope",
+    "adx14",
+    "h1_open",
+    "overnight_gap",
+]
+
+
+def _day_summary_row(day: DayResultSummary) -> List[Any]:
+    h1_range = (
+        round(day.h1_high - day.h1_low, 4)
+        if day.h1_high is not None and day.h1_low is not None
+        else None
+    )
+    return [
+        day.date.isoformat(),
+        day.status.value,
+        day.trade_count,
+        day.points,
+        day.h1_high,
+        day.h1_low,
+        h1_range,
+        day.mm50_slope,
+        day.adx14,
+        day.h1_open,
+        day.overnight_gap,
+    ]
+
+
 def backtest_run_result_to_csv(
     run_result: BacktestRunResult, params: BacktestParameters
 ) -> str:
@@ -213,45 +340,65 @@ def backtest_run_result_to_csv(
     output = io.StringIO()
     writer = csv.writer(output)
     _write_parameters_block(writer, params)
-    writer.writerow(
-        [
-            "date",
-            "status",
-            "trade_count",
-            "points",
-            "h1_high",
-            "h1_low",
-            "h1_range",
-            "mm50_slope",
-            "adx14",
-            "h1_open",
-            "overnight_gap",
-        ]
-    )
+    writer.writerow(RUN_CSV_HEADER)
     for day in run_result.days:
-        h1_range = (
-            round(day.h1_high - day.h1_low, 4)
-            if day.h1_high is not None and day.h1_low is not None
-            else None
-        )
-        writer.writerow(
-            [
-                day.date.isoformat(),
-                day.status.value,
-                day.trade_count,
-                day.points,
-                day.h1_high,
-                day.h1_low,
-                h1_range,
-                day.mm50_slope,
-                day.adx14,
-                day.h1_open,
-                day.overnight_gap,
-            ]
-        )
+        writer.writerow(_day_summary_row(day))
     return output.getvalue()
 
 
+def _csv_text(*rows: List[Any]) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row in rows:
+        writer.writerow(row)
+    return output.getvalue()
+
+
+async def stream_backtest_run_csv(
+    items: AsyncIterator[Union[DayResultSummary, BacktestSummary]],
+    params: BacktestParameters,
+) -> AsyncIterator[str]:
+    """backtest_run_result_to_csv as a stream fed by
+    BacktestService.stream_range: the parameters block and the header
+    first, a row as each day is evaluated, then - after a blank line - the
+    summary as a field/value block, since it is only known at the end."""
+    output = io.StringIO()
+    _write_parameters_block(csv.writer(output), params)
+    yield output.getvalue() + _csv_text(RUN_CSV_HEADER)
+    async for item in items:
+        if isinstance(item, DayResultSummary):
+            yield _csv_text(_day_summary_row(item))
+        else:
+            summary = _backtest_summary_to_response(item).model_dump(
+                mode="json"
+            )
+            yield _csv_text(
+                [],
+                ["summary", "value"],
+                *([field, value] for field, value in summary.items()),
+            )
+
+
+async def stream_backtest_run_ndjson(
+    items: AsyncIterator[Union[DayResultSummary, BacktestSummary]],
+) -> AsyncIterator[str]:
+    """The streamed range run as newline-delimited JSON: one
+    {"type": "day", ...} line per evaluated day, shaped like a
+    BacktestRunResponse day, then one {"type": "summary", ...} line."""
+    async for item in items:
+        if isinstance(item, DayResultSummary):
+            kind = "day"
+            payload = _day_result_summary_to_response(item).model_dump(
+                mode="json"
+            )
+        else:
+            kind = "summary"
+            payload = _backtest_summary_to_response(item).model_dump(
+                mode="json"
+            )
+        yield json.dumps({"type": kind, **payload}) + "\n"
+
+
 def day_result_to_csv(
     day_result: DayResult, params: BacktestParameters
 ) -> str:
@@ -113,6 +113,13 @@ class CreateGSheetOrderRequest(BaseModel):
         return v
 
 
+class ExportGSheetRequest(BaseModel):
+    """Request model for exporting a whole report to Google Sheets."""
+
+    account_id: str
+    from_date: str
+
+
 class UpdateGSheetOrderRequest(BaseModel):
     """Request model for updating order in Google Sheets."""
 
@@ -3,19 +3,27 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from api.date_utils import parse_iso_date
-from api.dependencies import get_backtest_service
+from api.dependencies import get_backtest_job_runner, get_backtest_service
 from api.models.backtest import (
     BacktestDefinitionResponse,
+    BacktestJobResponse,
     BacktestRunResponse,
+    BacktestSweepRequest,
+    BacktestSweepResponse,
     DayDetailResponse,
     backtest_definition_to_response,
+    backtest_job_to_response,
     backtest_run_result_to_csv,
     backtest_run_result_to_response,
     day_result_to_csv,
     day_result_to_response,
+    stream_backtest_job_ndjson,
+    stream_backtest_run_csv,
+    stream_backtest_run_ndjson,
+    sweep_results_to_response,
 )
 from api.services.backtest import (
     BacktestService,
@@ -23,7 +31,16 @@ from api.services.backtest import (
     is_today_not_yet_closed,
     resolve_parameters,
 )
-from model import BacktestDefinition, BacktestParameters, Market
+from api.services.backtest.jobs import BacktestJobRunner
+from api.services.backtest.sweep import parameter_grid
+from model import (
+    BacktestDefinition,
+    BacktestJob,
+    BacktestJobStatus,
+    BacktestParameters,
+    Market,
+)
+from utils.exception import SaxoException
 
 router = APIRouter(prefix="/api/backtest", tags=["backtest"])
 
@@ -136,6 +153,36 @@ async def get_backtest_run(
     return backtest_run_result_to_response(run_result)
 
 
+@router.post("/sweep", response_model=BacktestSweepResponse)
+async def post_backtest_sweep(
+    request: BacktestSweepRequest,
+    backtest_service: BacktestService = Depends(get_backtest_service),
+) -> BacktestSweepResponse:
+    """Run the backtest across a date range under every combination of a
+    parameter grid, loading the range's candles once, and return the
+    combinations ranked by final result."""
+    backtest_definition = _resolve_definition(
+        backtest_service, request.definition
+    )
+    start, end = _parse_range(
+        request.start_date, request.end_date, backtest_definition.market
+    )
+    try:
+        grid = parameter_grid(
+            backtest_definition,
+            stop_loss_points=request.stop_loss_points,
+            take_profit_offset_points=request.take_profit_offset_points,
+            break_even_trigger_points=request.break_even_trigger_points,
+            max_entry_distance_points=request.max_entry_distance_points,
+        )
+        results = await backtest_service.sweep(
+            backtest_definition, start, end, grid
+        )
+    except SaxoException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return sweep_results_to_response(results, request.top)
+
+
 @router.get("/day/csv")
 async def get_backtest_day_csv(
     definition: str = Query(..., description="Backtest definition code"),
@@ -188,6 +235,136 @@ async def get_backtest_run_csv(
     )
 
 
+@router.get("/run/stream")
+async def get_backtest_run_stream(
+    definition: str = Query(..., description="Backtest definition code"),
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    overrides: _ParamOverrides = Depends(_param_overrides),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+) -> StreamingResponse:
+    """GET /run as newline-delimited JSON: a line per day as soon as it
+    is evaluated, the summary line last. The request is validated before
+    the first byte; an error past that point ends the stream early."""
+    backtest_definition = _resolve_definition(backtest_service, definition)
+    params = _resolve_params(backtest_definition, overrides)
+    start, end = _parse_range(start_date, end_date, backtest_definition.market)
+    try:
+        items = backtest_service.stream_range(
+            backtest_definition, start, end, params
+        )
+    except SaxoException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_backtest_run_ndjson(items), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/run/csv/stream")
+async def get_backtest_run_csv_stream(
+    definition: str = Query(..., description="Backtest definition code"),
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    overrides: _ParamOverrides = Depends(_param_overrides),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+) -> StreamingResponse:
+    """GET /run/csv streamed: the day rows are sent as they are evaluated
+    and a summary block closes the file."""
+    backtest_definition = _resolve_definition(backtest_service, definition)
+    params = _resolve_params(backtest_definition, overrides)
+    start, end = _parse_range(start_date, end_date, backtest_definition.market)
+    try:
+        items = backtest_service.stream_range(
+            backtest_definition, start, end, params
+        )
+    except SaxoException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_backtest_run_csv(items, params),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": (
+                "attachment; "
+                f'filename="backtest-{definition}-{start_date}-{end_date}.csv"'
+            )
+        },
+    )
+
+
+@router.post("/jobs", response_model=BacktestJobResponse)
+async def post_backtest_job(
+    definition: str = Query(..., description="Backtest definition code"),
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+    overrides: _ParamOverrides = Depends(_param_overrides),
+    backtest_service: BacktestService = Depends(get_backtest_service),
+    job_runner: BacktestJobRunner = Depends(get_backtest_job_runner),
+) -> BacktestJobResponse:
+    """Submit GET /run as a background job and return it at once: already
+    done when the same run over a past range was memoized, shared with
+    the job already running the same inputs if any."""
+    backtest_definition = _resolve_definition(backtest_service, definition)
+    params = _resolve_params(backtest_definition, overrides)
+    start, end = _parse_range(start_date, end_date, backtest_definition.market)
+    try:
+        job = job_runner.submit(
+            backtest_service, backtest_definition, start, end, params
+        )
+    except SaxoException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return backtest_job_to_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=BacktestJobResponse)
+async def get_backtest_job(
+    job_id: str,
+    job_runner: BacktestJobRunner = Depends(get_backtest_job_runner),
+) -> BacktestJobResponse:
+    """A job's status and progress, for polling."""
+    return backtest_job_to_response(_resolve_job(job_runner, job_id))
+
+
+@router.get("/jobs/{job_id}/stream")
+async def get_backtest_job_stream(
+    job_id: str,
+    job_runner: BacktestJobRunner = Depends(get_backtest_job_runner),
+) -> StreamingResponse:
+    """A job's progress as newline-delimited JSON, a line per evaluated
+    day, until the job is finished."""
+    _resolve_job(job_runner, job_id)
+    return StreamingResponse(
+        stream_backtest_job_ndjson(job_runner.progress(job_id)),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/jobs/{job_id}/result", response_model=BacktestRunResponse)
+async def get_backtest_job_result(
+    job_id: str,
+    job_runner: BacktestJobRunner = Depends(get_backtest_job_runner),
+) -> BacktestRunResponse:
+    """A finished job's run, as GET /run returns it."""
+    job = _resolve_job(job_runner, job_id)
+    if job.status == BacktestJobStatus.FAILED:
+        raise HTTPException(
+            status_code=409, detail=f"backtest job failed: {job.error}"
+        )
+    if job.result is None or job.status != BacktestJobStatus.DONE:
+        raise HTTPException(
+            status_code=409, detail="backtest job is not finished yet"
+        )
+    return backtest_run_result_to_response(job.result)
+
+
+def _resolve_job(job_runner: BacktestJobRunner, job_id: str) -> BacktestJob:
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown backtest job: {job_id}"
+        )
+    return job
+
+
 def _parse_range(
     start_date: str, end_date: str, market: Market
 ) -> tuple[datetime.date, datetime.date]:
@@ -8,6 +8,7 @@ from api.dependencies import (
 )
 from api.models.report import (
     CreateGSheetOrderRequest,
+    ExportGSheetRequest,
     ReportListResponse,
     ReportOrderResponse,
     ReportSummaryResponse,
@@ -108,15 +109,15 @@ async def get_report_summary(
     Returns aggregated data like total orders, volume, fees, etc.
     """
     try:
-        report_service: Union[BinanceReportService, ReportService]
         if account_id.startswith("binance_"):
-            report_service = binance_report_service
+            orders = binance_report_service.get_orders_report(
+                account_id, from_date
+            )
+            summary = binance_report_service.calculate_summary(orders)
         else:
-            report_service = saxo_report_service
-
-        orders = report_service.get_orders_report(account_id, from_date)
-
-        summary = report_service.calculate_summary(orders)
+            summary = await saxo_report_service.summarize_orders_report(
+                account_id, from_date
+            )
         return ReportSummaryResponse(**summary)
 
     except ValueError as e:
@@ -186,6 +187,51 @@ async def create_gsheet_order(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/gsheet/export")
+async def export_gsheet_orders(
+    request: ExportGSheetRequest,
+    saxo_report_service: ReportService = Depends(get_report_service),
+    binance_report_service: BinanceReportService = Depends(
+        get_binance_report_service
+    ),
+):
+    """
+    Write every fill of the report that is not in Google Sheets yet.
+
+    Supports both Saxo and Binance accounts.
+
+    Fills already in the sheet are matched by date, code and quantity. A
+    new closing fill is written into the row of the position it closes,
+    any other new fill is appended as a row, each kind in a single batch.
+    """
+    try:
+        report_service: Union[BinanceReportService, ReportService]
+        if request.account_id.startswith("binance_"):
+            report_service = binance_report_service
+        else:
+            report_service = saxo_report_service
+
+        exported = report_service.export_to_gsheet(
+            request.account_id, request.from_date
+        )
+
+        return {
+            "status": "success",
+            "message": f"{exported} orders exported to Google Sheets",
+            "exported": exported,
+        }
+
+    except ValueError as e:
+        logger.error(f"Invalid request: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except SaxoException as e:
+        logger.error(f"Saxo error exporting report: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error exporting orders to Google Sheets: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/gsheet/update")
 async def update_gsheet_order(
     request: UpdateGSheetOrderRequest,
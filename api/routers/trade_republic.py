@@ -1,3 +1,5 @@
+import codecs
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile
 
 from api.dependencies import get_trade_republic_service
@@ -25,8 +27,10 @@ async def upload_trade_republic_csv(
     """Parse an uploaded Trade Republic CSV export and return the
     resulting transactions and any per-row parse errors."""
     try:
-        content = (await file.read()).decode("utf-8")
-        transactions, errors = trade_republic_service.parse_csv(content)
+        # Decoded line by line from the spooled upload instead of read
+        # into one string
+        lines = codecs.iterdecode(file.file, "utf-8")
+        transactions, errors = trade_republic_service.parse_csv(lines)
 
         return UploadTradeRepublicResponse(
             transactions=[
@@ -7,11 +7,16 @@ SL/TP parameters, which makes them usable to segment an exported run.
 """
 
 import datetime
+import logging
 from typing import List, Optional
 
+from api.services.backtest.calendar import PARIS_TZ
 from api.services.backtest.candles import candle_date
-from model import Candle
+from api.services.backtest.fetch_failures import fetch_failed
+from model import Candle, EUMarket, UnitTime
+from services.candles_service import CandlesService
 from services.indicator_service import adx, mobile_average, slope_percentage
+from utils.exception import SaxoException
 
 # Daily MA50 slope regime measure: MA50 needs 50 daily closes and the
 # slope is taken over a 10-candle lookback, so at least 60 prior daily
@@ -84,3 +89,51 @@ def overnight_gap(
     if not prior:
         return None
     return round(h1_open - prior[0].close, 4)
+
+
+def fetch_daily_candles(
+    candles_service: CandlesService,
+    instrument: str,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    logger: logging.Logger,
+) -> List[Candle]:
+    """Daily (newest-first) candle series covering the run range plus
+    enough lead-in to compute a 50-day MA slope on the first day.
+    Fetched once per range run. A failure degrades to an empty series
+    (blank mm50_slope column) rather than aborting the whole export.
+
+    Deliberately built on EUMarket rather than the definition's market:
+    the regime columns (mm50_slope, adx14, overnight_gap) are a
+    *measurement* of the instrument, not part of any strategy, and they
+    only earn their keep if the same day scores the same on every
+    definition. Following the definition's market would build the CFD
+    variant's daily bars over a 13-hour window instead of the cash
+    session's 9 (build_daily_candles_from_h1 sizes the day from
+    close_hour - open_hour), so its MA50 slope and ADX would not be
+    comparable with the variants it exists to be compared against, and
+    overnight_gap would silently start measuring from the 22:00 close
+    instead of the 17:30 one."""
+    # Daily candles are fetched counting backward from end_date, so count
+    # must reach ~60 trading days before start_date for the first day's
+    # MA50 slope. Calendar days is a safe upper bound on the range's
+    # trading days (build_candles caps at available data), so no need to
+    # exclude weekends/holidays precisely.
+    count = (end_date - start_date).days + DAILY_CANDLES_LEAD_IN
+    reference = datetime.datetime(
+        end_date.year, end_date.month, end_date.day, tzinfo=PARIS_TZ
+    )
+    try:
+        return candles_service.build_candles(
+            instrument,
+            UnitTime.D,
+            EUMarket(),
+            count,
+            reference,
+        )
+    except SaxoException as e:
+        logger.warning(
+            f"No daily candles for {instrument} regime measure: {e}"
+        )
+        fetch_failed(f"D {instrument} {start_date} - {end_date}")
+        return []
@@ -0,0 +1,203 @@
+"""Array form of a day's 5-minute candles, for the trade simulator.
+
+SessionRangeStrategy._evaluate_trades walks every candle through both
+DirectionSearch state machines and the whole exit chain, although on most
+candles nothing happens: no breach, no confirmation, no level touched.
+DayArrays holds the day's OHLC as numpy arrays so the simulator can jump
+from one candle where something *can* happen to the next with vectorized
+first-hit searches, and run the ordinary, scalar rules only there:
+
+- entries: a side's breach and confirmation candles depend on the H1
+  levels alone, so they are found once per day, whatever the parameters
+  (see next_entry);
+- exits: the candles where a policy of the chain could close the position
+  or change its state are a union of level crossings on the arrays,
+  recomputed whenever that state changes (see next_exit_event).
+
+The exit masks may over-approximate - a flagged candle where the chain
+ends up doing nothing only costs a scalar pass - but never miss a candle
+the chain would act on, which is what keeps the result identical to the
+candle-by-candle walk.
+"""
+
+import bisect
+import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from api.services.backtest.candles import candle_date
+from api.services.backtest.policies import (
+    ArmBreakEven,
+    DoubleTarget,
+    ExitPolicy,
+    ImpulsiveStop,
+    Stop,
+    StructuralStop,
+    Target,
+    TimeCut,
+    TrailToFirstTarget,
+)
+from api.services.backtest.position import Position
+from api.services.backtest.side import LONG, SHORT, Side
+from model import Candle
+
+# The policies next_exit_event knows the trigger of. A chain holding any
+# other one is run by the candle-by-candle engine.
+SUPPORTED_POLICIES = (
+    ArmBreakEven,
+    DoubleTarget,
+    ImpulsiveStop,
+    Stop,
+    StructuralStop,
+    Target,
+    TimeCut,
+    TrailToFirstTarget,
+)
+
+
+def supports(chain: Sequence[ExitPolicy]) -> bool:
+    return all(isinstance(policy, SUPPORTED_POLICIES) for policy in chain)
+
+
+class DayArrays:
+    """One day's chronological 5-minute candles against its H1 levels."""
+
+    def __init__(self, candles: List[Candle], h1_high: float, h1_low: float):
+        self.candles = candles
+        self.times = [candle_date(candle) for candle in candles]
+        self.open = np.array([c.open for c in candles], dtype=float)
+        self.high = np.array([c.higher for c in candles], dtype=float)
+        self.low = np.array([c.lower for c in candles], dtype=float)
+        self.close = np.array([c.close for c in candles], dtype=float)
+        self._breaches: Dict[Side, np.ndarray] = {}
+        self._confirmations: Dict[Side, np.ndarray] = {}
+        for side in (LONG, SHORT):
+            self._index_entries(side, side.reference_level(h1_high, h1_low))
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    def _extreme(self, side: Side) -> np.ndarray:
+        return self.high if side.is_long else self.low
+
+    def _adverse_extreme(self, side: Side) -> np.ndarray:
+        return self.low if side.is_long else self.high
+
+    def _index_entries(self, side: Side, reference: float) -> None:
+        """Where DirectionSearch breaches and confirms for this side.
+
+        From a clean search state, the first breach is the first candle
+        closing beyond the reference. From there every candle either
+        re-breaches (closing beyond) or becomes the candidate, so the
+        search confirms on the first later candle whose predecessor did
+        not close beyond and which trades past that predecessor's
+        favorable extreme. Neither depends on the parameters."""
+        beyond = (self.close - reference) * side.sign < 0
+        extreme = self._extreme(side)
+        confirms = np.zeros(len(self), dtype=bool)
+        confirms[1:] = ~beyond[:-1] & (
+            (extreme[1:] - extreme[:-1]) * side.sign > 0
+        )
+        self._breaches[side] = np.flatnonzero(beyond)
+        self._confirmations[side] = np.flatnonzero(confirms)
+
+    def next_entry(self, side: Side, start: int) -> Optional[int]:
+        """The candle on which a search restarted clean at `start`
+        confirms a breakout, or None when it never does today. The entry
+        is priced off the candle before it (the candidate)."""
+        breaches = self._breaches[side]
+        index = int(np.searchsorted(breaches, start))
+        if index == len(breaches):
+            return None
+        confirmations = self._confirmations[side]
+        index = int(np.searchsorted(confirmations, breaches[index] + 2))
+        if index == len(confirmations):
+            return None
+        return int(confirmations[index])
+
+    def next_exit_event(
+        self,
+        position: Position,
+        chain: Sequence[ExitPolicy],
+        start: int,
+    ) -> Optional[int]:
+        """The first candle from `start` on which a policy of the chain
+        could close the position or change its state, or None when the
+        position reaches the end of the day untouched.
+
+        The time cut's running best excursion is the only state that
+        moves on every candle; it is brought up to the returned candle
+        here, as the skipped candles would have."""
+        if start >= len(self):
+            return None
+        side = position.side
+        sign = side.sign
+        extreme = self._extreme(side)[start:]
+        mask = np.zeros(len(extreme), dtype=bool)
+        time_cut: Optional[TimeCut] = None
+
+        def reached(level: float) -> np.ndarray:
+            return (extreme - level) * sign >= 0
+
+        for policy in chain:
+            if isinstance(policy, Stop):
+                if not policy.only_when_armed or position.be_armed:
+                    adverse = self._adverse_extreme(side)[start:]
+                    mask |= (adverse - position.stop_level) * sign <= 0
+            elif isinstance(policy, Target):
+                mask |= reached(position.take_profit_level)
+            elif isinstance(policy, DoubleTarget):
+                level = (
+                    position.take_profit_level
+                    if position.first_target_taken
+                    else position.first_target_level
+                )
+                if level is not None:
+                    mask |= reached(level)
+            elif isinstance(policy, (StructuralStop, ImpulsiveStop)):
+                # The impulsive stop also needs a wide candle closing near
+                # its extreme; the close beyond the level alone is enough
+                # to flag a candle.
+                if not position.be_armed:
+                    close = self.close[start:]
+                    mask |= (close - position.structural_level) * sign < 0
+            elif isinstance(policy, ArmBreakEven):
+                if not position.be_armed:
+                    mask |= reached(
+                        position.break_even_arm_level(policy.trigger_points)
+                    )
+            elif isinstance(policy, TrailToFirstTarget):
+                first_target = position.first_target_level
+                if (
+                    not position.trailed_to_first_target
+                    and position.first_target_taken
+                    and first_target is not None
+                ):
+                    mask |= reached(
+                        first_target + sign * policy.trigger_points
+                    )
+            elif isinstance(policy, TimeCut):
+                time_cut = policy
+
+        favorable = None
+        if time_cut is not None:
+            favorable = (extreme - position.entry_price) * sign
+            best = np.maximum.accumulate(
+                np.maximum(favorable, position.max_favorable_points)
+            )
+            deadline = position.entry_time + datetime.timedelta(
+                minutes=time_cut.minutes
+            )
+            due = max(bisect.bisect_left(self.times, deadline) - start, 0)
+            mask[due:] |= best[due:] <= time_cut.min_favorable_points
+
+        hits = np.flatnonzero(mask)
+        if len(hits) == 0:
+            return None
+        offset = int(hits[0])
+        if favorable is not None and offset > 0:
+            position.max_favorable_points = max(
+                position.max_favorable_points, float(favorable[:offset].max())
+            )
+        return start + offset
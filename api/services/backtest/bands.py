@@ -0,0 +1,35 @@
+"""The combo strategy's two moving targets (spec 026, R4).
+
+Both are read off the 2.0 bollinger bands, the inner band combo itself
+scores against: the mm20 - the bands' middle - is TP1, and the band on
+the far side of the position is TP2. They are re-read on every candle
+from the window ending at it, which is what makes them move (FR-C07).
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from api.services.backtest.side import Side
+from model import Candle
+from services.indicator_service import bollinger_bands
+
+# The deviation of the band TP2 is read on. 2.5 would target combo's
+# outer band instead; nothing else depends on it.
+TARGET_BAND_DEVIATION = 2.0
+
+
+@dataclass(frozen=True)
+class BandLevels:
+    mm20: float
+    upper: float
+    bottom: float
+
+    def opposite(self, side: Side) -> float:
+        """TP2: the upper band for a long, the bottom one for a short."""
+        return self.upper if side.is_long else self.bottom
+
+
+def levels(window: List[Candle]) -> BandLevels:
+    """The levels at the window's newest candle (window[0])."""
+    bands = bollinger_bands(window, TARGET_BAND_DEVIATION)
+    return BandLevels(mm20=bands.middle, upper=bands.up, bottom=bands.bottom)
@@ -9,14 +9,27 @@ actually depends on, which collapses those copies into one entry per
 
 The planning half here is pure: it turns the table's items into a list of
 writes and deletes, so what the migration would do can be shown (and
-tested) without touching DynamoDB.
+tested) without touching DynamoDB. It is fed one scan page at a time and
+keeps no candles - only which row wins each target slot - so the plan of
+a table holding years of 5-minute candles still fits in memory; the
+winning rows are read back one chunk at a time when the plan is applied
+(see cache_scan for the paging, batching and checkpointing).
 """
 
+import asyncio
 import logging
 import re
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
-
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from api.services.backtest.cache_scan import (
+    BATCH_CHUNK,
+    ScanCheckpoint,
+    TableScan,
+    chunks,
+    segment_cursors,
+)
 from api.services.backtest.candle_source import (
     CACHE_SCHEMA_VERSION,
     cache_key,
@@ -31,14 +44,20 @@ V1_KEY_PATTERN = re.compile(r"^(?P<code>[^:]+):(?P<instrument>[^:]+):v1$")
 
 CURRENT_KEY_SUFFIX = f":v{CACHE_SCHEMA_VERSION}"
 
+# A (cache key, trading date) pair: a row of the table
+Slot = Tuple[str, str]
+# See _entry_rank
+Rank = Tuple[bool, bool, int, bool]
+
 
 @dataclass
 class _Candidate:
     """One contender for a target (new key, trading date) slot: either a
     v1 row to be rewritten, or the current-schema row already sitting
-    there."""
+    there. Only its rank is kept, never its candles."""
 
-    item: Dict[str, Any]
+    source: Slot
+    rank: Rank
     m5_fetched: bool
     # False for a row already stored under the current key - it is a
     # contender so a v1 row cannot silently replace something better,
@@ -46,19 +65,35 @@ class _Candidate:
     needs_write: bool
 
 
+@dataclass(frozen=True)
+class PlannedWrite:
+    """Copy the v1 row `source` to `target_key`, on the same day."""
+
+    source: Slot
+    target_key: str
+    m5_fetched: bool
+
+    @property
+    def trading_date(self) -> str:
+        return self.source[1]
+
+    @property
+    def target(self) -> Slot:
+        return (self.target_key, self.trading_date)
+
+
 @dataclass
 class MigrationPlan:
     """What the migration would write and delete, plus what it could not
     account for."""
 
-    # (item to write under its new key, m5_fetched) pairs.
-    writes: List[Tuple[Dict[str, Any], bool]] = field(default_factory=list)
+    writes: List[PlannedWrite] = field(default_factory=list)
     # (old key, trading_date) pairs to remove once the writes land.
-    deletes: List[Tuple[str, str]] = field(default_factory=list)
+    deletes: List[Slot] = field(default_factory=list)
     # Target slots a current-schema row already covers at least as well as
     # anything v1 holds. Nothing is written for them, but the v1 rows
     # feeding them are still safe to delete.
-    already_present: List[Tuple[str, str]] = field(default_factory=list)
+    already_present: List[Slot] = field(default_factory=list)
     # Old keys whose definition code is no longer in the registry: they
     # can't be mapped to an instrument/session, so they are reported and
     # left in place rather than guessed at or dropped.
@@ -80,6 +115,27 @@ class MigrationPlan:
         survive as a distinct entry of its own."""
         return len(self.deletes) - self.target_slots
 
+    def to_state(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MigrationPlan":
+        return cls(
+            writes=[
+                PlannedWrite(
+                    source=_slot(write["source"]),
+                    target_key=write["target_key"],
+                    m5_fetched=write["m5_fetched"],
+                )
+                for write in state["writes"]
+            ],
+            deletes=[_slot(slot) for slot in state["deletes"]],
+            already_present=[_slot(slot) for slot in state["already_present"]],
+            orphans=list(state["orphans"]),
+            skipped=state["skipped"],
+            target_slots=state["target_slots"],
+        )
+
 
 @dataclass
 class MigrationResult:
@@ -96,9 +152,20 @@ class MigrationResult:
         return self.write_failures + self.delete_failures
 
 
+def _slot(value: Iterable[str]) -> Slot:
+    """A slot back from JSON, which has no tuples."""
+    key, trading_date = value
+    return (key, trading_date)
+
+
+def _rank(value: List[Any]) -> Rank:
+    has_data, m5_fetched, m5_count, current = value
+    return (bool(has_data), bool(m5_fetched), int(m5_count), bool(current))
+
+
 def _entry_rank(
     item: Dict[str, Any], m5_fetched: bool, needs_write: bool = True
-) -> Tuple:
+) -> Rank:
     """How useful an item is, for picking a winner when several entries
     contend for the same target slot. Real data beats a no-data marker, a
     complete 5-minute series beats a partial one, and a longer series
@@ -138,91 +205,212 @@ def _was_m5_fetched(item: Dict[str, Any], definition_code: str) -> bool:
     return h1_range > definition.min_h1_range_points
 
 
-def build_plan(items: List[Dict[str, Any]]) -> MigrationPlan:
-    """Turn the table's current contents into the writes and deletes that
-    move it onto the current key. Pure - no I/O.
+def _migrated_item(
+    item: Dict[str, Any], write: PlannedWrite
+) -> Dict[str, Any]:
+    """The v1 row as store_backtest_candles would have written it under
+    the new key."""
+    migrated: Dict[str, Any] = {
+        "definition_code": write.target_key,
+        "trading_date": write.trading_date,
+        "has_data": bool(item.get("has_data")),
+        "cached_at": int(time.time()),
+    }
+    if migrated["has_data"]:
+        migrated["h1_candle"] = item.get("h1_candle")
+        migrated["m5_candles"] = item.get("m5_candles") or []
+        migrated["m5_fetched"] = write.m5_fetched
+    return migrated
+
+
+class PlanBuilder:
+    """build_plan, one scan page at a time.
 
     Rows already stored under the current key are contenders rather than
     noise: a v1 row only overwrites one if it is strictly better. Without
     that, a partially-completed run followed by a second one (exactly the
     documented recovery path) could push a stale v1 copy over an entry
     the running application had since improved."""
-    plan = MigrationPlan()
-    best: Dict[Tuple[str, str], _Candidate] = {}
-    v1_targets: set = set()
-
-    def offer(slot: Tuple[str, str], candidate: _Candidate) -> None:
-        current = best.get(slot)
-        if current is None or _entry_rank(
-            candidate.item, candidate.m5_fetched, candidate.needs_write
-        ) > _entry_rank(current.item, current.m5_fetched, current.needs_write):
-            best[slot] = candidate
-
-    for item in items:
+
+    def __init__(self) -> None:
+        self._best: Dict[Slot, _Candidate] = {}
+        self._v1_targets: Set[Slot] = set()
+        self._deletes: List[Slot] = []
+        self._orphans: List[str] = []
+        self._skipped = 0
+
+    def add(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            self._add(item)
+
+    def build(self) -> MigrationPlan:
+        return MigrationPlan(
+            writes=[
+                PlannedWrite(c.source, slot[0], c.m5_fetched)
+                for slot, c in self._best.items()
+                if c.needs_write
+            ],
+            deletes=list(self._deletes),
+            already_present=[
+                slot for slot, c in self._best.items() if not c.needs_write
+            ],
+            orphans=list(self._orphans),
+            skipped=self._skipped,
+            target_slots=len(self._v1_targets),
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "best": [
+                [list(slot), asdict(candidate)]
+                for slot, candidate in self._best.items()
+            ],
+            "v1_targets": [list(slot) for slot in self._v1_targets],
+            "deletes": [list(slot) for slot in self._deletes],
+            "orphans": self._orphans,
+            "skipped": self._skipped,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "PlanBuilder":
+        builder = cls()
+        for slot, candidate in state["best"]:
+            builder._best[_slot(slot)] = _Candidate(
+                source=_slot(candidate["source"]),
+                rank=_rank(candidate["rank"]),
+                m5_fetched=candidate["m5_fetched"],
+                needs_write=candidate["needs_write"],
+            )
+        builder._v1_targets = {_slot(slot) for slot in state["v1_targets"]}
+        builder._deletes = [_slot(slot) for slot in state["deletes"]]
+        builder._orphans = list(state["orphans"])
+        builder._skipped = state["skipped"]
+        return builder
+
+    def _offer(self, slot: Slot, candidate: _Candidate) -> None:
+        current = self._best.get(slot)
+        if current is None or candidate.rank > current.rank:
+            self._best[slot] = candidate
+
+    def _add(self, item: Dict[str, Any]) -> None:
         old_key = item.get("definition_code")
         trading_date = item.get("trading_date")
         if not isinstance(old_key, str) or not isinstance(trading_date, str):
-            plan.skipped += 1
-            continue
+            self._skipped += 1
+            return
 
         match = V1_KEY_PATTERN.match(old_key)
         if match is None:
-            plan.skipped += 1
+            self._skipped += 1
             if old_key.endswith(CURRENT_KEY_SUFFIX):
-                offer(
+                m5_fetched = bool(item.get("m5_fetched", True))
+                self._offer(
                     (old_key, trading_date),
                     _Candidate(
-                        item=item,
-                        m5_fetched=bool(item.get("m5_fetched", True)),
+                        source=(old_key, trading_date),
+                        rank=_entry_rank(item, m5_fetched, False),
+                        m5_fetched=m5_fetched,
                         needs_write=False,
                     ),
                 )
-            continue
+            return
 
         code = match.group("code")
         definition = get_definition(code)
         if definition is None:
-            plan.orphans.append(old_key)
-            continue
+            self._orphans.append(old_key)
+            return
 
-        plan.deletes.append((old_key, trading_date))
+        self._deletes.append((old_key, trading_date))
         new_key = cache_key(definition)
-        migrated = dict(item)
-        migrated["definition_code"] = new_key
-        v1_targets.add((new_key, trading_date))
-        offer(
+        self._v1_targets.add((new_key, trading_date))
+        m5_fetched = _was_m5_fetched(item, code)
+        self._offer(
             (new_key, trading_date),
             _Candidate(
-                item=migrated,
-                m5_fetched=_was_m5_fetched(item, code),
+                source=(old_key, trading_date),
+                rank=_entry_rank(item, m5_fetched),
+                m5_fetched=m5_fetched,
                 needs_write=True,
             ),
         )
 
-    plan.target_slots = len(v1_targets)
-    plan.writes = [
-        (c.item, c.m5_fetched) for c in best.values() if c.needs_write
-    ]
-    plan.already_present = [
-        slot for slot, c in best.items() if not c.needs_write
-    ]
-    return plan
+
+def build_plan(items: List[Dict[str, Any]]) -> MigrationPlan:
+    """Turn the table's current contents into the writes and deletes that
+    move it onto the current key. Pure - no I/O."""
+    builder = PlanBuilder()
+    builder.add(items)
+    return builder.build()
 
 
 class CacheMigration:
-    """Applies a MigrationPlan against DynamoDB."""
+    """Builds a MigrationPlan from a paged scan and applies it against
+    DynamoDB in batches.
+
+    With a checkpoint, every page scanned and every chunk applied is
+    recorded, and a run started over the same checkpoint resumes there:
+    in the middle of the scan, or with the plan it had already built.
+    The checkpoint is removed once the plan is fully applied."""
 
     def __init__(
         self,
         dynamodb_client: DynamoDBClient,
         logger: Optional[logging.Logger] = None,
+        checkpoint: Optional[ScanCheckpoint] = None,
+        segments: int = 1,
+        chunk_size: int = BATCH_CHUNK,
     ):
         self.dynamodb_client = dynamodb_client
         self.logger = logger or logging.getLogger(__name__)
+        self.checkpoint = checkpoint
+        self.segments = segments
+        self.chunk_size = chunk_size
+        self._state: Dict[str, Any] = (
+            (checkpoint.load() or {}) if checkpoint is not None else {}
+        )
+        # Whether a previous run's checkpoint was picked up
+        self.resumed = bool(self._state)
 
     async def build_plan(self) -> MigrationPlan:
-        items = await self.dynamodb_client.scan_backtest_candles()
-        return build_plan(items)
+        if self._state.get("phase") == "apply":
+            return MigrationPlan.from_state(self._state["plan"])
+
+        scanning = self._state.get("phase") == "scan"
+        builder = (
+            PlanBuilder.from_state(self._state["builder"])
+            if scanning
+            else PlanBuilder()
+        )
+        scan = TableScan(
+            self.dynamodb_client,
+            self._state["segments"] if scanning else self.segments,
+            segment_cursors(self._state["cursors"]) if scanning else None,
+        )
+
+        def progress() -> None:
+            self._save(
+                {
+                    "phase": "scan",
+                    "segments": scan.total_segments,
+                    "cursors": scan.cursors,
+                    "builder": builder.to_state(),
+                }
+            )
+
+        await scan.run(builder.add, progress)
+        plan = builder.build()
+        self._save(
+            {
+                "phase": "apply",
+                "plan": plan.to_state(),
+                "writes_done": 0,
+                "deletes_done": 0,
+                "written": [],
+                "result": asdict(MigrationResult()),
+            }
+        )
+        return plan
 
     async def apply(self, plan: MigrationPlan) -> MigrationResult:
         """Write every new entry, then delete the old ones - in that
@@ -230,50 +418,109 @@ class CacheMigration:
         deleted data. A failed write cancels the deletes that would have
         removed its source rows, so nothing is lost; the migration is
         idempotent, so the fix is to run it again."""
-        result = MigrationResult()
+        state = self._state if self._state.get("phase") == "apply" else {}
+        result = MigrationResult(**state.get("result", {}))
         # A slot a current-schema row already covers needs no write, but
         # the v1 rows feeding it are just as safe to delete as if one had
         # been made.
-        written_keys = set(plan.already_present)
-
-        for item, m5_fetched in plan.writes:
-            key = (item["definition_code"], item["trading_date"])
-            try:
-                await self.dynamodb_client.store_backtest_candles(
-                    item["definition_code"],
-                    item["trading_date"],
-                    bool(item.get("has_data")),
-                    item.get("h1_candle"),
-                    item.get("m5_candles"),
-                    m5_fetched,
-                )
-            except (DynamoDBOperationError, RuntimeError) as e:
-                self.logger.error(f"Failed to migrate {key}: {e}")
-                result.write_failures += 1
-                continue
-            written_keys.add(key)
-            result.written += 1
-
-        for old_key, trading_date in plan.deletes:
-            if not self._is_covered(old_key, trading_date, written_keys):
-                continue
+        written: Set[Slot] = {_slot(s) for s in state.get("written", [])}
+        writes_done = state.get("writes_done", 0)
+        deletes_done = state.get("deletes_done", 0)
+
+        def progress() -> None:
+            self._save(
+                {
+                    "phase": "apply",
+                    "plan": plan.to_state(),
+                    "writes_done": writes_done,
+                    "deletes_done": deletes_done,
+                    "written": [list(slot) for slot in written],
+                    "result": asdict(result),
+                }
+            )
+
+        for chunk in chunks(plan.writes[writes_done:], self.chunk_size):
+            items = await self._read_sources(chunk)
+            if items:
+                try:
+                    await self.dynamodb_client.batch_write_backtest_candles(
+                        [migrated for _, migrated in items]
+                    )
+                except (DynamoDBOperationError, RuntimeError) as e:
+                    self.logger.error(
+                        f"Failed to migrate {len(items)} entries from "
+                        f"{items[0][0].source}: {e}"
+                    )
+                    result.write_failures += len(items)
+                else:
+                    written.update(write.target for write, _ in items)
+                    result.written += len(items)
+            result.write_failures += len(chunk) - len(items)
+            writes_done += len(chunk)
+            progress()
+
+        covered = written | set(plan.already_present)
+        deletes = [
+            slot for slot in plan.deletes if self._is_covered(*slot, covered)
+        ]
+        for keys in chunks(deletes[deletes_done:], self.chunk_size):
             try:
-                await self.dynamodb_client.delete_backtest_candles(
-                    old_key, trading_date
+                await self.dynamodb_client.batch_write_backtest_candles(
+                    [], keys
                 )
             except (DynamoDBOperationError, RuntimeError) as e:
                 self.logger.error(
-                    f"Failed to delete {old_key}/{trading_date}: {e}"
+                    f"Failed to delete {len(keys)} entries from "
+                    f"{keys[0]}: {e}"
                 )
-                result.delete_failures += 1
-                continue
-            result.deleted += 1
-
+                result.delete_failures += len(keys)
+            else:
+                result.deleted += len(keys)
+            deletes_done += len(keys)
+            progress()
+
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+        self._state = {}
         return result
 
+    async def _read_sources(
+        self, writes: List[PlannedWrite]
+    ) -> List[Tuple[PlannedWrite, Dict[str, Any]]]:
+        """The migrated item of each write whose source row could be read
+        back. One that could not - a failed read, or a row gone since the
+        scan - is left out, and so is never written nor deleted."""
+        items = await asyncio.gather(
+            *(self._read_source(write) for write in writes)
+        )
+        return [
+            (write, _migrated_item(item, write))
+            for write, item in zip(writes, items)
+            if item is not None
+        ]
+
+    async def _read_source(
+        self, write: PlannedWrite
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            item = await self.dynamodb_client.get_cached_backtest_candles(
+                *write.source
+            )
+        except (DynamoDBOperationError, RuntimeError) as e:
+            self.logger.error(f"Failed to read {write.source}: {e}")
+            return None
+        if item is None:
+            self.logger.error(f"{write.source} vanished since the scan")
+        return item
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        if self.checkpoint is not None:
+            self._state = state
+            self.checkpoint.save(state)
+
     @staticmethod
     def _is_covered(
-        old_key: str, trading_date: str, written_keys: set
+        old_key: str, trading_date: str, written_keys: Set[Slot]
     ) -> bool:
         """Whether the new entry replacing this old row was written. An
         old row whose replacement failed is kept."""
@@ -0,0 +1,145 @@
+"""Paged, resumable passes over the raw-candle cache, for its migrations.
+
+A migration reads the whole table and rewrites part of it. Loading every
+item into one list first - years of 5-minute candles - and writing them
+back one request at a time does not scale, and a run that dies halfway
+has to start over. The pieces here stream the table instead:
+
+- TableScan pages through it, as a parallel segmented scan when asked,
+  hands each page to a callback and keeps a cursor per segment;
+- chunks cuts a list of writes or deletes into the units applied through
+  one batch_writer each, and checkpointed together;
+- ScanCheckpoint keeps a pass's progress in a JSON file between pages,
+  so a run picks up where the last one stopped.
+
+Nothing here knows about cache keys or schema versions: the next
+CACHE_SCHEMA_VERSION bump brings its own plan (see cache_migration) and
+reuses the rest.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from client.aws_client import DynamoDBClient
+
+# Segments scanned in parallel by default. DynamoDB splits the table's
+# key space evenly, so a segment costs the same whatever the split.
+DEFAULT_SEGMENTS = 4
+
+# Writes or deletes applied - and checkpointed - together. batch_writer
+# sends them 25 at a time underneath; this only bounds how much a
+# resumed run may redo.
+BATCH_CHUNK = 100
+
+# Cursor of a segment scanned to its end. A segment not started yet has
+# None, one in progress the key to resume after.
+SEGMENT_DONE = "done"
+
+T = TypeVar("T")
+
+
+def chunks(values: Sequence[T], size: int) -> Iterator[List[T]]:
+    for start in range(0, len(values), size):
+        yield list(values[start : start + size])
+
+
+class TableScan:
+    """Pages through the raw-candle cache, `total_segments` segments at a
+    time, from the cursors a previous run stopped at."""
+
+    def __init__(
+        self,
+        dynamodb_client: DynamoDBClient,
+        total_segments: int = 1,
+        cursors: Optional[Dict[int, Any]] = None,
+    ):
+        self.dynamodb_client = dynamodb_client
+        self.total_segments = total_segments
+        self.cursors: Dict[int, Any] = {
+            segment: None for segment in range(total_segments)
+        }
+        self.cursors.update(cursors or {})
+
+    @property
+    def done(self) -> bool:
+        return all(cursor == SEGMENT_DONE for cursor in self.cursors.values())
+
+    async def run(
+        self,
+        on_page: Callable[[List[Dict[str, Any]]], None],
+        on_progress: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Feed every remaining page to on_page, then call on_progress.
+
+        Both are synchronous on purpose: a page is handled and its
+        segment's cursor moved with no await in between, so whatever
+        on_progress records never has a cursor past a page that was not
+        handled - or a page handled twice on resume."""
+        await asyncio.gather(
+            *(
+                self._scan_segment(segment, on_page, on_progress)
+                for segment, cursor in self.cursors.items()
+                if cursor != SEGMENT_DONE
+            )
+        )
+
+    async def _scan_segment(
+        self,
+        segment: int,
+        on_page: Callable[[List[Dict[str, Any]]], None],
+        on_progress: Optional[Callable[[], None]],
+    ) -> None:
+        while self.cursors[segment] != SEGMENT_DONE:
+            items, last_key = (
+                await self.dynamodb_client.scan_backtest_candles_page(
+                    self.cursors[segment], segment, self.total_segments
+                )
+            )
+            on_page(items)
+            self.cursors[segment] = (
+                SEGMENT_DONE if last_key is None else last_key
+            )
+            if on_progress is not None:
+                on_progress()
+
+
+class ScanCheckpoint:
+    """A pass's resumable state, as a JSON file. Saved through a temporary
+    file and a rename, so an interrupted save leaves the previous state
+    rather than half of the new one."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text())
+
+    def save(self, state: Dict[str, Any]) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def segment_cursors(state: Dict[str, Any]) -> Dict[int, Any]:
+    """TableScan.cursors back from JSON, which keys objects by string."""
+    return {int(segment): cursor for segment, cursor in state.items()}
@@ -0,0 +1,168 @@
+"""Background filling of the raw-candle cache, so that an interactive
+backtest over a new range finds its days already cached instead of paying
+for every Saxo fetch inside the HTTP request.
+
+The unit of work is a cache key (instrument and session, shared by every
+definition on it, see candle_source.cache_key) over a chunk of trading
+days. Each chunk goes through CandleSource.prefetch_range, so a missing
+day is fetched and stored exactly as a backtest run would have done it,
+and a day already cached costs one DynamoDB read.
+"""
+
+import asyncio
+import dataclasses
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from api.services.backtest.calendar import (
+    is_future_paris_date,
+    is_today_not_yet_closed,
+)
+from api.services.backtest.candle_source import CandleSource, cache_key
+from api.services.backtest.definitions import BACKTEST_DEFINITIONS
+from client.aws_client import DynamoDBClient
+from model import BacktestDefinition
+from services.candles_service import CandlesService
+
+# Trading days per prefetch_range call: about a month, which keeps the
+# 5-minute range fetch to a handful of chart pages and gives the progress
+# report a useful granularity.
+WARM_CHUNK_DAYS = 20
+# Chunks warmed at the same time, across every cache key
+WARM_CONCURRENCY = 2
+
+
+@dataclass
+class WarmProgress:
+    """Where a warm-up stands after a chunk completes."""
+
+    key: str
+    first_date: datetime.date
+    last_date: datetime.date
+    days_stored: int
+    chunks_done: int
+    chunks_total: int
+
+
+@dataclass
+class WarmResult:
+    days_checked: int = 0
+    days_stored: int = 0
+    chunks_done: int = 0
+    failed_chunks: int = 0
+
+
+def warm_targets(
+    definitions: Iterable[BacktestDefinition],
+    instruments: Optional[Iterable[str]] = None,
+) -> List[BacktestDefinition]:
+    """One definition per cache key among the session-range definitions,
+    optionally restricted to some instruments.
+
+    The minimum H1 range is cleared on the returned definitions: a warm-up
+    has to leave complete days behind for every definition sharing the
+    key, not partial entries (m5_fetched=False) that only a wide-range
+    definition could use - and it completes the partial ones it finds."""
+    wanted = None if instruments is None else set(instruments)
+    targets: Dict[str, BacktestDefinition] = {}
+    for definition in definitions:
+        if definition.combo_entry:
+            continue
+        if wanted is not None and definition.instrument not in wanted:
+            continue
+        targets.setdefault(
+            cache_key(definition),
+            dataclasses.replace(definition, min_h1_range_points=None),
+        )
+    return list(targets.values())
+
+
+class CacheWarmer:
+    def __init__(
+        self,
+        candles_service: CandlesService,
+        dynamodb_client: DynamoDBClient,
+        logger: logging.Logger,
+        concurrency: int = WARM_CONCURRENCY,
+    ):
+        self.candles_service = candles_service
+        self.dynamodb_client = dynamodb_client
+        self.logger = logger
+        self.concurrency = concurrency
+
+    async def warm(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        instruments: Optional[Iterable[str]] = None,
+        progress: Optional[Callable[[WarmProgress], None]] = None,
+    ) -> WarmResult:
+        """Fill every missing or partial day of [start_date, end_date] for
+        the registered definitions. Weekends, future days and a session
+        still in progress are never fetched, like in a backtest run."""
+        chunks = [
+            (definition, days)
+            for definition in warm_targets(BACKTEST_DEFINITIONS, instruments)
+            for days in self._chunks(definition, start_date, end_date)
+        ]
+        result = WarmResult()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm_chunk(
+            definition: BacktestDefinition, days: List[datetime.date]
+        ) -> None:
+            async with semaphore:
+                # A source per chunk: what prefetch_range keeps for the day
+                # loop of a run is of no use here.
+                source = CandleSource(
+                    self.candles_service, self.dynamodb_client, self.logger
+                )
+                try:
+                    stored = await source.prefetch_range(definition, days)
+                except Exception as e:
+                    self.logger.error(
+                        f"Warming {cache_key(definition)} from {days[0]} "
+                        f"to {days[-1]} failed: {e}"
+                    )
+                    result.failed_chunks += 1
+                    stored = 0
+            result.days_checked += len(days)
+            result.days_stored += stored
+            result.chunks_done += 1
+            if progress is not None:
+                progress(
+                    WarmProgress(
+                        key=cache_key(definition),
+                        first_date=days[0],
+                        last_date=days[-1],
+                        days_stored=stored,
+                        chunks_done=result.chunks_done,
+                        chunks_total=len(chunks),
+                    )
+                )
+
+        await asyncio.gather(*(warm_chunk(d, days) for d, days in chunks))
+        return result
+
+    @staticmethod
+    def _chunks(
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> List[List[datetime.date]]:
+        days = [
+            day
+            for day in (
+                start_date + datetime.timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)
+            )
+            if day.weekday() < 5
+            and not is_future_paris_date(day)
+            and not is_today_not_yet_closed(day, definition.market)
+        ]
+        return [
+            days[index : index + WARM_CHUNK_DAYS]
+            for index in range(0, len(days), WARM_CHUNK_DAYS)
+        ]
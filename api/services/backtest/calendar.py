@@ -55,6 +55,16 @@ def paris_reference_window_utc(
     return (start, end)
 
 
+def paris_session_start_utc(
+    trading_date: datetime.date, market: Market
+) -> datetime.datetime:
+    """Start of the market's session on trading_date (02:00 local for
+    DaxCfdMarket), as a naive UTC datetime. The start of the reference
+    window too, but a strategy reading the whole session asks for it
+    under this name."""
+    return paris_reference_window_utc(trading_date, market)[0]
+
+
 def paris_session_end_utc(
     trading_date: datetime.date, market: Market
 ) -> datetime.datetime:
@@ -7,6 +7,16 @@ looks at the strategy, with one exception: on a definition carrying a
 minimum H1 range, a day that fails the filter skips the 5-minute fetch
 entirely (FR-033), because no 5-minute candle can change the outcome.
 
+A range run first acquires every day it is missing in bulk (see
+CandleSource.prefetch_range): contiguous multi-day H1 and 5-minute pages,
+split per session, so a cold year costs a few dozen Saxo calls instead of
+two per trading day. A day already in hand ends a page, so a warm stretch
+inside the range is not downloaded again.
+
+In front of DynamoDB sits a process-wide LRU of decoded days
+(DAY_CANDLE_CACHE), so re-running a definition with other parameters over
+a range the API process has already served is pure CPU.
+
 Failure policy: a genuine "Saxo has nothing for this day" is cached as
 such, but a transient fetch failure (expired token, rate limit, network
 blip) is never written to the cache - otherwise one bad minute would
@@ -14,9 +24,12 @@ poison every later run over that day. A cache outage in either direction
 degrades to going to Saxo, never to a failed request.
 """
 
+import asyncio
+import bisect
 import datetime
 import logging
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Collection, Dict, List, Optional, Tuple
 
 from api.services.backtest.calendar import (
     paris_reference_window_utc,
@@ -25,6 +38,7 @@ from api.services.backtest.calendar import (
 )
 from api.services.backtest.candles import candle_date
 from api.services.backtest.definitions import is_below_min_range
+from api.services.backtest.fetch_failures import fetch_failed
 from client.aws_client import DynamoDBClient, DynamoDBOperationError
 from model import BacktestDefinition, CachedDayCandles, Candle, UnitTime
 from services.candles_service import CandlesService
@@ -47,6 +61,12 @@ H1_HORIZON = 60
 # session, so v1 stored one copy per strategy of the exact same data.
 CACHE_SCHEMA_VERSION = 2
 
+# Bound of the in-process day cache, in candles (a day weighs its 5-minute
+# candles plus one). A full GER40 session is ~150 candles, so this keeps
+# about two years of each of the three cache keys - a few hundred MB at
+# most.
+DAY_CACHE_MAX_CANDLES = 300_000
+
 
 def cache_key(definition: BacktestDefinition) -> str:
     """Cache key for the raw-candle cache (FR-036): what the fetch itself
@@ -60,6 +80,144 @@ def cache_key(definition: BacktestDefinition) -> str:
     )
 
 
+Windows = Dict[datetime.date, Tuple[datetime.datetime, datetime.datetime]]
+
+
+def split_windows(
+    trading_dates: List[datetime.date],
+    windows: Windows,
+    in_hand: Collection[datetime.date],
+) -> List[Windows]:
+    """The windows in runs of consecutive trading dates, each fetched on
+    its own (see fetch_ranges). A run ends at a day whose candles are
+    already in hand, which a single fetch across it would download again;
+    a day without data costs nothing to span and does not end it."""
+    runs: List[Windows] = []
+    run: Windows = {}
+    for trading_date in sorted(trading_dates):
+        if trading_date in windows:
+            run[trading_date] = windows[trading_date]
+        elif trading_date in in_hand and run:
+            runs.append(run)
+            run = {}
+    if run:
+        runs.append(run)
+    return runs
+
+
+def fetch_ranges(
+    candles_service: CandlesService,
+    logger: logging.Logger,
+    instrument: str,
+    ut: UnitTime,
+    horizon: int,
+    runs: List[Windows],
+) -> Dict[datetime.date, List[Candle]]:
+    """fetch_range over each run of split_windows. A failed run falls
+    back to per-day fetches on its own; the others are kept."""
+    fetched: Dict[datetime.date, List[Candle]] = {}
+    for windows in runs:
+        fetched.update(
+            fetch_range(
+                candles_service, logger, instrument, ut, horizon, windows
+            )
+        )
+    return fetched
+
+
+def fetch_range(
+    candles_service: CandlesService,
+    logger: logging.Logger,
+    instrument: str,
+    ut: UnitTime,
+    horizon: int,
+    windows: Windows,
+) -> Dict[datetime.date, List[Candle]]:
+    """The candles of each day's [start, end) window, oldest first, from a
+    single range fetch over all of them. Only the days the fetched series
+    reaches back to are returned: an empty list there is a genuine "no
+    candles", while a day left out has to be fetched on its own."""
+    if not windows:
+        return {}
+    try:
+        candles = candles_service.get_candles_in_range(
+            instrument,
+            ut,
+            horizon,
+            min(start for start, _ in windows.values()),
+            max(end for _, end in windows.values()),
+        )
+    except SaxoException as e:
+        logger.warning(
+            f"Range {ut} fetch failed for {instrument}, falling back "
+            f"to per-day fetches: {e}"
+        )
+        return {}
+    dates = [candle_date(candle) for candle in candles]
+    if not dates:
+        return {}
+    return {
+        trading_date: candles[
+            bisect.bisect_left(dates, start) : bisect.bisect_left(dates, end)
+        ]
+        for trading_date, (start, end) in windows.items()
+        if dates[0] <= start
+    }
+
+
+class DayCandleCache:
+    """Least-recently-used map of (cache key, date) to the decoded day, as
+    stored in DynamoDB, bounded by the total number of candles held.
+
+    It mirrors the DynamoDB cache and nothing else: whatever is read from
+    or written to the table goes through here, so a transient fetch
+    failure - never stored - is never remembered either. The entries are
+    shared between requests and must be treated as read-only."""
+
+    def __init__(self, max_candles: int = DAY_CACHE_MAX_CANDLES):
+        self.max_candles = max_candles
+        self._entries: OrderedDict[
+            Tuple[str, datetime.date], CachedDayCandles
+        ] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _weight(day: CachedDayCandles) -> int:
+        return 1 + len(day.m5_candles)
+
+    def get(
+        self, key: str, trading_date: datetime.date
+    ) -> Optional[CachedDayCandles]:
+        day = self._entries.get((key, trading_date))
+        if day is not None:
+            self._entries.move_to_end((key, trading_date))
+        return day
+
+    def put(
+        self, key: str, trading_date: datetime.date, day: CachedDayCandles
+    ) -> None:
+        previous = self._entries.pop((key, trading_date), None)
+        if previous is not None:
+            self._size -= self._weight(previous)
+        self._entries[(key, trading_date)] = day
+        self._size += self._weight(day)
+        while self._size > self.max_candles and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= self._weight(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+# Shared by every CandleSource of the process: the backtest service is
+# rebuilt on each API request, this cache is not.
+DAY_CANDLE_CACHE = DayCandleCache()
+
+
 class CandleSource:
     """Serves a day's H1 reference candle and 5-minute session candles,
     from the cache when possible and from Saxo otherwise."""
@@ -69,10 +227,16 @@ class CandleSource:
         candles_service: CandlesService,
         dynamodb_client: DynamoDBClient,
         logger: logging.Logger,
+        day_cache: Optional[DayCandleCache] = None,
     ):
         self.candles_service = candles_service
         self.dynamodb_client = dynamodb_client
         self.logger = logger
+        self.day_cache = DAY_CANDLE_CACHE if day_cache is None else day_cache
+        # Days resolved by prefetch_range, served once by day_candles
+        self._prefetched: Dict[
+            Tuple[str, datetime.date], Optional[CachedDayCandles]
+        ] = {}
 
     async def day_candles(
         self, definition: BacktestDefinition, trading_date: datetime.date
@@ -80,6 +244,9 @@ class CandleSource:
         """The day's candles, or None when the day has no usable data
         (nothing from Saxo, or a fetch that failed). A returned value
         always carries an h1_candle."""
+        prefetched = (cache_key(definition), trading_date)
+        if prefetched in self._prefetched:
+            return self._prefetched.pop(prefetched)
         cached = await self._cache_hit(definition, trading_date)
         if cached is None:
             return await self._fetch_and_store(definition, trading_date)
@@ -96,6 +263,141 @@ class CandleSource:
             definition, trading_date, cached.h1_candle
         )
 
+    async def prefetch_range(
+        self,
+        definition: BacktestDefinition,
+        trading_dates: List[datetime.date],
+    ) -> int:
+        """Resolve the days of a range run ahead of its day loop, so that
+        day_candles then answers each of them without going to Saxo.
+        Returns how many days were fetched and stored.
+
+        Cached days are read as usual. Each run of consecutive missing
+        days shares one multi-day H1 fetch and, for the days that need
+        them (a partial entry being completed, or a fresh day clearing the
+        minimum range), each run of those shares one multi-day 5-minute
+        fetch; a cached day ends a run (see split_windows). The fetches
+        are split per session and every day is stored exactly as the
+        per-day path would have stored it. A day the range fetch does not
+        reach (a failure, or Saxo's history ending inside the range) is
+        left to the per-day path.
+
+        The range fetches run on a worker thread: they are the long part
+        of a cold run and would otherwise hold the event loop."""
+        key = cache_key(definition)
+        missing: List[datetime.date] = []
+        h1_candles: Dict[datetime.date, Candle] = {}
+        # Days with data whose 5-minute candles are not fetched again
+        complete: List[datetime.date] = []
+        for trading_date in trading_dates:
+            cached = await self._cache_hit(definition, trading_date)
+            if cached is None:
+                missing.append(trading_date)
+            elif not cached.has_data or cached.h1_candle is None:
+                self._prefetched[(key, trading_date)] = None
+            elif cached.m5_fetched or is_below_min_range(
+                definition, cached.h1_candle.higher, cached.h1_candle.lower
+            ):
+                self._prefetched[(key, trading_date)] = cached
+                complete.append(trading_date)
+            else:
+                h1_candles[trading_date] = cached.h1_candle
+
+        fetched_h1 = await asyncio.to_thread(
+            self._fetch_ranges,
+            definition.instrument,
+            UnitTime.H1,
+            H1_HORIZON,
+            split_windows(
+                trading_dates,
+                {
+                    trading_date: paris_reference_window_utc(
+                        trading_date, definition.market
+                    )
+                    for trading_date in missing
+                },
+                set(complete) | set(h1_candles),
+            ),
+        )
+        stores = []
+        for trading_date, candles in fetched_h1.items():
+            if not candles:
+                stores.append(self._store(key, trading_date, has_data=False))
+                self._prefetched[(key, trading_date)] = None
+                continue
+            h1_candle = candles[0]
+            if is_below_min_range(
+                definition, h1_candle.higher, h1_candle.lower
+            ):
+                stores.append(
+                    self._store(
+                        key,
+                        trading_date,
+                        has_data=True,
+                        h1_candle=h1_candle,
+                        m5_candles=[],
+                        m5_fetched=False,
+                        only_if_absent=True,
+                    )
+                )
+                self._prefetched[(key, trading_date)] = CachedDayCandles(
+                    has_data=True,
+                    h1_candle=h1_candle,
+                    m5_candles=[],
+                    m5_fetched=False,
+                )
+                complete.append(trading_date)
+                continue
+            h1_candles[trading_date] = h1_candle
+
+        fetched_m5 = await asyncio.to_thread(
+            self._fetch_ranges,
+            definition.instrument,
+            UnitTime.M5,
+            FIVE_MINUTE_HORIZON,
+            split_windows(
+                trading_dates,
+                {
+                    trading_date: (
+                        paris_reference_window_utc(
+                            trading_date, definition.market
+                        )[1],
+                        paris_session_end_utc(trading_date, definition.market),
+                    )
+                    for trading_date in h1_candles
+                },
+                complete,
+            ),
+        )
+        for trading_date, m5_candles in fetched_m5.items():
+            h1_candle = h1_candles[trading_date]
+            stores.append(
+                self._store(
+                    key,
+                    trading_date,
+                    has_data=True,
+                    h1_candle=h1_candle,
+                    m5_candles=m5_candles,
+                    m5_fetched=True,
+                )
+            )
+            self._prefetched[(key, trading_date)] = CachedDayCandles(
+                has_data=True, h1_candle=h1_candle, m5_candles=m5_candles
+            )
+        await asyncio.gather(*stores)
+        return len(stores)
+
+    def _fetch_ranges(
+        self,
+        instrument: str,
+        ut: UnitTime,
+        horizon: int,
+        runs: List[Windows],
+    ) -> Dict[datetime.date, List[Candle]]:
+        return fetch_ranges(
+            self.candles_service, self.logger, instrument, ut, horizon, runs
+        )
+
     async def _cache_hit(
         self, definition: BacktestDefinition, trading_date: datetime.date
     ) -> Optional[CachedDayCandles]:
@@ -140,6 +442,7 @@ class CandleSource:
                 f"{definition.instrument} on {trading_date}, "
                 f"not caching: {e}"
             )
+            fetch_failed(f"M5 {definition.instrument} {trading_date}")
             return CachedDayCandles(
                 has_data=True, h1_candle=h1_candle, m5_candles=[]
             )
@@ -171,6 +474,7 @@ class CandleSource:
                 f"H1 fetch failed for {definition.instrument} on "
                 f"{trading_date}, not caching: {e}"
             )
+            fetch_failed(f"H1 {definition.instrument} {trading_date}")
             return None
 
         if h1_candle is None:
@@ -215,6 +519,7 @@ class CandleSource:
                 f"5-minute fetch failed for {definition.instrument} on "
                 f"{trading_date}, not caching: {e}"
             )
+            fetch_failed(f"M5 {definition.instrument} {trading_date}")
             m5_candles = []
         else:
             await self._store(
@@ -265,7 +570,11 @@ class CandleSource:
     ) -> Optional[CachedDayCandles]:
         """The cached entry for (key, trading_date), or None on a miss, a
         DynamoDB failure, or a malformed item. In every such case the
-        caller falls back to Saxo, so a cache problem never breaks a run."""
+        caller falls back to Saxo, so a cache problem never breaks a run.
+        The in-process day cache is asked first."""
+        day = self.day_cache.get(key, trading_date)
+        if day is not None:
+            return day
         try:
             item = await self.dynamodb_client.get_cached_backtest_candles(
                 key, trading_date.isoformat()
@@ -281,15 +590,16 @@ class CandleSource:
 
         try:
             if not bool(item["has_data"]):
-                return CachedDayCandles(has_data=False)
-            return CachedDayCandles(
-                has_data=True,
-                h1_candle=Candle.from_dict(item["h1_candle"]),
-                m5_candles=[
-                    Candle.from_dict(c) for c in item.get("m5_candles", [])
-                ],
-                m5_fetched=bool(item.get("m5_fetched", True)),
-            )
+                day = CachedDayCandles(has_data=False)
+            else:
+                day = CachedDayCandles(
+                    has_data=True,
+                    h1_candle=Candle.from_dict(item["h1_candle"]),
+                    m5_candles=[
+                        Candle.from_dict(c) for c in item.get("m5_candles", [])
+                    ],
+                    m5_fetched=bool(item.get("m5_fetched", True)),
+                )
         except (KeyError, ValueError, TypeError) as e:
             # An item written under an earlier schema (or otherwise
             # malformed) is treated as a miss, the same as if nothing
@@ -299,6 +609,8 @@ class CandleSource:
                 f"{key}/{trading_date}: {e}"
             )
             return None
+        self.day_cache.put(key, trading_date, day)
+        return day
 
     async def _store(
         self,
@@ -313,7 +625,22 @@ class CandleSource:
         """Store the day's raw candles (FR-037/FR-038). A DynamoDB failure
         (including no active resource - local/dev without AWS) degrades to
         "not cached this time": caching is a cost optimization, not a
-        correctness requirement."""
+        correctness requirement.
+
+        The day is kept in the in-process cache either way, except for a
+        conditional (only_if_absent) write: whether it won is not known
+        here, so the next read goes to the table."""
+        if not only_if_absent:
+            self.day_cache.put(
+                key,
+                trading_date,
+                CachedDayCandles(
+                    has_data=has_data,
+                    h1_candle=h1_candle,
+                    m5_candles=list(m5_candles or []),
+                    m5_fetched=m5_fetched,
+                ),
+            )
         try:
             await self.dynamodb_client.store_backtest_candles(
                 key,
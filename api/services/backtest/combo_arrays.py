@@ -0,0 +1,196 @@
+"""Array form of a combo series, for the combo trade simulator.
+
+Calling `indicator_service.combo` on every flat candle of a multi-year
+series is what makes the candle-by-candle walk slow: each call rebuilds
+its averages, bands, atr and macd0lag from a 250-candle window. Most of
+those calls end at one of combo's first gates, though, and the gates read
+nothing but rolling averages and deviations of the closes. ComboArrays
+computes those once over the whole series, as numpy arrays:
+
+- the ma50, its slope over 10 candles, the 2.0 and 2.5 bollinger bands
+  and the 2.5 bands' slopes over 3 candles, with the same arithmetic
+  combo and bollinger_bands use on each window;
+- from them, the candles combo can return a signal on (`candidates`):
+  a bollinger band flat enough, an ma50 sloping enough, and a close on
+  the ma50's side and inside the 2.5 band;
+- the TP1/TP2 levels of every candle, so a position's exits are found
+  with vectorized first-hit searches, as in array_engine.
+
+The atr and macd0lag are left to combo. Both are recursive and seeded at
+the first candle of the window they are given, so a single recursion over
+the whole series would drift from what combo computes live; they are
+read only on the candidates, where combo is called on the candle's own
+window. The candidates may over-approximate - the slopes and the price
+checks are taken with a small tolerance, and the atr margins of the
+"far from the levels" gate are not applied at all - but never miss a
+candle combo would signal on, which keeps the trades identical to the
+candle-by-candle walk.
+"""
+
+import datetime
+from typing import List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from api.services.backtest.bands import TARGET_BAND_DEVIATION, BandLevels
+from api.services.backtest.candles import candle_date
+from api.services.backtest.position import Position
+from api.services.backtest.side import Side
+from model import Candle
+from services.indicator_service import (
+    COMBO_BB_BREACH_TOLERANCE,
+    COMBO_BB_FLAT_SLOPE_MAX,
+    COMBO_MA50_SLOPE_MIN,
+    COMBO_MIN_CANDLES,
+)
+
+BB_PERIOD = 20
+MA50_PERIOD = 50
+MA50_SLOPE_OFFSET = 10
+BB_SLOPE_OFFSET = 2
+OUTER_BAND_DEVIATION = 2.5
+# combo rounds its slopes to 5 decimals, which the arrays do not: far
+# more than that difference, far less than anything a threshold means.
+SLOPE_TOLERANCE = 1e-4
+# Relative slack on the price gates, against the last-bit differences
+# between the arrays and combo's own arithmetic.
+PRICE_TOLERANCE = 1e-9
+
+
+def _slope_percentage(y1: np.ndarray, dx: float, y2: np.ndarray) -> np.ndarray:
+    """indicator_service.slope_percentage(0, y1, dx, y2), unrounded."""
+    return (100 - y1 * (100.0 / y2)) / dx * 100.0
+
+
+def _shifted(values: np.ndarray, offset: int) -> np.ndarray:
+    """values[i - offset] at i, NaN where there is none."""
+    shifted = np.full(len(values), np.nan)
+    if offset < len(values):
+        shifted[offset:] = values[: len(values) - offset]
+    return shifted
+
+
+class ComboArrays:
+    """One combo series' chronological candles and rolling indicators."""
+
+    def __init__(self, candles: List[Candle]):
+        self.candles = candles
+        self.times: List[datetime.datetime] = [
+            candle_date(candle) for candle in candles
+        ]
+        self.open = np.array([c.open for c in candles], dtype=float)
+        self.high = np.array([c.higher for c in candles], dtype=float)
+        self.low = np.array([c.lower for c in candles], dtype=float)
+        self.close = np.array([c.close for c in candles], dtype=float)
+        count = len(candles)
+
+        # The bands of candle i are bollinger_bands of the newest-first
+        # window ending at it. Its 20 closes are a contiguous run of the
+        # reversed closes, in the same order, so each row's mean and
+        # deviation are bit for bit the ones numpy computes on the slice.
+        mean = np.full(count, np.nan)
+        std = np.full(count, np.nan)
+        if count >= BB_PERIOD:
+            windows = sliding_window_view(self.close[::-1], BB_PERIOD)
+            mean[BB_PERIOD - 1 :] = windows.mean(axis=1)[::-1]
+            std[BB_PERIOD - 1 :] = windows.std(axis=1)[::-1]
+        self.mm20 = np.round(mean, 4)
+        self.upper = np.round(mean + TARGET_BAND_DEVIATION * std, 4)
+        self.bottom = np.round(mean - TARGET_BAND_DEVIATION * std, 4)
+        outer_upper = np.round(mean + OUTER_BAND_DEVIATION * std, 4)
+        outer_bottom = np.round(mean - OUTER_BAND_DEVIATION * std, 4)
+
+        # mobile_average sums its closes newest first, one at a time;
+        # so does this, 50 vectorized additions in the same order.
+        ma50 = np.full(count, np.nan)
+        if count >= MA50_PERIOD:
+            total = self.close[MA50_PERIOD - 1 :].copy()
+            for age in range(1, MA50_PERIOD):
+                total += self.close[MA50_PERIOD - 1 - age : count - age]
+            ma50[MA50_PERIOD - 1 :] = total / MA50_PERIOD
+        self.ma50 = ma50
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ma50_slope = _slope_percentage(
+                _shifted(ma50, MA50_SLOPE_OFFSET), MA50_SLOPE_OFFSET, ma50
+            )
+            upper_slope = _slope_percentage(
+                _shifted(outer_upper, BB_SLOPE_OFFSET),
+                BB_SLOPE_OFFSET + 1,
+                outer_upper,
+            )
+            bottom_slope = _slope_percentage(
+                _shifted(outer_bottom, BB_SLOPE_OFFSET),
+                BB_SLOPE_OFFSET + 1,
+                outer_bottom,
+            )
+            flat_limit = COMBO_BB_FLAT_SLOPE_MAX + SLOPE_TOLERANCE
+            neither_flat = (np.abs(upper_slope) > flat_limit) & (
+                np.abs(bottom_slope) > flat_limit
+            )
+            slope_limit = COMBO_MA50_SLOPE_MIN - SLOPE_TOLERANCE
+            slack = np.abs(self.close) * PRICE_TOLERANCE
+            buy = (
+                (ma50_slope > slope_limit)
+                & (self.close >= ma50 - slack)
+                & (
+                    self.close
+                    >= outer_bottom * (1 - COMBO_BB_BREACH_TOLERANCE) - slack
+                )
+            )
+            sell = (
+                (ma50_slope < -slope_limit)
+                & (self.close <= ma50 + slack)
+                & (
+                    self.close
+                    <= outer_upper * (1 + COMBO_BB_BREACH_TOLERANCE) + slack
+                )
+            )
+        # combo declines a window shorter than COMBO_MIN_CANDLES, and the
+        # window of candle i holds at most i + 1 of them.
+        long_enough = np.arange(count) >= COMBO_MIN_CANDLES - 1
+        self.candidates = long_enough & ~neither_flat & (buy | sell)
+        self._candidate_indexes = np.flatnonzero(self.candidates)
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    def bands(self, index: int) -> BandLevels:
+        """bands.levels of the window ending at candles[index]."""
+        return BandLevels(
+            mm20=float(self.mm20[index]),
+            upper=float(self.upper[index]),
+            bottom=float(self.bottom[index]),
+        )
+
+    def next_candidate(self, start: int) -> Optional[int]:
+        """The first candle from `start` combo may signal on."""
+        index = int(np.searchsorted(self._candidate_indexes, start))
+        if index == len(self._candidate_indexes):
+            return None
+        return int(self._candidate_indexes[index])
+
+    def next_exit_event(self, position: Position, start: int) -> Optional[int]:
+        """The first candle from `start` on which the combo exit chain -
+        Stop, then DoubleTarget on the moving levels - could close the
+        position or bank its first lot, or None when it stays open to
+        the end of the series."""
+        if start >= len(self):
+            return None
+        side: Side = position.side
+        sign = side.sign
+        extreme = (self.high if side.is_long else self.low)[start:]
+        adverse = (self.low if side.is_long else self.high)[start:]
+        target = (
+            (self.upper if side.is_long else self.bottom)
+            if position.first_target_taken
+            else self.mm20
+        )[start:]
+        mask = ((adverse - position.stop_level) * sign <= 0) | (
+            (extreme - target) * sign >= 0
+        )
+        hits = np.flatnonzero(mask)
+        if len(hits) == 0:
+            return None
+        return start + int(hits[0])
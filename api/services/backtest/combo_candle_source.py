@@ -0,0 +1,407 @@
+"""Continuous candle series for the combo backtests (spec 026, R3).
+
+A session backtest reads a day as an H1 reference candle and its 5-minute
+candles (see candle_source). A combo backtest reads one unbroken series
+at its definition's unit time instead, across days and weekends, with a
+lead-in long enough that the indicator sees on the range's first candle
+the window the live alerting path would have fed it (FR-C13).
+
+The days are cached in the raw-candle table, under their own key
+namespace (series_key) and as a plain candle list, with the failure
+policy of CandleSource: a genuine empty day is cached as such, a failed
+fetch never is, and a cache outage degrades to going to Saxo. A process
+-wide LRU of decoded days sits in front of the table, so re-running a
+range with another stop distance costs no I/O at all.
+"""
+
+import asyncio
+import datetime
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from api.services.backtest.calendar import (
+    paris_session_end_utc,
+    paris_session_start_utc,
+    session_key,
+)
+from api.services.backtest.candle_source import (
+    fetch_ranges,
+    split_windows,
+)
+from api.services.backtest.candles import candle_date
+from api.services.backtest.fetch_failures import fetch_failed
+from client.aws_client import DynamoDBClient, DynamoDBOperationError
+from model import BacktestDefinition, Candle, UnitTime
+from services.candles_service import CandlesService
+from utils.exception import SaxoException
+
+# Bump whenever a change to how the series are fetched or stored would
+# make existing entries wrong under the same key (see
+# candle_source.CACHE_SCHEMA_VERSION).
+SERIES_SCHEMA_VERSION = 1
+
+# Saxo horizon, in minutes, of each timeframe a combo definition can run
+# on. All four are native Saxo horizons, so a closed day needs no
+# reconstruction; the daily one is the bar alerting.py::_build_candles
+# feeds the live combo.
+SERIES_HORIZONS: Dict[UnitTime, int] = {
+    UnitTime.M5: 5,
+    UnitTime.M15: 15,
+    UnitTime.H1: 60,
+    UnitTime.D: 1440,
+}
+
+# Candles of the newest-first window combo is evaluated on, as many as
+# alerting.py::_build_candles feeds it live: macd0lag and the atr are
+# recursive, so a shorter window scores the same candle differently.
+COMBO_WINDOW = 250
+# How far back the lead-in may reach for those candles (FR-C13), per
+# timeframe: about thirteen trading days of H1 over the 20-hour session,
+# fewer below it. A daily candle is a whole session, so the daily lead-in
+# reaches back 250 trading days - 50 weeks, plus the holidays.
+LEAD_IN_MAX_CALENDAR_DAYS: Dict[UnitTime, int] = {
+    UnitTime.M5: 30,
+    UnitTime.M15: 30,
+    UnitTime.H1: 30,
+    UnitTime.D: 380,
+}
+
+# Bound of the in-process series cache, in candles (a day weighs its
+# candles plus one): two years of the 5-minute series, or all of the
+# slower ones.
+SERIES_CACHE_MAX_CANDLES = 150_000
+
+
+def series_key(definition: BacktestDefinition) -> str:
+    """Cache key of a definition's series: the instrument, the session the
+    days are fetched over and the unit time - never the definition code,
+    so every definition reading the same series shares its entries."""
+    return (
+        f"{definition.instrument}:{session_key(definition.market)}"
+        f":{series_unit_time(definition).value}:v{SERIES_SCHEMA_VERSION}"
+    )
+
+
+def series_unit_time(definition: BacktestDefinition) -> UnitTime:
+    unit_time = definition.unit_time
+    if unit_time is None or unit_time not in SERIES_HORIZONS:
+        raise SaxoException(
+            f"definition {definition.code!r} has no series to read: the "
+            "combo backtests run on "
+            + ", ".join(ut.value for ut in SERIES_HORIZONS)
+        )
+    return unit_time
+
+
+@dataclass
+class ComboSeries:
+    """A range's candles in chronological order, lead-in first.
+
+    `dates[i]` is the trading day `candles[i]` belongs to, and
+    `first_index` the range's first candle: the ones before it only
+    exist to fill the indicator's window."""
+
+    candles: List[Candle] = field(default_factory=list)
+    dates: List[datetime.date] = field(default_factory=list)
+    first_index: int = 0
+
+
+class SeriesDayCache:
+    """Least-recently-used map of (series key, date) to the day's decoded
+    candles - an empty list for a day Saxo has nothing for - bounded by
+    the total number of candles held. Like DayCandleCache, it only ever
+    holds what was read from or written to the table, and its lists are
+    shared and must be treated as read-only."""
+
+    def __init__(self, max_candles: int = SERIES_CACHE_MAX_CANDLES):
+        self.max_candles = max_candles
+        self._entries: OrderedDict[Tuple[str, datetime.date], List[Candle]] = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, key: str, trading_date: datetime.date
+    ) -> Optional[List[Candle]]:
+        candles = self._entries.get((key, trading_date))
+        if candles is not None:
+            self._entries.move_to_end((key, trading_date))
+        return candles
+
+    def put(
+        self, key: str, trading_date: datetime.date, candles: List[Candle]
+    ) -> None:
+        previous = self._entries.pop((key, trading_date), None)
+        if previous is not None:
+            self._size -= 1 + len(previous)
+        self._entries[(key, trading_date)] = candles
+        self._size += 1 + len(candles)
+        while self._size > self.max_candles and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= 1 + len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+# Shared by every ComboCandleSource of the process, as DAY_CANDLE_CACHE is
+# by the candle sources.
+SERIES_DAY_CACHE = SeriesDayCache()
+
+
+class ComboCandleSource:
+    """Serves a combo definition's series over a range, from the cache
+    when possible and from Saxo otherwise."""
+
+    def __init__(
+        self,
+        candles_service: CandlesService,
+        dynamodb_client: DynamoDBClient,
+        logger: logging.Logger,
+        day_cache: Optional[SeriesDayCache] = None,
+    ):
+        self.candles_service = candles_service
+        self.dynamodb_client = dynamodb_client
+        self.logger = logger
+        self.day_cache = SERIES_DAY_CACHE if day_cache is None else day_cache
+
+    async def series(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> ComboSeries:
+        """The weekdays of [start_date, end_date], preceded by at least
+        COMBO_WINDOW lead-in candles when the last
+        LEAD_IN_MAX_CALENDAR_DAYS of the series' timeframe hold that
+        many."""
+        range_dates = _weekdays(start_date, end_date)
+        days = await self.day_series(definition, range_dates)
+
+        # The lead-in is taken a few sessions at a time, newest first,
+        # sized on a full session so one batch is enough but for
+        # holidays.
+        per_session = _session_candles(definition, start_date)
+        batch = math.ceil(COMBO_WINDOW / per_session) + 1
+        lead_in_dates = list(
+            reversed(
+                _weekdays(
+                    start_date
+                    - datetime.timedelta(
+                        days=LEAD_IN_MAX_CALENDAR_DAYS[
+                            series_unit_time(definition)
+                        ]
+                    ),
+                    start_date - datetime.timedelta(days=1),
+                )
+            )
+        )
+        lead_in: Dict[datetime.date, List[Candle]] = {}
+        while lead_in_dates and (
+            sum(len(candles) for candles in lead_in.values()) < COMBO_WINDOW
+        ):
+            chunk, lead_in_dates = (
+                lead_in_dates[:batch],
+                lead_in_dates[batch:],
+            )
+            lead_in.update(await self.day_series(definition, chunk))
+
+        series = ComboSeries()
+        for trading_date in sorted(lead_in):
+            series.candles.extend(lead_in[trading_date])
+            series.dates.extend([trading_date] * len(lead_in[trading_date]))
+        series.first_index = len(series.candles)
+        for trading_date in range_dates:
+            series.candles.extend(days[trading_date])
+            series.dates.extend([trading_date] * len(days[trading_date]))
+        return series
+
+    async def day_series(
+        self,
+        definition: BacktestDefinition,
+        trading_dates: List[datetime.date],
+    ) -> Dict[datetime.date, List[Candle]]:
+        """Each day's candles, chronological; an empty list for a day with
+        none. The cached days are read together, each run of consecutive
+        missing ones shares one range fetch on a worker thread (a cached
+        day ends a run, see split_windows), and a day those fetches do not
+        reach is fetched on its own."""
+        key = series_key(definition)
+        unit_time = series_unit_time(definition)
+        horizon = SERIES_HORIZONS[unit_time]
+        loaded = await asyncio.gather(
+            *(self._load(key, trading_date) for trading_date in trading_dates)
+        )
+        days: Dict[datetime.date, List[Candle]] = {}
+        windows: Dict[
+            datetime.date, Tuple[datetime.datetime, datetime.datetime]
+        ] = {}
+        for trading_date, cached in zip(trading_dates, loaded):
+            if cached is not None:
+                days[trading_date] = cached
+            else:
+                windows[trading_date] = _day_window(
+                    definition, unit_time, trading_date
+                )
+
+        fetched = await asyncio.to_thread(
+            fetch_ranges,
+            self.candles_service,
+            self.logger,
+            definition.instrument,
+            unit_time,
+            horizon,
+            split_windows(
+                trading_dates,
+                windows,
+                [trading_date for trading_date in days if days[trading_date]],
+            ),
+        )
+        stores = []
+        for trading_date, (start, end) in windows.items():
+            if trading_date in fetched:
+                candles: Optional[List[Candle]] = fetched[trading_date]
+            else:
+                candles = await asyncio.to_thread(
+                    self._fetch_day,
+                    definition.instrument,
+                    unit_time,
+                    horizon,
+                    start,
+                    end,
+                )
+            if candles is None:
+                days[trading_date] = []
+                continue
+            candles = sorted(candles, key=candle_date)
+            days[trading_date] = candles
+            stores.append(self._store(key, trading_date, candles))
+        await asyncio.gather(*stores)
+        return days
+
+    def _fetch_day(
+        self,
+        instrument: str,
+        unit_time: UnitTime,
+        horizon: int,
+        start_utc: datetime.datetime,
+        end_utc: datetime.datetime,
+    ) -> Optional[List[Candle]]:
+        """The day's candles, or None when the fetch failed: a transient
+        failure is an empty day for this run, never a cached one."""
+        try:
+            return self.candles_service.get_candles_in_window(
+                instrument, unit_time, horizon, start_utc, end_utc
+            )
+        except SaxoException as e:
+            self.logger.warning(
+                f"{unit_time.value} fetch failed for {instrument} on "
+                f"{start_utc.date()}, not caching: {e}"
+            )
+            fetch_failed(f"{unit_time.value} {instrument} {start_utc.date()}")
+            return None
+
+    async def _load(
+        self, key: str, trading_date: datetime.date
+    ) -> Optional[List[Candle]]:
+        """The cached day, or None on a miss, a DynamoDB failure or a
+        malformed item - every one of which goes to Saxo."""
+        candles = self.day_cache.get(key, trading_date)
+        if candles is not None:
+            return candles
+        try:
+            item = await self.dynamodb_client.get_cached_backtest_series(
+                key, trading_date.isoformat()
+            )
+        except (DynamoDBOperationError, RuntimeError) as e:
+            self.logger.warning(
+                f"Backtest series cache lookup failed for "
+                f"{key}/{trading_date}: {e}"
+            )
+            return None
+        if item is None:
+            return None
+        try:
+            candles = (
+                [Candle.from_dict(c) for c in item["candles"]]
+                if bool(item["has_data"])
+                else []
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            self.logger.warning(
+                f"Malformed backtest series item for "
+                f"{key}/{trading_date}: {e}"
+            )
+            return None
+        self.day_cache.put(key, trading_date, candles)
+        return candles
+
+    async def _store(
+        self, key: str, trading_date: datetime.date, candles: List[Candle]
+    ) -> None:
+        """Cache the day; a DynamoDB failure leaves it cached in process
+        only, as CandleSource._store does."""
+        self.day_cache.put(key, trading_date, candles)
+        try:
+            await self.dynamodb_client.store_backtest_series(
+                key,
+                trading_date.isoformat(),
+                bool(candles),
+                [c.to_dict() for c in candles],
+            )
+        except (DynamoDBOperationError, RuntimeError) as e:
+            self.logger.warning(
+                f"Backtest series cache store failed for "
+                f"{key}/{trading_date}: {e}"
+            )
+
+
+def _weekdays(
+    start_date: datetime.date, end_date: datetime.date
+) -> List[datetime.date]:
+    return [
+        day
+        for day in (
+            start_date + datetime.timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        )
+        if day.weekday() < 5
+    ]
+
+
+def _day_window(
+    definition: BacktestDefinition,
+    unit_time: UnitTime,
+    trading_date: datetime.date,
+) -> Tuple[datetime.datetime, datetime.datetime]:
+    """The window a day's candles are fetched over, as naive UTC bounds:
+    its session, or for a daily series the UTC day Saxo dates the day's
+    bar in."""
+    if unit_time == UnitTime.D:
+        start = datetime.datetime.combine(trading_date, datetime.time())
+        return start, start + datetime.timedelta(days=1)
+    return (
+        paris_session_start_utc(trading_date, definition.market),
+        paris_session_end_utc(trading_date, definition.market),
+    )
+
+
+def _session_candles(
+    definition: BacktestDefinition, trading_date: datetime.date
+) -> int:
+    """Candles in one full session of the definition's series: one for a
+    daily series."""
+    minutes = (
+        paris_session_end_utc(trading_date, definition.market)
+        - paris_session_start_utc(trading_date, definition.market)
+    ).total_seconds() / 60
+    return max(
+        int(minutes // SERIES_HORIZONS[series_unit_time(definition)]), 1
+    )
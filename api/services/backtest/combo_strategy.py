@@ -0,0 +1,376 @@
+"""The combo backtests (spec 026): indicator entries, positions held across
+days.
+
+A position opens on a MEDIUM or STRONG signal of
+`indicator_service.combo` - at the signal candle's close when it is
+already triggered, on the next candle through its pending level
+otherwise - with two lots: the first takes the mm20, the runner the
+opposite 2.0 band, both re-read on every candle, and the stop sits
+stop_loss_points beyond the signal candle's adverse extreme until TP1
+moves it to break-even. One position at a time; signals are ignored
+while one is open, and nothing closes it at the end of a day. Whatever
+is still open after the last candle is closed there, as END_OF_RUN.
+
+Unlike the session strategies, a range is one continuous walk over one
+series, not a loop of independent days, so the whole range is evaluated
+before its rows are reported. The walk runs on the series' arrays (see
+combo_arrays) unless array_engine is turned off.
+"""
+
+import asyncio
+import datetime
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from api.services.backtest.analytics import (
+    adx_before,
+    fetch_daily_candles,
+    mm50_slope_before,
+    overnight_gap,
+)
+from api.services.backtest.bands import BandLevels, levels
+from api.services.backtest.calendar import paris_reference_window_utc
+from api.services.backtest.candles import candle_date
+from api.services.backtest.combo_arrays import ComboArrays
+from api.services.backtest.combo_candle_source import (
+    COMBO_WINDOW,
+    ComboCandleSource,
+    ComboSeries,
+)
+from api.services.backtest.lots import LotModel
+from api.services.backtest.policies import resolve_exit
+from api.services.backtest.position import Position
+from api.services.backtest.rules import build_exit_chain, build_lot_model
+from api.services.backtest.signals import ComboEntry, ComboEntrySearch
+from api.services.backtest.statistics import build_summary
+from client.aws_client import DynamoDBClient
+from model import (
+    BacktestDefinition,
+    BacktestParameters,
+    BacktestRunResult,
+    BacktestSummary,
+    Candle,
+    DayResult,
+    DayResultSummary,
+    EUMarket,
+    Trade,
+)
+from model.enum import DayStatus, ExitReason
+from services.candles_service import CandlesService
+from services.indicator_service import combo
+from utils.exception import SaxoException
+from utils.logger import Logger
+
+
+def _cash_open(
+    candles: List[Candle], trading_date: datetime.date
+) -> Optional[float]:
+    """The open of the day's first candle from 9:00 Paris on: the open the
+    overnight gap is measured from on every other backtest, read here off
+    a series that starts seven hours earlier."""
+    cash_open, _ = paris_reference_window_utc(trading_date, EUMarket())
+    for candle in candles:
+        if candle_date(candle) >= cash_open:
+            return candle.open
+    return None
+
+
+def combo_window(candles: List[Candle], index: int) -> List[Candle]:
+    """The newest-first window combo is evaluated on at candles[index]:
+    that candle and the COMBO_WINDOW - 1 before it."""
+    start = max(index - COMBO_WINDOW + 1, 0)
+    return candles[start : index + 1][::-1]
+
+
+class ComboStrategy:
+    def __init__(
+        self,
+        candles_service: CandlesService,
+        dynamodb_client: DynamoDBClient,
+    ):
+        self.logger = Logger.get_logger("backtest_combo")
+        self.candles_service = candles_service
+        self.candle_source = ComboCandleSource(
+            candles_service, dynamodb_client, self.logger
+        )
+        # Trades are simulated on the series' arrays (see combo_arrays);
+        # False calls combo on every flat candle instead, the reference
+        # the array simulator is checked against.
+        self.array_engine = True
+
+    async def evaluate_day(
+        self,
+        definition: BacktestDefinition,
+        trading_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+    ) -> DayResult:
+        """A one-day range run (R9): the day's candles and the trades
+        entered on it, a position still open at its last candle closed
+        there as END_OF_RUN."""
+        params = params or definition.default_parameters
+        series = await self.candle_source.series(
+            definition, trading_date, trading_date
+        )
+        candles = series.candles[series.first_index :]
+        if not candles:
+            return DayResult(date=trading_date, status=DayStatus.NO_DATA)
+        trades = await asyncio.to_thread(
+            self._trades, series, params, definition
+        )
+        return DayResult(
+            date=trading_date,
+            status=DayStatus.TRADED if trades else DayStatus.NO_TRADE,
+            candles=candles,
+            trades=trades,
+        )
+
+    async def run_range(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+    ) -> BacktestRunResult:
+        day_summaries: List[DayResultSummary] = []
+        summary: Optional[BacktestSummary] = None
+        async for item in self.stream_range(
+            definition, start_date, end_date, params
+        ):
+            if isinstance(item, DayResultSummary):
+                day_summaries.append(item)
+            else:
+                summary = item
+        if summary is None:
+            raise SaxoException("the range stream ended without a summary")
+        return BacktestRunResult(summary=summary, days=day_summaries)
+
+    async def stream_range(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+    ) -> AsyncIterator[Union[DayResultSummary, BacktestSummary]]:
+        """The rows of every day with candles, then the summary. A trade
+        is reported on the day it entered (R8); a day a position only
+        runs through is a NO_TRADE. The h1 columns stay empty - there is
+        no reference range - while the regime columns are filled as for
+        any backtest."""
+        params = params or definition.default_parameters
+        series = await self.candle_source.series(
+            definition, start_date, end_date
+        )
+        daily_candles = fetch_daily_candles(
+            self.candles_service,
+            definition.instrument,
+            start_date,
+            end_date,
+            self.logger,
+        )
+        trades = await asyncio.to_thread(
+            self._trades, series, params, definition
+        )
+
+        candles_by_day: Dict[datetime.date, List[Candle]] = {}
+        entry_dates: Dict[datetime.datetime, datetime.date] = {}
+        for candle, trading_date in zip(
+            series.candles[series.first_index :],
+            series.dates[series.first_index :],
+        ):
+            candles_by_day.setdefault(trading_date, []).append(candle)
+            entry_dates[candle_date(candle)] = trading_date
+        trades_by_day: Dict[datetime.date, List[Trade]] = {}
+        for trade in trades:
+            trades_by_day.setdefault(entry_dates[trade.entry_time], []).append(
+                trade
+            )
+
+        for trading_date, day_candles in candles_by_day.items():
+            day_trades = trades_by_day.get(trading_date, [])
+            yield DayResultSummary(
+                date=trading_date,
+                status=(
+                    DayStatus.TRADED if day_trades else DayStatus.NO_TRADE
+                ),
+                trade_count=len(day_trades),
+                points=round(sum(trade.points for trade in day_trades), 4),
+                mm50_slope=mm50_slope_before(daily_candles, trading_date),
+                adx14=adx_before(daily_candles, trading_date),
+                overnight_gap=overnight_gap(
+                    daily_candles,
+                    trading_date,
+                    _cash_open(day_candles, trading_date),
+                ),
+            )
+
+        yield build_summary(
+            definition, start_date, end_date, trades, len(candles_by_day)
+        )
+
+    def _trades(
+        self,
+        series: ComboSeries,
+        params: BacktestParameters,
+        definition: BacktestDefinition,
+    ) -> List[Trade]:
+        if self.array_engine:
+            return self._simulate_trades(
+                ComboArrays(series.candles),
+                series.first_index,
+                params,
+                definition,
+            )
+        return self._evaluate_trades(
+            series.candles, series.first_index, params, definition
+        )
+
+    @classmethod
+    def _evaluate_trades(
+        cls,
+        candles: List[Candle],
+        first_index: int,
+        params: BacktestParameters,
+        definition: BacktestDefinition,
+    ) -> List[Trade]:
+        """Walk the series candle by candle from first_index: retarget
+        then resolve the exits while in a position, and feed the entry
+        search - calling combo - while flat."""
+        trades: List[Trade] = []
+        position: Optional[Position] = None
+        chain = build_exit_chain(definition, params)
+        lots = build_lot_model(definition)
+        search = ComboEntrySearch()
+
+        for index in range(first_index, len(candles)):
+            candle = candles[index]
+            if position is not None:
+                bands = levels(combo_window(candles, index))
+                position.retarget(bands.mm20, bands.opposite(position.side))
+                closed = resolve_exit(
+                    chain, position, candle, candle_date(candle)
+                )
+                if closed is not None:
+                    trades.append(closed)
+                    position = None
+                continue
+
+            window = combo_window(candles, index)
+            bands = levels(window)
+            entry = cls._favorable(search.fill(candle), bands)
+            if entry is None:
+                entry = cls._favorable(
+                    search.signal(candle, combo(window)), bands
+                )
+            if entry is not None:
+                position = cls._open_position(
+                    entry, candle, bands, lots, params
+                )
+
+        if position is not None:
+            last = candles[-1]
+            trades.append(
+                position.close(
+                    candle_date(last), last.close, ExitReason.END_OF_RUN
+                )
+            )
+        return trades
+
+    @classmethod
+    def _simulate_trades(
+        cls,
+        arrays: ComboArrays,
+        first_index: int,
+        params: BacktestParameters,
+        definition: BacktestDefinition,
+    ) -> List[Trade]:
+        """_evaluate_trades on the series' arrays: combo is only called
+        on the candidates, and a position jumps from one exit event to
+        the next. Identical trades - the tests run both."""
+        trades: List[Trade] = []
+        chain = build_exit_chain(definition, params)
+        lots = build_lot_model(definition)
+        search = ComboEntrySearch()
+        candles = arrays.candles
+        start = first_index
+
+        while True:
+            # A pending level resolves on the very next candle; without
+            # one, nothing can happen before the next candidate.
+            if search.pending is not None:
+                index: Optional[int] = start
+            else:
+                index = arrays.next_candidate(start)
+            if index is None or index >= len(arrays):
+                return trades
+            start = index + 1
+            candle = candles[index]
+            bands = arrays.bands(index)
+            entry = cls._favorable(search.fill(candle), bands)
+            if entry is None and arrays.candidates[index]:
+                entry = cls._favorable(
+                    search.signal(candle, combo(combo_window(candles, index))),
+                    bands,
+                )
+            if entry is None:
+                continue
+            position = cls._open_position(entry, candle, bands, lots, params)
+
+            closed = None
+            exit_index = index
+            while closed is None:
+                next_index = arrays.next_exit_event(position, exit_index + 1)
+                if next_index is None:
+                    break
+                exit_index = next_index
+                bands = arrays.bands(exit_index)
+                position.retarget(bands.mm20, bands.opposite(position.side))
+                closed = resolve_exit(
+                    chain,
+                    position,
+                    candles[exit_index],
+                    arrays.times[exit_index],
+                )
+            if closed is None:
+                trades.append(
+                    position.close(
+                        arrays.times[-1],
+                        candles[-1].close,
+                        ExitReason.END_OF_RUN,
+                    )
+                )
+                return trades
+            trades.append(closed)
+            start = exit_index + 1
+
+    @staticmethod
+    def _favorable(
+        entry: Optional[ComboEntry], bands: BandLevels
+    ) -> Optional[ComboEntry]:
+        """The entry, unless the mm20 - TP1 - is not strictly beyond its
+        price (FR-C10): the first lot would bank a loss the moment it
+        opened."""
+        if entry is None or entry.side.favorable(bands.mm20, entry.price) > 0:
+            return entry
+        return None
+
+    @staticmethod
+    def _open_position(
+        entry: ComboEntry,
+        candle: Candle,
+        bands: BandLevels,
+        lots: LotModel,
+        params: BacktestParameters,
+    ) -> Position:
+        side = entry.side
+        return Position(
+            entry_time=candle_date(candle),
+            entry_price=entry.price,
+            side=side,
+            take_profit_level=bands.opposite(side),
+            stop_loss_points=params.stop_loss_points,
+            lots=lots,
+            first_target_level=bands.mm20,
+            # Measured from the candle the signal fired on, even when a
+            # pending level fills on the next one (FR-C06).
+            initial_stop_price=side.adverse_extreme(entry.signal_candle)
+            - side.sign * params.stop_loss_points,
+        )
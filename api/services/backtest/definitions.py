@@ -6,6 +6,7 @@ from typing import List, Optional
 from model import (
     BacktestDefinition,
     BacktestParameters,
+    DaxCfdMarket,
     EuCfdMarket,
     Strategy,
     UnitTime,
@@ -165,6 +166,58 @@ BACKTEST_DEFINITIONS: List[BacktestDefinition] = [
         max_daily_losses=2,
         ma50_direction_filter=UnitTime.D,
     ),
+    # The combo backtests (spec 026): the entries of the live combo
+    # alert, on one timeframe each, over the whole 02:00-22:00 CFD
+    # session. No 9h candle and no daily flat - a position is held until
+    # its stop or its runner's target, across days if it must. The stop
+    # sits stop_loss_points beyond the signal candle; the other
+    # thresholds are carried for shape only.
+    BacktestDefinition(
+        code="C5M",
+        name=Strategy.C5M.value,
+        display_name="GER40 Combo 5m",
+        instrument="GER40.I",
+        market=DaxCfdMarket(),
+        default_parameters=BacktestParameters(stop_loss_points=50),
+        double_take_profit=True,
+        unit_time=UnitTime.M5,
+        combo_entry=True,
+    ),
+    BacktestDefinition(
+        code="C15M",
+        name=Strategy.C15M.value,
+        display_name="GER40 Combo 15m",
+        instrument="GER40.I",
+        market=DaxCfdMarket(),
+        default_parameters=BacktestParameters(stop_loss_points=50),
+        double_take_profit=True,
+        unit_time=UnitTime.M15,
+        combo_entry=True,
+    ),
+    BacktestDefinition(
+        code="C1H",
+        name=Strategy.C1H.value,
+        display_name="GER40 Combo H1",
+        instrument="GER40.I",
+        market=DaxCfdMarket(),
+        default_parameters=BacktestParameters(stop_loss_points=50),
+        double_take_profit=True,
+        unit_time=UnitTime.H1,
+        combo_entry=True,
+    ),
+    # A daily candle spans the whole session, so the stop beyond it is
+    # the GER40 session variants' 150 points rather than 50.
+    BacktestDefinition(
+        code="C1D",
+        name=Strategy.C1D.value,
+        display_name="GER40 Combo D",
+        instrument="GER40.I",
+        market=DaxCfdMarket(),
+        default_parameters=BacktestParameters(stop_loss_points=150),
+        double_take_profit=True,
+        unit_time=UnitTime.D,
+        combo_entry=True,
+    ),
 ]
 
 
@@ -0,0 +1,39 @@
+"""Transient fetch failures of the range run in progress.
+
+A Saxo failure never aborts a backtest: the day degrades (a dropped
+NO_DATA row, an empty NO_TRADE session, blank regime columns) and the run
+goes on. That is the right answer for the run at hand, and the wrong one
+to keep: a memoized run (see run_store) would serve the degraded days
+long after Saxo recovered.
+
+Every place that degrades on a failed fetch notes it with fetch_failed.
+The notes go to the run that made the call - a context variable, copied
+into the worker threads and tasks the run spawns - so two runs sharing a
+candle source do not see each other's failures.
+"""
+
+import contextlib
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+_failures: ContextVar[Optional[List[str]]] = ContextVar(
+    "backtest_fetch_failures", default=None
+)
+
+
+def fetch_failed(what: str) -> None:
+    """Note a failed fetch against the run being recorded, if any."""
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(what)
+
+
+@contextlib.contextmanager
+def recording_fetch_failures() -> Iterator[List[str]]:
+    """The failed fetches of the code run inside the block, as noted."""
+    failures: List[str] = []
+    token = _failures.set(failures)
+    try:
+        yield failures
+    finally:
+        _failures.reset(token)
@@ -0,0 +1,188 @@
+"""Range runs as background jobs.
+
+A long run_range held inside a request handler is lost with the request:
+a browser refresh starts it over. The job runner takes the run off the
+request instead - submit returns at once with a job to poll or follow,
+and the run goes on in a task of the API's event loop.
+
+Two submissions of the same inputs (see run_store.run_key) share one
+execution while it runs, and once it has run over a past range its result
+is memoized in the RunStore, so the next one is answered at once - unless
+a fetch failed during the run (see fetch_failures): a degraded result is
+served to the jobs that asked for it, never kept.
+"""
+
+import asyncio
+import datetime
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+
+from api.services.backtest.fetch_failures import recording_fetch_failures
+from api.services.backtest.run_store import RunStore, is_memoizable, run_key
+from api.services.backtest.service import BacktestService
+from model import (
+    BacktestDefinition,
+    BacktestJob,
+    BacktestJobStatus,
+    BacktestParameters,
+    BacktestRunResult,
+    BacktestSummary,
+    DayResultSummary,
+)
+from utils.exception import SaxoException
+from utils.logger import Logger
+
+# Jobs kept for polling. Beyond it the oldest finished ones are dropped;
+# their results stay in the RunStore when they were memoizable.
+JOB_HISTORY = 100
+
+
+def weekdays_between(
+    start_date: datetime.date, end_date: datetime.date
+) -> int:
+    """The days a range run evaluates: it skips the weekends."""
+    return sum(
+        (start_date + datetime.timedelta(days=offset)).weekday() < 5
+        for offset in range((end_date - start_date).days + 1)
+    )
+
+
+class BacktestJobRunner:
+    """Runs, shares and remembers the range-run jobs of one process."""
+
+    def __init__(self, store: RunStore):
+        self.logger = Logger.get_logger("backtest_jobs")
+        self.store = store
+        self._jobs: "OrderedDict[str, BacktestJob]" = OrderedDict()
+        # The unfinished job of each run key, for sharing
+        self._running: Dict[str, BacktestJob] = {}
+        # Set, then replaced, on every change of a job
+        self._changed: Dict[str, asyncio.Event] = {}
+        # asyncio keeps only weak references to tasks
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def submit(
+        self,
+        backtest_service: BacktestService,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: BacktestParameters,
+    ) -> BacktestJob:
+        """The job running these inputs: the one already running them, a
+        finished one when they were memoized, or a new one started now.
+
+        Raises SaxoException, before any job exists, for a definition no
+        engine runs."""
+        key = run_key(definition, params, start_date, end_date)
+        running = self._running.get(key)
+        if running is not None:
+            return running
+
+        job = BacktestJob(
+            job_id=uuid.uuid4().hex,
+            key=key,
+            definition_code=definition.code,
+            start_date=start_date,
+            end_date=end_date,
+            params=params,
+            days_total=weekdays_between(start_date, end_date),
+        )
+        memoized = self.store.get(key)
+        if memoized is not None:
+            job.status = BacktestJobStatus.DONE
+            job.memoized = True
+            job.result = memoized
+            job.days_done = len(memoized.days)
+            job.last_date = memoized.days[-1].date if memoized.days else None
+            self._remember(job)
+            return job
+
+        items = backtest_service.stream_range(
+            definition, start_date, end_date, params
+        )
+        self._remember(job)
+        self._running[key] = job
+        task = asyncio.create_task(
+            self._run(job, items, is_memoizable(end_date))
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[BacktestJob]:
+        return self._jobs.get(job_id)
+
+    async def progress(self, job_id: str) -> AsyncIterator[BacktestJob]:
+        """The job now, then again after each change, until it is
+        finished. Changes made while the caller handles one are not lost:
+        the event awaited next was taken before handing the job out."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        while True:
+            changed = self._changed.get(job_id)
+            yield job
+            if job.finished or changed is None:
+                return
+            await changed.wait()
+
+    async def _run(
+        self,
+        job: BacktestJob,
+        items: AsyncIterator[Union[DayResultSummary, BacktestSummary]],
+        memoize: bool,
+    ) -> None:
+        job.status = BacktestJobStatus.RUNNING
+        self._notify(job)
+        days: List[DayResultSummary] = []
+        try:
+            with recording_fetch_failures() as failures:
+                async for item in items:
+                    if isinstance(item, DayResultSummary):
+                        days.append(item)
+                        job.days_done = len(days)
+                        job.last_date = item.date
+                    else:
+                        job.result = BacktestRunResult(summary=item, days=days)
+                    self._notify(job)
+            if job.result is None:
+                raise SaxoException("the range run ended without a summary")
+            if memoize and failures:
+                # The days those fetches degraded would be served as they
+                # are until RUN_STORE_VERSION moves: run it again instead.
+                self.logger.warning(
+                    f"Backtest job {job.job_id} not memoized: "
+                    f"{len(failures)} failed fetches ({failures[0]}, ...)"
+                )
+            elif memoize:
+                await asyncio.to_thread(self.store.put, job.key, job.result)
+            job.status = BacktestJobStatus.DONE
+        except Exception as e:
+            self.logger.error(
+                f"Backtest job {job.job_id} ({job.definition_code} "
+                f"{job.start_date} - {job.end_date}) failed: {e}"
+            )
+            job.result = None
+            job.status = BacktestJobStatus.FAILED
+            job.error = str(e)
+        finally:
+            self._running.pop(job.key, None)
+            self._notify(job)
+
+    def _remember(self, job: BacktestJob) -> None:
+        self._jobs[job.job_id] = job
+        self._changed[job.job_id] = asyncio.Event()
+        finished = [
+            job_id for job_id, kept in self._jobs.items() if kept.finished
+        ]
+        for job_id in finished[: max(len(self._jobs) - JOB_HISTORY, 0)]:
+            del self._jobs[job_id]
+            self._changed.pop(job_id, None)
+
+    def _notify(self, job: BacktestJob) -> None:
+        changed = self._changed.get(job.job_id)
+        if changed is not None:
+            self._changed[job.job_id] = asyncio.Event()
+            changed.set()
@@ -0,0 +1,136 @@
+"""Memoized range-run results.
+
+A range run over closed days is a pure function of the definition, the
+resolved parameters and the range: the days are immutable and their
+candles come from a cache that never expires (FR-040). RunStore keeps
+each result under a hash of those inputs, as one JSON document per run
+on local disk mirrored in memory, so a repeated run over a past range is
+answered without evaluating a single day.
+"""
+
+import dataclasses
+import datetime
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from api.services.backtest.calendar import PARIS_TZ
+from api.services.backtest.candle_source import CACHE_SCHEMA_VERSION
+from model import (
+    BacktestDefinition,
+    BacktestParameters,
+    BacktestRunResult,
+    BacktestSummary,
+    DayResultSummary,
+)
+from model.enum import DayStatus
+from utils.logger import Logger
+
+logger = Logger.get_logger("backtest_run_store")
+
+# Part of every run key. Bump it when an engine change alters the result
+# of an unchanged definition, so the runs memoized before it are not
+# served anymore.
+RUN_STORE_VERSION = 1
+
+
+def run_key(
+    definition: BacktestDefinition,
+    params: BacktestParameters,
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> str:
+    """What a range run's result depends on, hashed. The definition is
+    hashed whole, not only its code: editing a hardcoded definition's
+    rules changes its results without changing its code."""
+    payload = json.dumps(
+        [
+            definition.code,
+            repr(definition),
+            dataclasses.asdict(params),
+            start_date.isoformat(),
+            end_date.isoformat(),
+            CACHE_SCHEMA_VERSION,
+            RUN_STORE_VERSION,
+        ]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_memoizable(
+    end_date: datetime.date, now: Optional[datetime.datetime] = None
+) -> bool:
+    """Only ranges ending before today are kept: today's session may be
+    closed, but a day Saxo has not fully published yet is better
+    evaluated again than frozen as NO_DATA."""
+    current = (now or datetime.datetime.now(PARIS_TZ)).astimezone(PARIS_TZ)
+    return end_date < current.date()
+
+
+class RunStore:
+    """Range-run results by run_key, on local disk and in memory."""
+
+    def __init__(self, directory: str = "backtest_runs") -> None:
+        self.directory = directory
+        self._results: Dict[str, BacktestRunResult] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[BacktestRunResult]:
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+            path = self._path(key)
+            if not os.path.isfile(path):
+                return None
+            try:
+                with open(path, "r") as f:
+                    result = _result_from_dict(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # A truncated or stale document is a miss, not an error:
+                # the run is evaluated again and the document rewritten.
+                logger.warning(f"Ignoring unreadable run {key}: {e}")
+                return None
+            self._results[key] = result
+            return result
+
+    def put(self, key: str, result: BacktestRunResult) -> None:
+        with self._lock:
+            self._results[key] = result
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._path(key), "w") as f:
+                    json.dump(_result_to_dict(result), f)
+            except OSError as e:
+                # Still memoized for this process
+                logger.warning(f"Could not save run {key}: {e}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+
+def _result_to_dict(result: BacktestRunResult) -> Dict[str, Any]:
+    summary = dataclasses.asdict(result.summary)
+    summary["start_date"] = result.summary.start_date.isoformat()
+    summary["end_date"] = result.summary.end_date.isoformat()
+    days = []
+    for day in result.days:
+        row = dataclasses.asdict(day)
+        row["date"] = day.date.isoformat()
+        row["status"] = day.status.value
+        days.append(row)
+    return {"summary": summary, "days": days}
+
+
+def _result_from_dict(content: Dict[str, Any]) -> BacktestRunResult:
+    summary = dict(content["summary"])
+    summary["start_date"] = datetime.date.fromisoformat(summary["start_date"])
+    summary["end_date"] = datetime.date.fromisoformat(summary["end_date"])
+    days = []
+    for row in content["days"]:
+        row = dict(row)
+        row["date"] = datetime.date.fromisoformat(row["date"])
+        row["status"] = DayStatus.get_value(row["status"])
+        days.append(DayResultSummary(**row))
+    return BacktestRunResult(summary=BacktestSummary(**summary), days=days)
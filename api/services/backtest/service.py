@@ -7,18 +7,24 @@ touch this class.
 """
 
 import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 
 from api.services.backtest.definitions import get_definition, list_definitions
+from api.services.backtest.session_range import SessionRangeStrategy
 from api.services.backtest.strategy import StrategySelector
+from api.services.backtest.sweep import run_sweep
 from client.aws_client import DynamoDBClient
 from model import (
     BacktestDefinition,
     BacktestParameters,
     BacktestRunResult,
+    BacktestSummary,
     DayResult,
+    DayResultSummary,
+    SweepResult,
 )
 from services.candles_service import CandlesService
+from utils.exception import SaxoException
 
 
 class BacktestService:
@@ -61,3 +67,47 @@ class BacktestService:
         return await self.strategies.for_definition(definition).run_range(
             definition, start_date, end_date, params
         )
+
+    def stream_range(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+    ) -> AsyncIterator[Union[DayResultSummary, BacktestSummary]]:
+        """run_range as a stream (see SessionRangeStrategy.stream_range).
+        Not a coroutine: the engine is picked here, so a definition no
+        engine runs fails before a streamed response has started."""
+        return self.strategies.for_definition(definition).stream_range(
+            definition, start_date, end_date, params
+        )
+
+    async def sweep(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        grid: List[BacktestParameters],
+        max_workers: Optional[int] = None,
+    ) -> List[SweepResult]:
+        """run_range under every combination of the grid, ranked by final
+        result. Only the session-range engine separates the candles from
+        the parameters this way (see sweep)."""
+        strategy = self.strategies.for_definition(definition)
+        if not isinstance(strategy, SessionRangeStrategy):
+            raise SaxoException(
+                f"definition {definition.code!r} does not support "
+                "parameter sweeps"
+            )
+        days, number_of_days = await strategy.sweep_days(
+            definition, start_date, end_date
+        )
+        return await run_sweep(
+            definition,
+            start_date,
+            end_date,
+            number_of_days,
+            days,
+            grid,
+            max_workers,
+        )
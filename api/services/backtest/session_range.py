@@ -1,12 +1,14 @@
 import datetime
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
 from api.services.backtest.analytics import (
-    DAILY_CANDLES_LEAD_IN,
     adx_before,
+    fetch_daily_candles,
     mm50_slope_before,
     overnight_gap,
 )
+from api.services.backtest.array_engine import DayArrays, supports
 from api.services.backtest.calendar import PARIS_TZ
 from api.services.backtest.candle_source import CandleSource
 from api.services.backtest.candles import candle_date
@@ -16,7 +18,8 @@ from api.services.backtest.direction_filter import (
     H1_CANDLES_PER_SESSION,
     allowed_side,
 )
-from api.services.backtest.entry import DirectionSearch
+from api.services.backtest.entry import DirectionSearch, is_valid_entry
+from api.services.backtest.fetch_failures import fetch_failed
 from api.services.backtest.lots import LotModel, Targets
 from api.services.backtest.policies import resolve_exit
 from api.services.backtest.position import Position
@@ -32,6 +35,7 @@ from model import (
     BacktestDefinition,
     BacktestParameters,
     BacktestRunResult,
+    BacktestSummary,
     Candle,
     DayResult,
     DayResultSummary,
@@ -44,6 +48,24 @@ from services.candles_service import CandlesService
 from utils.exception import SaxoException
 from utils.logger import Logger
 
+# Weekdays prefetched at a time by a streamed range run: small enough
+# that the first rows of a cold range arrive after one chunk's fetch,
+# large enough that a year is still a dozen range fetches, not 250.
+STREAM_PREFETCH_DAYS = 20
+
+
+@dataclass
+class SweepDay:
+    """What a day's trades depend on besides the parameters, resolved once
+    for a whole parameter sweep: the H1 levels, the session's 5-minute
+    candles in chronological order and the side the MM50 filter allows."""
+
+    trading_date: datetime.date
+    h1_high: float
+    h1_low: float
+    candles: List[Candle]
+    side_filter: Optional[Side] = None
+
 
 class SessionRangeStrategy:
     """The "bougie de 9h" family: a 9:00-10:00 H1 reference range fixes
@@ -66,6 +88,10 @@ class SessionRangeStrategy:
         self.candle_source = CandleSource(
             candles_service, dynamodb_client, self.logger
         )
+        # Trades are simulated on the day's candle arrays (see
+        # array_engine); False walks them candle by candle instead, the
+        # reference the array simulator is checked against.
+        self.array_engine = True
 
     async def evaluate_day(
         self,
@@ -159,15 +185,26 @@ class SessionRangeStrategy:
                 return no_trade
 
         chronological = sorted(five_min_candles, key=candle_date)
-        trades = self._evaluate_trades(
-            chronological,
-            h1_high,
-            h1_low,
-            params,
-            definition,
-            trading_date,
-            side_filter,
-        )
+        if self.array_engine:
+            trades = self._simulate_trades(
+                DayArrays(chronological, h1_high, h1_low),
+                h1_high,
+                h1_low,
+                params,
+                definition,
+                trading_date,
+                side_filter,
+            )
+        else:
+            trades = self._evaluate_trades(
+                chronological,
+                h1_high,
+                h1_low,
+                params,
+                definition,
+                trading_date,
+                side_filter,
+            )
 
         status = DayStatus.TRADED if trades else DayStatus.NO_TRADE
         return DayResult(
@@ -188,9 +225,37 @@ class SessionRangeStrategy:
         params: Optional[BacktestParameters] = None,
     ) -> BacktestRunResult:
         """Run the backtest across every day in [start_date, end_date]."""
-        params = params or definition.default_parameters
         day_summaries: List[DayResultSummary] = []
+        summary: Optional[BacktestSummary] = None
+        async for item in self.stream_range(
+            definition, start_date, end_date, params, prefetch_days=None
+        ):
+            if isinstance(item, DayResultSummary):
+                day_summaries.append(item)
+            else:
+                summary = item
+        if summary is None:
+            raise SaxoException("the range stream ended without a summary")
+        return BacktestRunResult(summary=summary, days=day_summaries)
+
+    async def stream_range(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+        prefetch_days: Optional[int] = STREAM_PREFETCH_DAYS,
+    ) -> AsyncIterator[Union[DayResultSummary, BacktestSummary]]:
+        """run_range one day at a time: each day's row as soon as it is
+        evaluated, then the range's summary last.
+
+        The candles are prefetched `prefetch_days` weekdays at a time, so
+        the first rows of a cold range do not wait for the whole range's
+        fetch; None prefetches the range in one go, which is what a
+        caller waiting for the summary anyway wants."""
+        params = params or definition.default_parameters
         all_trades: List[Trade] = []
+        number_of_days = 0
 
         daily_candles = self._fetch_daily_candles(
             definition, start_date, end_date
@@ -198,95 +263,120 @@ class SessionRangeStrategy:
         filter_series = self._fetch_filter_series(
             definition, start_date, end_date, daily_candles
         )
-
-        current = start_date
-        while current <= end_date:
-            if current.weekday() >= 5:
-                # Saturday/Sunday: FRA40.I never trades, so skip the
-                # H1/5-minute fetches that would only resolve to
-                # NO_DATA - avoids two wasted Saxo calls per weekend day.
-                current += datetime.timedelta(days=1)
-                continue
-            day_result = await self._evaluate_day(
-                definition, current, params, filter_series
+        # Saturday/Sunday: FRA40.I never trades, so the weekends are
+        # skipped rather than resolved to NO_DATA - avoids two wasted
+        # Saxo calls per weekend day.
+        weekdays = [
+            day
+            for day in (
+                start_date + datetime.timedelta(days=offset)
+                for offset in range((end_date - start_date).days + 1)
             )
-            if day_result.status != DayStatus.NO_DATA:
-                day_points = round(
-                    sum(trade.points for trade in day_result.trades), 4
-                )
-                day_summaries.append(
-                    DayResultSummary(
-                        date=day_result.date,
-                        status=day_result.status,
-                        trade_count=len(day_result.trades),
-                        points=day_points,
-                        h1_high=day_result.h1_high,
-                        h1_low=day_result.h1_low,
-                        mm50_slope=mm50_slope_before(
-                            daily_candles, day_result.date
-                        ),
-                        adx14=adx_before(daily_candles, day_result.date),
-                        h1_open=day_result.h1_open,
-                        overnight_gap=overnight_gap(
-                            daily_candles,
-                            day_result.date,
-                            day_result.h1_open,
-                        ),
-                    )
+            if day.weekday() < 5
+        ]
+        chunk_size = prefetch_days or max(len(weekdays), 1)
+
+        for index in range(0, len(weekdays), chunk_size):
+            chunk = weekdays[index : index + chunk_size]
+            await self.candle_source.prefetch_range(definition, chunk)
+            for current in chunk:
+                day_result = await self._evaluate_day(
+                    definition, current, params, filter_series
                 )
+                if day_result.status == DayStatus.NO_DATA:
+                    continue
+                number_of_days += 1
                 all_trades.extend(day_result.trades)
-            current += datetime.timedelta(days=1)
+                yield DayResultSummary(
+                    date=day_result.date,
+                    status=day_result.status,
+                    trade_count=len(day_result.trades),
+                    points=round(
+                        sum(trade.points for trade in day_result.trades), 4
+                    ),
+                    h1_high=day_result.h1_high,
+                    h1_low=day_result.h1_low,
+                    mm50_slope=mm50_slope_before(
+                        daily_candles, day_result.date
+                    ),
+                    adx14=adx_before(daily_candles, day_result.date),
+                    h1_open=day_result.h1_open,
+                    overnight_gap=overnight_gap(
+                        daily_candles,
+                        day_result.date,
+                        day_result.h1_open,
+                    ),
+                )
 
-        summary = build_summary(
-            definition, start_date, end_date, all_trades, len(day_summaries)
+        yield build_summary(
+            definition, start_date, end_date, all_trades, number_of_days
         )
-        return BacktestRunResult(summary=summary, days=day_summaries)
 
-    def _fetch_daily_candles(
+    async def sweep_days(
         self,
         definition: BacktestDefinition,
         start_date: datetime.date,
         end_date: datetime.date,
-    ) -> List[Candle]:
-        """Daily (newest-first) candle series covering the run range plus
-        enough lead-in to compute a 50-day MA slope on the first day.
-        Fetched once per run_range. A failure degrades to an empty series
-        (blank mm50_slope column) rather than aborting the whole export.
-
-        Deliberately built on EUMarket rather than definition.market: the
-        regime columns (mm50_slope, adx14, overnight_gap) are a
-        *measurement* of the instrument, not part of any strategy, and
-        they only earn their keep if the same day scores the same on every
-        definition. Following the definition's market would build the CFD
-        variant's daily bars over a 13-hour window instead of the cash
-        session's 9 (build_daily_candles_from_h1 sizes the day from
-        close_hour - open_hour), so its MA50 slope and ADX would not be
-        comparable with the variants it exists to be compared against, and
-        overnight_gap would silently start measuring from the 22:00 close
-        instead of the 17:30 one."""
-        # Daily candles are fetched counting backward from end_date, so
-        # count must reach ~60 trading days before start_date for the
-        # first day's MA50 slope. Calendar days is a safe upper bound on
-        # the range's trading days (build_candles caps at available data),
-        # so no need to exclude weekends/holidays precisely.
-        count = (end_date - start_date).days + DAILY_CANDLES_LEAD_IN
-        reference = datetime.datetime(
-            end_date.year, end_date.month, end_date.day, tzinfo=PARIS_TZ
+    ) -> Tuple[List[SweepDay], int]:
+        """Load a range once for a parameter sweep: the days that can
+        trade under some parameters, and how many days had data at all
+        (the run's number_of_days). A day filtered out by the minimum
+        range or the MM50 filter is a NO_TRADE whatever the parameters,
+        so it is counted but not returned - exactly what run_range makes
+        of it."""
+        filter_series = self._fetch_filter_series(
+            definition, start_date, end_date
         )
-        try:
-            return self.candles_service.build_candles(
-                definition.instrument,
-                UnitTime.D,
-                EUMarket(),
-                count,
-                reference,
+        trading_dates = [
+            start_date + datetime.timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        trading_dates = [day for day in trading_dates if day.weekday() < 5]
+        await self.candle_source.prefetch_range(definition, trading_dates)
+
+        sweep_days: List[SweepDay] = []
+        number_of_days = 0
+        for trading_date in trading_dates:
+            day = await self.candle_source.day_candles(
+                definition, trading_date
             )
-        except SaxoException as e:
-            self.logger.warning(
-                f"No daily candles for {definition.instrument} "
-                f"regime measure: {e}"
+            if day is None or day.h1_candle is None:
+                continue
+            number_of_days += 1
+            h1 = day.h1_candle
+            if is_below_min_range(definition, h1.higher, h1.lower):
+                continue
+            side_filter: Optional[Side] = None
+            if definition.ma50_direction_filter is not None:
+                side_filter = allowed_side(
+                    definition, filter_series, trading_date, h1.close
+                )
+                if side_filter is None:
+                    continue
+            sweep_days.append(
+                SweepDay(
+                    trading_date=trading_date,
+                    h1_high=h1.higher,
+                    h1_low=h1.lower,
+                    candles=sorted(day.m5_candles, key=candle_date),
+                    side_filter=side_filter,
+                )
             )
-            return []
+        return sweep_days, number_of_days
+
+    def _fetch_daily_candles(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+    ) -> List[Candle]:
+        return fetch_daily_candles(
+            self.candles_service,
+            definition.instrument,
+            start_date,
+            end_date,
+            self.logger,
+        )
 
     def _fetch_filter_series(
         self,
@@ -357,10 +447,14 @@ class SessionRangeStrategy:
                 f"No H1 candles for {definition.instrument} MM50 "
                 f"direction filter: {e}"
             )
+            fetch_failed(
+                f"H1 {definition.instrument} {start_date} - {end_date}"
+            )
             return []
 
+    @classmethod
     def _evaluate_trades(
-        self,
+        cls,
         candles: List[Candle],
         h1_high: float,
         h1_low: float,
@@ -389,7 +483,7 @@ class SessionRangeStrategy:
                 side,
                 h1_high,
                 h1_low,
-                self._take_profit_level(side, h1_high, h1_low, params),
+                cls._take_profit_level(side, h1_high, h1_low, params),
             )
             for side in (LONG, SHORT)
         }
@@ -444,7 +538,7 @@ class SessionRangeStrategy:
                         continue
                     entry_price = entries[side]
                     if entry_price is not None:
-                        position = self._open_position(
+                        position = cls._open_position(
                             side,
                             candle_time,
                             entry_price,
@@ -457,7 +551,7 @@ class SessionRangeStrategy:
                         )
                         break
                 if position is not None:
-                    self._reset(searches)
+                    cls._reset(searches)
                 continue
 
             closed = resolve_exit(chain, position, candle, candle_time)
@@ -465,7 +559,7 @@ class SessionRangeStrategy:
                 trades.append(closed)
                 gate.record(closed)
                 position = None
-                self._reset(searches)
+                cls._reset(searches)
 
         if position is not None and candles:
             last_candle = candles[-1]
@@ -479,6 +573,128 @@ class SessionRangeStrategy:
 
         return trades
 
+    @classmethod
+    def _simulate_trades(
+        cls,
+        day: DayArrays,
+        h1_high: float,
+        h1_low: float,
+        params: BacktestParameters,
+        definition: BacktestDefinition,
+        trading_date: datetime.date,
+        side_filter: Optional[Side] = None,
+    ) -> List[Trade]:
+        """_evaluate_trades on the day's candle arrays: the same rules,
+        run only on the candles where something can happen (see
+        array_engine). Identical trades, down to the last bit - the
+        golden tests run both."""
+        chain = build_exit_chain(definition, params)
+        if not supports(chain):
+            return cls._evaluate_trades(
+                day.candles,
+                h1_high,
+                h1_low,
+                params,
+                definition,
+                trading_date,
+                side_filter,
+            )
+        trades: List[Trade] = []
+        lots = build_lot_model(definition)
+        gate = build_entry_gate(definition, trading_date)
+        targets = {
+            side: lots.targets(
+                side,
+                h1_high,
+                h1_low,
+                cls._take_profit_level(side, h1_high, h1_low, params),
+            )
+            for side in (LONG, SHORT)
+        }
+        # Where each side's search restarts from a clean state: after its
+        # own confirmation, or after a position of either side closes.
+        starts = {LONG: 0, SHORT: 0}
+
+        while True:
+            events = {
+                side: day.next_entry(side, starts[side])
+                for side in (LONG, SHORT)
+            }
+            pending = [index for index in events.values() if index is not None]
+            if not pending:
+                return trades
+            index = min(pending)
+            candle = day.candles[index]
+            candle_time = day.times[index]
+            entries: Dict[Side, float] = {}
+            for side in (LONG, SHORT):
+                if events[side] != index:
+                    continue
+                starts[side] = index + 1
+                entry_price = side.worse(
+                    side.extreme(day.candles[index - 1]), candle.open
+                )
+                if is_valid_entry(
+                    side,
+                    entry_price,
+                    h1_high,
+                    h1_low,
+                    targets[side].runner,
+                    params.max_entry_distance_points,
+                    targets[side].first,
+                ):
+                    entries[side] = entry_price
+            if not gate.allows(candle_time):
+                continue
+            opening = [
+                side
+                for side in (LONG, SHORT)
+                if side in entries
+                and (side_filter is None or side == side_filter)
+            ]
+            if not opening:
+                continue
+            side = opening[0]
+            position = cls._open_position(
+                side,
+                candle_time,
+                entries[side],
+                h1_high,
+                h1_low,
+                targets[side],
+                lots,
+                params,
+                definition,
+            )
+
+            closed = None
+            exit_index = index
+            while closed is None:
+                next_index = day.next_exit_event(
+                    position, chain, exit_index + 1
+                )
+                if next_index is None:
+                    break
+                exit_index = next_index
+                closed = resolve_exit(
+                    chain,
+                    position,
+                    day.candles[exit_index],
+                    day.times[exit_index],
+                )
+            if closed is None:
+                trades.append(
+                    position.close(
+                        day.times[-1],
+                        day.candles[-1].close,
+                        ExitReason.END_OF_DAY,
+                    )
+                )
+                return trades
+            trades.append(closed)
+            gate.record(closed)
+            starts = {LONG: exit_index + 1, SHORT: exit_index + 1}
+
     @staticmethod
     def _reset(searches: Dict[Side, DirectionSearch]) -> None:
         for search in searches.values():
@@ -0,0 +1,70 @@
+"""From combo signals to entries (spec 026, R6).
+
+`indicator_service.combo` answers on one candle; turning its answers
+into entries needs one piece of state across candles - the pending level
+of an untriggered signal, valid for the next candle only (FR-C03/FR-C04).
+ComboEntrySearch holds it. It never calls combo itself: the strategy
+decides on which candles the indicator is worth asking, and hands the
+answer in.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from api.services.backtest.side import Side
+from model import Candle, ComboSignal, SignalStrength
+
+
+@dataclass(frozen=True)
+class PendingEntry:
+    """An untriggered signal's stop level, waiting one candle for a
+    fill. `signal_candle` is the candle the indicator fired on, which the
+    stop is measured from (FR-C06) - not the candle that fills."""
+
+    level: float
+    side: Side
+    signal_candle: Candle
+
+
+@dataclass(frozen=True)
+class ComboEntry:
+    side: Side
+    price: float
+    signal_candle: Candle
+
+
+class ComboEntrySearch:
+    def __init__(self) -> None:
+        self.pending: Optional[PendingEntry] = None
+
+    def fill(self, candle: Candle) -> Optional[ComboEntry]:
+        """Resolve the previous candle's pending level on this candle:
+        filled when the candle reaches it - at the level, or at the open
+        when it gapped through - and dropped otherwise. Called before the
+        candle's own signal, so a fill wins over it."""
+        pending, self.pending = self.pending, None
+        if pending is None or not pending.side.reached(pending.level, candle):
+            return None
+        return ComboEntry(
+            side=pending.side,
+            price=pending.side.worse(pending.level, candle.open),
+            signal_candle=pending.signal_candle,
+        )
+
+    def signal(
+        self, candle: Candle, signal: Optional[ComboSignal]
+    ) -> Optional[ComboEntry]:
+        """The entry a signal on this candle opens at its close when it
+        is already triggered; an untriggered one arms a pending level for
+        the next candle instead. A WEAK signal is no signal (FR-C02)."""
+        if signal is None or signal.strength == SignalStrength.WEAK:
+            return None
+        side = Side(signal.direction)
+        if signal.has_been_triggered:
+            return ComboEntry(
+                side=side, price=signal.price, signal_candle=candle
+            )
+        self.pending = PendingEntry(
+            level=signal.price, side=side, signal_candle=candle
+        )
+        return None
@@ -14,18 +14,20 @@ models, the CSV exports, the summary) is shared.
 """
 
 import datetime
-from typing import Optional, Protocol
+from typing import AsyncIterator, Optional, Protocol, Union
 
+from api.services.backtest.combo_strategy import ComboStrategy
 from api.services.backtest.session_range import SessionRangeStrategy
 from client.aws_client import DynamoDBClient
 from model import (
     BacktestDefinition,
     BacktestParameters,
     BacktestRunResult,
+    BacktestSummary,
     DayResult,
+    DayResultSummary,
 )
 from services.candles_service import CandlesService
-from utils.exception import SaxoException
 
 
 class BacktestStrategy(Protocol):
@@ -48,18 +50,26 @@ class BacktestStrategy(Protocol):
         """Every day in [start_date, end_date], plus the aggregate."""
         ...
 
+    def stream_range(
+        self,
+        definition: BacktestDefinition,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        params: Optional[BacktestParameters] = None,
+    ) -> AsyncIterator[Union[DayResultSummary, BacktestSummary]]:
+        """run_range's rows as each day is evaluated, the aggregate
+        last."""
+        ...
+
 
 class StrategySelector:
     """Builds the engines once and hands out the one a definition names.
 
     Construction happens here rather than per call because an engine
-    holds a candle source, and rebuilding it per request would drop
-    whatever that source had already fetched.
-
-    `dynamodb_client` is taken but not yet used: the combo engine reads
-    its own candle cache through it, and it is threaded now so adding
-    that engine does not also change this constructor's signature and
-    every call site with it.
+    holds a candle source, and rebuilding it per call would drop what a
+    range run had prefetched. The decoded days themselves outlive it in
+    the process-wide candle_source.DAY_CANDLE_CACHE, and the combo
+    series in combo_candle_source.SERIES_DAY_CACHE.
     """
 
     def __init__(
@@ -70,15 +80,11 @@ class StrategySelector:
         self.session_range = SessionRangeStrategy(
             candles_service, dynamodb_client
         )
+        self.combo = ComboStrategy(candles_service, dynamodb_client)
 
     def for_definition(
         self, definition: BacktestDefinition
     ) -> BacktestStrategy:
         if definition.combo_entry:
-            raise SaxoException(
-                "the combo strategy is not implemented yet; definition "
-                f"{definition.code!r} cannot be run. Falling back to the "
-                "session-range engine would report results for rules it "
-                "never applied"
-            )
+            return self.combo
         return self.session_range
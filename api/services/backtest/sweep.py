@@ -0,0 +1,181 @@
+"""Parameter sweeps over a session-range backtest.
+
+A sweep runs one definition over one range under every combination of a
+parameter grid. The thresholds only reach the trade simulation, so the
+days are loaded once (SessionRangeStrategy.sweep_days) and every
+combination is simulated against the same SweepDay list and the same
+candle arrays - a 500-point grid costs one range load and 500 passes of
+pure CPU, not 500 range runs.
+
+Those passes are spread over worker processes: the evaluation is pure
+Python and holds the GIL. Like the alerting DetectorPool, it runs inline
+on Lambda (no /dev/shm for the pool's semaphores) and on a single core.
+"""
+
+import asyncio
+import datetime
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from api.services.backtest.array_engine import DayArrays
+from api.services.backtest.definitions import resolve_parameters
+from api.services.backtest.session_range import (
+    SessionRangeStrategy,
+    SweepDay,
+)
+from api.services.backtest.statistics import build_summary
+from model import (
+    BacktestDefinition,
+    BacktestParameters,
+    BacktestSummary,
+    SweepResult,
+)
+from utils.exception import SaxoException
+
+# Upper bound on the grid size of one sweep: beyond it a request would
+# hold a worker pool for minutes.
+SWEEP_MAX_COMBINATIONS = 2000
+# Below this many combinations, starting worker processes costs more
+# than it saves.
+SWEEP_MIN_PARALLEL_COMBINATIONS = 16
+
+
+def parameter_grid(
+    definition: BacktestDefinition,
+    stop_loss_points: Sequence[float] = (),
+    take_profit_offset_points: Sequence[float] = (),
+    break_even_trigger_points: Sequence[float] = (),
+    max_entry_distance_points: Sequence[float] = (),
+) -> List[BacktestParameters]:
+    """Every combination of the given values. A parameter given no value
+    keeps the definition's default, as an omitted override does on a
+    single run."""
+    grid = [
+        resolve_parameters(
+            definition,
+            stop_loss_points=stop_loss,
+            take_profit_offset_points=take_profit,
+            break_even_trigger_points=break_even,
+            max_entry_distance_points=max_distance,
+        )
+        for stop_loss, take_profit, break_even, max_distance in (
+            itertools.product(
+                _or_default(stop_loss_points),
+                _or_default(take_profit_offset_points),
+                _or_default(break_even_trigger_points),
+                _or_default(max_entry_distance_points),
+            )
+        )
+    ]
+    if len(grid) > SWEEP_MAX_COMBINATIONS:
+        raise SaxoException(
+            f"A sweep is limited to {SWEEP_MAX_COMBINATIONS} combinations, "
+            f"this grid has {len(grid)}"
+        )
+    return grid
+
+
+def _or_default(values: Sequence[float]) -> List[Optional[float]]:
+    """The values to try, or None alone for "the definition's default"."""
+    return list(values) or [None]
+
+
+def sweep_summaries(
+    definition: BacktestDefinition,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    number_of_days: int,
+    days: List[SweepDay],
+    grid: List[BacktestParameters],
+) -> List[BacktestSummary]:
+    """The summary of the range under each combination of the grid, in
+    grid order. Module-level so a worker process can run it."""
+    # The arrays, and the entry candles indexed on them, do not depend on
+    # the parameters: built once for the whole grid.
+    arrays = [DayArrays(day.candles, day.h1_high, day.h1_low) for day in days]
+    summaries = []
+    for params in grid:
+        trades = [
+            trade
+            for day, day_arrays in zip(days, arrays)
+            for trade in SessionRangeStrategy._simulate_trades(
+                day_arrays,
+                day.h1_high,
+                day.h1_low,
+                params,
+                definition,
+                day.trading_date,
+                day.side_filter,
+            )
+        ]
+        summaries.append(
+            build_summary(
+                definition, start_date, end_date, trades, number_of_days
+            )
+        )
+    return summaries
+
+
+async def run_sweep(
+    definition: BacktestDefinition,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    number_of_days: int,
+    days: List[SweepDay],
+    grid: List[BacktestParameters],
+    max_workers: Optional[int] = None,
+) -> List[SweepResult]:
+    """Evaluate the grid over the loaded days and rank the combinations
+    by final result, best first (grid order among equals)."""
+    workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    workers = min(workers, len(grid))
+    if (
+        workers <= 1
+        or len(grid) < SWEEP_MIN_PARALLEL_COMBINATIONS
+        or "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+    ):
+        # Off the event loop all the same: a large grid on one core is
+        # still seconds of CPU.
+        summaries = await asyncio.to_thread(
+            sweep_summaries,
+            definition,
+            start_date,
+            end_date,
+            number_of_days,
+            days,
+            grid,
+        )
+    else:
+        # One contiguous slice per worker: the days are pickled once per
+        # slice, not once per combination.
+        size = -(-len(grid) // workers)
+        slices = [
+            grid[index : index + size] for index in range(0, len(grid), size)
+        ]
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        sweep_summaries,
+                        definition,
+                        start_date,
+                        end_date,
+                        number_of_days,
+                        days,
+                        grid_slice,
+                    )
+                    for grid_slice in slices
+                )
+            )
+        summaries = [summary for result in results for summary in result]
+    ranked = sorted(
+        zip(grid, summaries), key=lambda pair: -pair[1].final_result
+    )
+    return [
+        SweepResult(params=params, summary=summary)
+        for params, summary in ranked
+    ]
@@ -1,8 +1,6 @@
-from operator import attrgetter
 from typing import Dict, List, Optional
 
-from cachetools import TTLCache, cachedmethod
-
+from api.services.report_store import ReportStore
 from client.binance_client import BinanceClient
 from client.gsheet_client import GSheetClient
 from model import (
@@ -14,7 +12,12 @@ from model import (
     Strategy,
     crypto_account,
 )
-from saxo_order.service import calculate_currency, calculate_taxes
+from saxo_order.service import (
+    calculate_currency,
+    calculate_taxes,
+    export_unreported_orders,
+    unreported_orders,
+)
 from utils.configuration import Configuration
 from utils.logger import Logger
 
@@ -24,7 +27,12 @@ logger = Logger.get_logger("binance_report_service")
 class BinanceReportService:
     """Service for handling Binance trading report operations."""
 
-    def __init__(self, client: BinanceClient, configuration: Configuration):
+    def __init__(
+        self,
+        client: BinanceClient,
+        configuration: Configuration,
+        report_store: Optional[ReportStore] = None,
+    ):
         self.client = client
         self.configuration = configuration
         self.currencies_rate = configuration.currencies_rate
@@ -32,9 +40,8 @@ class BinanceReportService:
             key_path=configuration.gsheet_creds_path,
             spreadsheet_id=configuration.spreadsheet_id,
         )
-        # Cache for report data with 5 min TTL
-        self._report_cache: TTLCache[str, List[ReportOrder]] = TTLCache(
-            maxsize=128, ttl=300
+        self.report_store = report_store or ReportStore(
+            configuration.aws_client
         )
 
     def _get_binance_account(self) -> Account:
@@ -46,7 +53,6 @@ class BinanceReportService:
         """
         return crypto_account()
 
-    @cachedmethod(cache=attrgetter("_report_cache"))
     def get_orders_report(
         self, account_id: str, from_date: str
     ) -> List[ReportOrder]:
@@ -60,20 +66,19 @@ class BinanceReportService:
         Returns:
             List of ReportOrder objects
         """
-        logger.debug(
-            f"Cache MISS for get_orders_report({account_id}, {from_date}) "
-            f"- fetching from Binance API"
+        # Only the trades newer than the last sync come from Binance
+        # Keyed by the crypto account, whichever binance_* id was asked
+        return self.report_store.get_orders(
+            self._get_binance_account().key, from_date, self._fetch_orders
         )
+
+    def _fetch_orders(self, from_date: str) -> List[ReportOrder]:
         # Convert date format from YYYY-MM-DD to YYYY/MM/DD for BinanceClient
         date_formatted = from_date.replace("-", "/")
-
-        # Get orders from Binance
-        orders = self.client.get_report_all(
+        return self.client.get_report_all(
             date_formatted, self.currencies_rate["usdeur"]
         )
 
-        return orders
-
     def convert_order_to_eur(
         self, order: ReportOrder
     ) -> tuple[float, float, Optional[float], Optional[float]]:
@@ -205,6 +210,29 @@ class BinanceReportService:
             account=account, order=report_order, original_order=order
         )
 
+    def export_to_gsheet(self, account_id: str, from_date: str) -> int:
+        """
+        Write every fill of the report that the order sheet does not hold
+        yet, matched by date, code and quantity: an opening fill as a new
+        row, a closing fill into the row of the position it closes.
+
+        Args:
+            account_id: Binance account ID (should be "binance_main")
+            from_date: Start date in YYYY-MM-DD format
+
+        Returns:
+            Number of fills written
+        """
+        account = self._get_binance_account()
+        unreported = unreported_orders(
+            self.get_orders_report(account_id, from_date),
+            self.gsheet_client.get_reported_orders(),
+            self.currencies_rate,
+        )
+        return export_unreported_orders(
+            self.gsheet_client, account, unreported
+        )
+
     def update_gsheet_order(
         self,
         account_id: str,
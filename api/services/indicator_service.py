@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 from typing import List, Optional
 
@@ -306,7 +307,14 @@ class IndicatorService:
         Returns:
             AssetIndicatorsResponse with all indicator data
         """
-        candles = self.binance_client.get_candles(symbol, unit_time, limit=210)
+        # The connector is blocking: run both requests side by side on the
+        # thread pool rather than one after the other on the event loop
+        candles, latest_candle = await asyncio.gather(
+            asyncio.to_thread(
+                self.binance_client.get_candles, symbol, unit_time, limit=210
+            ),
+            asyncio.to_thread(self.binance_client.get_latest_candle, symbol),
+        )
 
         if len(candles) < 200:
             raise SaxoException(
@@ -314,7 +322,6 @@ class IndicatorService:
                 f"only {len(candles)} candles available, need at least 200"
             )
 
-        latest_candle = self.binance_client.get_latest_candle(symbol)
         current_price = latest_candle.close
 
         previous_close = (
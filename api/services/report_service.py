@@ -1,12 +1,21 @@
+import asyncio
+from dataclasses import dataclass
+from functools import partial
 from operator import attrgetter
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from cachetools import TTLCache, cachedmethod
 
+from api.services.report_store import ReportStore
 from client.gsheet_client import GSheetClient
 from client.saxo_client import SaxoClient
 from model import Account, Currency, Direction, ReportOrder, Signal, Strategy
-from saxo_order.service import calculate_currency, calculate_taxes
+from saxo_order.service import (
+    calculate_currency,
+    calculate_taxes,
+    export_unreported_orders,
+    unreported_orders,
+)
 from utils.configuration import Configuration
 from utils.logger import Logger
 
@@ -16,7 +25,12 @@ logger = Logger.get_logger("report_service")
 class ReportService:
     """Service for handling trading report operations."""
 
-    def __init__(self, client: SaxoClient, configuration: Configuration):
+    def __init__(
+        self,
+        client: SaxoClient,
+        configuration: Configuration,
+        report_store: Optional[ReportStore] = None,
+    ):
         self.client = client
         self.configuration = configuration
         self.currencies_rate = configuration.currencies_rate
@@ -24,9 +38,8 @@ class ReportService:
             key_path=configuration.gsheet_creds_path,
             spreadsheet_id=configuration.spreadsheet_id,
         )
-        # Cache for report data with 5 min TTL
-        self._report_cache: TTLCache[str, List[ReportOrder]] = TTLCache(
-            maxsize=128, ttl=300
+        self.report_store = report_store or ReportStore(
+            configuration.aws_client
         )
         # Cache for account data with 5 min TTL
         self._account_cache: TTLCache[str, Account] = TTLCache(
@@ -81,7 +94,6 @@ class ReportService:
         # Return full account details with DisplayName
         return self.client.get_account(account_dict["AccountKey"])
 
-    @cachedmethod(cache=attrgetter("_report_cache"))
     def get_orders_report(
         self, account_id: str, from_date: str
     ) -> List[ReportOrder]:
@@ -95,17 +107,29 @@ class ReportService:
         Returns:
             List of ReportOrder objects
         """
-        logger.debug(
-            f"Cache MISS for get_orders_report({account_id}, {from_date}) "
-            f"- fetching from Saxo API"
+        return self.get_account_orders(
+            self._find_account(account_id), from_date
         )
-        # Get account with full details
-        account = self._find_account(account_id)
 
-        # Get orders from Saxo
-        orders = self.client.get_report(account, from_date)
+    def get_account_orders(
+        self, account: Account, from_date: str
+    ) -> List[ReportOrder]:
+        """
+        The account's fills from from_date, from the store. It is keyed by
+        AccountKey, so an account looked up by AccountId (the API) or by
+        DisplayName (the CLIs) shares one store.
+        """
+        # Only the fills newer than the last sync come from Saxo
+        return self.report_store.get_orders(
+            account.key, from_date, partial(self._fetch_orders, account)
+        )
 
-        return orders
+    def _fetch_orders(
+        self, account: Account, from_date: str
+    ) -> Iterator[ReportOrder]:
+        """The fills from Saxo, one page held at a time."""
+        for page in self.client.iter_report_pages(account, from_date):
+            yield from page
 
     def convert_order_to_eur(
         self, order: ReportOrder
@@ -133,50 +157,62 @@ class ReportService:
             order.price * order.quantity,
         )
 
-    def calculate_summary(self, orders: List[ReportOrder]) -> Dict:
+    def calculate_summary(self, orders: Iterable[ReportOrder]) -> Dict:
         """
         Calculate summary statistics for orders.
 
         Args:
-            orders: List of ReportOrder objects
+            orders: ReportOrder objects, consumed once
 
         Returns:
             Dictionary with summary statistics
         """
-        total_orders = len(orders)
-        total_volume_eur = 0.0
-        total_fees_eur = 0.0
-        buy_orders = 0
-        buy_volume_eur = 0.0
-        sell_orders = 0
-        sell_volume_eur = 0.0
-
+        summary = _ReportSummary()
         for order in orders:
-            # Convert to EUR
-            price_eur, total_eur, _, _ = self.convert_order_to_eur(order)
-            total_volume_eur += total_eur
-
-            # Calculate taxes
-            taxes = calculate_taxes(order)
-            total_fees_eur += taxes.cost + taxes.taxes
-
-            # Count by direction
-            if order.direction and order.direction == Direction.BUY:
-                buy_orders += 1
-                buy_volume_eur += total_eur
-            else:
-                sell_orders += 1
-                sell_volume_eur += total_eur
+            self._add_to_summary(summary, order)
+        return summary.as_dict()
 
-        return {
-            "total_orders": total_orders,
-            "total_volume_eur": round(total_volume_eur, 2),
-            "total_fees_eur": round(total_fees_eur, 2),
-            "buy_orders": buy_orders,
-            "buy_volume_eur": round(buy_volume_eur, 2),
-            "sell_orders": sell_orders,
-            "sell_volume_eur": round(sell_volume_eur, 2),
-        }
+    async def summarize_orders_report(
+        self, account_id: str, from_date: str
+    ) -> Dict:
+        """
+        Summarize the report from the store, with the incremental Saxo sync
+        kept off the event loop. The orders are summed as they are rebuilt
+        from the store, never held as one list.
+        """
+        return await asyncio.to_thread(
+            self._summarize_orders_report, account_id, from_date
+        )
+
+    def _summarize_orders_report(
+        self, account_id: str, from_date: str
+    ) -> Dict:
+        account = self._find_account(account_id)
+        return self.calculate_summary(
+            self.report_store.iter_orders(
+                account.key, from_date, partial(self._fetch_orders, account)
+            )
+        )
+
+    def _add_to_summary(
+        self, summary: "_ReportSummary", order: ReportOrder
+    ) -> None:
+        # Convert to EUR
+        _, total_eur, _, _ = self.convert_order_to_eur(order)
+        summary.total_orders += 1
+        summary.total_volume_eur += total_eur
+
+        # Calculate taxes
+        taxes = calculate_taxes(order)
+        summary.total_fees_eur += taxes.cost + taxes.taxes
+
+        # Count by direction
+        if order.direction and order.direction == Direction.BUY:
+            summary.buy_orders += 1
+            summary.buy_volume_eur += total_eur
+        else:
+            summary.sell_orders += 1
+            summary.sell_volume_eur += total_eur
 
     def create_gsheet_order(
         self,
@@ -237,6 +273,29 @@ class ReportService:
             account=account, order=report_order, original_order=order
         )
 
+    def export_to_gsheet(self, account_id: str, from_date: str) -> int:
+        """
+        Write every fill of the report that the order sheet does not hold
+        yet, matched by date, code and quantity: an opening fill as a new
+        row, a closing fill into the row of the position it closes.
+
+        Args:
+            account_id: Saxo account ID
+            from_date: Start date in YYYY-MM-DD format
+
+        Returns:
+            Number of fills written
+        """
+        account = self._find_account(account_id)
+        unreported = unreported_orders(
+            self.get_orders_report(account_id, from_date),
+            self.gsheet_client.get_reported_orders(),
+            self.currencies_rate,
+        )
+        return export_unreported_orders(
+            self.gsheet_client, account, unreported
+        )
+
     def update_gsheet_order(
         self,
         account_id: str,
@@ -299,3 +358,25 @@ class ReportService:
             original_order=order,
             line_to_update=line_number,
         )
+
+
+@dataclass
+class _ReportSummary:
+    total_orders: int = 0
+    total_volume_eur: float = 0.0
+    total_fees_eur: float = 0.0
+    buy_orders: int = 0
+    buy_volume_eur: float = 0.0
+    sell_orders: int = 0
+    sell_volume_eur: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_orders": self.total_orders,
+            "total_volume_eur": round(self.total_volume_eur, 2),
+            "total_fees_eur": round(self.total_fees_eur, 2),
+            "buy_orders": self.buy_orders,
+            "buy_volume_eur": round(self.buy_volume_eur, 2),
+            "sell_orders": self.sell_orders,
+            "sell_volume_eur": round(self.sell_volume_eur, 2),
+        }
@@ -0,0 +1,221 @@
+import datetime
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+from client.aws_client import S3Client
+from model import (
+    AssetType,
+    Currency,
+    Direction,
+    ReportOrder,
+    Taxes,
+    Underlying,
+)
+from utils.logger import Logger
+
+logger = Logger.get_logger("report_store")
+
+
+@dataclass
+class StoredReport:
+    """
+    The enriched fills of one account, keyed by activity id.
+
+    synced_from is the earliest from_date that has been fully downloaded;
+    last_activity_date is the high-water mark, the day of the most recent
+    fill. Together they tell which part of a requested range still has to
+    come from the broker.
+    """
+
+    synced_from: Optional[str] = None
+    last_activity_date: Optional[str] = None
+    fills: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def fetch_from(self, from_date: str) -> str:
+        if self.synced_from is None or from_date < self.synced_from:
+            return from_date
+        return self.last_activity_date or self.synced_from
+
+    def merge(self, from_date: str, orders: Iterable[ReportOrder]) -> None:
+        for order in orders:
+            self.fills[_fill_id(order)] = _order_to_dict(order)
+            day = order.date.strftime("%Y-%m-%d")
+            if self.last_activity_date is None or (
+                day > self.last_activity_date
+            ):
+                self.last_activity_date = day
+        if self.synced_from is None or from_date < self.synced_from:
+            self.synced_from = from_date
+
+    def fills_since(self, from_date: str) -> List[Dict[str, Any]]:
+        return [
+            fill
+            for fill in self.fills.values()
+            if fill["date"][:10] >= from_date
+        ]
+
+
+class ReportStore:
+    """
+    Persistent store of already-enriched report fills.
+
+    Each account is one JSON document, on S3 in an AWS context and on local
+    disk otherwise, mirrored in memory once loaded. A report request only
+    downloads what is newer than the account's high-water mark (or older
+    than anything synced so far) and answers every range from the store.
+    """
+
+    def __init__(
+        self, aws_client: Optional[S3Client], directory: str = "reports"
+    ) -> None:
+        self.aws_client = aws_client
+        self.directory = directory
+        self._reports: Dict[str, StoredReport] = {}
+        self._lock = threading.Lock()
+        self._account_locks: Dict[str, threading.Lock] = {}
+
+    def get_orders(
+        self,
+        account_id: str,
+        from_date: str,
+        fetch: Callable[[str], Iterable[ReportOrder]],
+    ) -> List[ReportOrder]:
+        """The orders of iter_orders, oldest first."""
+        return sorted(
+            self.iter_orders(account_id, from_date, fetch),
+            key=lambda order: order.date,
+        )
+
+    def iter_orders(
+        self,
+        account_id: str,
+        from_date: str,
+        fetch: Callable[[str], Iterable[ReportOrder]],
+    ) -> Iterator[ReportOrder]:
+        """
+        Sync the account, then yield its orders from from_date onwards, in
+        no particular order, rebuilding one ReportOrder at a time.
+
+        fetch(date) downloads the fills from that YYYY-MM-DD day onwards
+        and is consumed lazily. The high-water mark day is fetched again on
+        purpose: fills later that day were not there at the previous sync,
+        and the ones that were are deduplicated by activity id.
+        """
+        # The CLIs take YYYY/MM/DD, the API YYYY-MM-DD
+        from_date = from_date.replace("/", "-")
+        # One lock per account: a sync downloads from the broker, and must
+        # not hold up the reports of the other accounts meanwhile.
+        with self._account_lock(account_id):
+            report = self._load(account_id)
+            fetch_from = report.fetch_from(from_date)
+            known_fills = len(report.fills)
+            synced_from = report.synced_from
+            report.merge(from_date, fetch(fetch_from))
+            if (
+                len(report.fills) != known_fills
+                or report.synced_from != synced_from
+            ):
+                self._save(account_id, report)
+            fills = report.fills_since(from_date)
+        return (_order_from_dict(fill) for fill in fills)
+
+    def _account_lock(self, account_id: str) -> threading.Lock:
+        with self._lock:
+            return self._account_locks.setdefault(account_id, threading.Lock())
+
+    def _load(self, account_id: str) -> StoredReport:
+        if account_id in self._reports:
+            return self._reports[account_id]
+        content = None
+        if self.aws_client is not None:
+            content = self.aws_client.get_report_store(account_id)
+        elif os.path.isfile(self._path(account_id)):
+            with open(self._path(account_id), "r") as f:
+                content = f.read()
+        report = (
+            StoredReport(**json.loads(content)) if content else StoredReport()
+        )
+        self._reports[account_id] = report
+        return report
+
+    def _save(self, account_id: str, report: StoredReport) -> None:
+        content = json.dumps(
+            {
+                "synced_from": report.synced_from,
+                "last_activity_date": report.last_activity_date,
+                "fills": report.fills,
+            }
+        )
+        if self.aws_client is not None:
+            self.aws_client.save_report_store(account_id, content)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(account_id), "w") as f:
+            f.write(content)
+        logger.debug(f"Saved {len(report.fills)} fills for {account_id}")
+
+    def _path(self, account_id: str) -> str:
+        return os.path.join(self.directory, f"{account_id}.json")
+
+
+def _fill_id(order: ReportOrder) -> str:
+    if order.activity_id is not None:
+        return order.activity_id
+    return f"{order.date.isoformat()}:{order.code}:{order.direction}"
+
+
+def _order_to_dict(order: ReportOrder) -> Dict[str, Any]:
+    return {
+        "activity_id": order.activity_id,
+        "code": order.code,
+        "name": order.name,
+        "price": order.price,
+        "quantity": order.quantity,
+        "direction": order.direction,
+        "asset_type": order.asset_type,
+        "currency": order.currency,
+        "date": order.date.isoformat(),
+        "taxes": (
+            None
+            if order.taxes is None
+            else {"cost": order.taxes.cost, "taxes": order.taxes.taxes}
+        ),
+        "underlying": (
+            None if order.underlying is None else order.underlying.price
+        ),
+    }
+
+
+def _order_from_dict(fill: Dict[str, Any]) -> ReportOrder:
+    return ReportOrder(
+        activity_id=fill["activity_id"],
+        code=fill["code"],
+        name=fill["name"],
+        price=fill["price"],
+        quantity=fill["quantity"],
+        direction=(
+            None
+            if fill["direction"] is None
+            else Direction.get_value(fill["direction"])
+        ),
+        asset_type=AssetType.get_value(fill["asset_type"]),
+        currency=Currency.get_value(fill["currency"]),
+        date=datetime.datetime.fromisoformat(fill["date"]),
+        taxes=None if fill["taxes"] is None else Taxes(**fill["taxes"]),
+        underlying=(
+            None
+            if fill["underlying"] is None
+            else Underlying(price=fill["underlying"])
+        ),
+    )
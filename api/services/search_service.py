@@ -1,4 +1,5 @@
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
 from client.binance_client import BinanceClient
 from client.ouinex_client import OuinexClient
@@ -24,35 +25,35 @@ class SearchService:
         self, keyword: str, asset_type: Optional[str] = None
     ) -> List[Asset]:
         """
-        Search for instruments using both Saxo and Binance APIs.
+        Search for instruments on Saxo, Binance and Ouinex at once.
 
         Args:
             keyword: Search keyword
             asset_type: Optional asset type filter (only applies to Saxo)
 
         Returns:
-            List of Asset objects from both Saxo and Binance
+            List of Asset objects from Saxo, Binance and Ouinex
         """
-        results = []
-
-        try:
-            saxo_results = self.saxo_client.search(
-                keyword=keyword, asset_type=asset_type
-            )
-            results.extend(saxo_results)
-        except Exception as e:
-            logger.error(f"Saxo search error: {e}")
-
-        try:
-            binance_results = self.binance_client.search(keyword=keyword)
-            results.extend(binance_results)
-        except Exception as e:
-            logger.error(f"Binance search error: {e}")
-
-        try:
-            ouinex_results = self.ouinex_client.search(keyword=keyword)
-            results.extend(ouinex_results)
-        except Exception as e:
-            logger.error(f"Ouinex search error: {e}")
-
+        searches: List[Tuple[str, Callable[[], List[Asset]]]] = [
+            (
+                "Saxo",
+                lambda: self.saxo_client.search(
+                    keyword=keyword, asset_type=asset_type
+                ),
+            ),
+            ("Binance", lambda: self.binance_client.search(keyword=keyword)),
+            ("Ouinex", lambda: self.ouinex_client.search(keyword=keyword)),
+        ]
+        # The three providers are independent, so the slowest one (a Saxo
+        # ref-data round trip) sets the latency instead of their sum
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            futures = [
+                (name, executor.submit(search)) for name, search in searches
+            ]
+            results: List[Asset] = []
+            for name, future in futures:
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    logger.error(f"{name} search error: {e}")
         return results
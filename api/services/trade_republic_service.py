@@ -1,7 +1,17 @@
 import csv
 import io
+import itertools
 from datetime import date, datetime
-from typing import Dict, List, Optional, Tuple, Type, Union
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from client.gsheet_client import GSheetClient
 from model import AssetType, Currency, ParseError, TradeRepublicTransaction
@@ -34,36 +44,73 @@ class TradeRepublicService:
         self.gsheet_client = gsheet_client
 
     def export_transactions(
-        self, transactions: List[TradeRepublicTransaction]
+        self, transactions: Iterable[TradeRepublicTransaction]
     ) -> int:
-        self.gsheet_client.append_etf_dca_rows(transactions)
-        return len(transactions)
+        """
+        Append the transactions that are not in the sheet yet, checked
+        against the sheet - by transaction_id, or by date, symbol, shares
+        and price for the rows imported without one - and by
+        transaction_id within the selection itself, and return how many
+        were exported.
+        """
+        exported = self.gsheet_client.get_etf_dca_rows()
+        new_transactions: Dict[str, TradeRepublicTransaction] = {}
+        skipped = 0
+        for transaction in transactions:
+            if exported.claim(transaction):
+                skipped += 1
+            else:
+                new_transactions.setdefault(
+                    transaction.transaction_id, transaction
+                )
+        if skipped:
+            logger.info(f"{skipped} transactions already exported")
+        self.gsheet_client.append_etf_dca_rows(list(new_transactions.values()))
+        return len(new_transactions)
 
     def parse_csv(
-        self, file_content: str
+        self, file_content: Union[str, Iterable[str]]
     ) -> Tuple[List[TradeRepublicTransaction], List[ParseError]]:
-        dialect = self._sniff_dialect(file_content)
-        reader = csv.DictReader(io.StringIO(file_content), dialect=dialect)
-
         transactions: List[TradeRepublicTransaction] = []
         errors: List[ParseError] = []
+        for result in self.iter_csv(file_content):
+            if isinstance(result, ParseError):
+                errors.append(result)
+            else:
+                transactions.append(result)
+        return transactions, errors
+
+    def iter_csv(
+        self, file_content: Union[str, Iterable[str]]
+    ) -> Iterator[Union[TradeRepublicTransaction, ParseError]]:
+        """
+        Parse an export row by row. file_content is either the whole text
+        or an iterable of its lines, e.g. an uploaded file being decoded,
+        which is then only read as far as the rows consumed.
+        """
+        lines = iter(
+            io.StringIO(file_content)
+            if isinstance(file_content, str)
+            else file_content
+        )
+        header = next(lines, "")
+        dialect = self._sniff_dialect(header)
+        reader = csv.DictReader(
+            itertools.chain([header], lines), dialect=dialect
+        )
 
         for row_number, row in enumerate(reader, start=1):
             try:
-                transactions.append(self._parse_row(row))
+                yield self._parse_row(row)
             except ValueError as e:
-                errors.append(
-                    ParseError(
-                        row_number=row_number,
-                        raw_line=",".join(v or "" for v in row.values()),
-                        reason=str(e),
-                    )
+                yield ParseError(
+                    row_number=row_number,
+                    raw_line=",".join(v or "" for v in row.values()),
+                    reason=str(e),
                 )
 
-        return transactions, errors
-
-    def _sniff_dialect(self, file_content: str) -> Type[csv.Dialect]:
-        sample = file_content.splitlines()[0] if file_content else ""
+    def _sniff_dialect(self, header: str) -> Type[csv.Dialect]:
+        sample = header.splitlines()[0] if header else ""
         try:
             return csv.Sniffer().sniff(sample, delimiters=",;\t")
         except csv.Error:
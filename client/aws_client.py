@@ -6,7 +6,7 @@ import os
 import time
 import uuid
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aioboto3
 import boto3
@@ -113,6 +113,7 @@ class S3Client(AwsClient):
     BUCKET_NAME = "k-order"
     ACCESS_TOKEN = "access_token"
     WORKFLOWS = "workflows.yml"
+    REPORTS = "reports"
 
     def __init__(self) -> None:
         self.s3 = boto3.client("s3")
@@ -143,6 +144,23 @@ class S3Client(AwsClient):
             Body=f"{content}\n",
         )
 
+    def get_report_store(self, account_id: str) -> Optional[str]:
+        try:
+            response = self.s3.get_object(
+                Bucket=S3Client.BUCKET_NAME,
+                Key=f"{S3Client.REPORTS}/{account_id}.json",
+            )
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return response["Body"].read().decode("utf-8")
+
+    def save_report_store(self, account_id: str, content: str) -> None:
+        self.s3.put_object(
+            Bucket=S3Client.BUCKET_NAME,
+            Key=f"{S3Client.REPORTS}/{account_id}.json",
+            Body=content,
+        )
+
 
 class DynamoDBClient(AwsClient):
 
@@ -871,12 +889,24 @@ class DynamoDBClient(AwsClient):
 
     @_dynamo_operation
     async def get_workflow_orders(
-        self, workflow_id: str, limit: Optional[int] = None
+        self,
+        workflow_id: str,
+        limit: Optional[int] = None,
+        placed_after: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
+        """The workflow's orders, newest first. placed_after narrows the
+        query to the orders placed after that timestamp: placed_at is the
+        sort key, so only those are read."""
         try:
-            query_params = {
-                "KeyConditionExpression": "workflow_id = :wf_id",
-                "ExpressionAttributeValues": {":wf_id": workflow_id},
+            key_condition = "workflow_id = :wf_id"
+            values: Dict[str, Any] = {":wf_id": workflow_id}
+            if placed_after is not None:
+                key_condition += " AND placed_at > :placed_after"
+                values[":placed_after"] = placed_after
+
+            query_params: Dict[str, Any] = {
+                "KeyConditionExpression": key_condition,
+                "ExpressionAttributeValues": values,
                 "ScanIndexForward": False,
             }
 
@@ -1063,29 +1093,103 @@ class DynamoDBClient(AwsClient):
 
         return response
 
+    # The combo backtests read one continuous series at their own unit
+    # time rather than an H1 candle plus 5-minute candles, so their days
+    # live in the same table under their own cache keys, as a plain
+    # candle list.
     @_dynamo_operation
-    async def scan_backtest_candles(self) -> List[Dict[str, Any]]:
-        """Every item in the raw-candle cache. Only the cache migration
-        needs this - the backtests themselves always read a single
-        (cache key, trading date) item."""
+    async def get_cached_backtest_series(
+        self, cache_key: str, trading_date: str
+    ) -> Optional[Dict[str, Any]]:
         table = await self._get_table("backtest_candle_cache")
-        response = await table.scan()
+        response = await table.get_item(
+            Key={
+                "definition_code": cache_key,
+                "trading_date": trading_date,
+            }
+        )
+
+        if response["ResponseMetadata"]["HTTPStatusCode"] >= 400:
+            self.logger.error(f"DynamoDB get_item error: {response}")
+            return None
+
+        return response.get("Item")
+
+    @_dynamo_operation
+    async def store_backtest_series(
+        self,
+        cache_key: str,
+        trading_date: str,
+        has_data: bool,
+        candles: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        item: Dict[str, Any] = {
+            "definition_code": cache_key,
+            "trading_date": trading_date,
+            "has_data": has_data,
+            "cached_at": int(time.time()),
+        }
+        if has_data:
+            item["candles"] = candles or []
+        item = self._convert_floats_to_decimal(item)
+
+        table = await self._get_table("backtest_candle_cache")
+        response = await table.put_item(Item=item)
+
+        if response["ResponseMetadata"]["HTTPStatusCode"] >= 400:
+            self.logger.error(f"DynamoDB put_item error: {response}")
+
+        return response
+
+    @_dynamo_operation
+    async def scan_backtest_candles_page(
+        self,
+        exclusive_start_key: Optional[Dict[str, Any]] = None,
+        segment: int = 0,
+        total_segments: int = 1,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """One page of the raw-candle cache, and the key to resume after
+        it (None once the segment is exhausted). Several segments of one
+        total_segments split are scanned in parallel; a single segment is
+        a plain paged scan."""
+        table = await self._get_table("backtest_candle_cache")
+        kwargs: Dict[str, Any] = {}
+        if total_segments > 1:
+            kwargs["Segment"] = segment
+            kwargs["TotalSegments"] = total_segments
+        if exclusive_start_key is not None:
+            kwargs["ExclusiveStartKey"] = exclusive_start_key
+        response = await table.scan(**kwargs)
 
         if response["ResponseMetadata"]["HTTPStatusCode"] >= 400:
             self.logger.error(f"DynamoDB scan error: {response}")
-            return []
+            raise RuntimeError("Failed to scan the backtest candle cache")
 
-        items = response.get("Items", [])
-        while "LastEvaluatedKey" in response:
-            response = await table.scan(
-                ExclusiveStartKey=response["LastEvaluatedKey"]
-            )
-            if response["ResponseMetadata"]["HTTPStatusCode"] >= 400:
-                self.logger.error(f"DynamoDB scan error: {response}")
-                break
-            items.extend(response.get("Items", []))
+        return response.get("Items", []), response.get("LastEvaluatedKey")
 
-        return items
+    @_dynamo_operation
+    async def batch_write_backtest_candles(
+        self,
+        items: List[Dict[str, Any]],
+        delete_keys: Optional[List[Tuple[str, str]]] = None,
+    ) -> None:
+        """Put complete cache items and delete (cache key, trading date)
+        rows through one batch_writer, which sends them 25 at a time and
+        resends whatever DynamoDB leaves unprocessed. Only the cache
+        migrations write in bulk - a backtest stores one day at a time."""
+        table = await self._get_table("backtest_candle_cache")
+        async with table.batch_writer() as batch:
+            for item in items:
+                await batch.put_item(
+                    Item=self._convert_floats_to_decimal(item)
+                )
+            for cache_key, trading_date in delete_keys or []:
+                await batch.delete_item(
+                    Key={
+                        "definition_code": cache_key,
+                        "trading_date": trading_date,
+                    }
+                )
 
     @_dynamo_operation
     async def delete_backtest_candles(
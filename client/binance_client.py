@@ -1,11 +1,18 @@
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
+import numpy
 import requests
 from binance.error import ClientError
 from binance.spot import Spot  # type: ignore
+from cachetools import TTLCache
 
+from client.symbol_index import SymbolIndex
 from model import AssetType, Currency, Direction, ReportOrder, Taxes
 from model.asset import Asset
 from model.enum import Exchange
@@ -37,15 +44,51 @@ class BinanceClient:
         "AAVE",
     ]
 
+    QUOTE_ASSETS = ["BUSD", "USDT", "USDC"]
+    # myTrades costs 20 of the 6000 weight Binance grants per minute; the
+    # report keeps to half of it so the API and the CLI can share the key
+    MY_TRADES_WEIGHT = 20
+    MY_TRADES_LIMIT = 1000
+    WEIGHT_BUDGET_PER_MINUTE = 3000
+    REPORT_WORKERS = 8
+    # Market data is read by concurrent watchlist rows, keep enough pooled
+    # connections to Binance for all of them
+    MARKET_DATA_CONNECTIONS = 16
+    KLINES_LIMIT = 1000
+    KLINES_TTL = 3600
+
     def __init__(self, key: str, secret: str) -> None:
         self.logger = Logger.get_logger("binance_client", logging.INFO)
         self.client = Spot(key, secret)
+        self.client.session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(
+                pool_maxsize=self.MARKET_DATA_CONNECTIONS
+            ),
+        )
+        self._exchange_cache: TTLCache[str, Any] = TTLCache(
+            maxsize=2, ttl=3600
+        )
+        # The trades of each pair kept across reports, with the timestamp
+        # they were seeded from
+        self._trades: Dict[str, Tuple[int, List[Dict]]] = {}
+        self._trades_lock = threading.Lock()
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._weight_lock = threading.Lock()
+        # A series not asked for within the hour is dropped rather than
+        # kept, and caught up, for the life of the process
+        self._klines: TTLCache[Tuple[str, str], numpy.ndarray] = TTLCache(
+            maxsize=256, ttl=self.KLINES_TTL
+        )
+        self._klines_lock = threading.Lock()
 
     def _merge_trades(self, trades: List) -> List:
         merged_trades = {}
         for trade in trades:
             if trade["orderId"] not in merged_trades:
-                merged_trades[trade["orderId"]] = trade
+                # A copy: the trades come from the per-pair history kept
+                # across reports, which the sums below must not touch
+                merged_trades[trade["orderId"]] = dict(trade)
             else:
                 order_id = trade["orderId"]
                 merged_trades[order_id]["qty"] = float(
@@ -80,26 +123,132 @@ class BinanceClient:
                 cost=float(trade["commission"]) * usdeur_rate, taxes=0
             )
 
-    def get_report(
-        self, symbol: str, date: str, usdeur_rate: float
-    ) -> List[ReportOrder]:
-        timestamp = datetime.strptime(date, "%Y/%m/%d").timestamp() * 1000
-        try:
-            trades = self.client.my_trades(
-                f"{symbol}BUSD", startTime=int(timestamp)
-            )
-        except ClientError as e:
-            self.logger.error(f"{symbol}BUSD {e}")
-            return []
+    def _load_exchange_info(self) -> bool:
+        """
+        Read exchangeInfo once an hour into the listed symbol set and the
+        search index of the pairs trading now. False when it can't be read.
+        """
+        if "symbols" in self._exchange_cache:
+            return True
         try:
-            trades += self.client.my_trades(
-                f"{symbol}USDT", startTime=int(timestamp)
+            response = requests.get(
+                "https://api.binance.com/api/v3/exchangeInfo", timeout=10
             )
-            trades += self.client.my_trades(
-                f"{symbol}USDC", startTime=int(timestamp)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Failed to fetch Binance exchange info: {e}")
+            return False
+        trading = [
+            symbol_data
+            for symbol_data in data.get("symbols", [])
+            if symbol_data.get("status") == "TRADING"
+        ]
+        # A pair on BREAK (the BUSD quotes, a halted coin) still has a
+        # trade history to report, only the search leaves it out
+        self._exchange_cache["symbols"] = {
+            symbol_data.get("symbol", "")
+            for symbol_data in data.get("symbols", [])
+        }
+        self._exchange_cache["index"] = SymbolIndex(
+            (
+                Asset(
+                    symbol=symbol_data.get("symbol", ""),
+                    description=f"{symbol_data.get('baseAsset', '')}/"
+                    f"{symbol_data.get('quoteAsset', '')}",
+                    asset_type=AssetType.CRYPTO,
+                    exchange=Exchange.BINANCE,
+                    identifier=None,
+                ),
+                (
+                    symbol_data.get("symbol", ""),
+                    symbol_data.get("baseAsset", ""),
+                    symbol_data.get("quoteAsset", ""),
+                ),
             )
-        except ClientError as e:
-            self.logger.error(f"{symbol}USDC / USDT {e}")
+            for symbol_data in trading
+        )
+        return True
+
+    def _listed_symbols(self) -> Optional[Set[str]]:
+        """
+        Symbols exchangeInfo lists, trading or not. None when it can't be
+        read, in which case no pair is skipped.
+        """
+        if not self._load_exchange_info():
+            return None
+        return self._exchange_cache["symbols"]
+
+    def _spend_weight(self, weight: int) -> None:
+        """
+        Block until the call fits in the request weight we allow ourselves
+        over a rolling minute, a share of the account-wide Binance limit.
+        """
+        while True:
+            with self._weight_lock:
+                now = time.monotonic()
+                while self._spent and self._spent[0][0] <= now - 60:
+                    self._spent.popleft()
+                used = sum(spent for _, spent in self._spent)
+                if used + weight <= BinanceClient.WEIGHT_BUDGET_PER_MINUTE:
+                    self._spent.append((now, weight))
+                    return
+                wait = self._spent[0][0] + 60 - now
+            time.sleep(wait)
+
+    def _get_pair_trades(self, pair: str, timestamp: int) -> List[Dict]:
+        """
+        The trades of the account on a pair since timestamp, at least. The
+        first call is seeded with startTime, so a report on last week does
+        not page through years of history; its trades give the id cursor,
+        and later calls only ask for the trades after the last id already
+        seen. A report reaching further back than the kept trades seeds
+        the pair again from its own start.
+        """
+        with self._trades_lock:
+            since, trades = self._trades.get(pair, (timestamp, []))
+        if since > timestamp:
+            since, trades = timestamp, []
+        trades = list(trades)
+        while True:
+            self._spend_weight(BinanceClient.MY_TRADES_WEIGHT)
+            if trades:
+                page = self.client.my_trades(
+                    pair,
+                    fromId=trades[-1]["id"] + 1,
+                    limit=BinanceClient.MY_TRADES_LIMIT,
+                )
+            else:
+                page = self.client.my_trades(
+                    pair, startTime=since, limit=BinanceClient.MY_TRADES_LIMIT
+                )
+            trades += page
+            if len(page) < BinanceClient.MY_TRADES_LIMIT:
+                break
+        with self._trades_lock:
+            self._trades[pair] = (since, trades)
+        return trades
+
+    def _get_symbol_trades(self, symbol: str, timestamp: int) -> List[Dict]:
+        listed = self._listed_symbols()
+        trades: List[Dict] = []
+        for quote in BinanceClient.QUOTE_ASSETS:
+            pair = f"{symbol}{quote}"
+            if listed is not None and pair not in listed:
+                continue
+            try:
+                trades += [
+                    trade
+                    for trade in self._get_pair_trades(pair, timestamp)
+                    if int(trade["time"]) >= timestamp
+                ]
+            except ClientError as e:
+                self.logger.error(f"{pair} {e}")
+        return trades
+
+    def _to_orders(
+        self, symbol: str, trades: List[Dict], usdeur_rate: float
+    ) -> List[ReportOrder]:
         orders = []
         for trade in self._merge_trades(trades):
             direction = (
@@ -114,18 +263,33 @@ class BinanceClient:
                 asset_type=AssetType.CRYPTO,
                 date=datetime.fromtimestamp(int(trade["time"]) / 1000),
                 currency=Currency.USD,
+                activity_id=f"{trade['symbol']}:{trade['orderId']}",
             )
             self._apply_commmission(trade, order, usdeur_rate)
             orders.append(order)
         return orders
 
+    def get_report(
+        self, symbol: str, date: str, usdeur_rate: float
+    ) -> List[ReportOrder]:
+        timestamp = int(datetime.strptime(date, "%Y/%m/%d").timestamp() * 1000)
+        return self._to_orders(
+            symbol, self._get_symbol_trades(symbol, timestamp), usdeur_rate
+        )
+
     def get_report_all(
         self, date: str, usdeur_rate: float
     ) -> List[ReportOrder]:
-        orders = []
-        for coin in BinanceClient.ASSET_WITHLIST:
-            orders += self.get_report(coin, date, usdeur_rate)
-        return orders
+        # The per-coin fetches only wait on Binance, so they run side by
+        # side; _spend_weight keeps the burst within the weight budget
+        with ThreadPoolExecutor(
+            max_workers=BinanceClient.REPORT_WORKERS
+        ) as executor:
+            reports = executor.map(
+                lambda coin: self.get_report(coin, date, usdeur_rate),
+                BinanceClient.ASSET_WITHLIST,
+            )
+            return [order for report in reports for order in report]
 
     def search(self, keyword: str) -> List[Asset]:
         """
@@ -138,42 +302,9 @@ class BinanceClient:
         Returns:
             List of Asset objects for matching trading pairs
         """
-        try:
-            response = requests.get(
-                "https://api.binance.com/api/v3/exchangeInfo", timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Failed to fetch Binance exchange info: {e}")
+        if not self._load_exchange_info():
             return []
-
-        keyword_lower = keyword.lower()
-        results = []
-
-        for symbol_data in data.get("symbols", []):
-            if symbol_data.get("status") != "TRADING":
-                continue
-
-            symbol = symbol_data.get("symbol", "")
-            base_asset = symbol_data.get("baseAsset", "")
-            quote_asset = symbol_data.get("quoteAsset", "")
-
-            if (
-                keyword_lower in symbol.lower()
-                or keyword_lower in base_asset.lower()
-                or keyword_lower in quote_asset.lower()
-            ):
-                asset = Asset(
-                    symbol=symbol,
-                    description=f"{base_asset}/{quote_asset}",
-                    asset_type=AssetType.CRYPTO,
-                    exchange=Exchange.BINANCE,
-                    identifier=None,
-                )
-                results.append(asset)
-
-        return results
+        return self._exchange_cache["index"].search(keyword)
 
     def _unit_time_to_binance_interval(self, unit_time: UnitTime) -> str:
         """
@@ -196,7 +327,11 @@ class BinanceClient:
         return interval_map[unit_time]
 
     def _get_klines(
-        self, symbol: str, interval: str, limit: int
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: Optional[int] = None,
     ) -> List[List]:
         """
         Fetch klines (candlestick data) from Binance.
@@ -207,6 +342,8 @@ class BinanceClient:
             symbol: Binance symbol (e.g., "BTCUSDT")
             interval: Binance interval string (e.g., "1d", "1h", "15m")
             limit: Number of klines to fetch (max 1000)
+            start_time: Open time in milliseconds of the first kline,
+                the latest klines when None
 
         Returns:
             List of klines in Binance format (nested arrays)
@@ -214,46 +351,83 @@ class BinanceClient:
         Raises:
             ClientError: If the API request fails
         """
+        params: Dict[str, Any] = {"limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
         try:
             klines = self.client.klines(
-                symbol=symbol, interval=interval, limit=limit
+                symbol=symbol, interval=interval, **params
             )
             return klines
         except ClientError as e:
             self.logger.error(f"Failed to fetch klines for {symbol}: {e}")
             raise
 
-    def _map_kline_to_candle(self, kline: List, unit_time: UnitTime) -> Candle:
+    @staticmethod
+    def _decode_klines(klines: List[List]) -> numpy.ndarray:
         """
-        Convert Binance kline array to Candle object.
-
-        Binance kline format:
-        [
-            0: Kline open time (milliseconds),
-            1: Open price,
-            2: High price,
-            3: Low price,
-            4: Close price,
-            5: Volume,
-            6: Kline close time,
-            ...
-        ]
+        Decode Binance klines straight into a (n, 5) float array of open
+        time, open, high, low and close, oldest first.
+        """
+        return numpy.array(
+            [kline[:5] for kline in klines], dtype=float
+        ).reshape(-1, 5)
 
-        Args:
-            kline: Binance kline array
-            unit_time: Time unit for the candle
+    def _get_kline_array(
+        self, symbol: str, interval: str, limit: int
+    ) -> numpy.ndarray:
+        """
+        The last `limit` klines of a symbol, from the kline cache.
 
-        Returns:
-            Candle object with rounded prices and proper datetime
+        Only the newest cached kline can still move, so a cached series is
+        refreshed by asking for the klines opened since its last open time
+        and replacing that one. The whole series is downloaded again when
+        nothing is cached yet, when fewer klines than `limit` are cached or
+        when the cache is more than a full page behind.
         """
-        return Candle(
-            open=round(float(kline[1]), 4),
-            higher=round(float(kline[2]), 4),
-            lower=round(float(kline[3]), 4),
-            close=round(float(kline[4]), 4),
-            ut=unit_time,
-            date=datetime.fromtimestamp(int(kline[0]) / 1000),
-        )
+        key = (symbol, interval)
+        with self._klines_lock:
+            cached = self._klines.get(key)
+        klines = None
+        if cached is not None and len(cached) >= limit:
+            last_open = int(cached[-1, 0])
+            fresh = self._decode_klines(
+                self._get_klines(
+                    symbol, interval, self.KLINES_LIMIT, start_time=last_open
+                )
+            )
+            if len(fresh) < self.KLINES_LIMIT:
+                kept = cached[cached[:, 0] < last_open]
+                klines = numpy.concatenate((kept, fresh))[-len(cached) :]
+        if klines is None:
+            klines = self._decode_klines(
+                self._get_klines(symbol, interval, limit)
+            )
+        with self._klines_lock:
+            self._klines[key] = klines
+        return klines[-limit:]
+
+    @staticmethod
+    def _to_candles(
+        klines: numpy.ndarray, unit_time: UnitTime
+    ) -> List[Candle]:
+        """
+        Decoded klines (see _decode_klines) as candles with rounded
+        prices, newest first (index 0 = latest).
+        """
+        return [
+            Candle(
+                open=round(open_price, 4),
+                higher=round(high, 4),
+                lower=round(low, 4),
+                close=round(close, 4),
+                ut=unit_time,
+                date=datetime.fromtimestamp(open_time / 1000),
+            )
+            for open_time, open_price, high, low, close in klines[
+                ::-1
+            ].tolist()
+        ]
 
     def get_candles(
         self, symbol: str, unit_time: UnitTime, limit: int = 200
@@ -270,16 +444,9 @@ class BinanceClient:
             List of Candle objects, sorted newest first (index 0 = latest)
         """
         interval = self._unit_time_to_binance_interval(unit_time)
-        klines = self._get_klines(symbol, interval, limit)
-
-        candles = [
-            self._map_kline_to_candle(kline, unit_time) for kline in klines
-        ]
-
-        # Reverse to get newest first (index 0 = latest)
-        candles.reverse()
-
-        return candles
+        return self._to_candles(
+            self._get_kline_array(symbol, interval, limit), unit_time
+        )
 
     def get_latest_candle(self, symbol: str) -> Candle:
         """
@@ -296,4 +463,5 @@ class BinanceClient:
         if not klines:
             raise ValueError(f"No kline data returned for {symbol}")
 
-        return self._map_kline_to_candle(klines[0], UnitTime.M15)
+        latest = self._decode_klines(klines[:1])
+        return self._to_candles(latest, UnitTime.M15)[0]
@@ -1,3 +1,5 @@
+from bisect import bisect_left
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 
 from model import Candle, UnitTime
@@ -30,12 +32,39 @@ def _get_value_from_saxo_data(data: Dict, key: str) -> float:
     raise SaxoException("Can't find the price")
 
 
+@dataclass(frozen=True)
+class TickSizeTable:
+    """
+    A saxo TickSizeScheme as two parallel lists sorted by HighPrice, so the
+    tick of a price is one bisect instead of a scan of the Elements.
+    """
+
+    high_prices: List[float]
+    tick_sizes: List[float]
+    default_tick_size: float
+
+    @classmethod
+    def from_scheme(cls, data: Dict) -> "TickSizeTable":
+        elements = sorted(data["Elements"], key=lambda x: x["HighPrice"])
+        return cls(
+            high_prices=[element["HighPrice"] for element in elements],
+            tick_sizes=[element["TickSize"] for element in elements],
+            default_tick_size=data["DefaultTickSize"],
+        )
+
+    def tick_size(self, price: float) -> float:
+        index = bisect_left(self.high_prices, price)
+        if index < len(self.tick_sizes):
+            return self.tick_sizes[index]
+        return self.default_tick_size
+
+
 def get_tick_size(data: Dict, price: float) -> float:
-    tick_size = data["DefaultTickSize"]
-    for tick in data["Elements"]:
-        if price <= tick["HighPrice"]:
-            return tick["TickSize"]
-    return tick_size
+    """
+    A one-off lookup. A caller reading the same scheme again keeps the
+    TickSizeTable rather than rebuilding it for every price.
+    """
+    return TickSizeTable.from_scheme(data).tick_size(price)
 
 
 def map_data_to_candles(
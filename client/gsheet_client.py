@@ -1,7 +1,21 @@
+import itertools
 import locale
-from datetime import datetime
-from typing import Any, List, Optional
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
+from cachetools import TTLCache
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 
@@ -21,6 +35,150 @@ ETF_DCA_SENS_MAP = {
     "BUY": "Achat",
     "SELL": "Vente",
 }
+# Direction of a position as the order sheet writes it in AC
+ORDER_SENS_MAP = {
+    "Achat": Direction.BUY,
+    "Vente": Direction.SELL,
+}
+# Rows per values.append call when importing a Trade Republic export
+ETF_DCA_APPEND_BATCH_SIZE = 500
+# Column of the ETF / DCA sheet holding the Trade Republic transaction_id
+# of each imported row (the tenth value of _generate_etf_dca_row), claimed
+# by its header on the first import
+ETF_DCA_ID_COLUMN = "J"
+ETF_DCA_ID_HEADER = "Transaction ID"
+# Day zero of the serial numbers the Sheets API renders dates as
+SHEETS_EPOCH = date(1899, 12, 30)
+
+
+def order_row_key(day: date, code: str, quantity: float) -> Tuple:
+    """Identity of a fill in the order sheet: its date, code and quantity"""
+    return (day, code.upper(), round(float(quantity), 6))
+
+
+@dataclass
+class ReportedOrders:
+    """
+    What the order sheet already holds. A position is one row: its opening
+    fill dated in U, its closing fill written into the same row, dated in
+    AB. fills counts the order_row_key of both. open_rows lists the rows
+    not closed yet as (opening date, quantity, line), by code and opening
+    direction, in sheet order.
+    """
+
+    fills: Counter = field(default_factory=Counter)
+    open_rows: Dict[Tuple[str, Direction], List[Tuple[date, float, int]]] = (
+        field(default_factory=dict)
+    )
+
+    def claim(self, order: ReportOrder) -> bool:
+        """
+        Whether the fill is already in the sheet. A row accounts for one
+        fill only, so two same-day fills of the same size are not both
+        dropped for a single row.
+        """
+        key = order_row_key(order.date.date(), order.code, order.quantity)
+        if self.fills[key] > 0:
+            self.fills[key] -= 1
+            return True
+        return False
+
+    def opened(
+        self,
+        day: date,
+        code: str,
+        quantity: float,
+        direction: Direction,
+        line: int,
+    ) -> None:
+        """Note the open row at line, opened on day by a fill of quantity
+        code in direction."""
+        self.open_rows.setdefault((code.upper(), direction), []).append(
+            (day, round(float(quantity), 6), line)
+        )
+
+    def close(self, order: ReportOrder) -> Optional[int]:
+        """
+        The line of the first open row the fill closes whole - same code
+        and quantity, opposite direction, opened the same day or before -
+        which is no longer open afterwards. None when it closes none.
+        """
+        rows = self._against(order)
+        quantity = round(float(order.quantity), 6)
+        for index, (opened, row_quantity, line) in enumerate(rows):
+            if opened <= order.date.date() and row_quantity == quantity:
+                del rows[index]
+                return line
+        return None
+
+    def reduces(self, order: ReportOrder) -> bool:
+        """Whether the fill goes against a row still open, whatever its
+        quantity: a partial close cannot be written into the row."""
+        return any(
+            opened <= order.date.date()
+            for opened, _, _ in self._against(order)
+        )
+
+    def _against(self, order: ReportOrder) -> List[Tuple[date, float, int]]:
+        if order.direction == Direction.BUY:
+            return self.open_rows.get((order.code.upper(), Direction.SELL), [])
+        return self.open_rows.get((order.code.upper(), Direction.BUY), [])
+
+
+def etf_dca_row_key(
+    day: date, symbol: str, shares: float, price: float
+) -> Tuple:
+    """Identity of an ETF / DCA row without a transaction_id: its date,
+    symbol, shares and price"""
+    return (
+        day,
+        symbol.upper(),
+        round(float(shares), 6),
+        round(float(price), 6),
+    )
+
+
+@dataclass
+class EtfDcaRows:
+    """
+    What the ETF / DCA sheet already holds: the transaction_ids of the rows
+    imported with one, and the etf_dca_row_key of the rows imported before
+    the id column existed, counted.
+    """
+
+    ids: Set[str] = field(default_factory=set)
+    row_keys: Counter = field(default_factory=Counter)
+    has_id_header: bool = False
+
+    def claim(self, transaction: TradeRepublicTransaction) -> bool:
+        """
+        Whether the transaction is already in the sheet. A row without an id
+        matches one transaction only, so two identical buys of an export
+        are not both dropped for a single row.
+        """
+        if transaction.transaction_id in self.ids:
+            return True
+        if (
+            transaction.symbol is None
+            or transaction.shares is None
+            or transaction.price is None
+        ):
+            return False
+        key = etf_dca_row_key(
+            transaction.date,
+            transaction.symbol,
+            transaction.shares,
+            transaction.price,
+        )
+        if self.row_keys[key] > 0:
+            self.row_keys[key] -= 1
+            return True
+        return False
+
+
+def appended_line(result: Dict) -> int:
+    """The first line a values append wrote, from its updatedRange"""
+    return int(result["updates"]["updatedRange"].split(":")[0].split("A")[1])
 
 
 class GSheetClient:
@@ -37,18 +195,43 @@ class GSheetClient:
         self.spreadsheet_id = spreadsheet_id
         self.sheet_name = "Liste d’ordre"
         self.trade_republic_sheet_name = trade_republic_sheet_name
+        # Sheet properties (ids and row counts) by title, kept for a minute
+        # and moved forward by our own appends so that writing a row does
+        # not download the spreadsheet structure again
+        self._sheets_cache: TTLCache[str, Dict[str, Dict]] = TTLCache(
+            maxsize=1, ttl=60
+        )
+        # Rows already in the ETF / DCA sheet, read once and extended by our
+        # own appends
+        self._etf_dca_rows_cache: TTLCache[str, EtfDcaRows] = TTLCache(
+            maxsize=1, ttl=60
+        )
+
+    def _get_sheets_properties(self) -> Dict[str, Dict]:
+        if "sheets" not in self._sheets_cache:
+            spreadsheet = (
+                self.client.spreadsheets()
+                .get(
+                    spreadsheetId=self.spreadsheet_id,
+                    fields="sheets.properties",
+                )
+                .execute()
+            )
+            self._sheets_cache["sheets"] = {
+                sheet["properties"]["title"]: sheet["properties"]
+                for sheet in spreadsheet.get("sheets", [])
+            }
+        return self._sheets_cache["sheets"]
+
+    def _rows_appended(self, sheet_name: str, count: int) -> None:
+        # INSERT_ROWS grows the grid by the appended rows
+        properties = self._sheets_cache.get("sheets", {}).get(sheet_name)
+        if properties is not None:
+            properties["gridProperties"]["rowCount"] += count
 
     def _get_sheet_id(self):
-        spreadsheet = (
-            self.client.spreadsheets()
-            .get(spreadsheetId=self.spreadsheet_id)
-            .execute()
-        )
-        sheets = spreadsheet.get("sheets", [])
-        for sheet in sheets:
-            if sheet["properties"]["title"] == self.sheet_name:
-                return sheet["properties"]["sheetId"]
-        return None
+        properties = self._get_sheets_properties().get(self.sheet_name)
+        return None if properties is None else properties["sheetId"]
 
     def _generate_r_v_block(self, order: Order, number_rows: int) -> List:
         taxes = Taxes(0, 0) if order.taxes is None else order.taxes
@@ -135,23 +318,22 @@ class GSheetClient:
         return self._get_number_rows_for_sheet(self.sheet_name)
 
     def _get_number_rows_for_sheet(self, sheet_name: str) -> Optional[int]:
-        spreadsheet = (
-            self.client.spreadsheets()
-            .get(spreadsheetId=self.spreadsheet_id)
-            .execute()
-        )
-        sheets = spreadsheet.get("sheets", [])
-        for sheet in sheets:
-            if sheet["properties"]["title"] == sheet_name:
-                return sheet["properties"]["gridProperties"]["rowCount"]
-        return None
+        properties = self._get_sheets_properties().get(sheet_name)
+        if properties is None:
+            return None
+        return properties["gridProperties"]["rowCount"]
 
     def _generate_row(
-        self, account: Account, order: Order, original_order: Order
+        self,
+        account: Account,
+        order: Order,
+        original_order: Order,
+        number_rows: Optional[int] = None,
     ) -> List:
         if order.taxes is None:
             order.taxes = Taxes(0, 0)
-        number_rows = self._get_number_rows() + 1
+        if number_rows is None:
+            number_rows = self._get_number_rows() + 1
         row: List[Any] = [
             order.name,
             order.code.upper(),
@@ -194,16 +376,28 @@ class GSheetClient:
         original_order: ReportOrder,
         line_to_update: int,
     ) -> Any:
-        if order.taxes is None:
-            order.taxes = Taxes(0, 0)
-        if order.open_position is False:
-            requests = self._generate_close_position_update(
-                order, original_order, line_to_update
-            )
-        else:
-            requests = self._generate_open_position_update(
-                order, original_order, line_to_update
-            )
+        return self.update_orders([(order, original_order, line_to_update)])
+
+    def update_orders(
+        self, orders: Sequence[Tuple[ReportOrder, ReportOrder, int]]
+    ) -> Any:
+        """
+        Write each (order, original order, line) into its row - the opening
+        cells of an open position, the closing cells otherwise - in a
+        single values batchUpdate whatever the number of orders.
+        """
+        requests: List = []
+        for order, original_order, line_to_update in orders:
+            if order.taxes is None:
+                order.taxes = Taxes(0, 0)
+            if order.open_position is False:
+                requests += self._generate_close_position_update(
+                    order, original_order, line_to_update
+                )
+            else:
+                requests += self._generate_open_position_update(
+                    order, original_order, line_to_update
+                )
 
         batch_update_request = {
             "valueInputOption": "USER_ENTERED",
@@ -324,6 +518,18 @@ class GSheetClient:
     def create_order(
         self, account: Account, order: Order, original_order: Order
     ) -> Any:
+        return self.create_orders(account, [(order, original_order)])
+
+    def create_orders(
+        self, account: Account, orders: Sequence[Tuple[Order, Order]]
+    ) -> Any:
+        """
+        Append one row per (order, original order) pair and colour them,
+        in two requests whatever the number of orders: a single values
+        append (USER_ENTERED, so dates and amounts are parsed the way the
+        sheet expects) and a single batchUpdate for the backgrounds.
+        """
+        first_row = self._get_number_rows() + 1
         result = (
             self.client.spreadsheets()
             .values()
@@ -334,47 +540,193 @@ class GSheetClient:
                 insertDataOption="INSERT_ROWS",
                 body={
                     "values": [
-                        self._generate_row(account, order, original_order)
+                        self._generate_row(
+                            account, order, original_order, first_row + i
+                        )
+                        for i, (order, original_order) in enumerate(orders)
                     ]
                 },
             )
             .execute()
         )
+        self._rows_appended(self.sheet_name, len(orders))
 
-        new_row_index = (
-            int(result["updates"]["updatedRange"].split(":")[0].split("A")[1])
-            - 1
-        )
+        new_row_index = appended_line(result) - 1
         sheet_id = self._get_sheet_id()
-        background_color = (
-            None
-            if isinstance(order, ReportOrder)
-            else {"red": 1, "green": 1, "blue": 0}
-        )
         requests: Any = [
             {
                 "repeatCell": {
                     "range": {
                         "sheetId": sheet_id,
-                        "startRowIndex": new_row_index,
-                        "endRowIndex": new_row_index + 1,
+                        "startRowIndex": new_row_index + i,
+                        "endRowIndex": new_row_index + i + 1,
                         "startColumnIndex": 0,
                         "endColumnIndex": 1,
                     },
                     "cell": {
                         "userEnteredFormat": {
-                            "backgroundColor": background_color
+                            "backgroundColor": (
+                                None
+                                if isinstance(order, ReportOrder)
+                                else {"red": 1, "green": 1, "blue": 0}
+                            )
                         }
                     },
                     "fields": "userEnteredFormat.backgroundColor",
                 }
             }
+            for i, (order, _) in enumerate(orders)
         ]
         self.client.spreadsheets().batchUpdate(
             spreadsheetId=self.spreadsheet_id, body={"requests": requests}
         ).execute()
         return result
 
+    def get_reported_orders(self) -> ReportedOrders:
+        """
+        The fills the order sheet reports and its open rows, read in a
+        single request. Only the code (B), quantity (E), date (U), close
+        date (AB) and direction (AC) columns are downloaded, unformatted so
+        that neither the sheet's locale nor its date format leaks into the
+        comparison.
+        """
+        response = (
+            self.client.spreadsheets()
+            .values()
+            .batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[
+                    f"{self.sheet_name}!B:B",
+                    f"{self.sheet_name}!E:E",
+                    f"{self.sheet_name}!U:U",
+                    f"{self.sheet_name}!AB:AB",
+                    f"{self.sheet_name}!AC:AC",
+                ],
+                valueRenderOption="UNFORMATTED_VALUE",
+                dateTimeRenderOption="SERIAL_NUMBER",
+            )
+            .execute()
+        )
+        # The API trims every column after its last value: an open row at
+        # the bottom of the sheet has no AB cell at all
+        columns = itertools.zip_longest(
+            *(
+                [
+                    row[0] if row else None
+                    for row in value_range.get("values", [])
+                ]
+                for value_range in response["valueRanges"]
+            )
+        )
+        reported = ReportedOrders()
+        for line, (code, quantity, opened, closed, sens) in enumerate(
+            columns, start=1
+        ):
+            day = _sheet_date(opened)
+            if (
+                not isinstance(code, str)
+                or not isinstance(quantity, (int, float))
+                or day is None
+            ):
+                continue
+            reported.fills[order_row_key(day, code, quantity)] += 1
+            close_day = _sheet_date(closed)
+            if close_day is not None:
+                reported.fills[order_row_key(close_day, code, quantity)] += 1
+            elif sens in ORDER_SENS_MAP:
+                reported.opened(
+                    day, code, quantity, ORDER_SENS_MAP[sens], line
+                )
+        return reported
+
+    def get_etf_dca_rows(self) -> EtfDcaRows:
+        """
+        The rows already in the ETF / DCA sheet, as a copy of the cached
+        ones: claim consumes the rows it matches, and an export must not
+        use up the rows the next one is checked against.
+        """
+        rows = self._etf_dca_rows()
+        return EtfDcaRows(
+            ids=set(rows.ids),
+            row_keys=Counter(rows.row_keys),
+            has_id_header=rows.has_id_header,
+        )
+
+    def _etf_dca_rows(self) -> EtfDcaRows:
+        """
+        The rows already in the ETF / DCA sheet, read in a single request:
+        symbol (B), date (C), price (E), shares (F) and the transaction_id
+        column. That column is only read once its header says it holds
+        ids; a column left empty is claimed by the next append, anything
+        else in it is refused rather than taken over.
+        """
+        if "rows" not in self._etf_dca_rows_cache:
+            sheet = self.trade_republic_sheet_name
+            response = (
+                self.client.spreadsheets()
+                .values()
+                .batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=[
+                        f"{sheet}!B:B",
+                        f"{sheet}!C:C",
+                        f"{sheet}!E:E",
+                        f"{sheet}!F:F",
+                        f"{sheet}!{ETF_DCA_ID_COLUMN}:{ETF_DCA_ID_COLUMN}",
+                    ],
+                    valueRenderOption="UNFORMATTED_VALUE",
+                    dateTimeRenderOption="SERIAL_NUMBER",
+                )
+                .execute()
+            )
+            symbols, dates, prices, shares, ids = (
+                [
+                    row[0] if row else None
+                    for row in value_range.get("values", [])
+                ]
+                for value_range in response["valueRanges"]
+            )
+            header = ids[0] if ids else None
+            if header != ETF_DCA_ID_HEADER and any(ids):
+                raise ValueError(
+                    f"Column {ETF_DCA_ID_COLUMN} of '{sheet}' does not hold "
+                    f"transaction ids (header '{header}', expected "
+                    f"'{ETF_DCA_ID_HEADER}')"
+                )
+            rows = EtfDcaRows(has_id_header=header == ETF_DCA_ID_HEADER)
+            cells = itertools.zip_longest(symbols, dates, prices, shares, ids)
+            # The first row is the header
+            for row in itertools.islice(cells, 1, None):
+                symbol, day, price, quantity, transaction_id = row
+                if transaction_id:
+                    rows.ids.add(str(transaction_id))
+                    continue
+                parsed_day = _sheet_date(day)
+                if (
+                    not isinstance(symbol, str)
+                    or parsed_day is None
+                    or not isinstance(price, (int, float))
+                    or not isinstance(quantity, (int, float))
+                ):
+                    continue
+                rows.row_keys[
+                    etf_dca_row_key(parsed_day, symbol, quantity, price)
+                ] += 1
+            self._etf_dca_rows_cache["rows"] = rows
+        return self._etf_dca_rows_cache["rows"]
+
+    def _claim_etf_dca_id_column(self) -> None:
+        rows = self._etf_dca_rows()
+        if rows.has_id_header:
+            return
+        self.client.spreadsheets().values().update(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"{self.trade_republic_sheet_name}!{ETF_DCA_ID_COLUMN}1",
+            valueInputOption="RAW",
+            body={"values": [[ETF_DCA_ID_HEADER]]},
+        ).execute()
+        rows.has_id_header = True
+
     def _generate_etf_dca_row(
         self, transaction: TradeRepublicTransaction, row_number: int
     ) -> List:
@@ -389,33 +741,67 @@ class GSheetClient:
             transaction.fee,
             f"=E{row_number}*F{row_number}",
             f"=H{row_number}+G{row_number}",
+            transaction.transaction_id,
         ]
 
     def append_etf_dca_rows(
-        self, transactions: List[TradeRepublicTransaction]
-    ) -> Any:
-        row_count = self._get_number_rows_for_sheet(
-            self.trade_republic_sheet_name
-        )
-        if row_count is None:
-            raise ValueError(
-                f"Sheet '{self.trade_republic_sheet_name}' not found"
+        self, transactions: Iterable[TradeRepublicTransaction]
+    ) -> int:
+        """
+        Append the transactions to the ETF / DCA sheet, ETF_DCA_APPEND_BATCH_
+        SIZE rows per request, and return how many rows were written. The
+        transactions are only consumed one batch at a time, so a generator
+        over a large export is never held in memory as a whole. The first
+        append writes the ETF_DCA_ID_HEADER of a still empty id column.
+        """
+        appended = 0
+        for batch in _batches(transactions, ETF_DCA_APPEND_BATCH_SIZE):
+            if not appended:
+                self._claim_etf_dca_id_column()
+            row_count = self._get_number_rows_for_sheet(
+                self.trade_republic_sheet_name
             )
-        start_row = row_count + 1
-        rows = [
-            self._generate_etf_dca_row(transaction, start_row + i)
-            for i, transaction in enumerate(transactions)
-        ]
-        result = (
-            self.client.spreadsheets()
-            .values()
-            .append(
+            if row_count is None:
+                raise ValueError(
+                    f"Sheet '{self.trade_republic_sheet_name}' not found"
+                )
+            start_row = row_count + 1
+            rows = [
+                self._generate_etf_dca_row(transaction, start_row + i)
+                for i, transaction in enumerate(batch)
+            ]
+            self.client.spreadsheets().values().append(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{self.trade_republic_sheet_name}!A:A",
                 valueInputOption="USER_ENTERED",
                 insertDataOption="INSERT_ROWS",
                 body={"values": rows},
-            )
-            .execute()
-        )
-        return result
+            ).execute()
+            self._rows_appended(self.trade_republic_sheet_name, len(rows))
+            self._etf_dca_rows().ids.update(t.transaction_id for t in batch)
+            appended += len(rows)
+        return appended
+
+
+def _sheet_date(value: Any) -> Optional[date]:
+    """A date cell read unformatted: a serial number, or the dd/mm/yyyy
+    text of a cell the sheet did not recognise as a date"""
+    if isinstance(value, (int, float)):
+        return SHEETS_EPOCH + timedelta(days=int(value))
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value.strip(), "%d/%m/%Y").date()
+        except ValueError:
+            return None
+    return None
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch: List = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
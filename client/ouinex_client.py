@@ -3,7 +3,9 @@ import time
 from typing import Any, Dict, List, Optional
 
 import requests
+from cachetools import TTLCache
 
+from client.symbol_index import SymbolIndex
 from model.asset import Asset
 from model.enum import AssetType, Exchange
 from utils.exception import OuinexException
@@ -60,6 +62,9 @@ class OuinexClient:
         self.session = requests.Session()
         self._access_token: Optional[str] = None
         self._token_expiry: float = 0.0
+        self._instruments_cache: TTLCache[str, SymbolIndex] = TTLCache(
+            maxsize=1, ttl=3600
+        )
 
     def _sign_in(self) -> None:
         response = self.session.post(
@@ -167,8 +172,8 @@ class OuinexClient:
         """
         Search Ouinex instruments by keyword.
 
-        Fetches the instrument list via the public `instruments` GraphQL query
-        and filters client-side against the symbol and base/quote currencies,
+        Matches the symbol and base/quote currencies against an index of the
+        public `instruments` GraphQL query, fetched at most once an hour,
         mirroring the Binance search behavior. Conversion pairs (`*_CONV`) are
         excluded — they are not tradable instruments.
 
@@ -178,22 +183,23 @@ class OuinexClient:
         Returns:
             List of Asset objects tagged Exchange.OUINEX / AssetType.CRYPTO
         """
-        data = self._execute(INSTRUMENTS_QUERY, authenticated=False)
-        keyword_lower = keyword.lower()
-
-        results = []
-        for instrument in data.get("instruments", []):
-            base, quote = self._currencies(instrument)
-            symbol = instrument.get("instrument_id") or f"{base}{quote}"
-
-            if symbol.endswith(CONVERSION_SUFFIX):
-                continue
-
-            if (
-                keyword_lower in symbol.lower()
-                or keyword_lower in base.lower()
-                or keyword_lower in quote.lower()
-            ):
-                results.append(self._map_instrument_to_asset(instrument))
-
-        return results
+        return self._search_index().search(keyword)
+
+    def _search_index(self) -> SymbolIndex:
+        """The instrument list, indexed, refreshed once an hour."""
+        if "index" not in self._instruments_cache:
+            data = self._execute(INSTRUMENTS_QUERY, authenticated=False)
+            entries = []
+            for instrument in data.get("instruments", []):
+                base, quote = self._currencies(instrument)
+                symbol = instrument.get("instrument_id") or f"{base}{quote}"
+                if symbol.endswith(CONVERSION_SUFFIX):
+                    continue
+                entries.append(
+                    (
+                        self._map_instrument_to_asset(instrument),
+                        (symbol, base, quote),
+                    )
+                )
+            self._instruments_cache["index"] = SymbolIndex(entries)
+        return self._instruments_cache["index"]
@@ -1,11 +1,25 @@
 import logging
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import lru_cache
-from typing import Any, Dict, List, Optional
+from operator import attrgetter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import urljoin
 
 import requests
-from cachetools import TTLCache
+from cachetools import TTLCache, cachedmethod
 from requests import Response
 from requests.adapters import HTTPAdapter, Retry
 
@@ -36,6 +50,9 @@ RATE_LIMITING_KEYS = [
     ),
     ("X-RateLimit-ChartMinute-Remaining", "X-RateLimit-ChartMinute-Reset"),
 ]
+INSTRUMENT_DETAILS_BATCH_SIZE = 50
+ODATA_PAGE_SIZE = 1000
+HISTORICAL_PRICE_WORKERS = 4
 
 
 class SaxoClient:
@@ -48,6 +65,11 @@ class SaxoClient:
         self.historical_data_cache: TTLCache = TTLCache(maxsize=256, ttl=1800)
         # Cache for 5min intraday data with 5 min TTL (only for horizon=5)
         self.intraday_data_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+        # Search-as-you-type repeats the same keywords within seconds
+        self.search_cache: TTLCache = TTLCache(maxsize=512, ttl=60)
+        # search also runs on the provider fan-out's worker threads, and a
+        # TTLCache is not thread-safe on its own
+        self.search_lock = threading.Lock()
         self.session.headers.update(
             {"Authorization": f"Bearer {configuration.access_token}"}
         )
@@ -117,6 +139,9 @@ class SaxoClient:
             raise SaxoException(f"Stock {symbol} doesn't exist")
         return data[0]
 
+    @cachedmethod(
+        cache=attrgetter("search_cache"), lock=attrgetter("search_lock")
+    )
     def search(
         self, keyword: str, asset_type: Optional[str] = None
     ) -> List[Asset]:
@@ -204,18 +229,40 @@ class SaxoClient:
         return response.json()["TotalValue"]
 
     def get_open_orders(self) -> List:
-        response = self.session.get(
-            f"{self.configuration.saxo_url}port/v1/orders/me/?$top=50"
-        )
-        self._check_response(response)
-        return response.json()["Data"]
+        return [
+            order
+            for page in self._iter_pages(
+                f"{self.configuration.saxo_url}port/v1/orders/me/"
+                f"?$top={ODATA_PAGE_SIZE}"
+            )
+            for order in page
+        ]
 
     def get_positions(self) -> List[Dict]:
-        response = self.session.get(
-            f"{self.configuration.saxo_url}port/v1/positions/me/?top=50"
-        )
-        self._check_response(response)
-        return response.json()
+        return [
+            position
+            for page in self._iter_pages(
+                f"{self.configuration.saxo_url}port/v1/positions/me/"
+                f"?$top={ODATA_PAGE_SIZE}"
+            )
+            for position in page
+        ]
+
+    def _iter_pages(self, url: str) -> Iterator[List[Dict]]:
+        """
+        Walk an OData collection page by page. Saxo caps every response at
+        $top items and announces the rest through __next, so reading only
+        the first response silently truncates long collections.
+        """
+        next_url: Optional[str] = url
+        while next_url is not None:
+            response = self.session.get(next_url)
+            self._check_response(response)
+            body = response.json()
+            yield body.get("Data", [])
+            next_url = body.get("__next")
+            if next_url is not None:
+                next_url = urljoin(self.configuration.saxo_url, next_url)
 
     def get_accounts(self):
         response = self.session.get(
@@ -374,19 +421,65 @@ class SaxoClient:
             raise SaxoException(f"Nothing found for {saxo_uic}")
         return asset["Data"][0]
 
+    def get_assets_detail(
+        self, instruments: Iterable[Tuple[int, str]]
+    ) -> Dict[Tuple[int, str], Dict]:
+        """
+        Resolve many (uic, asset type) pairs with the multi-UIC form of the
+        instruments/details endpoint: one request per asset type and batch
+        of uics instead of one request per instrument. Pairs Saxo does not
+        return are simply absent from the result.
+        """
+        uics_by_type: Dict[str, List[int]] = defaultdict(list)
+        for uic, asset_type in dict.fromkeys(instruments):
+            uics_by_type[asset_type].append(uic)
+        details: Dict[Tuple[int, str], Dict] = {}
+        for asset_type, uics in uics_by_type.items():
+            for start in range(0, len(uics), INSTRUMENT_DETAILS_BATCH_SIZE):
+                batch = uics[start : start + INSTRUMENT_DETAILS_BATCH_SIZE]
+                response = self.session.get(
+                    f"{self.configuration.saxo_url}ref/v1/instruments/details?"
+                    f"Uics={','.join(map(str, batch))}"
+                    f"&AssetTypes={asset_type}"
+                )
+                try:
+                    self._check_response(response)
+                except EmptyResponseException:
+                    continue
+                for asset in response.json()["Data"]:
+                    details[(asset["Uic"], asset["AssetType"])] = asset
+        return details
+
     def get_report(self, account: Account, date_s: str) -> List[ReportOrder]:
-        response = self.session.get(
+        return [
+            order
+            for page in self.iter_report_pages(account, date_s)
+            for order in page
+        ]
+
+    def iter_report_pages(
+        self, account: Account, date_s: str
+    ) -> Iterator[List[ReportOrder]]:
+        for activities in self._iter_pages(
             f"{self.configuration.saxo_url}cs/v1/audit/orderactivities/"
             f"?ClientKey={account.client_key}&AccountKey={account.key}"
             f"&status=FinalFill&FromDateTime={date_s}"
+            f"&$top={ODATA_PAGE_SIZE}"
+        ):
+            yield self._build_report_orders(activities)
+
+    def _build_report_orders(
+        self, activities: List[Dict]
+    ) -> List[ReportOrder]:
+        assets = self.get_assets_detail(
+            (data["Uic"], data["AssetType"]) for data in activities
         )
-        self._check_response(response)
         orders = []
-        for data in response.json()["Data"]:
+        underlyings: List[Tuple[ReportOrder, Tuple[int, str, datetime]]] = []
+        for data in activities:
             date = datetime.fromisoformat(data["ActivityTime"])
-            try:
-                asset = self.get_asset_detail(data["Uic"], data["AssetType"])
-            except EmptyResponseException:
+            asset = assets.get((data["Uic"], data["AssetType"]))
+            if asset is None:
                 self.logger.error(
                     f"No asset for {data['Uic']} {data['AssetType']} at {date}"
                 )
@@ -400,28 +493,54 @@ class SaxoClient:
                 asset_type=AssetType.get_value(asset["AssetType"]),
                 currency=Currency.get_value(asset["CurrencyCode"]),
                 date=date,
+                activity_id=str(data["OrderId"]),
             )
-            if report_order.asset_type not in [
-                AssetType.STOCK,
-                AssetType.CFDINDEX,
-                AssetType.CFDFUTURE,
-            ]:
-                if "UnderlyingUic" in asset:
-                    underlying_asset_type = (
-                        asset["UnderlyingAssetType"]
-                        if "UnderlyingAssetType" in asset
-                        else ""
-                    )
-                    underlying_close = self.get_historical_price(
-                        asset["UnderlyingUic"],
-                        asset_type=underlying_asset_type,
-                        date=date,
-                    )
-                    underlying = Underlying(price=underlying_close)
-                    report_order.underlying = underlying
+            if (
+                report_order.asset_type
+                not in [
+                    AssetType.STOCK,
+                    AssetType.CFDINDEX,
+                    AssetType.CFDFUTURE,
+                ]
+                and "UnderlyingUic" in asset
+            ):
+                underlying_key = (
+                    asset["UnderlyingUic"],
+                    asset.get("UnderlyingAssetType", ""),
+                    date.replace(second=0, microsecond=0),
+                )
+                underlyings.append((report_order, underlying_key))
             orders.append(report_order)
+        prices = self._get_historical_prices({key for _, key in underlyings})
+        for report_order, key in underlyings:
+            report_order.underlying = Underlying(price=prices[key])
         return orders
 
+    def _get_historical_prices(
+        self, keys: Set[Tuple[int, str, datetime]]
+    ) -> Dict[Tuple[int, str, datetime], float]:
+        """
+        Fetch the underlying close of every (uic, asset type, minute) once,
+        a few at a time. The report request that precedes this has already
+        gone through the token refresh hook, so the concurrent calls share
+        a valid session header.
+        """
+        if len(keys) == 0:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(HISTORICAL_PRICE_WORKERS, len(keys))
+        ) as executor:
+            futures = {
+                key: executor.submit(
+                    self.get_historical_price,
+                    key[0],
+                    date=key[2],
+                    asset_type=key[1],
+                )
+                for key in keys
+            }
+            return {key: future.result() for key, future in futures.items()}
+
     def get_historical_price(
         self, saxo_uic: int, date: datetime, asset_type: str
     ) -> float:
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from model.asset import Asset
+
+
+class SymbolIndex:
+    """
+    In-memory substring index over an exchange's instrument list.
+
+    Every 1- to 3-character slice of each search term (symbol, base and
+    quote asset) points at the instruments holding it. A keyword of up to
+    three characters is a single lookup; a longer one only checks the
+    instruments sharing its rarest trigram. Results keep the order of the
+    instrument list, exactly like the linear scan it replaces.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, entries: Iterable[Tuple[Asset, Iterable[str]]]):
+        self._assets: List[Asset] = []
+        self._terms: List[List[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for position, (asset, terms) in enumerate(entries):
+            lowered = [term.lower() for term in terms]
+            self._assets.append(asset)
+            self._terms.append(lowered)
+            for gram in self._grams(lowered):
+                self._postings[gram].append(position)
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    @classmethod
+    def _grams(cls, terms: List[str]) -> set:
+        return {
+            term[start : start + size]
+            for term in terms
+            for size in range(1, cls.GRAM_SIZE + 1)
+            for start in range(len(term) - size + 1)
+        }
+
+    def search(self, keyword: str) -> List[Asset]:
+        keyword = keyword.lower()
+        if keyword == "":
+            return list(self._assets)
+        if len(keyword) <= self.GRAM_SIZE:
+            return [self._assets[i] for i in self._postings.get(keyword, [])]
+        candidates = min(
+            (
+                self._postings.get(keyword[start : start + self.GRAM_SIZE], [])
+                for start in range(len(keyword) - self.GRAM_SIZE + 1)
+            ),
+            key=len,
+        )
+        return [
+            self._assets[i]
+            for i in candidates
+            if any(keyword in term for term in self._terms[i])
+        ]
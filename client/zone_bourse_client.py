@@ -1,13 +1,46 @@
+import hashlib
+import json
+import os
+import re
+import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from model import ZoneBourseScrap
+from utils.logger import Logger
+
+# The valuation, income statement and balance sheet tables, the only part
+# of the page the score needs
+FUNDAMENTAL_TABLES = ["valuationTable", "iseTableA", "bsTable"]
+
+ZONE_BOURSE_URL = "https://www.zonebourse.com"
+SEARCH_URL = f"{ZONE_BOURSE_URL}/recherche/"
+# A stock's page, as linked from the search results, and its fundamentals
+STOCK_PAGE = re.compile(r"^/cours/action/[^/?#]+/")
+FUNDAMENTALS_PAGE = "fondamentaux/"
+# Search results checked for a ticker, the best ranked first
+MAX_CANDIDATES = 3
+# A stock page's title lists its ticker and ISIN between pipes,
+# "TotalEnergies SE : Cours ... | TTE | FR0014000MR3 | Zonebourse"
+TITLE_SEPARATOR = "|"
+# Ticker to fundamentals url, in the cache directory. Only a url whose
+# page shows the ticker is kept, and a stock keeps its page, so a
+# resolved url does not expire.
+URLS_FILE = "urls.json"
 
 
 class ZoneBourseClient:
-    def __init__(self) -> None:
+    # Concurrent page downloads, all of them on zonebourse.com
+    MAX_CONNECTIONS = 4
+    # Yearly fundamentals barely move, a parsed page is reused for a week
+    CACHE_TTL = 7 * 24 * 3600
+
+    def __init__(self, cache_directory: Optional[str] = None) -> None:
+        self.logger = Logger.get_logger("zone_bourse_client")
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -16,11 +49,126 @@ class ZoneBourseClient:
                 "Chrome/123.0.0.0 Safari/537.36"
             }
         )
+        self.session.mount(
+            "https://",
+            requests.adapters.HTTPAdapter(pool_maxsize=self.MAX_CONNECTIONS),
+        )
+        self.cache_directory = cache_directory
 
-    @typing.no_type_check
     def parse_fundamental(self, url: str) -> ZoneBourseScrap:
-        s = self.session.get(url).text
-        soup = BeautifulSoup(s, "html.parser")
+        data = self._read_cache(url)
+        if data is None:
+            data = self._parse_page(self.session.get(url).text).data
+            self._write_cache(url, data)
+        zb = ZoneBourseScrap()
+        zb.data = {year: dict(categories) for year, categories in data.items()}
+        return zb
+
+    def parse_fundamentals(
+        self, urls: List[str]
+    ) -> Dict[str, Optional[ZoneBourseScrap]]:
+        """
+        Parse several pages, MAX_CONNECTIONS at a time. A page that cannot
+        be downloaded or parsed is logged and mapped to None so that one
+        delisted stock does not stop the whole batch.
+        """
+
+        def parse(url: str) -> Optional[ZoneBourseScrap]:
+            try:
+                return self.parse_fundamental(url)
+            except Exception as e:
+                self.logger.error(f"Failed to parse {url}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.MAX_CONNECTIONS) as pool:
+            return dict(zip(urls, pool.map(parse, urls)))
+
+    def find_fundamental_urls(
+        self, tickers: List[str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        The fundamentals page of each ticker, MAX_CONNECTIONS searches at a
+        time. Zone Bourse's search is queried with the ticker and one of
+        its first MAX_CANDIDATES stocks is kept only when its own page
+        shows that ticker. A ticker with no such stock is mapped to None
+        and searched again on the next run.
+        """
+        known = self._read_urls()
+
+        def find(ticker: str) -> Optional[str]:
+            if ticker in known:
+                return known[ticker]
+            try:
+                return self._find_fundamental_url(ticker)
+            except Exception as e:
+                self.logger.error(f"Failed to search {ticker}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.MAX_CONNECTIONS) as pool:
+            urls = dict(zip(tickers, pool.map(find, tickers)))
+        found = {
+            ticker: url for ticker, url in urls.items() if url is not None
+        }
+        if not found.keys() <= known.keys():
+            self._write_urls({**known, **found})
+        return urls
+
+    def _find_fundamental_url(self, ticker: str) -> Optional[str]:
+        search = self.session.get(SEARCH_URL, params={"q": ticker})
+        for stock_page in self._parse_search(search.text)[:MAX_CANDIDATES]:
+            page = self.session.get(f"{ZONE_BOURSE_URL}{stock_page}")
+            if ticker.upper() in self._parse_codes(page.text):
+                return f"{ZONE_BOURSE_URL}{stock_page}{FUNDAMENTALS_PAGE}"
+        self.logger.warning(f"No Zone Bourse stock shows the ticker {ticker}")
+        return None
+
+    @typing.no_type_check
+    def _parse_search(self, page: str) -> List[str]:
+        soup = BeautifulSoup(
+            page, "html.parser", parse_only=SoupStrainer("a", href=STOCK_PAGE)
+        )
+        stock_pages = [
+            STOCK_PAGE.match(link["href"]).group(0)
+            for link in soup.find_all("a")
+        ]
+        # A stock is linked several times in its result row
+        return list(dict.fromkeys(stock_pages))
+
+    @typing.no_type_check
+    def _parse_codes(self, page: str) -> Set[str]:
+        title = BeautifulSoup(
+            page, "html.parser", parse_only=SoupStrainer("title")
+        ).find("title")
+        if title is None:
+            return set()
+        return {
+            code.strip().upper()
+            for code in title.text.split(TITLE_SEPARATOR)[1:-1]
+        }
+
+    def _read_urls(self) -> Dict[str, str]:
+        if self.cache_directory is None:
+            return {}
+        path = os.path.join(self.cache_directory, URLS_FILE)
+        if not os.path.isfile(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write_urls(self, urls: Dict[str, str]) -> None:
+        if self.cache_directory is None:
+            return
+        os.makedirs(self.cache_directory, exist_ok=True)
+        with open(os.path.join(self.cache_directory, URLS_FILE), "w") as f:
+            json.dump(urls, f, indent=2, sort_keys=True)
+
+    @typing.no_type_check
+    def _parse_page(self, page: str) -> ZoneBourseScrap:
+        soup = BeautifulSoup(
+            page,
+            "html.parser",
+            parse_only=SoupStrainer("table", id=FUNDAMENTAL_TABLES),
+        )
         table = soup.find("table", id="valuationTable")
         ths = table.find_all("th")
         years = [0] * len(ths)
@@ -55,3 +203,28 @@ class ZoneBourseClient:
                     )
         zb.create_category("Croissance résultat")
         return zb
+
+    def _cache_path(self, url: str) -> Optional[str]:
+        if self.cache_directory is None:
+            return None
+        digest = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.cache_directory, f"{digest}.json")
+
+    def _read_cache(self, url: str) -> Optional[Dict[int, Dict]]:
+        path = self._cache_path(url)
+        if path is None or not os.path.isfile(path):
+            return None
+        if time.time() - os.path.getmtime(path) > self.CACHE_TTL:
+            return None
+        with open(path, "r") as f:
+            content = json.load(f)
+        # JSON object keys are strings, the scrap is keyed by year
+        return {int(year): data for year, data in content.items()}
+
+    def _write_cache(self, url: str, data: Dict[int, Dict]) -> None:
+        path = self._cache_path(url)
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
@@ -1,10 +1,15 @@
 import asyncio
+import datetime
 import os
 
 from slack_sdk import WebClient
 
 from client.saxo_auth_client import SaxoAuthClient
 from saxo_order.commands.alerting import run_alerting
+from saxo_order.commands.internal import (
+    WARM_LOOKBACK_DAYS,
+    run_backtest_cache_warm,
+)
 from saxo_order.commands.snapshot import execute_snapshot
 from saxo_order.commands.workflow import execute_workflow
 from utils.configuration import Configuration
@@ -26,6 +31,17 @@ def handler(event, _):
                 asyncio.run(execute_workflow(os.getenv("SAXO_CONFIG")))
             case "snapshot":
                 execute_snapshot(os.getenv("SAXO_CONFIG"))
+            case "warm_backtest_cache":
+                end_date = datetime.date.today()
+                lookback = event.get("days", WARM_LOOKBACK_DAYS)
+                asyncio.run(
+                    run_backtest_cache_warm(
+                        os.getenv("SAXO_CONFIG"),
+                        end_date - datetime.timedelta(days=lookback),
+                        end_date,
+                        instruments=event.get("instruments"),
+                    )
+                )
             case _:
                 raise SaxoException(
                     f"Command {event.get('command')} not found"
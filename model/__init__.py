@@ -4,17 +4,20 @@ from typing import Any, Dict, List, Optional, Union
 
 from model.backtest import (  # noqa: F401
     BacktestDefinition,
+    BacktestJob,
     BacktestParameters,
     BacktestRunResult,
     BacktestSummary,
     CachedDayCandles,
     DayResult,
     DayResultSummary,
+    SweepResult,
     Trade,
 )
 from model.enum import (  # noqa: F401
     AlertType,
     AssetType,
+    BacktestJobStatus,
     Conviction,
     Currency,
     DayStatus,
@@ -193,6 +196,7 @@ class ReportOrder(Order):
         stopped: bool = False,
         be_stopped: bool = False,
         open_position: bool = True,
+        activity_id: Optional[str] = None,
     ) -> None:
         super().__init__(
             code,
@@ -215,6 +219,7 @@ class ReportOrder(Order):
         self.stopped = stopped
         self.be_stopped = be_stopped
         self.open_position = open_position
+        self.activity_id = activity_id
 
 
 @dataclass
@@ -4,7 +4,7 @@ import datetime
 from dataclasses import dataclass, field
 from typing import List, Optional
 
-from model.enum import DayStatus, Direction, ExitReason
+from model.enum import BacktestJobStatus, DayStatus, Direction, ExitReason
 from model.market import EUMarket, Market
 from model.workflow import Candle, UnitTime
 
@@ -414,6 +414,45 @@ class BacktestRunResult:
     days: List[DayResultSummary] = field(default_factory=list)
 
 
+@dataclass
+class BacktestJob:
+    """A range run submitted to the job runner, with its progress.
+
+    `days_done` counts the days evaluated so far that had data, so it may
+    end below `days_total` (the weekdays of the range). `memoized` marks a
+    job answered from a previous run of the same inputs."""
+
+    job_id: str
+    key: str
+    definition_code: str
+    start_date: datetime.date
+    end_date: datetime.date
+    params: BacktestParameters
+    days_total: int
+    status: BacktestJobStatus = BacktestJobStatus.PENDING
+    days_done: int = 0
+    last_date: Optional[datetime.date] = None
+    memoized: bool = False
+    result: Optional[BacktestRunResult] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (
+            BacktestJobStatus.DONE,
+            BacktestJobStatus.FAILED,
+        )
+
+
+@dataclass
+class SweepResult:
+    """One combination of a parameter sweep and the summary of the range
+    run under it."""
+
+    params: BacktestParameters
+    summary: BacktestSummary
+
+
 @dataclass
 class CachedDayCandles:
     """Raw Saxo candle data cached for one (backtest definition, trading
@@ -15,6 +15,7 @@ class Strategy(EnumWithGetValue):
     C5M = "Combo GER40 5m"
     C15M = "Combo GER40 15m"
     C1H = "Combo GER40 h1"
+    C1D = "Combo GER40 daily"
     BH = "Breakout haussier"
     C200 = "Cassure mm200"
     CRANGE = "Cassure de range"
@@ -158,3 +159,10 @@ class DayStatus(EnumWithGetValue):
     NO_DATA = "no_data"
     NO_TRADE = "no_trade"
     TRADED = "traded"
+
+
+class BacktestJobStatus(EnumWithGetValue):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
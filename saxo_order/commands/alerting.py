@@ -3,10 +3,23 @@ import datetime
 import json
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from functools import partial
-from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 import click
+from cachetools import TTLCache
 from click.core import Context
 from slack_sdk import WebClient
 
@@ -14,16 +27,29 @@ from client import client_helper
 from client.anthropic_client import AnthropicClient
 from client.aws_client import DynamoDBClient
 from client.saxo_client import SaxoClient
-from model import Alert, AlertType, AssetType, Candle, EUMarket, UnitTime
+from model import (
+    Alert,
+    AlertType,
+    AssetType,
+    Candle,
+    ComboSignal,
+    EUMarket,
+    UnitTime,
+)
 from saxo_order.async_utils import create_dynamodb_client
 from saxo_order.commands import catch_exception
 from services import congestion_indicator, indicator_service
 from services.alert_triage_service import (
     TriageAgent,
+    TriageInput,
     current_run_date,
     format_slack_digest,
 )
-from services.workflow_trigger_service import collect_todays_triggers
+from services.workflow_trigger_service import (
+    prefetch_todays_orders,
+    refresh_todays_orders,
+    resolve_todays_triggers,
+)
 from utils.configuration import Configuration
 from utils.exception import SaxoException
 from utils.helper import build_daily_candles_from_h1
@@ -31,6 +57,17 @@ from utils.logger import Logger
 
 logger = Logger.get_logger("alerting")
 
+# Tick size table of each scanned asset, by saxo uic. Saxo rarely changes
+# a scheme, a day is short enough.
+_TICK_SIZE_TABLES: TTLCache[int, client_helper.TickSizeTable] = TTLCache(
+    maxsize=4096, ttl=86400
+)
+
+# The table of an asset without a scheme: a tick of 0 at any price.
+NO_TICK_SIZE = client_helper.TickSizeTable(
+    high_prices=[], tick_sizes=[], default_tick_size=0.0
+)
+
 T = TypeVar("T")
 
 
@@ -53,17 +90,22 @@ def _safe_detect(
     bug that must stay visible, so it logs at error with a traceback rather
     than being flattened into the same routine-looking line.
     """
+    return _safe_call(alert_type.value, asset_description, detector)
+
+
+def _safe_call(
+    what: str, asset_description: str, call: Callable[[], T]
+) -> Optional[T]:
+    """_safe_detect for a step named `what`, a detector or an input
+    several detectors share."""
     try:
-        return detector()
+        return call()
     except (SaxoException, IndexError) as e:
-        logger.warning(
-            f"{alert_type.value} skipped for {asset_description}: {e}"
-        )
+        logger.warning(f"{what} skipped for {asset_description}: {e}")
         return None
     except Exception as e:
         logger.error(
-            f"{alert_type.value} failed unexpectedly for"
-            f" {asset_description}: {e}",
+            f"{what} failed unexpectedly for {asset_description}: {e}",
             exc_info=True,
         )
         return None
@@ -91,63 +133,190 @@ def _parse_asset_code(code: str) -> Tuple[str, Optional[str]]:
     return code, None
 
 
-def fetch_french_stocks(saxo_client: SaxoClient) -> List[Dict]:
+FRENCH_STOCKS_PAGE_SIZE = 1000
+
+
+def _fetch_french_stocks_page(
+    saxo_client: SaxoClient, skip: int
+) -> List[Dict]:
+    """
+    Fetch one page of French stocks, in the internal stock format:
+    {"name": str, "code": str, "saxo_uic": int}
     """
-    Fetch all French stocks from Saxo API using pagination.
+    response = saxo_client.list_instruments(
+        asset_type="Stock",
+        exchange_id="PAR",
+        top=FRENCH_STOCKS_PAGE_SIZE,
+        skip=skip,
+        include_non_tradable=False,
+    )
+    return [
+        {
+            "name": instrument.get("Description", ""),
+            "code": instrument.get("Symbol", ""),
+            "saxo_uic": instrument.get("Identifier"),
+        }
+        for instrument in response.get("Data", [])
+    ]
 
-    Args:
-        saxo_client: Initialized SaxoClient instance
 
-    Returns:
-        List of stock dictionaries with format:
-        {"name": str, "code": str, "saxo_uic": int}
+async def stream_french_stocks(
+    saxo_client: SaxoClient,
+) -> AsyncIterator[Dict]:
+    """
+    Yield the French stocks page by page as Saxo returns them.
 
-    Raises:
-        SaxoException: If API call fails
+    Pages are fetched on a thread, and the next one is requested before the
+    current one is handed out, so the scan of a page overlaps the download
+    of the following one and only two pages are ever held at once.
     """
-    all_instruments = []
+    logger.info("Streaming French stocks from Saxo API...")
+    start_time = time.time()
     skip = 0
-    page_size = 1000
-
-    logger.info("Fetching French stocks from Saxo API...")
-
-    while True:
-        response = saxo_client.list_instruments(
-            asset_type="Stock",
-            exchange_id="PAR",
-            top=page_size,
-            skip=skip,
-            include_non_tradable=False,
-        )
+    total = 0
+    page = await asyncio.to_thread(_fetch_french_stocks_page, saxo_client, 0)
+    next_page: Optional[asyncio.Future] = None
+    try:
+        while len(page) > 0:
+            if len(page) == FRENCH_STOCKS_PAGE_SIZE:
+                skip += FRENCH_STOCKS_PAGE_SIZE
+                next_page = asyncio.ensure_future(
+                    asyncio.to_thread(
+                        _fetch_french_stocks_page, saxo_client, skip
+                    )
+                )
+            total += len(page)
+            logger.debug(
+                f"Fetched page: {len(page)} instruments (total: {total})"
+            )
+            for stock in page:
+                yield stock
+            if next_page is None:
+                break
+            page = await next_page
+            next_page = None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+    logger.info(
+        f"Streamed {total} French stocks from Saxo API"
+        f" in {time.time() - start_time:.2f}s"
+    )
 
-        data = response.get("Data", [])
-        if not data:
-            break
 
-        all_instruments.extend(data)
-        logger.debug(
-            f"Fetched page: {len(data)} instruments "
-            f"(total: {len(all_instruments)})"
-        )
+class AssetUniverse:
+    """
+    The assets of one alerting scan, streamed rather than loaded up front.
 
-        if len(data) < page_size:
-            break
+    By default it yields the French stocks page by page from the Saxo API
+    (falling back to stocks.json when the API fails), then the followup
+    stocks, deduplicated by code with the API taking precedence. Excluded
+    assets are dropped as they go by, so the scan starts on the first page
+    while the next ones are still downloading. An explicit asset list is
+    streamed as is, only filtered by the exclusions.
 
-        skip += page_size
+    `scanned` and `excluded` are complete once the iteration is over.
+    """
 
-    # Transform to stock format
-    stocks = []
-    for instrument in all_instruments:
-        stocks.append(
-            {
-                "name": instrument.get("Description", ""),
-                "code": instrument.get("Symbol", ""),
-                "saxo_uic": instrument.get("Identifier"),
-            }
+    def __init__(
+        self,
+        saxo_client: SaxoClient,
+        slack_client: WebClient,
+        excluded_asset_ids: List[str],
+        assets: Optional[List[Dict]] = None,
+    ) -> None:
+        self.saxo_client = saxo_client
+        self.slack_client = slack_client
+        self.excluded_asset_ids = set(excluded_asset_ids)
+        self.assets = assets
+        self.scanned = 0
+        self.excluded = 0
+
+    async def __aiter__(self) -> AsyncIterator[Dict]:
+        source = (
+            self._deduplicated(self._default_assets())
+            if self.assets is None
+            else self._listed_assets()
         )
+        async for asset in source:
+            if _asset_id(asset) in self.excluded_asset_ids:
+                self.excluded += 1
+                continue
+            self.scanned += 1
+            yield asset
+
+    async def _listed_assets(self) -> AsyncIterator[Dict]:
+        for asset in self.assets or []:
+            yield asset
+
+    async def _default_assets(self) -> AsyncIterator[Dict]:
+        try:
+            async for stock in stream_french_stocks(self.saxo_client):
+                yield stock
+        except Exception as e:
+            logger.error(f"Failed to fetch French stocks from API: {e}")
+            # Fallback to JSON: whatever the API already yielded is dropped
+            # by the deduplication, so a failure mid-stream resumes here
+            try:
+                with open("stocks.json") as f:
+                    french_stocks = json.load(f)
+            except FileNotFoundError:
+                logger.error("stocks.json file not found, cannot proceed")
+                raise click.Abort()
+            logger.info(
+                f"Loaded {len(french_stocks)} stocks from stocks.json "
+                "(fallback)"
+            )
+            # Notify error channel
+            self.slack_client.chat_postMessage(
+                channel="#errors",
+                text=(
+                    "Alert system failed to fetch French stocks "
+                    f"from API. Using fallback to stocks.json. "
+                    f"Error: {str(e)}"
+                ),
+            )
+            for stock in french_stocks:
+                yield stock
 
-    logger.info(f"Fetched {len(stocks)} French stocks from Saxo API")
-    return stocks
+        # Load followup stocks (non-French, manual additions)
+        try:
+            with open("followup-stocks.json") as f:
+                followup_stocks = json.load(f)
+            logger.debug("Followup stocks file loaded")
+        except FileNotFoundError:
+            logger.warning(
+                "followup-stocks.json not found, using only French stocks"
+            )
+            followup_stocks = []
+        for stock in followup_stocks:
+            yield stock
+
+    @staticmethod
+    async def _deduplicated(
+        assets: AsyncIterator[Dict],
+    ) -> AsyncIterator[Dict]:
+        # Deduplicate by code (API takes precedence)
+        seen = set()
+        async for asset in assets:
+            if asset["code"] not in seen:
+                seen.add(asset["code"])
+                yield asset
+
+
+def _asset_id(asset: Dict) -> str:
+    """
+    The id the exclusion list knows an asset by, e.g. "SAN:xpar".
+    """
+    # Parse asset code to separate asset_code and country_code
+    parsed_asset_code, parsed_country_code = _parse_asset_code(asset["code"])
+    # Prefer explicit country_code from asset dict, fallback to parsed
+    final_country_code = asset.get("country_code") or parsed_country_code
+    return (
+        f"{parsed_asset_code}:{final_country_code}"
+        if final_country_code
+        else parsed_asset_code
+    )
 
 
 @click.command()
@@ -186,6 +355,160 @@ def alerting(ctx: Context, code: str, country_code: str) -> None:
         asyncio.run(run_alerting(config))
 
 
+@dataclass
+class DetectionResult:
+    """
+    What the detectors found on one candle set. Only plain data, so it can
+    come back from a worker process.
+    """
+
+    ma50_slope: Optional[float] = None
+    congestions: Dict[AlertType, List[Candle]] = field(default_factory=dict)
+    candles: Dict[AlertType, Candle] = field(default_factory=dict)
+    combo: Optional[ComboSignal] = None
+    mm50_touch: Optional[Dict[str, float]] = None
+    mm7_break: Optional[Dict[str, Any]] = None
+
+
+def detect_patterns(
+    asset: Dict, candles: List[Candle], tick: Optional[float]
+) -> DetectionResult:
+    """
+    Run every detector over one asset's candles.
+
+    This is the CPU-bound half of run_detection_for_asset: no I/O, candles
+    in and results out, so DetectorPool can run it in a worker process. The
+    tick size is looked up by the caller; None skips the double top/bottom
+    detectors, which cannot run without it.
+    """
+
+    def detect(
+        alert_type: AlertType, detector: Callable[[], T]
+    ) -> Optional[T]:
+        return _safe_detect(alert_type, asset["name"], detector)
+
+    result = DetectionResult()
+    # Every detector below reads its averages, bands, atr and pivots from
+    # this one frame instead of re-walking the candles for each of them.
+    frame = indicator_service.FeatureFrame(candles)
+
+    # Calculate MA50 slope for this asset (used for sorting alerts)
+    try:
+        if len(candles) >= 60:  # Need at least 60 candles for MA50 calculation
+            result.ma50_slope = frame.ma50_slope
+    except SaxoException:
+        logger.warning(
+            f"Could not calculate ma50_slope for {asset['code']} - "
+            "insufficient candle data"
+        )
+
+    for alert_type, length, minimal_touch_points in (
+        (AlertType.CONGESTION20, 20, 2),
+        (AlertType.CONGESTION100, 100, 3),
+    ):
+        congestion_result = detect(
+            alert_type,
+            partial(
+                _run_congestion_indicator,
+                asset,
+                candles,
+                length,
+                minimal_touch_points,
+            ),
+        )
+        if congestion_result is not None and len(congestion_result[0]) > 0:
+            result.congestions[alert_type] = congestion_result[0]
+
+    candle_detectors: List[Tuple[AlertType, Callable[[], Optional[Candle]]]]
+    candle_detectors = []
+    if tick is not None:
+        candle_detectors += [
+            (
+                AlertType.DOUBLE_TOP,
+                partial(_run_double_top, asset, frame, tick),
+            ),
+            (
+                AlertType.DOUBLE_BOTTOM,
+                partial(_run_double_bottom, asset, frame, tick),
+            ),
+        ]
+    candle_detectors += [
+        (
+            AlertType.CONTAINING_CANDLE,
+            partial(_run_containing_candle, asset, candles),
+        ),
+        (
+            AlertType.DOUBLE_INSIDE_BAR,
+            partial(_run_double_inside_bar, asset, frame),
+        ),
+    ]
+    for alert_type, candle_detector in candle_detectors:
+        if (candle := detect(alert_type, candle_detector)) is not None:
+            result.candles[alert_type] = candle
+
+    result.combo = detect(
+        AlertType.COMBO,
+        partial(indicator_service.combo, candles, frame),
+    )
+    result.mm50_touch = detect(
+        AlertType.MM50_TOUCH,
+        partial(indicator_service.mm50_touch, candles, frame),
+    )
+    result.mm7_break = detect(
+        AlertType.MM7_BREAK,
+        partial(indicator_service.mm7_break, candles, frame),
+    )
+    return result
+
+
+class DetectorPool:
+    """
+    Runs detect_patterns on a pool of warm worker processes.
+
+    Fetching candles is I/O and stays on the event loop, but the detectors
+    are pure Python and hold the GIL, so on one thread they become the
+    bottleneck of the scan once fetching overlaps them. The workers are
+    started once and reused for every asset. Lambda has no /dev/shm for the
+    pool's semaphores and runs the scan on a single vCPU anyway, so there -
+    and on any single-core box - the detectors run inline instead.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = (
+            max_workers if max_workers is not None else os.cpu_count() or 1
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if (
+            self.max_workers > 1
+            and "AWS_LAMBDA_FUNCTION_NAME" not in os.environ
+        ):
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    @property
+    def is_parallel(self) -> bool:
+        return self._executor is not None
+
+    async def detect(
+        self, asset: Dict, candles: List[Candle], tick: Optional[float]
+    ) -> DetectionResult:
+        if self._executor is None:
+            return detect_patterns(asset, candles, tick)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, detect_patterns, asset, candles, tick
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "DetectorPool":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
 async def run_detection_for_asset(
     asset_code: str,
     country_code: Optional[str],
@@ -194,6 +517,7 @@ async def run_detection_for_asset(
     saxo_uic: Optional[str | int],
     saxo_client: SaxoClient,
     dynamodb_client: DynamoDBClient,
+    detector_pool: Optional[DetectorPool] = None,
 ) -> List[Alert]:
     """
     Run all detection algorithms for a single asset and store results.
@@ -206,6 +530,7 @@ async def run_detection_for_asset(
         saxo_uic: Saxo UIC for the asset (None for non-Saxo assets)
         saxo_client: Saxo API client
         dynamodb_client: DynamoDB client for storage
+        detector_pool: Where the detectors run, inline when None
 
     Returns:
         List of detected Alert objects
@@ -230,171 +555,88 @@ async def run_detection_for_asset(
         logger.warning(f"No candle for {asset_description}, nothing to scan")
         return asset_alerts
 
-    # Calculate MA50 slope for this asset (used for sorting alerts)
-    ma50_slope: Optional[float] = None
-    try:
-        if len(candles) >= 60:  # Need at least 60 candles for MA50 calculation
-            ma50_last = indicator_service.mobile_average(candles, 50)
-            ma50_first = indicator_service.mobile_average(candles[10:], 50)
-            ma50_slope = indicator_service.slope_percentage(
-                0, ma50_first, 10, ma50_last
-            )
-    except SaxoException:
-        logger.warning(
-            f"Could not calculate ma50_slope for {asset_code} - "
-            "insufficient candle data"
-        )
-
-    def detect(
-        alert_type: AlertType, detector: Callable[[], T]
-    ) -> Optional[T]:
-        return _safe_detect(alert_type, asset_description, detector)
-
-    def candle_alert(alert_type: AlertType, candle: Candle) -> Alert:
+    # The tick is the only input of the detectors that needs a request, so
+    # it is looked up here and the detectors themselves stay I/O free. Both
+    # double top and double bottom read it: a failed lookup skips the two.
+    tick = _safe_call(
+        f"{AlertType.DOUBLE_TOP.value} and {AlertType.DOUBLE_BOTTOM.value}"
+        " tick size",
+        asset_description,
+        partial(_asset_tick_size, saxo_client, asset_dict, candles),
+    )
+    if detector_pool is None:
+        result = detect_patterns(asset_dict, candles, tick)
+    else:
+        result = await detector_pool.detect(asset_dict, candles, tick)
+    ma50_slope = result.ma50_slope
+
+    def alert(
+        alert_type: AlertType,
+        data: Dict[str, Any],
+        date: Optional[datetime.datetime] = None,
+    ) -> Alert:
         return Alert(
             alert_type=alert_type,
-            date=candle.date if candle.date else datetime.datetime.now(),
-            data={
-                "close": candle.close,
-                "open": candle.open,
-                "higher": candle.higher,
-                "lower": candle.lower,
-                "ma50_slope": ma50_slope,
-            },
+            date=date if date else datetime.datetime.now(),
+            data={**data, "ma50_slope": ma50_slope},
             asset_code=asset_code,
             asset_description=asset_description,
             exchange=exchange,
             country_code=country_code,
         )
 
-    for alert_type, length, minimal_touch_points in (
-        (AlertType.CONGESTION20, 20, 2),
-        (AlertType.CONGESTION100, 100, 3),
-    ):
-        congestion_result = detect(
-            alert_type,
-            partial(
-                _run_congestion_indicator,
-                asset_dict,
-                candles,
-                length,
-                minimal_touch_points,
-            ),
-        )
-        if congestion_result is not None and len(congestion_result[0]) > 0:
-            touch_points = [
-                f"{c.date.strftime('%Y-%m-%d') if c.date else 'Unknown'}: "
-                + f"{c.higher} {c.lower}"
-                for c in congestion_result[0]
-            ]
-            asset_alerts.append(
-                Alert(
-                    alert_type=alert_type,
-                    date=datetime.datetime.now(),
-                    data={
-                        "touch_points": touch_points,
-                        "candles": [
-                            {
-                                "date": (
-                                    c.date.isoformat() if c.date else None
-                                ),
-                                "higher": c.higher,
-                                "lower": c.lower,
-                            }
-                            for c in congestion_result[0]
-                        ],
-                        "ma50_slope": ma50_slope,
-                    },
-                    asset_code=asset_code,
-                    asset_description=asset_description,
-                    exchange=exchange,
-                    country_code=country_code,
-                )
-            )
-
-    for alert_type, candle_detector in (
-        (
-            AlertType.DOUBLE_TOP,
-            partial(_run_double_top, saxo_client, asset_dict, candles),
-        ),
-        (
-            AlertType.DOUBLE_BOTTOM,
-            partial(_run_double_bottom, saxo_client, asset_dict, candles),
-        ),
-        (
-            AlertType.CONTAINING_CANDLE,
-            partial(_run_containing_candle, asset_dict, candles),
-        ),
-        (
-            AlertType.DOUBLE_INSIDE_BAR,
-            partial(_run_double_inside_bar, asset_dict, candles),
-        ),
-    ):
-        if (candle := detect(alert_type, candle_detector)) is not None:
-            asset_alerts.append(candle_alert(alert_type, candle))
-
-    if (
-        combo := detect(
-            AlertType.COMBO, partial(indicator_service.combo, candles)
-        )
-    ) is not None:
+    for alert_type, touch_candles in result.congestions.items():
         asset_alerts.append(
-            Alert(
-                alert_type=AlertType.COMBO,
-                date=datetime.datetime.now(),
-                data={
-                    "price": combo.price,
-                    "direction": combo.direction.value,
-                    "strength": combo.strength.value,
-                    "has_been_triggered": combo.has_been_triggered,
-                    "details": combo.details,
-                    "ma50_slope": ma50_slope,
+            alert(
+                alert_type,
+                {
+                    "touch_points": [_touch_point(c) for c in touch_candles],
+                    "candles": [
+                        {
+                            "date": c.date.isoformat() if c.date else None,
+                            "higher": c.higher,
+                            "lower": c.lower,
+                        }
+                        for c in touch_candles
+                    ],
                 },
-                asset_code=asset_code,
-                asset_description=asset_description,
-                exchange=exchange,
-                country_code=country_code,
             )
         )
 
-    mm50_touch_result = detect(
-        AlertType.MM50_TOUCH, partial(indicator_service.mm50_touch, candles)
-    )
-    if mm50_touch_result is not None:
+    for alert_type, candle in result.candles.items():
         asset_alerts.append(
-            Alert(
-                alert_type=AlertType.MM50_TOUCH,
-                date=datetime.datetime.now(),
-                data={
-                    **mm50_touch_result,
-                    "ma50_slope": ma50_slope,
+            alert(
+                alert_type,
+                {
+                    "close": candle.close,
+                    "open": candle.open,
+                    "higher": candle.higher,
+                    "lower": candle.lower,
                 },
-                asset_code=asset_code,
-                asset_description=asset_description,
-                exchange=exchange,
-                country_code=country_code,
+                candle.date,
             )
         )
 
-    mm7_break_result = detect(
-        AlertType.MM7_BREAK, partial(indicator_service.mm7_break, candles)
-    )
-    if mm7_break_result is not None:
+    if (combo := result.combo) is not None:
         asset_alerts.append(
-            Alert(
-                alert_type=AlertType.MM7_BREAK,
-                date=datetime.datetime.now(),
-                data={
-                    **mm7_break_result,
-                    "ma50_slope": ma50_slope,
+            alert(
+                AlertType.COMBO,
+                {
+                    "price": combo.price,
+                    "direction": combo.direction.value,
+                    "strength": combo.strength.value,
+                    "has_been_triggered": combo.has_been_triggered,
+                    "details": combo.details,
                 },
-                asset_code=asset_code,
-                asset_description=asset_description,
-                exchange=exchange,
-                country_code=country_code,
             )
         )
 
+    if result.mm50_touch is not None:
+        asset_alerts.append(alert(AlertType.MM50_TOUCH, result.mm50_touch))
+
+    if result.mm7_break is not None:
+        asset_alerts.append(alert(AlertType.MM7_BREAK, result.mm7_break))
+
     # Store what was found even if some detector above could not run
     if len(asset_alerts) > 0:
         try:
@@ -411,85 +653,29 @@ async def run_detection_for_asset(
     return asset_alerts
 
 
-async def run_alerting(
-    config: str, assets: Optional[List[Dict]] = None
-) -> None:
-
-    configuration = Configuration(config)
-    saxo_client = SaxoClient(configuration)
-    slack_client = WebClient(token=configuration.slack_token)
-
-    async with create_dynamodb_client() as dynamodb_client:
-        if assets is None:
-            # Fetch French stocks from API with fallback to JSON
-            try:
-                start_time = time.time()
-                french_stocks = fetch_french_stocks(saxo_client)
-                fetch_duration = time.time() - start_time
-                logger.info(f"API fetch completed in {fetch_duration:.2f}s")
-            except Exception as e:
-                logger.error(f"Failed to fetch French stocks from API: {e}")
-                # Fallback to JSON
-                try:
-                    with open("stocks.json") as f:
-                        french_stocks = json.load(f)
-                    logger.info(
-                        f"Loaded {len(french_stocks)} stocks from stocks.json "
-                        "(fallback)"
-                    )
-                    # Notify error channel
-                    slack_client.chat_postMessage(
-                        channel="#errors",
-                        text=(
-                            "Alert system failed to fetch French stocks "
-                            f"from API. Using fallback to stocks.json. "
-                            f"Error: {str(e)}"
-                        ),
-                    )
-                except FileNotFoundError:
-                    logger.error("stocks.json file not found, cannot proceed")
-                    raise click.Abort()
-
-            # Load followup stocks (non-French, manual additions)
-            try:
-                with open("followup-stocks.json") as f:
-                    followup_stocks = json.load(f)
-                logger.debug("Followup stocks file loaded")
-            except FileNotFoundError:
-                logger.warning(
-                    "followup-stocks.json not found, "
-                    "using only French stocks"
-                )
-                followup_stocks = []
-
-            # Combine API stocks + followup stocks
-            all_stocks = french_stocks + followup_stocks
-
-            # Deduplicate by code (API takes precedence)
-            seen = set()
-            unique_stocks = []
-            for stock in all_stocks:
-                if stock["code"] not in seen:
-                    unique_stocks.append(stock)
-                    seen.add(stock["code"])
-
-            logger.info(
-                f"Processing {len(unique_stocks)} total stocks "
-                f"({len(french_stocks)} French + "
-                f"{len(followup_stocks)} followup)"
-            )
-
-            assets = unique_stocks
-
-        # Filter out excluded assets
-        excluded_asset_ids = await dynamodb_client.get_excluded_assets()
-        logger.info(f"Excluded assets: {excluded_asset_ids}")
+async def _scan_assets(
+    assets: AsyncIterable[Dict],
+    saxo_client: SaxoClient,
+    dynamodb_client: DynamoDBClient,
+    detector_pool: DetectorPool,
+    on_scanned: Optional[Callable[[int, List[Alert]], None]] = None,
+) -> List[Alert]:
+    """
+    Scan the assets as they stream in, keeping up to two per worker in
+    flight: while the pool runs the detectors of one asset, the event loop
+    already fetches the candles of the next ones. The next asset is only
+    pulled once a slot frees up, so at most that many candle sets are held
+    whatever the size of the universe. Inline, this is the plain sequential
+    scan. Alerts come back in the order the assets came in, and
+    `on_scanned` gets each asset's alerts with its position in the stream
+    as soon as that asset is done.
+    """
+    in_flight = asyncio.Semaphore(2 * detector_pool.max_workers)
 
-        original_count = len(assets)
+    async def scan(position: int, asset: Dict) -> List[Alert]:
+        try:
+            logger.debug(f"scan {asset['name']}")
 
-        # Filter assets by constructing full asset_id for exclusion check
-        filtered_assets = []
-        for asset in assets:
             # Parse asset code to separate asset_code and country_code
             parsed_asset_code, parsed_country_code = _parse_asset_code(
                 asset["code"]
@@ -499,23 +685,92 @@ async def run_alerting(
                 asset.get("country_code") or parsed_country_code
             )
 
-            # Construct full asset_id for exclusion check
-            asset_id = (
-                f"{parsed_asset_code}:{final_country_code}"
-                if final_country_code
-                else parsed_asset_code
+            asset_alerts = await run_detection_for_asset(
+                asset_code=parsed_asset_code,
+                country_code=final_country_code,
+                exchange="saxo",
+                asset_description=asset["name"],
+                saxo_uic=asset.get("saxo_uic"),
+                saxo_client=saxo_client,
+                dynamodb_client=dynamodb_client,
+                detector_pool=detector_pool,
             )
+        except Exception as e:
+            # One asset that fails is logged and skipped, it never takes
+            # the rest of the scan down with it.
+            logger.error(f"{asset.get('name')} can't be scanned: {e}")
+            asset_alerts = []
+        finally:
+            in_flight.release()
+        if on_scanned is not None:
+            on_scanned(position, asset_alerts)
+        return asset_alerts
+
+    scans: List[asyncio.Task] = []
+    try:
+        async for asset in assets:
+            await in_flight.acquire()
+            scans.append(asyncio.create_task(scan(len(scans), asset)))
+        scanned = await asyncio.gather(*scans)
+    finally:
+        # A universe that fails mid-stream leaves scans running: they are
+        # cancelled and awaited rather than left to outlive the clients.
+        for pending in scans:
+            if not pending.done():
+                await _cancel(pending)
+    return [alert for asset_alerts in scanned for alert in asset_alerts]
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    """Cancel the task and wait for it, so it never outlives the DynamoDB
+    client it reads through."""
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def run_alerting(
+    config: str, assets: Optional[List[Dict]] = None
+) -> None:
 
-            if asset_id not in excluded_asset_ids:
-                filtered_assets.append(asset)
+    configuration = Configuration(config)
+    saxo_client = SaxoClient(configuration)
+    slack_client = WebClient(token=configuration.slack_token)
 
-        assets = filtered_assets
-        filtered_count = original_count - len(assets)
+    async with create_dynamodb_client() as dynamodb_client:
+        excluded_asset_ids = await dynamodb_client.get_excluded_assets()
+        logger.info(f"Excluded assets: {excluded_asset_ids}")
+        universe = AssetUniverse(
+            saxo_client, slack_client, excluded_asset_ids, assets
+        )
+        # The triage inputs that do not depend on the scan are prepared
+        # alongside it: the day's workflow orders load while the first
+        # assets are scanned, and each asset's alerts are grouped for the
+        # triage as soon as it is done. Only the trigger matching and the
+        # triage call itself wait for the last asset.
+        run_date = current_run_date()
+        todays_orders = asyncio.create_task(
+            prefetch_todays_orders(dynamodb_client, run_date)
+        )
+        triage_input = TriageInput()
 
-        logger.info(f"Assets after exclusion filtering: {len(assets)}")
-        logger.info(f"Filtered out {filtered_count} excluded assets")
+        try:
+            with DetectorPool() as detector_pool:
+                await _scan_assets(
+                    universe,
+                    saxo_client,
+                    dynamodb_client,
+                    detector_pool,
+                    on_scanned=triage_input.add,
+                )
+        except BaseException:
+            await _cancel(todays_orders)
+            raise
+
+        logger.info(f"Assets after exclusion filtering: {universe.scanned}")
+        logger.info(f"Filtered out {universe.excluded} excluded assets")
 
-        if len(assets) == 0:
+        if universe.scanned == 0:
+            await _cancel(todays_orders)
             logger.warning(
                 "All assets are excluded. No alerts will be generated."
             )
@@ -525,42 +780,21 @@ async def run_alerting(
             )
             return
 
-        all_alerts: List[Alert] = []
-        for asset in assets:
-            logger.debug(f"scan {asset['name']}")
-
-            # Parse asset code to separate asset_code and country_code
-            parsed_asset_code, parsed_country_code = _parse_asset_code(
-                asset["code"]
-            )
-            # Prefer explicit country_code from asset dict, fallback to parsed
-            final_country_code = (
-                asset.get("country_code") or parsed_country_code
-            )
-
-            # Call extracted detection function
-            asset_alerts = await run_detection_for_asset(
-                asset_code=parsed_asset_code,
-                country_code=final_country_code,
-                exchange="saxo",
-                asset_description=asset["name"],
-                saxo_uic=asset.get("saxo_uic"),
-                saxo_client=saxo_client,
-                dynamodb_client=dynamodb_client,
-            )
-            all_alerts.extend(asset_alerts)
-
         try:
             triage_agent = TriageAgent(
                 AnthropicClient(configuration),
                 configuration.triage_slope_threshold,
             )
-            run_date = current_run_date()
-            triggers = await collect_todays_triggers(
-                dynamodb_client, run_date, all_alerts
+            # The prefetch closed its window before the scan; the orders
+            # placed since are read now that it is over.
+            triggers = resolve_todays_triggers(
+                await refresh_todays_orders(
+                    dynamodb_client, run_date, await todays_orders
+                ),
+                triage_input.alerts,
             )
-            digest = triage_agent.synthesize(
-                all_alerts, triggers, run_date=run_date
+            digest = triage_agent.synthesize_input(
+                triage_input, triggers, run_date=run_date
             )
             try:
                 await dynamodb_client.store_alert_digest(digest)
@@ -570,7 +804,7 @@ async def run_alerting(
                 f"Triage digest for {digest.run_date}: {digest.counts} "
                 f"(fallback={digest.fallback_used})"
             )
-            if len(digest.triaged_assets) > 0 or len(assets) > 1:
+            if len(digest.triaged_assets) > 0 or universe.scanned > 1:
                 slack_client.chat_postMessage(
                     channel="#stock",
                     text=format_slack_digest(digest, configuration.app_url),
@@ -579,12 +813,17 @@ async def run_alerting(
             logger.error(f"Triage step failed: {e}")
 
 
+def _touch_point(candle: Candle) -> str:
+    day = candle.date.strftime("%Y-%m-%d") if candle.date else "Unknown"
+    return f"{day}: {candle.higher} {candle.lower}"
+
+
 def _run_double_inside_bar(
-    asset: Dict, candles: List[Candle]
+    asset: Dict, frame: indicator_service.FeatureFrame
 ) -> Optional[Candle]:
-    if indicator_service.double_inside_bar(candles):
-        logger.debug(f"{asset['name']}, {candles[0]}")
-        return candles[0]
+    if indicator_service.double_inside_bar(frame.candles, frame):
+        logger.debug(f"{asset['name']}, {frame.candles[0]}")
+        return frame.candles[0]
     return None
 
 
@@ -615,19 +854,36 @@ def _run_congestion_indicator(
     return None
 
 
+def _asset_tick_size(
+    saxo_client: SaxoClient, asset: Dict, candles: List[Candle]
+) -> float:
+    """
+    The tick of the asset's last close. The scheme carries no id of its
+    own, so its sorted table is kept per uic: an asset's scheme is fetched
+    and sorted once, and every later scan only bisects it.
+    """
+    table = _TICK_SIZE_TABLES.get(asset["saxo_uic"])
+    if table is None:
+        detail = saxo_client.get_asset_detail(
+            asset["saxo_uic"], AssetType.STOCK
+        )
+        table = (
+            client_helper.TickSizeTable.from_scheme(detail["TickSizeScheme"])
+            if "TickSizeScheme" in detail
+            else NO_TICK_SIZE
+        )
+        _TICK_SIZE_TABLES[asset["saxo_uic"]] = table
+    return table.tick_size(candles[0].close)
+
+
 def _run_double_top(
-    saxo_client: SaxoClient,
     asset: Dict,
-    candles: List[Candle],
+    frame: indicator_service.FeatureFrame,
+    tick: float,
 ) -> Optional[Candle]:
-    detail = saxo_client.get_asset_detail(asset["saxo_uic"], AssetType.STOCK)
-    if "TickSizeScheme" not in detail:
-        tick = 0.0
-    else:
-        tick = client_helper.get_tick_size(
-            detail["TickSizeScheme"], candles[0].close
-        )
-    double_top_candle = indicator_service.double_top(candles, tick)
+    double_top_candle = indicator_service.double_top(
+        frame.candles, tick, frame.pivots
+    )
     if (
         double_top_candle is not None
         and double_top_candle.date is not None
@@ -639,18 +895,13 @@ def _run_double_top(
 
 
 def _run_double_bottom(
-    saxo_client: SaxoClient,
     asset: Dict,
-    candles: List[Candle],
+    frame: indicator_service.FeatureFrame,
+    tick: float,
 ) -> Optional[Candle]:
-    detail = saxo_client.get_asset_detail(asset["saxo_uic"], AssetType.STOCK)
-    if "TickSizeScheme" not in detail:
-        tick = 0.0
-    else:
-        tick = client_helper.get_tick_size(
-            detail["TickSizeScheme"], candles[0].close
-        )
-    double_bottom_candle = indicator_service.double_bottom(candles, tick)
+    double_bottom_candle = indicator_service.double_bottom(
+        frame.candles, tick, frame.pivots
+    )
     if (
         double_bottom_candle is not None
         and double_bottom_candle.date is not None
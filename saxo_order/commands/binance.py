@@ -131,6 +131,27 @@ def show_report(orders, currencies_rate):
             )
 
 
+@click.command
+@click.option(
+    "--from-date",
+    type=str,
+    required=True,
+    help="What is the start date",
+    prompt="What is the start date ? (YYYY/MM/DD)",
+)
+@click.pass_context
+@catch_exception(handle=SaxoException)
+def export_report(ctx: Context, from_date: str):
+    """Write every trade missing from the gsheet, closes into their row"""
+    configuration = Configuration(ctx.obj["config"])
+    client = BinanceClient(
+        configuration.binance_keys[0], configuration.binance_keys[1]
+    )
+    report_service = BinanceReportService(client, configuration)
+    exported = report_service.export_to_gsheet("binance_main", from_date)
+    print(f"{exported} orders exported to the gsheet")
+
+
 @click.command
 @click.option(
     "--file",
@@ -1,6 +1,9 @@
-from typing import List
+import json
+import os
+from typing import Dict, List, Tuple
 
 import click
+from prettytable import PrettyTable
 
 from client.zone_bourse_client import ZoneBourseClient
 from model import ZoneBourseScore, ZoneBourseScrap
@@ -10,6 +13,9 @@ from utils.logger import Logger
 
 logger = Logger.get_logger("fundamental")
 
+# Parsed Zone Bourse pages, shared by get-score and get-scores
+ZONE_BOURSE_CACHE = "zone_bourse"
+
 
 @click.command
 @click.option(
@@ -23,7 +29,7 @@ def get_score(url: str):
     referential_year = click.prompt(
         "What year has to be used as the main one ?", type=int, default=2023
     )
-    zb_client = ZoneBourseClient()
+    zb_client = ZoneBourseClient(cache_directory=ZONE_BOURSE_CACHE)
     zb_score = ZoneBourseScore()
     zb_score.is_ath = (
         click.prompt(
@@ -72,6 +78,99 @@ def get_score(url: str):
     print(f"{'Total':<45} - {zb_score.score} {zb_score.weighted_score}")
 
 
+@click.command
+@click.option(
+    "--stocks-file",
+    type=str,
+    default="stocks.json",
+    help=(
+        "Stocks list, every entry is scored: its zone_bourse_url, or the "
+        "page Zone Bourse's search finds for its ticker"
+    ),
+)
+@click.option(
+    "--url",
+    "urls",
+    type=str,
+    multiple=True,
+    help="Additional zone bourse url to score",
+)
+@click.option(
+    "--referential-year",
+    type=int,
+    default=2023,
+    help="What year has to be used as the main one",
+)
+@catch_exception(handle=SaxoException)
+def get_scores(stocks_file: str, urls: Tuple[str, ...], referential_year: int):
+    """
+    Score every stock of the list in one non-interactive run. The ATH,
+    outperformance, trend and dividend criteria need a human answer and
+    count as not met, so the score is the fundamental part only.
+
+    A stock is scored on its zone_bourse_url when the list gives one, on
+    the page Zone Bourse's search finds for the ticker of its code
+    otherwise.
+    """
+    stocks: List[Dict] = []
+    if os.path.isfile(stocks_file):
+        with open(stocks_file, "r") as f:
+            stocks = json.load(f)
+    if len(stocks) == 0 and len(urls) == 0:
+        raise SaxoException(f"No stock in {stocks_file} and no --url given")
+
+    zb_client = ZoneBourseClient(cache_directory=ZONE_BOURSE_CACHE)
+    found = zb_client.find_fundamental_urls(
+        [
+            stock_ticker(stock)
+            for stock in stocks
+            if not stock.get("zone_bourse_url")
+        ]
+    )
+    names: Dict[str, str] = {}
+    not_found = 0
+    for stock in stocks:
+        url = stock.get("zone_bourse_url") or found[stock_ticker(stock)]
+        if url is None:
+            logger.error(
+                f"No Zone Bourse page found for {stock['name']}"
+                f" ({stock_ticker(stock)})"
+            )
+            not_found += 1
+            continue
+        names[url] = stock["name"]
+    for url in urls:
+        names.setdefault(url, url)
+
+    scraps = zb_client.parse_fundamentals(list(names))
+
+    scores = []
+    for url, zb in scraps.items():
+        if zb is None:
+            continue
+        zb_score = ZoneBourseScore()
+        try:
+            calculate_score(zb_score, zb, referential_year)
+        except (KeyError, ValueError, ZeroDivisionError) as e:
+            logger.error(f"Cannot score {names[url]}: {e}")
+            continue
+        scores.append((names[url], zb_score))
+
+    table = PrettyTable()
+    table.field_names = ["Stock", "Score", "Weighted score"]
+    for name, zb_score in sorted(
+        scores, key=lambda score: score[1].weighted_score, reverse=True
+    ):
+        table.add_row([name, zb_score.score, zb_score.weighted_score])
+    print(table)
+    print(f"{len(scores)}/{len(names) + not_found} stocks scored")
+
+
+def stock_ticker(stock: Dict) -> str:
+    """The ticker of a stocks list entry, its code without the exchange"""
+    return stock["code"].split(":")[0]
+
+
 def calculate_score(
     zb_score: ZoneBourseScore, zb_data: ZoneBourseScrap, referential_year: int
 ) -> List[str]:
@@ -1,6 +1,7 @@
 import click
 from click.core import Context
 
+from api.services.report_service import ReportService
 from client.gsheet_client import GSheetClient
 from client.saxo_client import SaxoClient
 from model import Currency, ReportOrder
@@ -39,7 +40,9 @@ def get_report(ctx: Context, from_date: str, update_gsheet: bool):
         spreadsheet_id=configuration.spreadsheet_id,
     )
     account = select_account(client)
-    orders = client.get_report(account, from_date)
+    orders = ReportService(client, configuration).get_account_orders(
+        account, from_date
+    )
     if len(orders) == 0:
         print("No order to report")
         exit(0)
@@ -109,6 +112,26 @@ def get_report(ctx: Context, from_date: str, update_gsheet: bool):
             show_report(orders, configuration.currencies_rate)
 
 
+@click.command()
+@click.option(
+    "--from-date",
+    type=str,
+    required=True,
+    help="What is the start date",
+    prompt="What is the start date ? (YYYY/MM/DD)",
+)
+@click.pass_context
+@catch_exception(handle=SaxoException)
+def export_report(ctx: Context, from_date: str):
+    """Write every fill missing from the gsheet, closes into their row"""
+    configuration = Configuration(ctx.obj["config"])
+    client = SaxoClient(configuration)
+    account = select_account(client)
+    report_service = ReportService(client, configuration)
+    exported = report_service.export_to_gsheet(account.name, from_date)
+    print(f"{exported} orders exported to the gsheet")
+
+
 def show_report(orders, currencies_rate):
     for index, order in enumerate(orders):
         if order.currency != Currency.EURO:
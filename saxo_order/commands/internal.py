@@ -1,13 +1,25 @@
 # flake8: noqa: W291
 
 import asyncio
+import datetime
 import json
+from pathlib import Path
+from typing import Optional, Sequence
 
 import click
 from click.core import Context
+from prettytable import PrettyTable
 from slack_sdk import WebClient
 
+from api.services.backtest import BacktestService, get_definition
 from api.services.backtest.cache_migration import CacheMigration
+from api.services.backtest.cache_scan import DEFAULT_SEGMENTS, ScanCheckpoint
+from api.services.backtest.cache_warmer import (
+    WARM_CONCURRENCY,
+    CacheWarmer,
+    WarmProgress,
+)
+from api.services.backtest.sweep import parameter_grid
 from client.aws_client import S3Client
 from client.client_helper import map_data_to_candles
 from client.saxo_client import SaxoClient
@@ -15,6 +27,7 @@ from engines.workflow_loader import load_workflows
 from model import AssetType, UnitTime
 from saxo_order.async_utils import create_dynamodb_client, run_async
 from saxo_order.commands import catch_exception
+from services.candles_service import CandlesService
 from utils.configuration import Configuration
 from utils.exception import SaxoException
 from utils.json_util import dumps_indicator
@@ -347,6 +360,10 @@ def sync_workflows(ctx: Context, direction: str):
     print("Workflows file is synchronized")
 
 
+# Progress file of migrate_backtest_cache, in the working directory
+MIGRATION_CHECKPOINT = "backtest_cache_migration.json"
+
+
 @click.command()
 @click.option(
     "--dry-run",
@@ -354,15 +371,39 @@ def sync_workflows(ctx: Context, direction: str):
     default=False,
     help="Show what would be migrated without writing anything",
 )
+@click.option(
+    "--segments",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SEGMENTS,
+    show_default=True,
+    help="Segments of the table scanned in parallel",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    default=MIGRATION_CHECKPOINT,
+    show_default=True,
+    help="Progress file an interrupted migration resumes from",
+)
 @catch_exception(handle=SaxoException)
 @run_async
-async def migrate_backtest_cache(dry_run: bool):
+async def migrate_backtest_cache(
+    dry_run: bool, segments: int, checkpoint: str
+):
     """Re-key the backtest raw-candle cache from the per-definition v1 key
     onto the v2 (instrument, session) key, collapsing the duplicate copies
     the definitions used to keep of the same candles. Idempotent: a second
-    run finds nothing left on v1."""
+    run finds nothing left on v1. An interrupted run resumes from its
+    checkpoint file; a dry run neither reads nor writes one."""
     async with create_dynamodb_client() as dynamodb_client:
-        migration = CacheMigration(dynamodb_client, logger)
+        migration = CacheMigration(
+            dynamodb_client,
+            logger,
+            checkpoint=None if dry_run else ScanCheckpoint(Path(checkpoint)),
+            segments=segments,
+        )
+        if migration.resumed:
+            print(f"Resuming from {checkpoint}")
         plan = await migration.build_plan()
 
         print(f"v1 entries found:      {plan.v1_entries}")
@@ -380,11 +421,12 @@ async def migrate_backtest_cache(dry_run: bool):
         if dry_run:
             print("\nDry run, nothing written.")
             return
+
+        # Applied even when empty: it is what removes the checkpoint
+        result = await migration.apply(plan)
         if not plan.writes and not plan.deletes:
             print("\nNothing to migrate.")
             return
-
-        result = await migration.apply(plan)
         print(
             f"\nWritten: {result.written}, deleted: {result.deleted}, "
             f"write failures: {result.write_failures}, "
@@ -400,3 +442,211 @@ async def migrate_backtest_cache(dry_run: bool):
                 "Every day was migrated, but some v1 entries could not be "
                 "removed. Re-run to clean them up."
             )
+
+
+# Days looked back by the scheduled warm-up: a week of sessions, so that a
+# missed run is caught up by the next one
+WARM_LOOKBACK_DAYS = 7
+
+
+async def run_backtest_cache_warm(
+    config: str,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    instruments: Optional[Sequence[str]] = None,
+    concurrency: int = WARM_CONCURRENCY,
+    verbose: bool = False,
+) -> None:
+    candles_service = CandlesService(SaxoClient(Configuration(config)))
+
+    def report(progress: WarmProgress) -> None:
+        message = (
+            f"[{progress.chunks_done}/{progress.chunks_total}] "
+            f"{progress.key} {progress.first_date} -> "
+            f"{progress.last_date}: {progress.days_stored} day(s) stored"
+        )
+        if verbose:
+            print(message)
+        else:
+            logger.info(message)
+
+    async with create_dynamodb_client() as dynamodb_client:
+        warmer = CacheWarmer(
+            candles_service, dynamodb_client, logger, concurrency
+        )
+        result = await warmer.warm(
+            start_date, end_date, instruments=instruments, progress=report
+        )
+    summary = (
+        f"Backtest cache warmed: {result.days_stored} day(s) stored out of "
+        f"{result.days_checked} checked, {result.failed_chunks} failed "
+        f"chunk(s)"
+    )
+    if verbose:
+        print(summary)
+    else:
+        logger.info(summary)
+
+
+@click.command()
+@click.pass_context
+@click.option(
+    "--from-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="First day to warm (YYYY-MM-DD)",
+)
+@click.option(
+    "--to-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Last day to warm (YYYY-MM-DD), today by default",
+)
+@click.option(
+    "--instrument",
+    multiple=True,
+    help="Only warm this instrument (e.g. GER40.I), can be repeated",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=WARM_CONCURRENCY,
+    show_default=True,
+    help="Chunks of days fetched at the same time",
+)
+@catch_exception(handle=SaxoException)
+@run_async
+async def warm_backtest_cache(
+    ctx: Context,
+    from_date: datetime.datetime,
+    to_date: Optional[datetime.datetime],
+    instrument: Sequence[str],
+    concurrency: int,
+):
+    """Fill the backtest raw-candle cache for every backtest definition
+    over a date range, so that the Backtest menu finds its days cached.
+    Days already complete cost one read; missing and partial ones are
+    fetched from Saxo."""
+    end_date = to_date.date() if to_date else datetime.date.today()
+    if end_date < from_date.date():
+        raise SaxoException("--to-date must not be before --from-date")
+    await run_backtest_cache_warm(
+        ctx.obj["config"],
+        from_date.date(),
+        end_date,
+        instruments=instrument or None,
+        concurrency=concurrency,
+        verbose=True,
+    )
+
+
+@click.command()
+@click.pass_context
+@click.option(
+    "--definition", required=True, help="Backtest definition code (B9H)"
+)
+@click.option(
+    "--from-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="Start date (YYYY-MM-DD)",
+)
+@click.option(
+    "--to-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    required=True,
+    help="End date (YYYY-MM-DD)",
+)
+@click.option(
+    "--stop-loss",
+    type=click.FloatRange(min=0, min_open=True),
+    multiple=True,
+    help="Stop-loss distance to try, can be repeated",
+)
+@click.option(
+    "--take-profit",
+    type=click.FloatRange(min=0, min_open=True),
+    multiple=True,
+    help="Take-profit offset to try, can be repeated",
+)
+@click.option(
+    "--break-even",
+    type=click.FloatRange(min=0, min_open=True),
+    multiple=True,
+    help="Break-even trigger to try, can be repeated",
+)
+@click.option(
+    "--max-entry-distance",
+    type=click.FloatRange(min=0, min_open=True),
+    multiple=True,
+    help="Max entry distance to try, can be repeated",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of combinations printed",
+)
+@catch_exception(handle=SaxoException)
+@run_async
+async def backtest_sweep(
+    ctx: Context,
+    definition: str,
+    from_date: datetime.datetime,
+    to_date: datetime.datetime,
+    stop_loss: Sequence[float],
+    take_profit: Sequence[float],
+    break_even: Sequence[float],
+    max_entry_distance: Sequence[float],
+    top: int,
+):
+    """Run a backtest definition over a date range under every
+    combination of the given parameters and print the best ones. A
+    parameter left out keeps the definition's default."""
+    backtest_definition = get_definition(definition)
+    if backtest_definition is None:
+        raise SaxoException(f"Unknown backtest definition: {definition}")
+    grid = parameter_grid(
+        backtest_definition,
+        stop_loss_points=stop_loss,
+        take_profit_offset_points=take_profit,
+        break_even_trigger_points=break_even,
+        max_entry_distance_points=max_entry_distance,
+    )
+    candles_service = CandlesService(
+        SaxoClient(Configuration(ctx.obj["config"]))
+    )
+    async with create_dynamodb_client() as dynamodb_client:
+        results = await BacktestService(
+            candles_service, dynamodb_client
+        ).sweep(backtest_definition, from_date.date(), to_date.date(), grid)
+
+    table = PrettyTable()
+    table.field_names = [
+        "Stop loss",
+        "Take profit",
+        "Break even",
+        "Max entry",
+        "Trades",
+        "Wins",
+        "Losses",
+        "BE",
+        "Result",
+    ]
+    for result in results[:top]:
+        table.add_row(
+            [
+                result.params.stop_loss_points,
+                result.params.take_profit_offset_points,
+                result.params.break_even_trigger_points,
+                result.params.max_entry_distance_points,
+                result.summary.number_of_trades,
+                result.summary.number_of_winning_positions,
+                result.summary.number_of_losing_positions,
+                result.summary.number_of_be,
+                result.summary.final_result,
+            ]
+        )
+    print(table)
+    print(f"{len(results)} combinations run")
@@ -105,10 +105,12 @@ k_order.add_command(workflow)
 
 k_order.add_command(alerting.alerting)
 k_order.add_command(get_score.get_score)
+k_order.add_command(get_score.get_scores)
 k_order.add_command(auth.auth)
 k_order.add_command(available_funds.available_funds)
 k_order.add_command(snapshot.snapshot)
 k_order.add_command(get_report.get_report)
+k_order.add_command(get_report.export_report)
 k_order.add_command(search.search)
 
 set.add_command(set_order.set_order)
@@ -126,6 +128,7 @@ shortcut.add_command(shortcurts.nasdaq)
 shortcut.add_command(shortcurts.nikkei)
 
 binance.add_command(binance_commands.get_report)
+binance.add_command(binance_commands.export_report)
 binance.add_command(binance_commands.get_stacking_report)
 
 internal.add_command(internal_command.refresh_stocks_list)
@@ -133,3 +136,5 @@ internal.add_command(internal_command.technical)
 internal.add_command(internal_command.sync_workflows)
 internal.add_command(internal_command.get_gpt_prompt)
 internal.add_command(internal_command.migrate_backtest_cache)
+internal.add_command(internal_command.warm_backtest_cache)
+internal.add_command(internal_command.backtest_sweep)
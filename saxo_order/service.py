@@ -1,7 +1,12 @@
 import copy
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from client.gsheet_client import GSheetClient, ReportedOrders, appended_line
 from model import Account, AssetType, Currency, Order, ReportOrder, Taxes
+from utils.logger import Logger
+
+logger = Logger.get_logger("service")
 
 
 def validate_ratio(order: Order) -> tuple:
@@ -89,6 +94,111 @@ def calculate_currency(
     return new_order
 
 
+@dataclass
+class UnreportedOrders:
+    """
+    The fills of a report the order sheet does not hold yet, converted and
+    paired with their original as GSheetClient expects them: the openings
+    to append as new rows, the closings of a row already in the sheet by
+    line, and the closings of one of the openings by its index. reduced are
+    the fills that close part of an open row, left to a manual update.
+    """
+
+    openings: List[Tuple[ReportOrder, ReportOrder]] = field(
+        default_factory=list
+    )
+    closings: List[Tuple[ReportOrder, ReportOrder, int]] = field(
+        default_factory=list
+    )
+    closed_openings: List[Tuple[ReportOrder, ReportOrder, int]] = field(
+        default_factory=list
+    )
+    reduced: List[ReportOrder] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return (
+            len(self.openings) + len(self.closings) + len(self.closed_openings)
+        )
+
+
+def unreported_orders(
+    orders: Iterable[ReportOrder],
+    reported: ReportedOrders,
+    currencies_rate: Dict,
+) -> UnreportedOrders:
+    """
+    Sort out the fills the sheet does not hold yet, oldest first. A fill
+    that closes an open row whole - in the sheet or opened earlier in the
+    same report - is written into that row, the way update_order closes a
+    position; any other new fill opens a row. reported is consumed.
+    """
+    unreported = UnreportedOrders()
+    # The rows the openings will be appended as, by their index
+    appended = ReportedOrders()
+    for order in sorted(orders, key=lambda o: o.date):
+        if reported.claim(order):
+            continue
+        line = reported.close(order)
+        opening = appended.close(order) if line is None else None
+        if (
+            line is None
+            and opening is None
+            and (reported.reduces(order) or appended.reduces(order))
+        ):
+            unreported.reduced.append(order)
+            continue
+        order.taxes = calculate_taxes(order)
+        order.open_position = line is None and opening is None
+        report_order = calculate_currency(order, currencies_rate)
+        if not isinstance(report_order, ReportOrder):
+            raise TypeError(
+                "calculate_currency must return a ReportOrder for a "
+                "ReportOrder input"
+            )
+        if line is not None:
+            unreported.closings.append((report_order, order, line))
+        elif opening is not None:
+            unreported.closed_openings.append((report_order, order, opening))
+        else:
+            if order.direction is not None:
+                appended.opened(
+                    order.date.date(),
+                    order.code,
+                    order.quantity,
+                    order.direction,
+                    len(unreported.openings),
+                )
+            unreported.openings.append((report_order, order))
+    return unreported
+
+
+def export_unreported_orders(
+    gsheet_client: GSheetClient, account: Account, unreported: UnreportedOrders
+) -> int:
+    """
+    Write the unreported fills to the order sheet in two requests: one
+    append for the openings, one batchUpdate for the closings. The partial
+    closes are only logged. Returns the number of fills written.
+    """
+    for order in unreported.reduced:
+        logger.warning(
+            f"{order.code} {order.quantity} on {order.date:%Y-%m-%d} closes"
+            " part of an open row of the sheet, left for a manual update"
+        )
+    closings = list(unreported.closings)
+    if len(unreported.openings) > 0:
+        first_line = appended_line(
+            gsheet_client.create_orders(account, unreported.openings)
+        )
+        closings += [
+            (report_order, order, first_line + index)
+            for report_order, order, index in unreported.closed_openings
+        ]
+    if len(closings) > 0:
+        gsheet_client.update_orders(closings)
+    return len(unreported)
+
+
 def get_lost(total_funds: float, order: Order) -> str:
     if order.stop is not None:
         lost = order.quantity * (order.price - order.stop)
@@ -230,7 +230,26 @@ class TriageAgent:
         triggers: Optional[Dict[str, List[WorkflowTrigger]]] = None,
         run_date: Optional[str] = None,
     ) -> AlertDigest:
-        grouped = self._group_by_asset(alerts, triggers or {})
+        return self._synthesize_grouped(
+            self._group_by_asset(alerts, triggers or {}), run_date
+        )
+
+    def synthesize_input(
+        self,
+        triage_input: "TriageInput",
+        triggers: Optional[Dict[str, List[WorkflowTrigger]]] = None,
+        run_date: Optional[str] = None,
+    ) -> AlertDigest:
+        """synthesize() over alerts already grouped while the scan ran."""
+        return self._synthesize_grouped(
+            triage_input.grouped(triggers or {}), run_date
+        )
+
+    def _synthesize_grouped(
+        self,
+        grouped: Dict[str, Dict[str, Any]],
+        run_date: Optional[str],
+    ) -> AlertDigest:
         run_date = run_date or current_run_date()
         created_at = int(
             datetime.datetime.now(datetime.timezone.utc).timestamp()
@@ -418,28 +437,8 @@ class TriageAgent:
     ) -> Dict[str, Dict[str, Any]]:
         grouped: Dict[str, Dict[str, Any]] = {}
         for alert in alerts:
-            entry = grouped.setdefault(
-                alert.id,
-                {
-                    "asset_code": alert.asset_code,
-                    "asset_description": alert.asset_description,
-                    "exchange": alert.exchange,
-                    "country_code": alert.country_code,
-                    "patterns": [],
-                    "ma50_slope": None,
-                    "workflow_triggers": triggers.get(alert.id, []),
-                },
-            )
-            if alert.alert_type not in entry["patterns"]:
-                entry["patterns"].append(alert.alert_type)
-            slope = (
-                alert.data.get("ma50_slope")
-                if isinstance(alert.data, dict)
-                else None
-            )
-            if slope is not None and entry["ma50_slope"] is None:
-                entry["ma50_slope"] = slope
-        return grouped
+            _group_alert(grouped, alert)
+        return _attach_triggers(grouped, triggers)
 
     def _build_payload(self, grouped: Dict[str, Dict[str, Any]]) -> str:
         assets = []
@@ -548,6 +547,90 @@ class TriageAgent:
         )
 
 
+def _group_alert(grouped: Dict[str, Dict[str, Any]], alert: Alert) -> None:
+    entry = grouped.setdefault(
+        alert.id,
+        {
+            "asset_code": alert.asset_code,
+            "asset_description": alert.asset_description,
+            "exchange": alert.exchange,
+            "country_code": alert.country_code,
+            "patterns": [],
+            "ma50_slope": None,
+            "workflow_triggers": [],
+        },
+    )
+    if alert.alert_type not in entry["patterns"]:
+        entry["patterns"].append(alert.alert_type)
+    slope = (
+        alert.data.get("ma50_slope") if isinstance(alert.data, dict) else None
+    )
+    if slope is not None and entry["ma50_slope"] is None:
+        entry["ma50_slope"] = slope
+
+
+def _attach_triggers(
+    grouped: Dict[str, Dict[str, Any]],
+    triggers: Dict[str, List[WorkflowTrigger]],
+) -> Dict[str, Dict[str, Any]]:
+    for asset_id, entry in grouped.items():
+        entry["workflow_triggers"] = triggers.get(asset_id, [])
+    return grouped
+
+
+class TriageInput:
+    """The scan's alerts, grouped for the triage as each asset completes.
+
+    The alerting run feeds it one asset at a time while the scan is still
+    going, so by the time the last asset is done only the day's triggers
+    are left to attach before the triage call. Assets may complete out of
+    order; they are keyed by their position in the scan and grouped back
+    in that order, so the digest is the one synthesize() would build from
+    the alerts of the whole scan.
+    """
+
+    def __init__(self) -> None:
+        self._by_position: Dict[int, List[Alert]] = {}
+        self._grouped_by_position: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+    def add(self, position: int, alerts: List[Alert]) -> None:
+        self._by_position[position] = alerts
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for alert in alerts:
+            _group_alert(grouped, alert)
+        self._grouped_by_position[position] = grouped
+
+    @property
+    def alerts(self) -> List[Alert]:
+        return [
+            alert
+            for position in sorted(self._by_position)
+            for alert in self._by_position[position]
+        ]
+
+    def grouped(
+        self, triggers: Dict[str, List[WorkflowTrigger]]
+    ) -> Dict[str, Dict[str, Any]]:
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for position in sorted(self._grouped_by_position):
+            for asset_id, entry in self._grouped_by_position[position].items():
+                if asset_id not in grouped:
+                    grouped[asset_id] = {
+                        **entry,
+                        "patterns": list(entry["patterns"]),
+                    }
+                    continue
+                # Two scanned assets with the same id: merge them exactly
+                # as grouping their alerts one after the other would
+                merged = grouped[asset_id]
+                for pattern in entry["patterns"]:
+                    if pattern not in merged["patterns"]:
+                        merged["patterns"].append(pattern)
+                if merged["ma50_slope"] is None:
+                    merged["ma50_slope"] = entry["ma50_slope"]
+        return _attach_triggers(grouped, triggers)
+
+
 def format_slack_digest(digest: AlertDigest, app_url: str) -> str:
     if len(digest.triaged_assets) == 0:
         return digest.summary
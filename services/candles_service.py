@@ -1,7 +1,7 @@
 import datetime
 import logging
 import math
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from client.client_helper import map_data_to_candle, map_data_to_candles
 from client.mock_saxo_client import MockSaxoClient
@@ -21,6 +21,8 @@ from utils.logger import Logger
 # Extra calendar days fetched beyond the strict weekend-adjusted span, to
 # absorb public holidays without needing an exchange calendar.
 HOLIDAY_BUFFER_DAYS = 2
+# Most bars a single Saxo chart request returns
+CHART_PAGE_SIZE = 1200
 
 
 class CandlesService:
@@ -394,3 +396,49 @@ class CandlesService:
             for candle in candles
             if candle.date is not None and start_utc <= candle.date < end_utc
         ]
+
+    def get_candles_in_range(
+        self,
+        code: str,
+        ut: UnitTime,
+        horizon: int,
+        start_utc: datetime.datetime,
+        end_utc: datetime.datetime,
+    ) -> List[Candle]:
+        """
+        Fetch every candle at the given horizon in [start_utc, end_utc),
+        oldest first, possibly spanning many sessions.
+
+        Where get_candles_in_window sizes one request on a single window,
+        this walks backward from end_utc with full CHART_PAGE_SIZE pages,
+        each ending at the oldest bar of the previous one, until start_utc
+        is reached. The series only starts after start_utc when Saxo has
+        no older history.
+        """
+        self.logger.debug(
+            f"get_candles_in_range({code}, ut={ut}, horizon={horizon}, "
+            f"{start_utc} -> {end_utc})"
+        )
+        asset = self.saxo_client.get_asset(code)
+        candles: Dict[datetime.datetime, Candle] = {}
+        page_end = end_utc + datetime.timedelta(minutes=horizon)
+        while True:
+            data = self.saxo_client.get_historical_data(
+                saxo_uic=asset["Identifier"],
+                asset_type=asset["AssetType"],
+                horizon=horizon,
+                count=CHART_PAGE_SIZE,
+                date=page_end,
+            )
+            page = {
+                candle.date: candle
+                for candle in map_data_to_candles(data, ut)
+                if candle.date is not None and candle.date < end_utc
+            }
+            # Consecutive pages share their boundary bar
+            candles.update(page)
+            oldest = min(page, default=None)
+            if oldest is None or oldest <= start_utc or oldest >= page_end:
+                break
+            page_end = oldest
+        return [candles[date] for date in sorted(candles) if date >= start_utc]
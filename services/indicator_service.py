@@ -1,5 +1,6 @@
 import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import cached_property
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import numpy
 
@@ -15,66 +16,90 @@ from utils.exception import SaxoException
 from utils.logger import Logger
 
 
-def double_top(candles: List[Candle], tick=float) -> Optional[Candle]:
+class Pivots(NamedTuple):
+    """
+    The local extremes of a candle list, in the list order (newest first).
+    A top is a candle whose high is not below its neighbours' highs, a
+    bottom one whose low is not above theirs; the first and the last candle
+    only have one neighbour to compare with.
+    """
+
+    tops: List[Candle]
+    bottoms: List[Candle]
+
+
+def find_pivots(candles: List[Candle]) -> Pivots:
+    """
+    Find the tops and the bottoms in one pass over the candles, so
+    double_top and double_bottom can share it instead of walking the list
+    twice.
+    """
+    if len(candles) < 2:
+        return Pivots(tops=[], bottoms=[])
+    highs = numpy.fromiter((c.higher for c in candles), float, len(candles))
+    lows = numpy.fromiter((c.lower for c in candles), float, len(candles))
+    is_top = numpy.ones(len(candles), dtype=bool)
+    is_top[:-1] &= highs[:-1] >= highs[1:]
+    is_top[1:] &= highs[1:] >= highs[:-1]
+    is_bottom = numpy.ones(len(candles), dtype=bool)
+    is_bottom[:-1] &= lows[:-1] <= lows[1:]
+    is_bottom[1:] &= lows[1:] <= lows[:-1]
+    return Pivots(
+        tops=[candles[i] for i in numpy.flatnonzero(is_top)],
+        bottoms=[candles[i] for i in numpy.flatnonzero(is_bottom)],
+    )
+
+
+def _first_near_equal(
+    pivots: List[Candle], values: List[float], tick: float
+) -> Optional[Candle]:
+    """
+    The first pivot (in list order) with another pivot within one tick.
+
+    The closest value to any pivot is one of its neighbours once the values
+    are sorted, so only adjacent pairs need checking: one sort and a linear
+    pass instead of comparing every pair.
+    """
+    order = sorted(range(len(values)), key=values.__getitem__)
+    first: Optional[int] = None
+    for a, b in zip(order, order[1:]):
+        if round(abs(values[a] - values[b]), 4) <= tick:
+            candidate = min(a, b)
+            if first is None or candidate < first:
+                first = candidate
+    return pivots[first] if first is not None else None
+
+
+def double_top(
+    candles: List[Candle], tick=float, pivots: Optional[Pivots] = None
+) -> Optional[Candle]:
     """
     If a double top exist in the list, return true
     The top can be another candle than the first one
     We accept a spread of one tick between two tops
+    Pass the pivots when find_pivots already ran on these candles
     """
     if len(candles) < 2:
         return None
-
-    tops: List[Candle] = []
-
-    if candles[0].higher >= candles[1].higher:
-        tops.append(candles[0])
-
-    for i in range(1, len(candles) - 1):
-        if (
-            candles[i].higher >= candles[i - 1].higher
-            and candles[i].higher >= candles[i + 1].higher
-        ):
-            tops.append(candles[i])
-
-    if candles[-1].higher >= candles[-2].higher:
-        tops.append(candles[-1])
-    # Check if there are two tops within one tick spread
-    for i in range(len(tops)):
-        for j in range(i + 1, len(tops)):
-            if round(abs(tops[i].higher - tops[j].higher), 4) <= tick:
-                return tops[i]
-    return None
+    tops = (pivots if pivots is not None else find_pivots(candles)).tops
+    return _first_near_equal(tops, [top.higher for top in tops], tick)
 
 
-def double_bottom(candles: List[Candle], tick=float) -> Optional[Candle]:
+def double_bottom(
+    candles: List[Candle], tick=float, pivots: Optional[Pivots] = None
+) -> Optional[Candle]:
     """
     If a double bottom exist in the list, return the trough candle
     The bottom can be another candle than the first one
     We accept a spread of one tick between two bottoms
+    Pass the pivots when find_pivots already ran on these candles
     """
     if len(candles) < 2:
         return None
-
-    bottoms: List[Candle] = []
-
-    if candles[0].lower <= candles[1].lower:
-        bottoms.append(candles[0])
-
-    for i in range(1, len(candles) - 1):
-        if (
-            candles[i].lower <= candles[i - 1].lower
-            and candles[i].lower <= candles[i + 1].lower
-        ):
-            bottoms.append(candles[i])
-
-    if candles[-1].lower <= candles[-2].lower:
-        bottoms.append(candles[-1])
-    # Check if there are two bottoms within one tick spread
-    for i in range(len(bottoms)):
-        for j in range(i + 1, len(bottoms)):
-            if round(abs(bottoms[i].lower - bottoms[j].lower), 4) <= tick:
-                return bottoms[i]
-    return None
+    bottoms = (pivots if pivots is not None else find_pivots(candles)).bottoms
+    return _first_near_equal(
+        bottoms, [bottom.lower for bottom in bottoms], tick
+    )
 
 
 def bollinger_bands(
@@ -82,8 +107,14 @@ def bollinger_bands(
 ) -> BollingerBands:
     candles = candles[:period]
     closes = list(map(lambda x: x.close, candles))
-    std = numpy.std(closes)
-    avg = numpy.average(closes)
+    return _bands(numpy.average(closes), numpy.std(closes), multiply_std)
+
+
+def _bands(
+    avg: numpy.floating, std: numpy.floating, multiply_std: float
+) -> BollingerBands:
+    # avg and std stay numpy scalars: round() on them is numpy's rounding,
+    # which is what the bands have always been rounded with.
     return BollingerBands(
         bottom=float(round(avg - multiply_std * std, 4)),
         up=float(round(avg + multiply_std * std, 4)),
@@ -128,12 +159,92 @@ COMBO_STRONG_SIGNAL_MIN = 4
 COMBO_MIN_CANDLES = 235
 
 
-def mm50_touch(candles: List[Candle]) -> Optional[Dict[str, float]]:
+class FeatureFrame:
+    """
+    The indicators the alert detectors read, computed once per candle set.
+
+    Each detector used to walk and slice the same candles on its own, so the
+    ma50 was rebuilt by the scan, by mm50_touch and by combo, and every mm7
+    of a streak copied the candle list again. The frame keeps the closes
+    once and memoizes every (period, offset) average, the bollinger
+    mean/deviation per offset, the atr, the pivots and the inside-bar flags.
+    Adding a detector then costs lookups rather than another pass.
+
+    Averages and bands use the same arithmetic as mobile_average and
+    bollinger_bands on the same slices, so a detector reading the frame
+    gets bit for bit the values it computed before.
+    """
+
+    def __init__(self, candles: List[Candle]) -> None:
+        self.candles = candles
+        self.closes = [candle.close for candle in candles]
+        self._averages: Dict[Tuple[int, int], float] = {}
+        self._deviations: Dict[
+            Tuple[int, int], Tuple[numpy.floating, numpy.floating]
+        ] = {}
+
+    def mobile_average(self, period: int, offset: int = 0) -> float:
+        """The ma of `period` closes starting at candles[offset]."""
+        key = (period, offset)
+        if key not in self._averages:
+            if len(self.closes) - offset < period:
+                Logger.get_logger("mobile_average").error(
+                    "Missing candles to calculate"
+                    f" the ma {max(len(self.closes) - offset, 0)}, {period}"
+                )
+                raise SaxoException("Missing candles to calcule the ma")
+            self._averages[key] = (
+                sum(self.closes[offset : offset + period]) / period
+            )
+        return self._averages[key]
+
+    def bollinger_bands(
+        self, multiply_std: float = 2.0, offset: int = 0, period: int = 20
+    ) -> BollingerBands:
+        """The bands as bollinger_bands(candles[offset:]) would give them."""
+        key = (period, offset)
+        if key not in self._deviations:
+            closes = self.closes[offset : offset + period]
+            self._deviations[key] = (
+                numpy.average(closes),
+                numpy.std(closes),
+            )
+        avg, std = self._deviations[key]
+        return _bands(avg, std, multiply_std)
+
+    @cached_property
+    def ma50_slope(self) -> float:
+        """Slope of the ma50 over the last 10 candles, needs 60 of them."""
+        return slope_percentage(
+            0, self.mobile_average(50, 10), 10, self.mobile_average(50)
+        )
+
+    @cached_property
+    def atr(self) -> float:
+        return average_true_range(self.candles)
+
+    @cached_property
+    def pivots(self) -> Pivots:
+        return find_pivots(self.candles)
+
+    @cached_property
+    def inside_bars(self) -> List[bool]:
+        """inside_bars[i] is true when candles[i] is inside candles[i + 1]."""
+        return [
+            current.lower > previous.lower and current.higher < previous.higher
+            for current, previous in zip(self.candles, self.candles[1:])
+        ]
+
+
+def mm50_touch(
+    candles: List[Candle], frame: Optional[FeatureFrame] = None
+) -> Optional[Dict[str, float]]:
     if len(candles) < 60:
         return None
-    ma50_last = mobile_average(candles, 50)
-    ma50_first = mobile_average(candles[10:], 50)
-    slope = slope_percentage(0, ma50_first, 10, ma50_last)
+    if frame is None:
+        frame = FeatureFrame(candles)
+    ma50_last = frame.mobile_average(50)
+    slope = frame.ma50_slope
     close = candles[0].close
     if abs(close - ma50_last) / ma50_last > MM50_TOUCH_PROXIMITY:
         return None
@@ -147,27 +258,26 @@ def mm50_touch(candles: List[Candle]) -> Optional[Dict[str, float]]:
     }
 
 
-def _mm7_at(candles: List[Candle], offset: int) -> float:
+def _mm7_at(frame: FeatureFrame, offset: int) -> float:
     """
     The MM7 as it stood at candles[offset], i.e. that candle and the 6 older
-    ones. Newest is index 0, so dropping the first `offset` entries walks
-    backwards in time and `mobile_average` then reads the 7 newest of what
-    remains - candles[offset:offset+7]. Same idiom as mm50_touch's
-    mobile_average(candles[10:], 50) for the MA50 of 10 candles ago.
+    ones. Newest is index 0, so the average at `offset` walks backwards in
+    time and reads candles[offset:offset+7]. Same idiom as mm50_touch's
+    ma50 of 10 candles ago.
     """
-    return mobile_average(candles[offset:], MM7_PERIOD)
+    return frame.mobile_average(MM7_PERIOD, offset)
 
 
-def _mm7_streak(candles: List[Candle], direction: Direction) -> int:
+def _mm7_streak(frame: FeatureFrame, direction: Direction) -> int:
     """
     Number of consecutive candles before the break that closed on the side the
     price is leaving. Stops as soon as the history runs short of a full MM7.
     """
     streak = 0
     offset = 1
-    while len(candles) - offset >= MM7_PERIOD:
-        mm7 = _mm7_at(candles, offset)
-        close = candles[offset].close
+    while len(frame.closes) - offset >= MM7_PERIOD:
+        mm7 = _mm7_at(frame, offset)
+        close = frame.closes[offset]
         on_previous_side = (
             close >= mm7 if direction == Direction.SELL else close <= mm7
         )
@@ -178,7 +288,9 @@ def _mm7_streak(candles: List[Candle], direction: Direction) -> int:
     return streak
 
 
-def mm7_break(candles: List[Candle]) -> Optional[Dict[str, Any]]:
+def mm7_break(
+    candles: List[Candle], frame: Optional[FeatureFrame] = None
+) -> Optional[Dict[str, Any]]:
     """
     Detect the last candle closing through the 7-period mobile average.
 
@@ -189,8 +301,10 @@ def mm7_break(candles: List[Candle]) -> Optional[Dict[str, Any]]:
     """
     if len(candles) < MM7_BREAK_MIN_CANDLES:
         return None
+    if frame is None:
+        frame = FeatureFrame(candles)
 
-    mm7 = _mm7_at(candles, 0)
+    mm7 = _mm7_at(frame, 0)
     close = candles[0].close
     distance = (close - mm7) / mm7
 
@@ -201,7 +315,7 @@ def mm7_break(candles: List[Candle]) -> Optional[Dict[str, Any]]:
     else:
         return None
 
-    streak = _mm7_streak(candles, direction)
+    streak = _mm7_streak(frame, direction)
     if streak < MM7_BREAK_MIN_STREAK:
         return None
 
@@ -209,7 +323,7 @@ def mm7_break(candles: List[Candle]) -> Optional[Dict[str, Any]]:
         "close": close,
         "mm7": mm7,
         "previous_close": candles[1].close,
-        "previous_mm7": _mm7_at(candles, 1),
+        "previous_mm7": _mm7_at(frame, 1),
         "distance_pct": distance * 100,
         "direction": direction.value,
         "streak": streak,
@@ -296,21 +410,20 @@ class _ComboContext:
     here is satisfied by 60.
     """
 
-    def __init__(self, candles: List[Candle]) -> None:
+    def __init__(self, candles: List[Candle], frame: FeatureFrame) -> None:
         self.candles = candles
-        self.ma50 = mobile_average(candles, 50)
-        ma50_first = mobile_average(candles[10:], 50)
-        self.ma50_slope = slope_percentage(0, ma50_first, 10, self.ma50)
-        self.bb25 = bollinger_bands(candles, 2.5)
-        self.bb25_previous = bollinger_bands(candles[1:], 2.5)
-        self.bb20 = bollinger_bands(candles, 2.0)
-        self.bb20_previous = bollinger_bands(candles[1:], 2.0)
-        bb_first = bollinger_bands(candles[2:], 2.5)
+        self.ma50 = frame.mobile_average(50)
+        self.ma50_slope = frame.ma50_slope
+        self.bb25 = frame.bollinger_bands(2.5)
+        self.bb25_previous = frame.bollinger_bands(2.5, offset=1)
+        self.bb20 = frame.bollinger_bands(2.0)
+        self.bb20_previous = frame.bollinger_bands(2.0, offset=1)
+        bb_first = frame.bollinger_bands(2.5, offset=2)
         self.bbh_slope = slope_percentage(0, bb_first.up, 3, self.bb25.up)
         self.bbb_slope = slope_percentage(
             0, bb_first.bottom, 3, self.bb25.bottom
         )
-        atr = average_true_range(candles)
+        atr = frame.atr
         self.margin_band = atr * COMBO_ATR_BB_MARGIN
         self.margin_ma50 = atr * COMBO_ATR_MA50_MARGIN
         self._macd0lag: Optional[Tuple[float, float]] = None
@@ -424,7 +537,9 @@ def _combo_for_direction(
     return combo_signal
 
 
-def combo(candles: List[Candle]) -> Optional[ComboSignal]:
+def combo(
+    candles: List[Candle], frame: Optional[FeatureFrame] = None
+) -> Optional[ComboSignal]:
     logger = Logger.get_logger("combo")
     if len(candles) < COMBO_MIN_CANDLES:
         logger.debug(
@@ -435,7 +550,9 @@ def combo(candles: List[Candle]) -> Optional[ComboSignal]:
     logger.debug(
         f"do we have a combo {candles[0].ut} at the date {candles[0].date} ?"
     )
-    context = _ComboContext(candles)
+    context = _ComboContext(
+        candles, frame if frame is not None else FeatureFrame(candles)
+    )
     if context.neither_bb_flat:
         logger.debug(
             f"BB bands are not flat bbh={context.bbh_slope},"
@@ -673,13 +790,17 @@ def inside_bar(candles: List[Candle]) -> bool:
     )
 
 
-def double_inside_bar(candles: List[Candle]) -> bool:
+def double_inside_bar(
+    candles: List[Candle], frame: Optional[FeatureFrame] = None
+) -> bool:
     if len(candles) < 3:
         Logger.get_logger("double_inside_bar").error(
             f"Missing candles to calculate a double_inside_bar {len(candles)}"
         )
         raise SaxoException("Missing candles")
-    return inside_bar(candles) and inside_bar(candles[1:])
+    if frame is None:
+        return inside_bar(candles) and inside_bar(candles[1:])
+    return frame.inside_bars[0] and frame.inside_bars[1]
 
 
 def number_of_day_between_dates(
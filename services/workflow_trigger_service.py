@@ -1,5 +1,7 @@
+import asyncio
 import datetime
 import logging
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
@@ -79,6 +81,17 @@ def _build_trigger(
     )
 
 
+@dataclass
+class TodaysOrders:
+    """The day's workflow orders and the workflows they belong to."""
+
+    orders: List[Dict[str, Any]] = field(default_factory=list)
+    workflows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Timestamp the window was closed at when the orders were read; orders
+    # placed after it are picked up by refresh_todays_orders.
+    until: int = 0
+
+
 async def collect_todays_triggers(
     dynamodb_client: Any, run_date: str, alerts: List[Alert]
 ) -> Dict[str, List[WorkflowTrigger]]:
@@ -87,34 +100,115 @@ async def collect_todays_triggers(
     Returns an empty mapping on any failure: the digest must be identical to
     what it would have been without this enrichment.
     """
+    if not alerts:
+        return {}
+    return resolve_todays_triggers(
+        await prefetch_todays_orders(dynamodb_client, run_date), alerts
+    )
+
+
+async def prefetch_todays_orders(
+    dynamodb_client: Any, run_date: str
+) -> Optional[TodaysOrders]:
+    """Load the day's workflow orders before the alerts they match exist.
+
+    Nothing here depends on the scan, so the alerting run starts it
+    alongside the scan and only resolve_todays_triggers waits for the last
+    asset. This is the one full read of the orders table. The session
+    window closes when it runs: orders placed while the scan is still
+    going are added by refresh_todays_orders. Returns None on any failure,
+    which resolve_todays_triggers turns into no triggers.
+    """
     try:
-        return await _collect(dynamodb_client, run_date, alerts)
+        start, end = _session_window(run_date)
+        orders, workflows = await asyncio.gather(
+            dynamodb_client.get_all_workflow_orders(),
+            dynamodb_client.get_all_workflows(),
+        )
     except Exception as e:
         logger.warning(f"Workflow trigger collection failed, skipping: {e}")
-        return {}
+        return None
+    return TodaysOrders(
+        orders=[
+            order
+            for order in orders
+            if start <= int(order.get("placed_at", 0)) <= end
+        ],
+        workflows=_build_workflow_map(workflows),
+        until=end,
+    )
 
 
-async def _collect(
-    dynamodb_client: Any, run_date: str, alerts: List[Alert]
+async def refresh_todays_orders(
+    dynamodb_client: Any,
+    run_date: str,
+    todays_orders: Optional[TodaysOrders],
+) -> Optional[TodaysOrders]:
+    """Close the window now, once the scan is over: the orders placed since
+    the prefetch are added to it - the workflows scheduled while the
+    alerting runs place theirs during the scan.
+
+    This runs after the scan, on the path to the digest, so it only reads
+    the tail: placed_at is the sort key of the orders table, and each
+    prefetched workflow is queried for the orders placed after the
+    prefetch. A workflow created during the scan is left to the next run.
+    A failed prefetch is retried whole; a failed refresh keeps what the
+    prefetch read."""
+    if todays_orders is None:
+        return await prefetch_todays_orders(dynamodb_client, run_date)
+    try:
+        _, end = _session_window(run_date)
+        tails = await asyncio.gather(
+            *(
+                dynamodb_client.get_workflow_orders(
+                    workflow_id, placed_after=todays_orders.until
+                )
+                for workflow_id in todays_orders.workflows
+            )
+        )
+    except Exception as e:
+        logger.warning(f"Workflow order refresh failed, skipping: {e}")
+        return todays_orders
+    tail = sorted(
+        (
+            order
+            for orders in tails
+            for order in orders
+            if int(order.get("placed_at", 0)) <= end
+        ),
+        key=lambda order: int(order.get("placed_at", 0)),
+    )
+    return TodaysOrders(
+        orders=todays_orders.orders + tail,
+        workflows=todays_orders.workflows,
+        until=end,
+    )
+
+
+def resolve_todays_triggers(
+    todays_orders: Optional[TodaysOrders], alerts: List[Alert]
 ) -> Dict[str, List[WorkflowTrigger]]:
-    if not alerts:
+    """Match prefetched orders to the alert assets, {} on any failure."""
+    if todays_orders is None:
         return {}
+    try:
+        return _resolve(todays_orders, alerts)
+    except Exception as e:
+        logger.warning(f"Workflow trigger collection failed, skipping: {e}")
+        return {}
+
 
-    start, end = _session_window(run_date)
-    orders = await dynamodb_client.get_all_workflow_orders()
-    todays_orders = [
-        order
-        for order in orders
-        if start <= int(order.get("placed_at", 0)) <= end
-    ]
-    if not todays_orders:
+def _resolve(
+    todays_orders: TodaysOrders, alerts: List[Alert]
+) -> Dict[str, List[WorkflowTrigger]]:
+    if not alerts or not todays_orders.orders:
         return {}
 
-    workflows = _build_workflow_map(await dynamodb_client.get_all_workflows())
+    workflows: Dict[Any, Dict[str, Any]] = todays_orders.workflows
     alert_ids = _index_to_alert_id(alerts)
 
     triggers: Dict[str, List[WorkflowTrigger]] = {}
-    for order in todays_orders:
+    for order in todays_orders.orders:
         workflow = workflows.get(order.get("workflow_id"))
         if workflow is None:
             logger.info(
@@ -1,24 +1,31 @@
+import dataclasses
 import datetime
+import json
 from unittest.mock import MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from api.main import app
-from api.routers.backtest import get_backtest_service
+from api.routers.backtest import get_backtest_job_runner, get_backtest_service
 from api.services.backtest import BacktestService
+from api.services.backtest.jobs import BacktestJobRunner
 from model import (
     BacktestDefinition,
+    BacktestJob,
+    BacktestJobStatus,
     BacktestParameters,
     BacktestRunResult,
     BacktestSummary,
     Candle,
     DayResult,
     DayResultSummary,
+    SweepResult,
     Trade,
     UnitTime,
 )
 from model.enum import DayStatus, ExitReason
+from utils.exception import SaxoException
 
 client = TestClient(app)
 
@@ -259,6 +266,89 @@ class TestGetBacktestRun:
         mock_backtest_service.run_range.assert_not_called()
 
 
+def _summary(final_result: float) -> BacktestSummary:
+    return BacktestSummary(
+        definition_code="B9H",
+        start_date=datetime.date(2026, 6, 1),
+        end_date=datetime.date(2026, 6, 12),
+        number_of_days=10,
+        number_of_trades=4,
+        number_of_winning_positions=2,
+        number_of_losing_positions=2,
+        number_of_be=0,
+        average_win=None,
+        average_loss=None,
+        final_result=final_result,
+    )
+
+
+class TestPostBacktestSweep:
+    def test_grid_is_expanded_and_ranked_results_cut_to_top(
+        self, mock_backtest_service
+    ):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_backtest_service.sweep.return_value = [
+            SweepResult(BacktestParameters(stop_loss_points=30), _summary(60)),
+            SweepResult(BacktestParameters(stop_loss_points=20), _summary(10)),
+        ]
+
+        response = client.post(
+            "/api/backtest/sweep",
+            json={
+                "definition": "B9H",
+                "start_date": "2026-06-01",
+                "end_date": "2026-06-12",
+                "stop_loss_points": [20, 30],
+                "break_even_trigger_points": [10],
+                "top": 1,
+            },
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["combinations"] == 2
+        assert len(body["results"]) == 1
+        assert body["results"][0]["parameters"]["stop_loss_points"] == 30
+        assert body["results"][0]["summary"]["final_result"] == 60
+        grid = mock_backtest_service.sweep.call_args.args[3]
+        assert [p.stop_loss_points for p in grid] == [20, 30]
+        assert {p.break_even_trigger_points for p in grid} == {10}
+        assert {p.max_entry_distance_points for p in grid} == {20}
+
+    def test_non_positive_value_returns_422(self, mock_backtest_service):
+        response = client.post(
+            "/api/backtest/sweep",
+            json={
+                "definition": "B9H",
+                "start_date": "2026-06-01",
+                "end_date": "2026-06-12",
+                "stop_loss_points": [0],
+            },
+        )
+
+        assert response.status_code == 422
+        mock_backtest_service.sweep.assert_not_called()
+
+    def test_oversized_grid_returns_400(self, mock_backtest_service):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        values = list(range(1, 20))
+
+        response = client.post(
+            "/api/backtest/sweep",
+            json={
+                "definition": "B9H",
+                "start_date": "2026-06-01",
+                "end_date": "2026-06-12",
+                "stop_loss_points": values,
+                "take_profit_offset_points": values,
+                "break_even_trigger_points": values,
+            },
+        )
+
+        assert response.status_code == 400
+        mock_backtest_service.sweep.assert_not_called()
+
+
 class TestGetBacktestDayCsv:
     def test_traded_day_returns_csv(self, mock_backtest_service):
         mock_backtest_service.get_definition.return_value = _b9h_definition()
@@ -467,6 +557,250 @@ class TestGetBacktestRunCsv:
         mock_backtest_service.run_range.assert_not_called()
 
 
+def _streamed_items():
+    """What BacktestService.stream_range yields: the day rows, then the
+    summary."""
+    day = DayResultSummary(
+        date=datetime.date(2026, 6, 2),
+        status=DayStatus.TRADED,
+        trade_count=1,
+        points=30.0,
+        h1_high=8050.0,
+        h1_low=8000.0,
+        mm50_slope=1.2345,
+        adx14=27.5,
+        h1_open=8020.0,
+        overnight_gap=-12.5,
+    )
+    summary = BacktestSummary(
+        definition_code="B9H",
+        start_date=datetime.date(2026, 6, 1),
+        end_date=datetime.date(2026, 6, 2),
+        number_of_days=1,
+        number_of_trades=1,
+        number_of_winning_positions=1,
+        number_of_losing_positions=0,
+        number_of_be=0,
+        average_win=30.0,
+        average_loss=None,
+        final_result=30.0,
+    )
+
+    async def items():
+        yield day
+        yield summary
+
+    return items()
+
+
+RUN_PARAMS = {
+    "definition": "B9H",
+    "start_date": "2026-06-01",
+    "end_date": "2026-06-02",
+}
+
+
+class TestGetBacktestRunStream:
+    def test_one_line_per_day_then_the_summary(self, mock_backtest_service):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_backtest_service.stream_range.return_value = _streamed_items()
+
+        response = client.get("/api/backtest/run/stream", params=RUN_PARAMS)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(
+            "application/x-ndjson"
+        )
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["day", "summary"]
+        assert lines[0]["date"] == "2026-06-02"
+        assert lines[0]["status"] == "traded"
+        assert lines[1]["final_result"] == 30.0
+
+    def test_unrunnable_definition_returns_400(self, mock_backtest_service):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_backtest_service.stream_range.side_effect = SaxoException(
+            "not implemented"
+        )
+
+        response = client.get("/api/backtest/run/stream", params=RUN_PARAMS)
+
+        assert response.status_code == 400
+
+    def test_end_before_start_returns_400(self, mock_backtest_service):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+
+        response = client.get(
+            "/api/backtest/run/stream",
+            params={**RUN_PARAMS, "start_date": "2026-06-10"},
+        )
+
+        assert response.status_code == 400
+        mock_backtest_service.stream_range.assert_not_called()
+
+
+class TestGetBacktestRunCsvStream:
+    def test_rows_then_the_summary_block(self, mock_backtest_service):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_backtest_service.stream_range.return_value = _streamed_items()
+
+        response = client.get(
+            "/api/backtest/run/csv/stream", params=RUN_PARAMS
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert (
+            'attachment; filename="backtest-B9H-2026-06-01-2026-06-02.csv"'
+            in response.headers["content-disposition"]
+        )
+        body = response.text
+        assert "stop_loss_points,50" in body
+        # The same rows as the buffered export, the summary after them
+        assert body.index(
+            "2026-06-02,traded,1,30.0,8050.0,8000.0,50.0,1.2345,27.5,"
+            "8020.0,-12.5"
+        ) < body.index("summary,value")
+        assert "final_result,30.0" in body
+        assert "average_loss," in body
+
+
+def _job(**overrides) -> BacktestJob:
+    job = BacktestJob(
+        job_id="abc",
+        key="key",
+        definition_code="B9H",
+        start_date=datetime.date(2026, 6, 1),
+        end_date=datetime.date(2026, 6, 2),
+        params=BacktestParameters(),
+        days_total=2,
+    )
+    return dataclasses.replace(job, **overrides)
+
+
+@pytest.fixture
+def mock_job_runner():
+    job_runner = MagicMock(spec=BacktestJobRunner)
+    app.dependency_overrides[get_backtest_job_runner] = lambda: job_runner
+    yield job_runner
+    app.dependency_overrides.clear()
+
+
+class TestBacktestJobs:
+    def test_submit_returns_the_job(
+        self, mock_backtest_service, mock_job_runner
+    ):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_job_runner.submit.return_value = _job()
+
+        response = client.post(
+            "/api/backtest/jobs",
+            params={**RUN_PARAMS, "stop_loss_points": 30},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["job_id"] == "abc"
+        assert response.json()["status"] == "pending"
+        args = mock_job_runner.submit.call_args.args
+        assert args[2:4] == (
+            datetime.date(2026, 6, 1),
+            datetime.date(2026, 6, 2),
+        )
+        assert args[4].stop_loss_points == 30
+
+    def test_unrunnable_definition_returns_400(
+        self, mock_backtest_service, mock_job_runner
+    ):
+        mock_backtest_service.get_definition.return_value = _b9h_definition()
+        mock_job_runner.submit.side_effect = SaxoException("no engine")
+
+        response = client.post("/api/backtest/jobs", params=RUN_PARAMS)
+
+        assert response.status_code == 400
+
+    def test_poll(self, mock_job_runner):
+        mock_job_runner.get.return_value = _job(
+            status=BacktestJobStatus.RUNNING,
+            days_done=1,
+            last_date=datetime.date(2026, 6, 1),
+        )
+
+        response = client.get("/api/backtest/jobs/abc")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "running"
+        assert body["days_done"] == 1
+        assert body["days_total"] == 2
+        assert body["last_date"] == "2026-06-01"
+        assert body["parameters"]["stop_loss_points"] == 50
+
+    def test_unknown_job_returns_404(self, mock_job_runner):
+        mock_job_runner.get.return_value = None
+
+        assert client.get("/api/backtest/jobs/nope").status_code == 404
+        assert client.get("/api/backtest/jobs/nope/result").status_code == 404
+        assert client.get("/api/backtest/jobs/nope/stream").status_code == 404
+
+    def test_result_of_a_done_job(self, mock_job_runner):
+        result = BacktestRunResult(
+            summary=BacktestSummary(
+                definition_code="B9H",
+                start_date=datetime.date(2026, 6, 1),
+                end_date=datetime.date(2026, 6, 2),
+                number_of_days=0,
+                number_of_trades=0,
+                number_of_winning_positions=0,
+                number_of_losing_positions=0,
+                number_of_be=0,
+                average_win=None,
+                average_loss=None,
+                final_result=0.0,
+            )
+        )
+        mock_job_runner.get.return_value = _job(
+            status=BacktestJobStatus.DONE, result=result
+        )
+
+        response = client.get("/api/backtest/jobs/abc/result")
+
+        assert response.status_code == 200
+        assert response.json()["summary"]["definition_code"] == "B9H"
+        assert response.json()["days"] == []
+
+    @pytest.mark.parametrize(
+        "status", [BacktestJobStatus.RUNNING, BacktestJobStatus.FAILED]
+    )
+    def test_no_result_before_done(self, mock_job_runner, status):
+        mock_job_runner.get.return_value = _job(status=status, error="boom")
+
+        response = client.get("/api/backtest/jobs/abc/result")
+
+        assert response.status_code == 409
+
+    def test_stream_the_progress(self, mock_job_runner):
+        updates = [
+            _job(status=BacktestJobStatus.RUNNING, days_done=1),
+            _job(status=BacktestJobStatus.DONE, days_done=2),
+        ]
+
+        async def progress(job_id):
+            for update in updates:
+                yield update
+
+        mock_job_runner.get.return_value = updates[0]
+        mock_job_runner.progress.side_effect = progress
+
+        response = client.get("/api/backtest/jobs/abc/stream")
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [(line["status"], line["days_done"]) for line in lines] == [
+            ("running", 1),
+            ("done", 2),
+        ]
+
+
 class TestBacktestParameters:
     def test_omitted_params_default_to_the_strategy_thresholds(
         self, mock_backtest_service
@@ -7,6 +7,7 @@ from fastapi.testclient import TestClient
 from api.main import app
 from api.routers.trade_republic import get_trade_republic_service
 from api.services.trade_republic_service import TradeRepublicService
+from client.gsheet_client import EtfDcaRows
 
 client = TestClient(app)
 
@@ -29,7 +30,9 @@ def _clear_overrides():
 def real_trade_republic_service() -> TradeRepublicService:
     """Real service (parsing has no external dependency) with a mocked
     GSheetClient, since export isn't exercised by these upload tests."""
-    service = TradeRepublicService(MagicMock())
+    gsheet_client = MagicMock()
+    gsheet_client.get_etf_dca_rows.return_value = EtfDcaRows()
+    service = TradeRepublicService(gsheet_client)
     app.dependency_overrides[get_trade_republic_service] = lambda: service
     return service
 
@@ -0,0 +1,254 @@
+"""Multi-year synthetic market for the backtest benchmarks.
+
+Stretches the golden market (market_fixture) over years rather than
+weeks: its series are pure functions of (instrument, date), so the
+session definitions read the same H1 / 5-minute / daily shapes, just more
+of them. The combo definitions read a continuous series over the CFD
+session, which the golden market has no equivalent of; it is walked
+here in the same way, one seeded walk per day and timeframe.
+
+Every candle is generated once and memoized, so a timed run measures the
+backtest engine rather than the random walk feeding it.
+"""
+
+import datetime
+import math
+from typing import Callable, Dict, List, Tuple
+from unittest.mock import MagicMock
+
+from api.services.backtest.calendar import (
+    paris_session_end_utc,
+    paris_session_start_utc,
+)
+from api.services.backtest.combo_candle_source import (
+    LEAD_IN_MAX_CALENDAR_DAYS,
+)
+from model import BacktestDefinition, Candle, DaxCfdMarket, UnitTime
+from services.candles_service import CandlesService
+from tests.api.services.backtest.market_fixture import (
+    H1_SESSION_CANDLES,
+    INSTRUMENT_PROFILE,
+    NO_DATA_DATES,
+    _rng,
+    _session_open_price,
+    _walk,
+    daily_candles,
+    h1_reference_candle,
+    h1_session_candles,
+    m5_session_candles,
+)
+from utils.helper import last_session_close
+
+# Two years of weekdays ending on the golden range's first day
+BENCHMARK_START = datetime.date(2024, 3, 4)
+BENCHMARK_END = datetime.date(2026, 2, 27)
+
+# Calendar days generated ahead of the range: the regime filters' MA50
+# and ADX history, and the intraday combo series' lead-in. The daily
+# series reaches further back, see LEAD_IN_MAX_CALENDAR_DAYS.
+LEAD_IN_DAYS = 120
+
+SERIES_MINUTES = {
+    UnitTime.M5: 5,
+    UnitTime.M15: 15,
+    UnitTime.H1: 60,
+    UnitTime.D: 1440,
+}
+
+
+def weekdays(
+    start_date: datetime.date, end_date: datetime.date
+) -> List[datetime.date]:
+    days = []
+    current = start_date
+    while current <= end_date:
+        if current.weekday() < 5:
+            days.append(current)
+        current += datetime.timedelta(days=1)
+    return days
+
+
+def series_day_candles(
+    instrument: str, ut: UnitTime, d: datetime.date
+) -> List[Candle]:
+    """The day's CFD session (02:00-22:00 Paris) at `ut`, opening at the
+    golden market's level for the day. The step sigma grows with the
+    square root of the timeframe, as a random walk's would. A daily
+    series is the session as one bar, dated at midnight UTC as Saxo
+    dates it."""
+    _, sigma = INSTRUMENT_PROFILE[instrument]
+    start = paris_session_start_utc(d, DaxCfdMarket())
+    end = paris_session_end_utc(d, DaxCfdMarket())
+    if ut == UnitTime.D:
+        minutes = int((end - start).total_seconds() // 60)
+        start = datetime.datetime.combine(d, datetime.time())
+        steps = 1
+    else:
+        minutes = SERIES_MINUTES[ut]
+        steps = int((end - start).total_seconds() // (60 * minutes))
+    bars = _walk(
+        _rng(instrument, d, f"series-{ut.value}"),
+        _session_open_price(instrument, d),
+        sigma * math.sqrt(minutes / 5),
+        steps,
+    )
+    return [
+        Candle(
+            lower=bar[2],
+            higher=bar[1],
+            open=bar[0],
+            close=bar[3],
+            ut=ut,
+            date=start + datetime.timedelta(minutes=minutes * index),
+        )
+        for index, bar in enumerate(bars)
+    ]
+
+
+class _Memo:
+    """Each generated day, by (instrument, series, date)."""
+
+    def __init__(self) -> None:
+        self.days: Dict[Tuple[str, str, datetime.date], List[Candle]] = {}
+
+    def get(
+        self,
+        instrument: str,
+        series: str,
+        d: datetime.date,
+        generate: Callable[[], List[Candle]],
+    ) -> List[Candle]:
+        key = (instrument, series, d)
+        if key not in self.days:
+            self.days[key] = generate()
+        return self.days[key]
+
+
+def _in_range(
+    day_candles: Callable[[str, UnitTime, datetime.date], List[Candle]],
+) -> Callable[..., List[Candle]]:
+    def get_candles_in_range(code, ut, horizon, start, end):
+        candles = []
+        for offset in range((end.date() - start.date()).days + 1):
+            trading_date = start.date() + datetime.timedelta(days=offset)
+            if trading_date.weekday() < 5:
+                candles.extend(day_candles(code, ut, trading_date))
+        return [candle for candle in candles if start <= candle.date < end]
+
+    return get_candles_in_range
+
+
+def session_candles_service() -> MagicMock:
+    """golden_candles_service, memoized: the same candles at any range."""
+    service = MagicMock(spec=CandlesService)
+    memo = _Memo()
+
+    def day_candles(code, ut, trading_date):
+        if trading_date in NO_DATA_DATES:
+            return []
+        if ut == UnitTime.H1:
+            return memo.get(
+                code,
+                "h1",
+                trading_date,
+                lambda: [h1_reference_candle(code, trading_date)],
+            )
+        return memo.get(
+            code,
+            "m5",
+            trading_date,
+            lambda: m5_session_candles(code, trading_date),
+        )
+
+    def h1_candles(
+        code: str, end_date: datetime.date, count: int
+    ) -> List[Candle]:
+        candles: List[Candle] = []
+        current = end_date
+        while len(candles) < count:
+            if current.weekday() < 5:
+                session = memo.get(
+                    code,
+                    "h1session",
+                    current,
+                    lambda: h1_session_candles(code, current),
+                )
+                candles.extend(reversed(session))
+            current -= datetime.timedelta(days=1)
+        return candles[:count]
+
+    def build_candles(code, ut, market, count, reference):
+        if ut == UnitTime.H1:
+            return h1_candles(
+                code, last_session_close(reference, market).date(), count
+            )
+        return daily_candles(code, reference.date(), count)
+
+    service.get_candles_in_window.side_effect = (
+        lambda code, ut, horizon, start, end: day_candles(
+            code, ut, start.date()
+        )
+    )
+    service.get_candles_in_range.side_effect = _in_range(day_candles)
+    service.build_candles.side_effect = build_candles
+    return service
+
+
+def series_candles_service() -> MagicMock:
+    """A CandlesService stub serving the combo series, memoized."""
+    service = MagicMock(spec=CandlesService)
+    memo = _Memo()
+
+    def day_candles(code, ut, trading_date):
+        return memo.get(
+            code,
+            ut.value,
+            trading_date,
+            lambda: series_day_candles(code, ut, trading_date),
+        )
+
+    get_candles_in_range = _in_range(day_candles)
+    service.get_candles_in_range.side_effect = get_candles_in_range
+    service.get_candles_in_window.side_effect = get_candles_in_range
+    return service
+
+
+def candles_service_for(definition: BacktestDefinition) -> MagicMock:
+    if definition.combo_entry:
+        return series_candles_service()
+    return session_candles_service()
+
+
+def prefetch(
+    service: MagicMock,
+    definition: BacktestDefinition,
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> None:
+    """Generate every day a run over [start_date, end_date] reads, lead-in
+    included, so none of it is generated inside a timed run."""
+    lead_in_days = LEAD_IN_DAYS
+    if definition.combo_entry and definition.unit_time is not None:
+        lead_in_days = max(
+            lead_in_days, LEAD_IN_MAX_CALENDAR_DAYS[definition.unit_time]
+        )
+    start = datetime.datetime.combine(
+        start_date - datetime.timedelta(days=lead_in_days), datetime.time()
+    )
+    end = datetime.datetime.combine(
+        end_date + datetime.timedelta(days=1), datetime.time()
+    )
+    if definition.combo_entry:
+        service.get_candles_in_range(
+            definition.instrument, definition.unit_time, 0, start, end
+        )
+        return
+    for ut in (UnitTime.H1, UnitTime.M5):
+        service.get_candles_in_range(definition.instrument, ut, 0, start, end)
+    service.build_candles(
+        definition.instrument,
+        UnitTime.H1,
+        definition.market,
+        len(weekdays(start.date(), end_date)) * H1_SESSION_CANDLES,
+        end,
+    )
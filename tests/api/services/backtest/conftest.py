@@ -0,0 +1,12 @@
+import pytest
+
+from api.services.backtest.candle_source import DAY_CANDLE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def empty_day_candle_cache():
+    """The day cache outlives a test like it outlives an API request;
+    every test starts from a cold process."""
+    DAY_CANDLE_CACHE.clear()
+    yield
+    DAY_CANDLE_CACHE.clear()
@@ -15,6 +15,7 @@ from model import (
     BacktestDefinition,
     BacktestParameters,
     Candle,
+    DaxCfdMarket,
     EuCfdMarket,
     Trade,
     UnitTime,
@@ -158,6 +159,18 @@ MM50_DAILY_DEFINITION = BacktestDefinition(
     max_daily_losses=2,
     ma50_direction_filter=UnitTime.D,
 )
+# The combo backtest (spec 026) on its middle timeframe.
+COMBO_DEFINITION = BacktestDefinition(
+    code="C15M",
+    name="Combo GER40 15m",
+    display_name="GER40 Combo 15m",
+    instrument="GER40.I",
+    market=DaxCfdMarket(),
+    default_parameters=BacktestParameters(stop_loss_points=50),
+    double_take_profit=True,
+    unit_time=UnitTime.M15,
+    combo_entry=True,
+)
 GER_PARAMS = GER_DEFINITION.default_parameters
 
 # The impulsive variant needs an H1 range wider than 70 points to trade at
@@ -365,6 +378,7 @@ async def run_impulsive_double(
 
 
 __all__ = [
+    "COMBO_DEFINITION",
     "DEFINITION",
     "GER_DEFINITION",
     "GER_PARAMS",
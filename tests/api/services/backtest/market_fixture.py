@@ -201,14 +201,24 @@ def golden_candles_service() -> MagicMock:
     """A CandlesService stub serving the synthetic market."""
     service = MagicMock(spec=CandlesService)
 
-    def get_candles_in_window(code, ut, horizon, start, end):
-        trading_date = start.date()
+    def day_candles(code, ut, trading_date):
         if trading_date in NO_DATA_DATES:
             return []
         if ut == UnitTime.H1:
             return [h1_reference_candle(code, trading_date)]
         return m5_session_candles(code, trading_date)
 
+    def get_candles_in_window(code, ut, horizon, start, end):
+        return day_candles(code, ut, start.date())
+
+    def get_candles_in_range(code, ut, horizon, start, end):
+        candles = []
+        for offset in range((end.date() - start.date()).days + 1):
+            trading_date = start.date() + datetime.timedelta(days=offset)
+            if trading_date.weekday() < 5:
+                candles.extend(day_candles(code, ut, trading_date))
+        return [candle for candle in candles if start <= candle.date < end]
+
     def build_candles(code, ut, market, count, reference):
         if ut == UnitTime.H1:
             # Anchored like the real builder: the fetch's reference sits
@@ -220,5 +230,6 @@ def golden_candles_service() -> MagicMock:
         return daily_candles(code, reference.date(), count)
 
     service.get_candles_in_window.side_effect = get_candles_in_window
+    service.get_candles_in_range.side_effect = get_candles_in_range
     service.build_candles.side_effect = build_candles
     return service
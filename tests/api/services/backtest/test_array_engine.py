@@ -0,0 +1,109 @@
+"""The array trade simulator against the candle-by-candle one: the same
+trades, compared exactly, on random sessions for every definition."""
+
+import datetime
+import random
+
+import pytest
+
+from api.services.backtest.array_engine import DayArrays
+from api.services.backtest.definitions import BACKTEST_DEFINITIONS
+from api.services.backtest.session_range import SessionRangeStrategy
+from api.services.backtest.side import LONG, SHORT
+from model import BacktestParameters, Candle, UnitTime
+from tests.api.services.backtest.helpers import (
+    H1_HIGH,
+    H1_LOW,
+    TRADING_DATE,
+    m5_candle,
+    stop_loss_candles,
+)
+
+SESSION_DEFINITIONS = [d for d in BACKTEST_DEFINITIONS if not d.combo_entry]
+
+
+def random_session(rng: random.Random, count: int = 150):
+    """A random walk around the H1 range, wide enough to breach both
+    sides, gap through levels and hit every exit now and then."""
+    candles = []
+    price = rng.uniform(H1_LOW - 20, H1_HIGH + 20)
+    start = datetime.datetime(2026, 6, 2, 8, 0)
+    for index in range(count):
+        open_ = price + rng.choice([0, 0, 0, rng.uniform(-15, 15)])
+        # Now and then an impulsive candle, for the impulsive stops
+        close = open_ + rng.gauss(0, rng.choice([12, 12, 12, 60]))
+        higher = max(open_, close) + abs(rng.gauss(0, 6))
+        lower = min(open_, close) - abs(rng.gauss(0, 6))
+        candles.append(
+            Candle(
+                lower=round(lower, 1),
+                higher=round(higher, 1),
+                open=round(open_, 1),
+                close=round(close, 1),
+                ut=UnitTime.M5,
+                date=start + datetime.timedelta(minutes=5 * index),
+            )
+        )
+        price = close
+    return candles
+
+
+def both_engines(candles, params, definition, side_filter=None):
+    args = (H1_HIGH, H1_LOW, params, definition, TRADING_DATE, side_filter)
+    return (
+        SessionRangeStrategy._simulate_trades(
+            DayArrays(candles, H1_HIGH, H1_LOW), *args
+        ),
+        SessionRangeStrategy._evaluate_trades(candles, *args),
+    )
+
+
+class TestArrayEngine:
+    @pytest.mark.parametrize(
+        "definition", SESSION_DEFINITIONS, ids=lambda d: d.code
+    )
+    def test_random_sessions_give_identical_trades(self, definition):
+        rng = random.Random(definition.code)
+        traded = 0
+        for _ in range(60):
+            candles = random_session(rng)
+            params = BacktestParameters(
+                stop_loss_points=rng.choice([10, 25, 50, 150]),
+                take_profit_offset_points=rng.choice([0.5, 10, 20]),
+                break_even_trigger_points=rng.choice([5, 20, 50]),
+                max_entry_distance_points=rng.choice([10, 20, 40, 200]),
+            )
+            side_filter = rng.choice([None, LONG, SHORT])
+
+            simulated, reference = both_engines(
+                candles, params, definition, side_filter
+            )
+
+            assert simulated == reference
+            traded += bool(reference)
+        assert traded > 10
+
+    def test_position_open_at_the_close_ends_the_day(self):
+        candles = stop_loss_candles()[:3]
+
+        simulated, reference = both_engines(
+            candles, BacktestParameters(), SESSION_DEFINITIONS[0]
+        )
+
+        assert simulated == reference
+        assert len(simulated) == 1
+
+    def test_no_candles_no_trades(self):
+        assert both_engines(
+            [], BacktestParameters(), SESSION_DEFINITIONS[0]
+        ) == ([], [])
+
+    def test_entry_confirmation_needs_a_breach_first(self):
+        # Candidate-like candles without any close below the H1 low
+        candles = [
+            m5_candle(0, 8005, 8010, 8001, 8006),
+            m5_candle(1, 8006, 8015, 8003, 8012),
+        ]
+        day = DayArrays(candles, H1_HIGH, H1_LOW)
+
+        assert day.next_entry(LONG, 0) is None
@@ -0,0 +1,358 @@
+"""Throughput benchmarks for the backtest service.
+
+Runs every registered definition over two years of the synthetic market
+(tests.api.services.backtest.benchmark_market) and times what the
+Backtest menu does with it - run_range, evaluate_day, build_summary and
+the two CSV exports - as trading days per second. Each operation runs
+once to warm up, then REPETITIONS times, and its rate is the best run.
+That rate is compared against the committed baseline and fails when it
+falls below baseline * (1 - tolerance), so a change that slows the
+engine down is noticed the way the golden test notices one that changes
+its results. An operation whose runs spread more than MAX_SPREAD is
+reported but not gated, and so is build_summary, which takes a few
+microseconds.
+
+Timings take seconds to minutes and depend on the machine, so the
+benchmarks are opt-in:
+
+    BACKTEST_BENCHMARK=1 poetry run pytest -s \
+        tests/api/services/backtest/test_backtest_benchmark.py
+
+The tolerance defaults to 0.5 and is read from
+BACKTEST_BENCHMARK_TOLERANCE. Record a new baseline - after an intended
+change, or on the machine the benchmarks run on - with the following,
+which keeps the median rate of RECORDED_PASSES measurements:
+
+    poetry run python -m tests.api.services.backtest.test_backtest_benchmark
+"""
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from api.models.backtest import backtest_run_result_to_csv, day_result_to_csv
+from api.services.backtest import (
+    BACKTEST_DEFINITIONS,
+    BacktestService,
+    build_summary,
+    combo_strategy,
+    resolve_parameters,
+    session_range,
+)
+from api.services.backtest.candle_source import DAY_CANDLE_CACHE
+from api.services.backtest.combo_candle_source import SERIES_DAY_CACHE
+from client.aws_client import DynamoDBClient
+from model import BacktestDefinition
+from tests.api.services.backtest.benchmark_market import (
+    BENCHMARK_END,
+    BENCHMARK_START,
+    candles_service_for,
+    prefetch,
+    weekdays,
+)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("BACKTEST_BENCHMARK"),
+    reason="benchmarks are opt-in: set BACKTEST_BENCHMARK=1",
+)
+
+BASELINE_FILE = (
+    Path(__file__).resolve().parents[1] / "files" / "backtest_benchmark.json"
+)
+
+# As in the golden test: every cache call degrades to a miss, so a run
+# pays for the fetch path a cold request pays for.
+NO_CACHE_CLIENT = DynamoDBClient(dynamodb_resource=None)
+
+DEFAULT_TOLERANCE = 0.5
+
+# Days evaluated one by one. evaluate_day serves the detail view, a day
+# at a time; a sample is enough for its rate and keeps the combo
+# definitions, which rebuild their lead-in for every day, affordable.
+EVALUATED_DAYS = 20
+
+# The cheap operations, and evaluate_day's sample, are repeated until
+# they have run this long, so their rate is not a handful of
+# milliseconds of clock noise.
+MIN_MEASURE_SECONDS = 0.5
+
+# Timed runs of every operation, after a warm-up one. The best is its
+# rate: a slower run measures the machine, not the code.
+REPETITIONS = 3
+
+# An operation is gated only when its median run is within this share
+# of its best one, that is when the best rate was reproduced.
+MAX_SPREAD = 0.25
+
+OPERATIONS = [
+    "run_range",
+    "evaluate_day",
+    "build_summary",
+    "run_csv",
+    "day_csv",
+]
+
+# Too fast for a rate that holds from one run to the next, reported only
+REPORTED_OPERATIONS = ["build_summary"]
+
+# Measurements a baseline is the median of. The machine's speed drifts
+# over minutes, a single pass can be recorded in a fast or a slow phase.
+RECORDED_PASSES = 3
+
+
+def _tolerance() -> float:
+    return float(
+        os.environ.get("BACKTEST_BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE)
+    )
+
+
+def _cold() -> None:
+    """Empty the process-wide day caches, as a fresh API worker has."""
+    DAY_CANDLE_CACHE.clear()
+    SERIES_DAY_CACHE.clear()
+
+
+def _rate(days: int, call: Callable[[], Any]) -> float:
+    """Days per second of a synchronous call, repeated for at least
+    MIN_MEASURE_SECONDS."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        call()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_MEASURE_SECONDS:
+            return days * calls / elapsed
+
+
+async def _cold_rate(days: int, run: Callable[[], Awaitable[Any]]) -> float:
+    """Days per second of a run from empty day caches, repeated for at
+    least MIN_MEASURE_SECONDS."""
+    runs = 0
+    elapsed = 0.0
+    while True:
+        _cold()
+        start = time.perf_counter()
+        await run()
+        elapsed += time.perf_counter() - start
+        runs += 1
+        if elapsed >= MIN_MEASURE_SECONDS:
+            return days * runs / elapsed
+
+
+def _best(rates: List[float]) -> Tuple[float, float]:
+    """The best rate and its spread, the share the median rate falls
+    below it."""
+    return max(rates), 1 - statistics.median(rates) / max(rates)
+
+
+async def _measure(
+    definition: BacktestDefinition,
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """The rate and the spread of every operation."""
+    candles_service = candles_service_for(definition)
+    prefetch(candles_service, definition, BENCHMARK_START, BENCHMARK_END)
+    service = BacktestService(candles_service, NO_CACHE_CLIENT)
+    params = resolve_parameters(definition)
+    timed: Dict[str, Tuple[float, float]] = {}
+
+    # The warm-up run. The run result keeps no trades; build_summary is
+    # timed on the ones the engine summarized, read off the call rather
+    # than re-evaluated.
+    _cold()
+    with patch.object(
+        session_range, "build_summary", wraps=build_summary
+    ) as session_summary, patch.object(
+        combo_strategy, "build_summary", wraps=build_summary
+    ) as combo_summary:
+        run = await service.run_range(
+            definition, BENCHMARK_START, BENCHMARK_END, params
+        )
+    summary_args = (session_summary.call_args or combo_summary.call_args)[0]
+    timed["run_range"] = _best(
+        [
+            await _cold_rate(
+                len(weekdays(BENCHMARK_START, BENCHMARK_END)),
+                lambda: service.run_range(
+                    definition, BENCHMARK_START, BENCHMARK_END, params
+                ),
+            )
+            for _ in range(REPETITIONS)
+        ]
+    )
+
+    sample = weekdays(BENCHMARK_START, BENCHMARK_END)[:EVALUATED_DAYS]
+
+    async def evaluate_sample() -> List[Any]:
+        return [
+            await service.evaluate_day(definition, trading_date, params)
+            for trading_date in sample
+        ]
+
+    _cold()
+    days = await evaluate_sample()
+    timed["evaluate_day"] = _best(
+        [
+            await _cold_rate(len(sample), evaluate_sample)
+            for _ in range(REPETITIONS)
+        ]
+    )
+
+    cheap: Dict[str, Tuple[int, Callable[[], Any]]] = {
+        "build_summary": (
+            run.summary.number_of_days,
+            lambda: build_summary(*summary_args),
+        ),
+        "run_csv": (
+            len(run.days),
+            lambda: backtest_run_result_to_csv(run, params),
+        ),
+        "day_csv": (
+            len(days),
+            lambda: [day_result_to_csv(day, params) for day in days],
+        ),
+    }
+    for operation, (count, call) in cheap.items():
+        call()
+        timed[operation] = _best(
+            [_rate(count, call) for _ in range(REPETITIONS)]
+        )
+    _cold()
+    return (
+        {operation: rate for operation, (rate, _) in timed.items()},
+        {operation: spread for operation, (_, spread) in timed.items()},
+    )
+
+
+async def _measure_all() -> Dict[str, Any]:
+    rates: Dict[str, Dict[str, float]] = {}
+    spreads: Dict[str, Dict[str, float]] = {}
+    for definition in BACKTEST_DEFINITIONS:
+        rates[definition.code], spreads[definition.code] = await _measure(
+            definition
+        )
+    return {
+        "start": BENCHMARK_START.isoformat(),
+        "end": BENCHMARK_END.isoformat(),
+        "days_per_second": rates,
+        "spread": spreads,
+    }
+
+
+def _report(measured: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """One line per definition and operation: the rate, the spread of
+    its runs, the baseline's rate and the ratio of the two."""
+    lines = [
+        f"backtest throughput, days/s, {measured['start']} to "
+        f"{measured['end']}"
+    ]
+    recorded = baseline.get("days_per_second", {})
+    for code, rates in measured["days_per_second"].items():
+        for operation in OPERATIONS:
+            rate = rates[operation]
+            spread = measured["spread"][code][operation]
+            line = (
+                f"  {code:<8} {operation:<14} {rate:>12.1f}"
+                f"  spread {spread:>4.0%}"
+            )
+            expected = recorded.get(code, {}).get(operation)
+            if expected:
+                line += f"  baseline {expected:>12.1f}  x{rate / expected:.2f}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def measured() -> Dict[str, Any]:
+    """Every definition measured once for the module."""
+    return await _measure_all()
+
+
+@pytest.fixture(scope="module")
+def baseline(measured) -> Dict[str, Any]:
+    if not BASELINE_FILE.exists():
+        pytest.fail(
+            f"Missing benchmark baseline {BASELINE_FILE}. Record it with "
+            "python -m tests.api.services.backtest.test_backtest_benchmark"
+        )
+    recorded = json.loads(BASELINE_FILE.read_text())
+    print()
+    print(_report(measured, recorded))
+    return recorded
+
+
+def test_the_baseline_covers_the_same_range(measured, baseline):
+    """Rates over a different range are not comparable: days/s depends on
+    how many trades the market produces, not only on the day count."""
+    assert (baseline["start"], baseline["end"]) == (
+        measured["start"],
+        measured["end"],
+    ), "the benchmark range changed - record a new baseline"
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+@pytest.mark.parametrize(
+    "code", [definition.code for definition in BACKTEST_DEFINITIONS]
+)
+def test_throughput_has_not_regressed(code, operation, measured, baseline):
+    recorded = baseline["days_per_second"].get(code, {}).get(operation)
+    assert (
+        recorded
+    ), f"No baseline for {code} {operation} - record a new baseline"
+    if operation in REPORTED_OPERATIONS:
+        pytest.skip(f"{operation} is reported, not gated")
+    spread = measured["spread"][code][operation]
+    if spread > MAX_SPREAD:
+        pytest.skip(
+            f"{code} {operation} runs spread {spread:.0%}, above "
+            f"{MAX_SPREAD:.0%}: too unstable to gate"
+        )
+    rate = measured["days_per_second"][code][operation]
+    floor = recorded * (1 - _tolerance())
+    assert rate >= floor, (
+        f"{code} {operation} ran at {rate:.1f} days/s, below "
+        f"{floor:.1f} (baseline {recorded:.1f}, tolerance {_tolerance()})"
+    )
+
+
+def _record() -> None:
+    import asyncio
+
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    passes = [asyncio.run(_measure_all()) for _ in range(RECORDED_PASSES)]
+    measured = dict(passes[0])
+    for key in ["days_per_second", "spread"]:
+        measured[key] = {
+            code: {
+                operation: statistics.median(
+                    measurement[key][code][operation] for measurement in passes
+                )
+                for operation in rates
+            }
+            for code, rates in passes[0][key].items()
+        }
+    previous: Dict[str, Any] = (
+        json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    )
+    print(_report(measured, previous))
+    rounded: Dict[str, Any] = {
+        "start": measured["start"],
+        "end": measured["end"],
+    }
+    rounded["days_per_second"] = {
+        code: {operation: round(rate, 1) for operation, rate in rates.items()}
+        for code, rates in measured["days_per_second"].items()
+    }
+    BASELINE_FILE.write_text(json.dumps(rounded, indent=2, sort_keys=True))
+    print(f"Wrote {BASELINE_FILE}")
+
+
+if __name__ == "__main__":
+    _record()
@@ -45,9 +45,20 @@ NO_CACHE_CLIENT = DynamoDBClient(dynamodb_resource=None)
 # resolves it to a traded day, so the per-trade detail is non-trivial.
 DETAIL_DATE = datetime.date(2026, 3, 3)
 
+# The session definitions only. The golden market is a 9h H1 candle and
+# its 5-minute candles per day, nothing a combo series can be read from;
+# the combo engine is pinned by its own tests (test_combo_strategy).
+GOLDEN_DEFINITIONS = [
+    definition
+    for definition in BACKTEST_DEFINITIONS
+    if not definition.combo_entry
+]
 
-def _service() -> BacktestService:
-    return BacktestService(golden_candles_service(), NO_CACHE_CLIENT)
+
+def _service(array_engine: bool = True) -> BacktestService:
+    service = BacktestService(golden_candles_service(), NO_CACHE_CLIENT)
+    service.strategies.session_range.array_engine = array_engine
+    return service
 
 
 def _plain(value: Any) -> Any:
@@ -89,11 +100,11 @@ async def _exit_reason_histogram(
     return histogram
 
 
-async def _build_snapshot() -> Dict[str, Any]:
+async def _build_snapshot(array_engine: bool = True) -> Dict[str, Any]:
     snapshot: Dict[str, Any] = {}
-    for definition in BACKTEST_DEFINITIONS:
+    for definition in GOLDEN_DEFINITIONS:
         params = resolve_parameters(definition)
-        service = _service()
+        service = _service(array_engine)
         run = await service.run_range(
             definition, GOLDEN_START, GOLDEN_END, params
         )
@@ -116,12 +127,18 @@ async def _build_snapshot() -> Dict[str, Any]:
     return snapshot
 
 
-@pytest_asyncio.fixture(scope="module", loop_scope="module")
-async def snapshot() -> Dict[str, Any]:
-    """The freshly computed snapshot, built once for the module - every
-    assertion reads the same run rather than re-running four range
-    backtests per parametrized case."""
-    return await _build_snapshot()
+@pytest_asyncio.fixture(
+    scope="module",
+    loop_scope="module",
+    params=[True, False],
+    ids=["array_engine", "candle_by_candle"],
+)
+async def snapshot(request) -> Dict[str, Any]:
+    """The freshly computed snapshot, built once per trade simulator for
+    the module - every assertion reads the same run rather than
+    re-running four range backtests per parametrized case. Both
+    simulators must reproduce the committed snapshot exactly."""
+    return await _build_snapshot(request.param)
 
 
 @pytest.fixture(scope="module")
@@ -135,7 +152,7 @@ def golden() -> Dict[str, Any]:
 
 
 @pytest.mark.parametrize(
-    "code", [definition.code for definition in BACKTEST_DEFINITIONS]
+    "code", [definition.code for definition in GOLDEN_DEFINITIONS]
 )
 async def test_definition_matches_golden_snapshot(code, golden, snapshot):
     """Every definition's full range run and detail day are byte-identical
@@ -3,10 +3,13 @@ the v2 (instrument, session) key."""
 
 from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
 from api.services.backtest.cache_migration import (
     CacheMigration,
     build_plan,
 )
+from api.services.backtest.cache_scan import ScanCheckpoint
 from client.aws_client import DynamoDBClient, DynamoDBOperationError
 from tests.api.services.backtest.helpers import h1_candle, m5_candle
 
@@ -30,6 +33,54 @@ def item(old_key, trading_date=TRADING_DATE, has_data=True, m5_count=1):
     return entry
 
 
+class Killed(Exception):
+    """The process dying mid-run."""
+
+
+def migration_client(rows, page_size=2):
+    """A DynamoDBClient over `rows`: paged scans of them, and reads of a
+    single row back by its key."""
+    client = MagicMock(spec=DynamoDBClient)
+    by_key = {
+        (row["definition_code"], row["trading_date"]): row for row in rows
+    }
+
+    async def scan_page(start_key=None, segment=0, total_segments=1):
+        mine = [
+            row
+            for index, row in enumerate(rows)
+            if index % total_segments == segment
+        ]
+        start = 0 if start_key is None else start_key["index"]
+        end = start + page_size
+        return mine[start:end], ({"index": end} if end < len(mine) else None)
+
+    async def get(cache_key, trading_date):
+        return by_key.get((cache_key, trading_date))
+
+    client.scan_backtest_candles_page = AsyncMock(side_effect=scan_page)
+    client.get_cached_backtest_candles = AsyncMock(side_effect=get)
+    client.batch_write_backtest_candles = AsyncMock()
+    return client
+
+
+def written_items(client):
+    return [
+        written
+        for call in client.batch_write_backtest_candles.call_args_list
+        for written in call[0][0]
+    ]
+
+
+def deleted_keys(client):
+    return [
+        deleted
+        for call in client.batch_write_backtest_candles.call_args_list
+        if len(call[0]) > 1
+        for deleted in call[0][1]
+    ]
+
+
 class TestBuildPlan:
     def test_collapses_definitions_sharing_an_instrument_and_session(self):
         plan = build_plan(
@@ -43,10 +94,8 @@ class TestBuildPlan:
         assert len(plan.writes) == 1
         assert len(plan.deletes) == 3
         assert plan.duplicates_removed == 2
-        migrated, m5_fetched = plan.writes[0]
-        assert migrated["definition_code"] == FRA40_KEY
-        assert migrated["trading_date"] == TRADING_DATE
-        assert m5_fetched is True
+        assert plan.writes[0].target == (FRA40_KEY, TRADING_DATE)
+        assert plan.writes[0].m5_fetched is True
 
     def test_keeps_separate_entries_per_day_and_session(self):
         plan = build_plan(
@@ -57,9 +106,7 @@ class TestBuildPlan:
             ]
         )
 
-        keys = {
-            (i["definition_code"], i["trading_date"]) for i, _ in plan.writes
-        }
+        keys = {write.target for write in plan.writes}
         assert keys == {
             (FRA40_KEY, "2026-06-02"),
             (FRA40_KEY, "2026-06-03"),
@@ -75,14 +122,14 @@ class TestBuildPlan:
 
         plan = build_plan([narrow])
 
-        assert plan.writes[0][1] is False
+        assert plan.writes[0].m5_fetched is False
 
     def test_wide_day_from_a_min_range_definition_is_complete(self):
         """Same definition, a day whose range clears the threshold: the
         5-minute fetch did happen, so the entry migrates as complete."""
         plan = build_plan([item("B9HWS:FRA40.I:v1")])
 
-        assert plan.writes[0][1] is True
+        assert plan.writes[0].m5_fetched is True
 
     def test_complete_entry_wins_over_a_partial_one(self):
         narrow = item("B9HWS:FRA40.I:v1", m5_count=0)
@@ -92,9 +139,8 @@ class TestBuildPlan:
 
         plan = build_plan([narrow, full])
 
-        migrated, m5_fetched = plan.writes[0]
-        assert m5_fetched is True
-        assert len(migrated["m5_candles"]) == 3
+        assert plan.writes[0].source == ("B9H:FRA40.I:v1", TRADING_DATE)
+        assert plan.writes[0].m5_fetched is True
 
     def test_data_wins_over_a_no_data_marker(self):
         plan = build_plan(
@@ -105,7 +151,7 @@ class TestBuildPlan:
         )
 
         assert len(plan.writes) == 1
-        assert plan.writes[0][0]["has_data"] is True
+        assert plan.writes[0].source == ("B9HTC:FRA40.I:v1", TRADING_DATE)
 
     def test_already_migrated_keys_are_left_alone(self):
         plan = build_plan(
@@ -125,49 +171,86 @@ class TestBuildPlan:
 
 
 class TestApply:
-    def _client(self):
-        client = MagicMock(spec=DynamoDBClient)
-        client.store_backtest_candles = AsyncMock()
-        client.delete_backtest_candles = AsyncMock()
-        return client
-
     async def test_writes_new_entries_then_deletes_old_ones(self):
-        client = self._client()
-        plan = build_plan([item("B9H:FRA40.I:v1"), item("B9HTC:FRA40.I:v1")])
+        rows = [item("B9H:FRA40.I:v1"), item("B9HTC:FRA40.I:v1")]
+        client = migration_client(rows)
+        plan = build_plan(rows)
 
         result = await CacheMigration(client).apply(plan)
 
         assert result.written == 1
         assert result.deleted == 2
         assert result.failed == 0
-        store_args = client.store_backtest_candles.call_args[0]
-        assert store_args[0] == FRA40_KEY
-        assert store_args[5] is True
-        deleted = {
-            c[0][0] for c in client.delete_backtest_candles.call_args_list
+        (migrated,) = written_items(client)
+        assert migrated["definition_code"] == FRA40_KEY
+        assert migrated["trading_date"] == TRADING_DATE
+        assert migrated["m5_fetched"] is True
+        assert migrated["m5_candles"] == rows[0]["m5_candles"]
+        assert set(deleted_keys(client)) == {
+            ("B9H:FRA40.I:v1", TRADING_DATE),
+            ("B9HTC:FRA40.I:v1", TRADING_DATE),
         }
-        assert deleted == {"B9H:FRA40.I:v1", "B9HTC:FRA40.I:v1"}
+
+    async def test_the_winning_row_is_the_one_read_back(self):
+        """The plan keeps no candles: the fuller row is read back by its
+        key when the plan is applied."""
+        narrow = item("B9H:FRA40.I:v1", m5_count=1)
+        full = item("B9HTC:FRA40.I:v1", m5_count=3)
+        client = migration_client([narrow, full])
+
+        await CacheMigration(client).apply(build_plan([narrow, full]))
+
+        client.get_cached_backtest_candles.assert_called_once_with(
+            "B9HTC:FRA40.I:v1", TRADING_DATE
+        )
+        assert len(written_items(client)[0]["m5_candles"]) == 3
 
     async def test_a_failed_write_keeps_its_old_entries(self):
         """Old rows are only removed once their replacement landed, so an
         interrupted migration leaves duplicated data, never lost data."""
-        client = self._client()
-        client.store_backtest_candles = AsyncMock(
-            side_effect=DynamoDBOperationError("put_item", "boom")
+        rows = [item("B9H:FRA40.I:v1"), item("B9HTC:FRA40.I:v1")]
+        client = migration_client(rows)
+        client.batch_write_backtest_candles.side_effect = (
+            DynamoDBOperationError("batch_write_item", "boom")
         )
-        plan = build_plan([item("B9H:FRA40.I:v1"), item("B9HTC:FRA40.I:v1")])
+        plan = build_plan(rows)
 
         result = await CacheMigration(client).apply(plan)
 
         assert result.written == 0
         assert result.failed == 1
-        client.delete_backtest_candles.assert_not_called()
+        assert client.batch_write_backtest_candles.call_count == 1
+
+    async def test_a_row_gone_since_the_scan_is_a_failed_write(self):
+        rows = [item("B9H:FRA40.I:v1")]
+        client = migration_client([])
+        plan = build_plan(rows)
+
+        result = await CacheMigration(client).apply(plan)
+
+        assert result.write_failures == 1
+        client.batch_write_backtest_candles.assert_not_called()
+
+    async def test_writes_and_deletes_go_out_in_chunks(self):
+        rows = [
+            item("B9H:FRA40.I:v1", trading_date=f"2026-06-{day:02d}")
+            for day in range(1, 6)
+        ]
+        client = migration_client(rows)
+        plan = build_plan(rows)
+
+        result = await CacheMigration(client, chunk_size=2).apply(plan)
+
+        assert result.written == 5
+        assert result.deleted == 5
+        sizes = [
+            (len(call[0][0]), len(call[0][1]) if len(call[0]) > 1 else 0)
+            for call in client.batch_write_backtest_candles.call_args_list
+        ]
+        assert sizes == [(2, 0), (2, 0), (1, 0), (0, 2), (0, 2), (0, 1)]
 
     async def test_second_run_finds_nothing_to_do(self):
-        client = self._client()
-        client.scan_backtest_candles = AsyncMock(
-            return_value=[item(FRA40_KEY)]
-        )
+        client = migration_client([item(FRA40_KEY)])
 
         plan = await CacheMigration(client).build_plan()
 
@@ -175,6 +258,101 @@ class TestApply:
         assert plan.deletes == []
 
 
+class TestStreamedPlan:
+    ROWS = [
+        item("B9H:FRA40.I:v1", trading_date=f"2026-06-{day:02d}")
+        for day in range(1, 8)
+    ] + [item("B9HTC:FRA40.I:v1", trading_date="2026-06-01")]
+
+    async def test_a_paged_scan_plans_what_a_full_one_does(self):
+        client = migration_client(self.ROWS, page_size=2)
+
+        plan = await CacheMigration(client).build_plan()
+
+        assert plan == build_plan(self.ROWS)
+        assert client.scan_backtest_candles_page.call_count == 4
+
+    async def test_a_segmented_scan_plans_what_a_full_one_does(self):
+        client = migration_client(self.ROWS, page_size=2)
+
+        plan = await CacheMigration(client, segments=3).build_plan()
+
+        expected = build_plan(self.ROWS)
+        assert sorted(plan.writes, key=lambda w: w.target) == sorted(
+            expected.writes, key=lambda w: w.target
+        )
+        assert sorted(plan.deletes) == sorted(expected.deletes)
+        assert plan.target_slots == expected.target_slots
+
+
+class TestResume:
+    ROWS = TestStreamedPlan.ROWS
+
+    async def test_an_interrupted_scan_resumes_after_its_last_page(
+        self, tmp_path
+    ):
+        checkpoint = ScanCheckpoint(tmp_path / "migration.json")
+        client = migration_client(self.ROWS, page_size=2)
+        pages = client.scan_backtest_candles_page.side_effect
+        calls = []
+
+        async def failing(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise DynamoDBOperationError("scan", "boom")
+            return await pages(*args)
+
+        client.scan_backtest_candles_page.side_effect = failing
+        with pytest.raises(DynamoDBOperationError):
+            await CacheMigration(client, checkpoint=checkpoint).build_plan()
+        assert checkpoint.load()["phase"] == "scan"
+
+        client.scan_backtest_candles_page.side_effect = pages
+        client.scan_backtest_candles_page.reset_mock()
+        migration = CacheMigration(client, checkpoint=checkpoint)
+        plan = await migration.build_plan()
+
+        assert migration.resumed
+        assert plan == build_plan(self.ROWS)
+        # Pages one and two were kept: the scan picks up at the third
+        first = client.scan_backtest_candles_page.call_args_list[0][0]
+        assert first[0] == {"index": 4}
+
+    async def test_an_interrupted_apply_resumes_after_its_last_chunk(
+        self, tmp_path
+    ):
+        checkpoint = ScanCheckpoint(tmp_path / "migration.json")
+        client = migration_client(self.ROWS)
+        migration = CacheMigration(client, checkpoint=checkpoint, chunk_size=3)
+        plan = await migration.build_plan()
+        # Not a DynamoDB failure the run absorbs: the process dies
+        client.batch_write_backtest_candles.side_effect = [None, Killed()]
+        with pytest.raises(Killed):
+            await migration.apply(plan)
+        state = checkpoint.load()
+        assert state["phase"] == "apply"
+        assert state["writes_done"] == 3
+
+        client.batch_write_backtest_candles.side_effect = None
+        client.batch_write_backtest_candles.reset_mock()
+        resumed = CacheMigration(client, checkpoint=checkpoint, chunk_size=3)
+        result = await resumed.apply(await resumed.build_plan())
+
+        assert result.written == len(plan.writes)
+        assert result.deleted == len(plan.deletes)
+        assert len(written_items(client)) == len(plan.writes) - 3
+        assert not checkpoint.exists()
+
+    async def test_a_finished_run_leaves_no_checkpoint(self, tmp_path):
+        checkpoint = ScanCheckpoint(tmp_path / "migration.json")
+        client = migration_client(self.ROWS)
+        migration = CacheMigration(client, checkpoint=checkpoint)
+
+        await migration.apply(await migration.build_plan())
+
+        assert not checkpoint.exists()
+
+
 class TestExistingCurrentSchemaRows:
     """A row already stored under the current key is a contender, not
     noise: the documented recovery path for a partly-failed run is to run
@@ -201,7 +379,7 @@ class TestExistingCurrentSchemaRows:
         plan = build_plan([partial, full])
 
         assert len(plan.writes) == 1
-        assert len(plan.writes[0][0]["m5_candles"]) == 3
+        assert plan.writes[0].source == ("B9H:FRA40.I:v1", TRADING_DATE)
         assert plan.already_present == []
 
     def test_equal_entries_do_not_cause_a_pointless_rewrite(self):
@@ -211,16 +389,15 @@ class TestExistingCurrentSchemaRows:
         assert plan.already_present == [(FRA40_KEY, TRADING_DATE)]
 
     async def test_covered_v1_rows_are_deleted_without_a_write(self):
-        client = MagicMock(spec=DynamoDBClient)
-        client.store_backtest_candles = AsyncMock()
-        client.delete_backtest_candles = AsyncMock()
-        plan = build_plan([item(FRA40_KEY), item("B9H:FRA40.I:v1")])
+        rows = [item(FRA40_KEY), item("B9H:FRA40.I:v1")]
+        client = migration_client(rows)
+        plan = build_plan(rows)
 
         result = await CacheMigration(client).apply(plan)
 
         assert result.written == 0
         assert result.deleted == 1
-        client.store_backtest_candles.assert_not_called()
+        assert written_items(client) == []
 
 
 class TestCounts:
@@ -243,12 +420,13 @@ class TestCounts:
         assert plan.duplicates_removed == 1
 
     async def test_write_and_delete_failures_are_counted_apart(self):
-        client = MagicMock(spec=DynamoDBClient)
-        client.store_backtest_candles = AsyncMock()
-        client.delete_backtest_candles = AsyncMock(
-            side_effect=DynamoDBOperationError("delete_item", "boom")
-        )
-        plan = build_plan([item("B9H:FRA40.I:v1")])
+        rows = [item("B9H:FRA40.I:v1")]
+        client = migration_client(rows)
+        client.batch_write_backtest_candles.side_effect = [
+            None,
+            DynamoDBOperationError("batch_write_item", "boom"),
+        ]
+        plan = build_plan(rows)
 
         result = await CacheMigration(client).apply(plan)
 
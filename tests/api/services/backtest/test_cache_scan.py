@@ -0,0 +1,92 @@
+"""The paging, batching and checkpointing the cache migrations run on."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from api.services.backtest.cache_scan import (
+    SEGMENT_DONE,
+    ScanCheckpoint,
+    TableScan,
+    chunks,
+    segment_cursors,
+)
+from client.aws_client import DynamoDBClient
+
+
+def paged_client(pages_by_segment):
+    """Segment s serves pages_by_segment[s], one page per call."""
+    client = MagicMock(spec=DynamoDBClient)
+
+    async def scan_page(start_key=None, segment=0, total_segments=1):
+        pages = pages_by_segment[segment]
+        index = 0 if start_key is None else start_key["page"]
+        last_key = {"page": index + 1} if index + 1 < len(pages) else None
+        return pages[index], last_key
+
+    client.scan_backtest_candles_page = AsyncMock(side_effect=scan_page)
+    return client
+
+
+class TestChunks:
+    def test_the_last_chunk_holds_the_rest(self):
+        assert list(chunks([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+    def test_nothing_to_chunk(self):
+        assert list(chunks([], 25)) == []
+
+
+class TestTableScan:
+    async def test_every_segment_is_paged_to_its_end(self):
+        client = paged_client([[["a"], ["b"]], [["c"]], [[], ["d"]]])
+        scan = TableScan(client, total_segments=3)
+        seen = []
+
+        await scan.run(seen.extend)
+
+        assert sorted(seen) == ["a", "b", "c", "d"]
+        assert scan.done
+
+    async def test_progress_follows_every_page(self):
+        client = paged_client([[["a"], ["b"], ["c"]]])
+        scan = TableScan(client)
+        cursors = []
+
+        await scan.run(
+            lambda items: None, lambda: cursors.append(dict(scan.cursors))
+        )
+
+        assert cursors == [
+            {0: {"page": 1}},
+            {0: {"page": 2}},
+            {0: SEGMENT_DONE},
+        ]
+
+    async def test_a_resumed_scan_skips_what_was_done(self):
+        client = paged_client([[["a"], ["b"]], [["c"], ["d"]]])
+        scan = TableScan(
+            client, total_segments=2, cursors={0: SEGMENT_DONE, 1: {"page": 1}}
+        )
+        seen = []
+
+        await scan.run(seen.extend)
+
+        assert seen == ["d"]
+
+
+class TestScanCheckpoint:
+    def test_a_saved_state_loads_back(self, tmp_path):
+        checkpoint = ScanCheckpoint(tmp_path / "progress.json")
+        scan = TableScan(MagicMock(spec=DynamoDBClient), total_segments=2)
+        scan.cursors[0] = {"definition_code": "B9H:FRA40.I:v1"}
+        scan.cursors[1] = SEGMENT_DONE
+
+        checkpoint.save({"cursors": scan.cursors})
+
+        loaded = segment_cursors(checkpoint.load()["cursors"])
+        assert loaded == scan.cursors
+        assert not (tmp_path / "progress.json.tmp").exists()
+
+    def test_no_file_is_no_state(self, tmp_path):
+        checkpoint = ScanCheckpoint(tmp_path / "progress.json")
+        assert checkpoint.load() is None
+        checkpoint.clear()
+        assert not checkpoint.exists()
@@ -0,0 +1,93 @@
+import datetime
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+from api.services.backtest import cache_warmer
+from api.services.backtest.cache_warmer import (
+    CacheWarmer,
+    warm_targets,
+)
+from api.services.backtest.candle_source import CandleSource, cache_key
+from api.services.backtest.definitions import BACKTEST_DEFINITIONS
+from client.aws_client import DynamoDBClient
+from services.candles_service import CandlesService
+
+MONDAY = datetime.date(2024, 3, 4)
+
+
+class TestWarmTargets:
+    def test_one_definition_per_cache_key(self):
+        targets = warm_targets(BACKTEST_DEFINITIONS)
+
+        keys = [cache_key(d) for d in targets]
+        assert len(keys) == len(set(keys))
+        assert set(keys) == {
+            cache_key(d) for d in BACKTEST_DEFINITIONS if not d.combo_entry
+        }
+
+    def test_minimum_h1_range_is_cleared(self):
+        assert all(
+            d.min_h1_range_points is None
+            for d in warm_targets(BACKTEST_DEFINITIONS)
+        )
+
+    def test_restricted_to_instruments(self):
+        targets = warm_targets(BACKTEST_DEFINITIONS, ["FRA40.I"])
+
+        assert {d.instrument for d in targets} == {"FRA40.I"}
+
+
+class TestCacheWarmer:
+    def _warmer(self, concurrency=2) -> CacheWarmer:
+        return CacheWarmer(
+            MagicMock(spec=CandlesService),
+            MagicMock(spec=DynamoDBClient),
+            logging.getLogger("test"),
+            concurrency,
+        )
+
+    async def test_chunks_skip_weekends(self, mocker):
+        mocker.patch.object(cache_warmer, "WARM_CHUNK_DAYS", 3)
+        prefetch = mocker.patch.object(
+            CandleSource, "prefetch_range", AsyncMock(return_value=1)
+        )
+
+        result = await self._warmer().warm(
+            MONDAY, MONDAY + datetime.timedelta(days=6), ["FRA40.I"]
+        )
+
+        days = [call.args[1] for call in prefetch.call_args_list]
+        assert sorted(days) == [
+            [MONDAY + datetime.timedelta(days=n) for n in (0, 1, 2)],
+            [MONDAY + datetime.timedelta(days=n) for n in (3, 4)],
+        ]
+        assert result.days_checked == 5
+        assert result.days_stored == 2
+        assert result.chunks_done == 2
+
+    async def test_failed_chunk_is_reported_and_the_rest_goes_on(self, mocker):
+        async def prefetch(definition, days):
+            if definition.instrument == "GER40.I":
+                raise RuntimeError("boom")
+            return len(days)
+
+        mocker.patch.object(
+            CandleSource, "prefetch_range", side_effect=prefetch
+        )
+        progress = []
+
+        result = await self._warmer(concurrency=1).warm(
+            MONDAY,
+            MONDAY + datetime.timedelta(days=4),
+            progress=progress.append,
+        )
+
+        ger_keys = {
+            cache_key(d)
+            for d in warm_targets(BACKTEST_DEFINITIONS, ["GER40.I"])
+        }
+        assert result.failed_chunks == len(ger_keys)
+        assert result.days_stored == 5
+        assert [p.chunks_done for p in progress] == [1, 2, 3]
+        assert {p.chunks_total for p in progress} == {3}
+        assert all(p.days_stored == 0 for p in progress if p.key in ger_keys)
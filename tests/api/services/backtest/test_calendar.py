@@ -6,9 +6,10 @@ from api.services.backtest import (
     is_today_not_yet_closed,
     paris_reference_window_utc,
     paris_session_end_utc,
+    paris_session_start_utc,
     session_key,
 )
-from model import EuCfdMarket, EUMarket, Market
+from model import DaxCfdMarket, EuCfdMarket, EUMarket, Market
 
 PARIS_TZ = ZoneInfo("Europe/Paris")
 
@@ -41,6 +42,18 @@ class TestSessionEnd:
         ) == datetime.datetime(2026, 1, 15, 16, 30)
 
 
+class TestSessionStart:
+    def test_dax_cfd_session_cest_summer(self):
+        assert paris_session_start_utc(
+            datetime.date(2026, 6, 2), DaxCfdMarket()
+        ) == datetime.datetime(2026, 6, 2, 0, 0)
+
+    def test_dax_cfd_session_cet_winter(self):
+        assert paris_session_start_utc(
+            datetime.date(2026, 1, 15), DaxCfdMarket()
+        ) == datetime.datetime(2026, 1, 15, 1, 0)
+
+
 class TestTradableDateGuards:
     def test_is_future_paris_date(self):
         now = datetime.datetime(2026, 6, 2, 10, 0, tzinfo=PARIS_TZ)
@@ -4,11 +4,18 @@ Exercised through BacktestService.evaluate_day (the cache is transparent
 to callers) against a mocked DynamoDBClient.
 """
 
+import datetime
 from unittest.mock import AsyncMock, MagicMock
 
 from api.services.backtest import BacktestService
+from api.services.backtest.calendar import paris_reference_window_utc
+from api.services.backtest.candle_source import (
+    CandleSource,
+    DayCandleCache,
+    split_windows,
+)
 from client.aws_client import DynamoDBClient, DynamoDBOperationError
-from model import UnitTime
+from model import CachedDayCandles, Candle, UnitTime
 from model.enum import DayStatus
 from services.candles_service import CandlesService
 from tests.api.services.backtest.helpers import (
@@ -263,6 +270,106 @@ class TestBacktestCandleCache:
         )
 
 
+class TestInProcessDayCache:
+    """The decoded days outlive the BacktestService they were read or
+    fetched by, like they outlive an API request."""
+
+    def _dynamodb_client(self, item=None):
+        dynamodb_client = MagicMock(spec=DynamoDBClient)
+        dynamodb_client.get_cached_backtest_candles = AsyncMock(
+            return_value=item
+        )
+        dynamodb_client.store_backtest_candles = AsyncMock()
+        return dynamodb_client
+
+    def _candles_service(self):
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_window.side_effect = (
+            lambda code, ut, horizon, start, end: (
+                [h1_candle()]
+                if ut == UnitTime.H1
+                else [m5_candle(0, 8005, 8010, 7995, 8000)]
+            )
+        )
+        return candles_service
+
+    async def test_a_read_day_is_not_read_again_by_a_new_service(self):
+        dynamodb_client = self._dynamodb_client(
+            {
+                "has_data": True,
+                "h1_candle": h1_candle().to_dict(),
+                "m5_candles": [m5_candle(0, 8005, 8010, 7995, 8000).to_dict()],
+            }
+        )
+
+        for definition in (DEFINITION, TIME_CUT_DEFINITION):
+            service = BacktestService(self._candles_service(), dynamodb_client)
+            result = await service.evaluate_day(definition, TRADING_DATE)
+            assert len(result.candles) == 1
+
+        dynamodb_client.get_cached_backtest_candles.assert_called_once()
+
+    async def test_a_fetched_day_is_served_from_memory(self):
+        dynamodb_client = self._dynamodb_client()
+        candles_service = self._candles_service()
+
+        for _ in range(2):
+            service = BacktestService(candles_service, dynamodb_client)
+            result = await service.evaluate_day(DEFINITION, TRADING_DATE)
+
+        assert candles_service.get_candles_in_window.call_count == 2
+        dynamodb_client.get_cached_backtest_candles.assert_called_once()
+        assert result.h1_high == H1_HIGH
+
+    async def test_a_failed_fetch_is_not_remembered(self):
+        dynamodb_client = self._dynamodb_client()
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_window.side_effect = SaxoException(
+            "expired token"
+        )
+
+        for _ in range(2):
+            await BacktestService(
+                candles_service, dynamodb_client
+            ).evaluate_day(DEFINITION, TRADING_DATE)
+
+        assert dynamodb_client.get_cached_backtest_candles.call_count == 2
+
+    async def test_a_partial_write_is_not_remembered(self):
+        dynamodb_client = self._dynamodb_client()
+        candles_service = self._candles_service()
+        candles_service.get_candles_in_window.side_effect = (
+            lambda code, ut, horizon, start, end: [
+                h1_candle(higher=8010.0, lower=8000.0)
+            ]
+        )
+
+        for _ in range(2):
+            await BacktestService(
+                candles_service, dynamodb_client
+            ).evaluate_day(WIDE_RANGE_DEFINITION, TRADING_DATE)
+
+        assert dynamodb_client.get_cached_backtest_candles.call_count == 2
+
+    def test_least_recently_used_days_are_evicted_by_candle_count(self):
+        cache = DayCandleCache(max_candles=8)
+        day = CachedDayCandles(
+            has_data=True,
+            h1_candle=h1_candle(),
+            m5_candles=[m5_candle(0, 8005, 8010, 7995, 8000)] * 2,
+        )
+        dates = [TRADING_DATE + datetime.timedelta(days=n) for n in range(3)]
+        cache.put("key", dates[0], day)
+        cache.put("key", dates[1], day)
+        cache.get("key", dates[0])
+        cache.put("key", dates[2], day)
+
+        assert cache.get("key", dates[1]) is None
+        assert cache.get("key", dates[0]) is day
+        assert cache.get("key", dates[2]) is day
+        assert len(cache) == 2
+
+
 class TestPartialCacheEntries:
     """A definition with a minimum H1 range skips the 5-minute fetch on a
     day that fails the filter (FR-033). Under a shared cache key that
@@ -380,3 +487,163 @@ class TestPartialCacheEntries:
         assert result.status == DayStatus.NO_TRADE
         assert result.h1_high == H1_HIGH
         dynamodb_client.store_backtest_candles.assert_not_called()
+
+
+class TestSplitWindows:
+    DAYS = [datetime.date(2026, 6, day) for day in (1, 2, 3, 4, 5)]
+
+    def _windows(self, *days):
+        return {
+            day: paris_reference_window_utc(day, DEFINITION.market)
+            for day in days
+        }
+
+    def test_a_day_in_hand_ends_a_run(self):
+        d = self.DAYS
+        runs = split_windows(d, self._windows(d[0], d[1], d[3]), {d[2]})
+
+        assert [sorted(run) for run in runs] == [[d[0], d[1]], [d[3]]]
+
+    def test_a_day_without_data_is_spanned(self):
+        d = self.DAYS
+        runs = split_windows(d, self._windows(d[0], d[4]), {d[1]})
+
+        assert [sorted(run) for run in runs] == [[d[0]], [d[4]]]
+        assert [
+            sorted(run)
+            for run in split_windows(d, self._windows(d[2], d[4]), {d[1]})
+        ] == [[d[2], d[4]]]
+
+    def test_nothing_missing_is_no_run(self):
+        assert split_windows(self.DAYS, {}, set(self.DAYS)) == []
+
+
+class TestRangePrefetch:
+    """A range run acquires its missing days with multi-day fetches split
+    per session, instead of two Saxo calls per trading day."""
+
+    DAYS = [datetime.date(2026, 6, day) for day in (1, 2, 3)]
+
+    def _day_candles(self, trading_date, ut):
+        h1_start, h1_end = paris_reference_window_utc(
+            trading_date, DEFINITION.market
+        )
+        if ut == UnitTime.H1:
+            return [
+                Candle(
+                    lower=H1_LOW,
+                    higher=H1_HIGH,
+                    open=8020.0,
+                    close=8030.0,
+                    ut=UnitTime.H1,
+                    date=h1_start + datetime.timedelta(hours=hour),
+                )
+                for hour in range(-2, 9)
+            ]
+        return [
+            Candle(
+                lower=7995,
+                higher=8010,
+                open=8005,
+                close=8000,
+                ut=UnitTime.M5,
+                date=h1_end + datetime.timedelta(minutes=5 * step),
+            )
+            for step in range(-12, 130)
+        ]
+
+    def _source(self, no_data=(), served_from=None):
+        dynamodb_client = MagicMock(spec=DynamoDBClient)
+        dynamodb_client.get_cached_backtest_candles = AsyncMock(
+            return_value=None
+        )
+        dynamodb_client.store_backtest_candles = AsyncMock()
+        candles_service = MagicMock(spec=CandlesService)
+
+        def get_candles_in_range(code, ut, horizon, start, end):
+            candles = [
+                candle
+                for day in self.DAYS
+                if day not in no_data
+                and (served_from is None or day >= served_from)
+                for candle in self._day_candles(day, ut)
+            ]
+            return [c for c in candles if start <= c.date < end]
+
+        candles_service.get_candles_in_range.side_effect = get_candles_in_range
+        candles_service.get_candles_in_window.return_value = []
+        source = CandleSource(candles_service, dynamodb_client, MagicMock())
+        return source, candles_service, dynamodb_client
+
+    async def test_missing_days_are_fetched_in_two_range_calls(self):
+        source, candles_service, dynamodb_client = self._source(
+            no_data={self.DAYS[1]}
+        )
+
+        await source.prefetch_range(DEFINITION, self.DAYS)
+        days = [await source.day_candles(DEFINITION, d) for d in self.DAYS]
+
+        assert candles_service.get_candles_in_range.call_count == 2
+        candles_service.get_candles_in_window.assert_not_called()
+        assert days[1] is None
+        for day in (days[0], days[2]):
+            assert day.h1_candle.higher == H1_HIGH
+            # 10:00 to 17:30 Paris, in 5-minute candles
+            assert len(day.m5_candles) == 90
+        stored = {
+            call.args[1]: call.args[2]
+            for call in dynamodb_client.store_backtest_candles.call_args_list
+        }
+        assert stored == {d.isoformat(): d != self.DAYS[1] for d in self.DAYS}
+
+    async def test_a_cached_day_splits_the_range_fetches(self):
+        source, candles_service, dynamodb_client = self._source()
+        middle = self.DAYS[1]
+        dynamodb_client.get_cached_backtest_candles.side_effect = (
+            lambda key, day: (
+                {
+                    "has_data": True,
+                    "h1_candle": h1_candle().to_dict(),
+                    "m5_candles": [],
+                    "m5_fetched": True,
+                }
+                if day == middle.isoformat()
+                else None
+            )
+        )
+
+        await source.prefetch_range(DEFINITION, self.DAYS)
+
+        fetched = [
+            (call.args[1], call.args[3], call.args[4])
+            for call in candles_service.get_candles_in_range.call_args_list
+        ]
+        # An H1 and a 5-minute fetch for each side of the cached day
+        assert len(fetched) == 4
+        middle_start, middle_end = paris_reference_window_utc(
+            middle, DEFINITION.market
+        )
+        for _, start, end in fetched:
+            assert end <= middle_start or start >= middle_end
+        candles_service.get_candles_in_window.assert_not_called()
+
+    async def test_days_before_the_fetched_history_use_per_day_fetches(self):
+        source, candles_service, _ = self._source(served_from=self.DAYS[1])
+
+        await source.prefetch_range(DEFINITION, self.DAYS)
+        first_day = await source.day_candles(DEFINITION, self.DAYS[0])
+
+        assert first_day is None
+        assert candles_service.get_candles_in_window.call_count == 1
+
+    async def test_range_failure_falls_back_to_per_day_fetches(self):
+        source, candles_service, dynamodb_client = self._source()
+        candles_service.get_candles_in_range.side_effect = SaxoException(
+            "token expired"
+        )
+
+        await source.prefetch_range(DEFINITION, self.DAYS)
+        await source.day_candles(DEFINITION, self.DAYS[0])
+
+        dynamodb_client.store_backtest_candles.assert_called_once()
+        candles_service.get_candles_in_window.assert_called()
@@ -0,0 +1,308 @@
+"""The combo series (spec 026, R3): lead-in, contiguity across days, and
+the cache in front of Saxo, against a mocked DynamoDBClient."""
+
+import dataclasses
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.services.backtest.calendar import (
+    paris_session_end_utc,
+    paris_session_start_utc,
+)
+from api.services.backtest.combo_candle_source import (
+    COMBO_WINDOW,
+    ComboCandleSource,
+    SeriesDayCache,
+    series_key,
+    series_unit_time,
+)
+from client.aws_client import DynamoDBClient, DynamoDBOperationError
+from model import Candle, DaxCfdMarket, UnitTime
+from services.candles_service import CandlesService
+from tests.api.services.backtest.helpers import COMBO_DEFINITION
+from utils.exception import SaxoException
+from utils.logger import Logger
+
+H1_DEFINITION = dataclasses.replace(
+    COMBO_DEFINITION, code="C1H", unit_time=UnitTime.H1
+)
+D_DEFINITION = dataclasses.replace(
+    COMBO_DEFINITION, code="C1D", unit_time=UnitTime.D
+)
+# A Tuesday: the lead-in reaches back over two weekends
+START = datetime.date(2026, 6, 2)
+END = datetime.date(2026, 6, 8)
+KEY = "GER40.I:0200-2200@Europe/Paris:h1:v1"
+
+
+def session_candles(trading_date):
+    start = paris_session_start_utc(trading_date, DaxCfdMarket())
+    end = paris_session_end_utc(trading_date, DaxCfdMarket())
+    candles = []
+    while start < end:
+        candles.append(
+            Candle(
+                lower=99.0,
+                higher=101.0,
+                open=100.0,
+                close=100.0,
+                ut=UnitTime.H1,
+                date=start,
+            )
+        )
+        start += datetime.timedelta(hours=1)
+    return candles
+
+
+def weekday_candles(start_utc, end_utc):
+    day = start_utc.date() - datetime.timedelta(days=1)
+    candles = []
+    while day <= end_utc.date():
+        if day.weekday() < 5:
+            candles.extend(
+                candle
+                for candle in session_candles(day)
+                if start_utc <= candle.date < end_utc
+            )
+        day += datetime.timedelta(days=1)
+    return candles
+
+
+def make_candles_service():
+    candles_service = MagicMock(spec=CandlesService)
+    candles_service.get_candles_in_range.side_effect = (
+        lambda code, ut, horizon, start, end: weekday_candles(start, end)
+    )
+    candles_service.get_candles_in_window.side_effect = (
+        lambda code, ut, horizon, start, end: weekday_candles(start, end)
+    )
+    return candles_service
+
+
+def make_dynamodb_client(item=None):
+    dynamodb_client = MagicMock(spec=DynamoDBClient)
+    dynamodb_client.get_cached_backtest_series = AsyncMock(return_value=item)
+    dynamodb_client.store_backtest_series = AsyncMock()
+    return dynamodb_client
+
+
+def make_source(candles_service, dynamodb_client):
+    return ComboCandleSource(
+        candles_service,
+        dynamodb_client,
+        Logger.get_logger("test_combo_candle_source"),
+        day_cache=SeriesDayCache(),
+    )
+
+
+class TestSeriesKey:
+    def test_the_key_names_instrument_session_and_timeframe(self):
+        assert series_key(H1_DEFINITION) == KEY
+
+    def test_every_combo_timeframe_has_its_own_key(self):
+        keys = {
+            series_key(dataclasses.replace(H1_DEFINITION, unit_time=ut))
+            for ut in (UnitTime.M5, UnitTime.M15, UnitTime.H1, UnitTime.D)
+        }
+        assert len(keys) == 4
+
+    def test_a_weekly_series_is_not_supported(self):
+        with pytest.raises(SaxoException, match="C1H"):
+            series_unit_time(
+                dataclasses.replace(H1_DEFINITION, unit_time=UnitTime.W)
+            )
+
+
+class TestSeries:
+    async def test_the_lead_in_fills_the_indicator_window(self):
+        source = make_source(make_candles_service(), make_dynamodb_client())
+        series = await source.series(H1_DEFINITION, START, END)
+        assert series.first_index >= COMBO_WINDOW
+        assert all(date < START for date in series.dates[: series.first_index])
+        assert series.dates[series.first_index] == START
+
+    async def test_the_series_is_one_chronological_run_across_weekends(self):
+        source = make_source(make_candles_service(), make_dynamodb_client())
+        series = await source.series(H1_DEFINITION, START, END)
+        times = [candle.date for candle in series.candles]
+        assert times == sorted(set(times))
+        assert sorted(set(series.dates[series.first_index :])) == [
+            START,
+            datetime.date(2026, 6, 3),
+            datetime.date(2026, 6, 4),
+            datetime.date(2026, 6, 5),
+            END,
+        ]
+
+    async def test_a_range_starting_on_a_weekend_still_gets_its_lead_in(self):
+        source = make_source(make_candles_service(), make_dynamodb_client())
+        series = await source.series(
+            H1_DEFINITION, datetime.date(2026, 6, 6), END
+        )
+        assert series.first_index >= COMBO_WINDOW
+        assert set(series.dates[series.first_index :]) == {END}
+
+    async def test_a_daily_lead_in_reaches_back_a_year(self):
+        def daily_candles(code, ut, horizon, start, end):
+            # Saxo dates a daily bar at midnight UTC
+            candles = []
+            day = start.date()
+            while day < end.date():
+                if day.weekday() < 5:
+                    candles.append(
+                        Candle(
+                            lower=99.0,
+                            higher=101.0,
+                            open=100.0,
+                            close=100.0,
+                            ut=UnitTime.D,
+                            date=datetime.datetime.combine(
+                                day, datetime.time()
+                            ),
+                        )
+                    )
+                day += datetime.timedelta(days=1)
+            return candles
+
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_range.side_effect = daily_candles
+        candles_service.get_candles_in_window.side_effect = daily_candles
+        source = make_source(candles_service, make_dynamodb_client())
+
+        series = await source.series(D_DEFINITION, START, END)
+
+        assert series.first_index >= COMBO_WINDOW
+        assert series.dates[series.first_index :] == [
+            START,
+            datetime.date(2026, 6, 3),
+            datetime.date(2026, 6, 4),
+            datetime.date(2026, 6, 5),
+            END,
+        ]
+        assert [c.date.date() for c in series.candles] == series.dates
+
+    async def test_the_lead_in_stops_at_the_calendar_cap(self):
+        """Nothing before the range: the lead-in gives up after 30 days
+        rather than walking back forever."""
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_range.return_value = []
+        candles_service.get_candles_in_window.return_value = []
+        source = make_source(candles_service, make_dynamodb_client())
+        series = await source.series(H1_DEFINITION, START, START)
+        assert series.first_index == 0
+        assert series.candles == []
+
+
+class TestSeriesCache:
+    async def test_a_cached_day_skips_saxo(self):
+        candles_service = make_candles_service()
+        dynamodb_client = make_dynamodb_client(
+            {
+                "has_data": True,
+                "candles": [c.to_dict() for c in session_candles(START)],
+            }
+        )
+        source = make_source(candles_service, dynamodb_client)
+        days = await source.day_series(H1_DEFINITION, [START])
+        candles_service.get_candles_in_range.assert_not_called()
+        dynamodb_client.get_cached_backtest_series.assert_called_once_with(
+            KEY, START.isoformat()
+        )
+        assert len(days[START]) == 20
+
+    async def test_a_cached_empty_day_skips_saxo(self):
+        candles_service = make_candles_service()
+        source = make_source(
+            candles_service, make_dynamodb_client({"has_data": False})
+        )
+        days = await source.day_series(H1_DEFINITION, [START])
+        candles_service.get_candles_in_range.assert_not_called()
+        assert days[START] == []
+
+    async def test_a_miss_is_fetched_and_stored(self):
+        dynamodb_client = make_dynamodb_client()
+        source = make_source(make_candles_service(), dynamodb_client)
+        days = await source.day_series(H1_DEFINITION, [START])
+        assert len(days[START]) == 20
+        args = dynamodb_client.store_backtest_series.call_args[0]
+        assert args[:3] == (KEY, START.isoformat(), True)
+        assert len(args[3]) == 20
+
+    async def test_a_day_saxo_has_nothing_for_is_cached_empty(self):
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_range.return_value = []
+        candles_service.get_candles_in_window.return_value = []
+        dynamodb_client = make_dynamodb_client()
+        source = make_source(candles_service, dynamodb_client)
+        days = await source.day_series(H1_DEFINITION, [START])
+        assert days[START] == []
+        args = dynamodb_client.store_backtest_series.call_args[0]
+        assert args[:3] == (KEY, START.isoformat(), False)
+
+    async def test_a_failed_fetch_is_never_cached(self):
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.get_candles_in_range.side_effect = SaxoException("x")
+        candles_service.get_candles_in_window.side_effect = SaxoException("x")
+        dynamodb_client = make_dynamodb_client()
+        source = make_source(candles_service, dynamodb_client)
+        days = await source.day_series(H1_DEFINITION, [START])
+        assert days[START] == []
+        dynamodb_client.store_backtest_series.assert_not_called()
+        assert source.day_cache.get(KEY, START) is None
+
+    async def test_a_cached_day_splits_the_range_fetch(self):
+        days = [
+            START + datetime.timedelta(days=offset) for offset in (0, 1, 2)
+        ]
+        cached = {
+            "has_data": True,
+            "candles": [c.to_dict() for c in session_candles(days[1])],
+        }
+        dynamodb_client = make_dynamodb_client()
+        dynamodb_client.get_cached_backtest_series.side_effect = (
+            lambda key, day: (cached if day == days[1].isoformat() else None)
+        )
+        candles_service = make_candles_service()
+        source = make_source(candles_service, dynamodb_client)
+
+        fetched = await source.day_series(H1_DEFINITION, days)
+
+        fetch = candles_service.get_candles_in_range
+        # The 02:00 Paris session start is midnight UTC in June
+        assert [call.args[3].date() for call in fetch.call_args_list] == [
+            days[0],
+            days[2],
+        ]
+        assert all(len(fetched[day]) == 20 for day in days)
+
+    async def test_a_malformed_item_is_a_miss(self):
+        candles_service = make_candles_service()
+        source = make_source(
+            candles_service, make_dynamodb_client({"has_data": True})
+        )
+        days = await source.day_series(H1_DEFINITION, [START])
+        candles_service.get_candles_in_range.assert_called_once()
+        assert len(days[START]) == 20
+
+    async def test_a_cache_outage_degrades_to_saxo(self):
+        candles_service = make_candles_service()
+        dynamodb_client = make_dynamodb_client()
+        dynamodb_client.get_cached_backtest_series.side_effect = (
+            DynamoDBOperationError("get_item", "down")
+        )
+        dynamodb_client.store_backtest_series.side_effect = (
+            DynamoDBOperationError("get_item", "down")
+        )
+        source = make_source(candles_service, dynamodb_client)
+        days = await source.day_series(H1_DEFINITION, [START])
+        assert len(days[START]) == 20
+
+    async def test_a_second_read_is_served_in_process(self):
+        dynamodb_client = make_dynamodb_client()
+        source = make_source(make_candles_service(), dynamodb_client)
+        await source.day_series(H1_DEFINITION, [START])
+        dynamodb_client.get_cached_backtest_series.reset_mock()
+        await source.day_series(H1_DEFINITION, [START])
+        dynamodb_client.get_cached_backtest_series.assert_not_called()
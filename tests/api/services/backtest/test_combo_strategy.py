@@ -0,0 +1,285 @@
+"""The combo engine: entries from combo signals, positions carried across
+days, the array simulator against the candle-by-candle one, and the rows
+a range run reports."""
+
+import datetime
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from api.services.backtest.bands import levels
+from api.services.backtest.combo_arrays import ComboArrays
+from api.services.backtest.combo_candle_source import ComboSeries
+from api.services.backtest.combo_strategy import ComboStrategy, combo_window
+from model import (
+    BacktestParameters,
+    Candle,
+    ComboSignal,
+    SignalStrength,
+    UnitTime,
+)
+from model.enum import DayStatus, Direction, ExitReason
+from services.candles_service import CandlesService
+from tests.api.services.backtest.helpers import (
+    COMBO_DEFINITION,
+    NO_CACHE_CLIENT,
+)
+
+PARAMS = BacktestParameters(stop_loss_points=5)
+START = datetime.datetime(2026, 6, 1, 0, 0)
+SIGNAL_INDEX = 260
+
+
+def candle(index, open_, higher, lower, close):
+    return Candle(
+        lower=lower,
+        higher=higher,
+        open=open_,
+        close=close,
+        ut=UnitTime.M15,
+        date=START + datetime.timedelta(minutes=15 * index),
+    )
+
+
+def ranging_series(count=300):
+    """Closes alternating 99/101 around an open of 100: an mm20 of 100
+    and 2.0 bands at 98 and 102 on every candle."""
+    return [
+        candle(
+            index,
+            100.0,
+            101.5,
+            98.5,
+            99.0 if index % 2 == 0 else 101.0,
+        )
+        for index in range(count)
+    ]
+
+
+def trending_series(rng, count=1200):
+    """Legs of a random drift with pullbacks - the market combo is built
+    to signal on, so a few hundred candles give dozens of signals."""
+    candles = []
+    price = 2000.0
+    drift = 0.0
+    for index in range(count):
+        if index % 30 == 0:
+            drift = rng.choice([-1, 1]) * rng.uniform(0.3, 2.0)
+        open_ = price
+        close = open_ + drift + rng.gauss(0, 4)
+        candles.append(
+            candle(
+                index,
+                round(open_, 1),
+                round(max(open_, close) + abs(rng.gauss(0, 2)), 1),
+                round(min(open_, close) - abs(rng.gauss(0, 2)), 1),
+                round(close, 1),
+            )
+        )
+        price = close
+    return candles
+
+
+def signal_at(mocker, candles, signals):
+    """Replace combo with a stub answering `signals[index]` on the window
+    ending at candles[index], and nothing elsewhere."""
+    by_date = {candles[index].date: value for index, value in signals.items()}
+    mocker.patch(
+        "api.services.backtest.combo_strategy.combo",
+        side_effect=lambda window: by_date.get(window[0].date),
+    )
+
+
+def buy(price, triggered=True, strength=SignalStrength.MEDIUM):
+    return ComboSignal(
+        price=price,
+        has_been_triggered=triggered,
+        direction=Direction.BUY,
+        strength=strength,
+        details={},
+    )
+
+
+def evaluate(candles, params=PARAMS):
+    return ComboStrategy._evaluate_trades(
+        candles, 250, params, COMBO_DEFINITION
+    )
+
+
+class TestEntries:
+    def test_a_triggered_signal_enters_at_its_close(self, mocker):
+        candles = ranging_series()
+        signal_at(mocker, candles, {SIGNAL_INDEX: buy(99.0)})
+        trades = evaluate(candles)
+        assert trades[0].entry_time == candles[SIGNAL_INDEX].date
+        assert trades[0].entry_price == 99.0
+        assert trades[0].direction == Direction.BUY
+
+    def test_a_weak_signal_is_no_signal(self, mocker):
+        candles = ranging_series()
+        signal_at(
+            mocker,
+            candles,
+            {SIGNAL_INDEX: buy(99.0, strength=SignalStrength.WEAK)},
+        )
+        assert evaluate(candles) == []
+
+    def test_an_entry_at_or_beyond_the_mm20_is_refused(self, mocker):
+        """FR-C10: a buy at 101 over an mm20 of 100 would bank a loss on
+        its first lot the moment it opened."""
+        candles = ranging_series()
+        signal_at(mocker, candles, {SIGNAL_INDEX + 1: buy(101.0)})
+        assert evaluate(candles) == []
+
+    def test_a_pending_level_fills_at_the_open_it_gapped_to(self, mocker):
+        """The level of an untriggered signal is good for one candle; a
+        candle opening through it fills at the open, and the stop stays
+        measured from the candle the signal fired on."""
+        candles = ranging_series()
+        candles[SIGNAL_INDEX + 1] = candle(
+            SIGNAL_INDEX + 1, 99.5, 99.6, 99.0, 99.3
+        )
+        candles[SIGNAL_INDEX + 2] = candle(
+            SIGNAL_INDEX + 2, 99.3, 99.4, 90.0, 91.0
+        )
+        signal_at(mocker, candles, {SIGNAL_INDEX: buy(99.2, triggered=False)})
+        trade = evaluate(candles)[0]
+        assert trade.entry_time == candles[SIGNAL_INDEX + 1].date
+        assert trade.entry_price == 99.5
+        # 98.5, the signal candle's low, less the 5-point stop
+        assert trade.exit_reason == ExitReason.STOP_LOSS
+        assert trade.exit_price == 93.5
+
+    def test_a_pending_level_not_reached_is_dropped(self, mocker):
+        candles = ranging_series()
+        candles[SIGNAL_INDEX + 1] = candle(
+            SIGNAL_INDEX + 1, 98.9, 99.0, 98.6, 98.8
+        )
+        signal_at(mocker, candles, {SIGNAL_INDEX: buy(99.2, triggered=False)})
+        assert evaluate(candles) == []
+
+    def test_signals_are_ignored_while_a_position_is_open(self, mocker):
+        """The first position is still open on candle 262, where it goes
+        flat; the signal there is dropped, the one on 264 taken."""
+        candles = ranging_series()
+        signal_at(
+            mocker,
+            candles,
+            {
+                SIGNAL_INDEX: buy(99.0),
+                SIGNAL_INDEX + 2: buy(99.0),
+                SIGNAL_INDEX + 4: buy(99.0),
+            },
+        )
+        trades = evaluate(candles)
+        assert [trade.entry_time for trade in trades] == [
+            candles[SIGNAL_INDEX].date,
+            candles[SIGNAL_INDEX + 4].date,
+        ]
+
+
+class TestExits:
+    def test_the_first_lot_banks_the_mm20_then_the_runner_goes_flat(
+        self, mocker
+    ):
+        """Long from 99: the next candle's high reaches the mm20 (100) and
+        banks the first lot, the stop moves to the entry, and the 98.5 low
+        after it takes the runner out there."""
+        candles = ranging_series()
+        signal_at(mocker, candles, {SIGNAL_INDEX: buy(99.0)})
+        trade = evaluate(candles)[0]
+        assert trade.exit_reason == ExitReason.BREAK_EVEN
+        assert trade.exit_time == candles[SIGNAL_INDEX + 2].date
+        assert trade.points > 0
+
+    def test_a_position_open_after_the_last_candle_ends_the_run(self, mocker):
+        candles = ranging_series(count=301)
+        signal_at(mocker, candles, {300: buy(99.0)})
+        trade = evaluate(candles)[0]
+        assert trade.exit_reason == ExitReason.END_OF_RUN
+        assert trade.exit_time == candles[-1].date
+        assert trade.exit_price == candles[-1].close
+
+
+class TestArrayEngine:
+    @pytest.mark.parametrize("seed", range(4))
+    @pytest.mark.parametrize("stop_loss_points", [3.0, 30.0])
+    def test_identical_trades_to_the_candle_by_candle_walk(
+        self, seed, stop_loss_points
+    ):
+        candles = trending_series(random.Random(seed))
+        params = BacktestParameters(stop_loss_points=stop_loss_points)
+        simulated = ComboStrategy._simulate_trades(
+            ComboArrays(candles), 250, params, COMBO_DEFINITION
+        )
+        assert simulated == evaluate(candles, params)
+
+    def test_the_random_markets_do_exercise_the_engine(self):
+        """Guards the test above: identical empty lists prove nothing."""
+        reasons = set()
+        count = 0
+        for seed in range(4):
+            trades = evaluate(trending_series(random.Random(seed)))
+            count += len(trades)
+            reasons.update(trade.exit_reason for trade in trades)
+        assert count >= 10
+        assert {ExitReason.STOP_LOSS, ExitReason.BREAK_EVEN} <= reasons
+
+    def test_the_array_bands_are_the_window_bands(self):
+        candles = trending_series(random.Random(7), count=400)
+        arrays = ComboArrays(candles)
+        for index in range(250, 400, 7):
+            assert arrays.bands(index) == levels(combo_window(candles, index))
+
+
+class TestStreamRange:
+    DAY1 = datetime.date(2026, 6, 1)
+    DAY2 = datetime.date(2026, 6, 2)
+
+    def _strategy(self, candles, dates, first_index):
+        candles_service = MagicMock(spec=CandlesService)
+        candles_service.build_candles.return_value = []
+        strategy = ComboStrategy(candles_service, NO_CACHE_CLIENT)
+        strategy.candle_source.series = AsyncMock(
+            return_value=ComboSeries(candles, dates, first_index)
+        )
+        return strategy
+
+    async def test_a_trade_is_reported_on_the_day_it_entered(self, mocker):
+        """The position opened late on day 1 runs into day 2: day 1 is
+        the TRADED row, day 2 a NO_TRADE one."""
+        candles = ranging_series(count=300)
+        dates = [self.DAY1] * 280 + [self.DAY2] * 20
+        signal_at(mocker, candles, {278: buy(99.0)})
+        candles[279] = candle(279, 99.5, 99.6, 99.0, 99.3)
+        strategy = self._strategy(candles, dates, 250)
+        strategy.array_engine = False
+
+        items = [
+            item
+            async for item in strategy.stream_range(
+                COMBO_DEFINITION, self.DAY1, self.DAY2
+            )
+        ]
+        *days, summary = items
+        assert [(day.date, day.status, day.trade_count) for day in days] == [
+            (self.DAY1, DayStatus.TRADED, 1),
+            (self.DAY2, DayStatus.NO_TRADE, 0),
+        ]
+        assert summary.number_of_trades == 1
+        assert summary.number_of_days == 2
+
+    async def test_a_range_without_candles_reports_no_day(self, mocker):
+        strategy = self._strategy([], [], 0)
+        result = await strategy.run_range(
+            COMBO_DEFINITION, self.DAY1, self.DAY2
+        )
+        assert result.days == []
+        assert result.summary.number_of_trades == 0
+
+    async def test_evaluate_day_on_a_day_without_candles(self, mocker):
+        strategy = self._strategy([], [], 0)
+        day = await strategy.evaluate_day(COMBO_DEFINITION, self.DAY1)
+        assert day.status == DayStatus.NO_DATA
+        assert day.h1_high is None
@@ -10,6 +10,7 @@ from api.services.backtest import (
 from model import (
     BacktestDefinition,
     BacktestParameters,
+    DaxCfdMarket,
     EuCfdMarket,
     EUMarket,
     UnitTime,
@@ -126,8 +127,12 @@ class TestRegistry:
         """Derived from the registry rather than a second copy of it, and
         keyed on the rule rather than on codes: the impulse stop is what
         makes holding into the evening meaningful, so exactly the
-        definitions carrying one trade the CFD session."""
+        definitions carrying one trade the CFD session. The combo
+        definitions read their own 02:00-22:00 series and are left to
+        TestComboRegistry."""
         for definition in list_definitions():
+            if definition.combo_entry:
+                continue
             expected = (
                 EuCfdMarket
                 if definition.impulsive_candle_points is not None
@@ -430,3 +435,31 @@ class TestComboDefinitionValidation:
         first lot exits."""
         with pytest.raises(ValueError, match="first_target_fraction"):
             self._build(double_take_profit=True)
+
+
+class TestComboRegistry:
+    @pytest.mark.parametrize(
+        "code,unit_time,stop_loss_points",
+        [
+            ("C5M", UnitTime.M5, 50),
+            ("C15M", UnitTime.M15, 50),
+            ("C1H", UnitTime.H1, 50),
+            ("C1D", UnitTime.D, 150),
+        ],
+    )
+    def test_one_combo_definition_per_timeframe(
+        self, code, unit_time, stop_loss_points
+    ):
+        definition = get_definition(code)
+        assert definition is not None
+        assert definition.combo_entry is True
+        assert definition.unit_time == unit_time
+        assert definition.instrument == "GER40.I"
+        assert isinstance(definition.market, DaxCfdMarket)
+        assert (
+            definition.default_parameters.stop_loss_points == stop_loss_points
+        )
+
+    def test_the_combo_definitions_come_last_in_the_menu(self):
+        codes = [definition.code for definition in list_definitions()]
+        assert codes[-4:] == ["C5M", "C15M", "C1H", "C1D"]
@@ -0,0 +1,36 @@
+import asyncio
+
+from api.services.backtest.fetch_failures import (
+    fetch_failed,
+    recording_fetch_failures,
+)
+
+
+class TestFetchFailures:
+    def test_a_failure_outside_a_recording_is_ignored(self):
+        fetch_failed("H1 DAX.I 2026-06-01")
+
+        with recording_fetch_failures() as failures:
+            pass
+
+        assert failures == []
+
+    async def test_worker_threads_report_to_their_run(self):
+        with recording_fetch_failures() as failures:
+            await asyncio.to_thread(fetch_failed, "M5 DAX.I 2026-06-01")
+
+        assert failures == ["M5 DAX.I 2026-06-01"]
+
+    async def test_concurrent_runs_keep_their_own_failures(self):
+        async def run(failing: bool):
+            with recording_fetch_failures() as failures:
+                await asyncio.sleep(0)
+                if failing:
+                    fetch_failed("H1 DAX.I 2026-06-01")
+                await asyncio.sleep(0)
+            return failures
+
+        failed, healthy = await asyncio.gather(run(True), run(False))
+
+        assert failed == ["H1 DAX.I 2026-06-01"]
+        assert healthy == []
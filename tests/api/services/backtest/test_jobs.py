@@ -0,0 +1,212 @@
+"""Range runs as jobs: the same result as run_range, shared between
+identical submissions and memoized for past ranges."""
+
+import asyncio
+import datetime
+
+import pytest
+
+from api.services.backtest import jobs
+from api.services.backtest.jobs import BacktestJobRunner, weekdays_between
+from api.services.backtest.run_store import RunStore
+from model import BacktestJobStatus, BacktestParameters
+from tests.api.services.backtest.helpers import (
+    DEFINITION,
+    h1_candle,
+    make_service,
+    stop_loss_candles,
+)
+from utils.exception import SaxoException
+
+START = datetime.date(2026, 6, 1)
+END = datetime.date(2026, 6, 12)
+PARAMS = DEFINITION.default_parameters
+
+
+@pytest.fixture
+def runner(tmp_path) -> BacktestJobRunner:
+    return BacktestJobRunner(RunStore(str(tmp_path)))
+
+
+def fetch_count(service) -> int:
+    return service.candles_service.get_candles_in_window.call_count
+
+
+async def finished(runner: BacktestJobRunner, job_id: str):
+    async for job in runner.progress(job_id):
+        pass
+    return job
+
+
+class TestWeekdaysBetween:
+    def test_weekends_are_not_counted(self):
+        assert weekdays_between(START, END) == 10
+        assert weekdays_between(START, START) == 1
+        assert (
+            weekdays_between(
+                datetime.date(2026, 6, 6), datetime.date(2026, 6, 7)
+            )
+            == 0
+        )
+
+
+class TestBacktestJobRunner:
+    async def test_a_job_gives_the_range_run(self, runner):
+        service = make_service([h1_candle()], stop_loss_candles())
+
+        job = runner.submit(service, DEFINITION, START, END, PARAMS)
+        done = await finished(runner, job.job_id)
+
+        assert done.status == BacktestJobStatus.DONE
+        assert not done.memoized
+        assert done.days_done == done.days_total == 10
+        assert done.last_date == END
+        assert done.result == await service.run_range(
+            DEFINITION, START, END, PARAMS
+        )
+
+    async def test_identical_submissions_share_one_execution(self, runner):
+        service = make_service([h1_candle()], stop_loss_candles())
+
+        first = runner.submit(service, DEFINITION, START, END, PARAMS)
+        second = runner.submit(service, DEFINITION, START, END, PARAMS)
+        await finished(runner, first.job_id)
+
+        assert second is first
+        # An H1 and a 5-minute fetch per weekday, once
+        assert fetch_count(service) == 20
+
+    async def test_a_past_range_is_answered_from_the_store(self, tmp_path):
+        service = make_service([h1_candle()], stop_loss_candles())
+        first_runner = BacktestJobRunner(RunStore(str(tmp_path)))
+        first = first_runner.submit(service, DEFINITION, START, END, PARAMS)
+        await finished(first_runner, first.job_id)
+        fetches = fetch_count(service)
+
+        # Another process, reading the same store
+        runner = BacktestJobRunner(RunStore(str(tmp_path)))
+        again = runner.submit(service, DEFINITION, START, END, PARAMS)
+
+        assert again.status == BacktestJobStatus.DONE
+        assert again.memoized
+        assert again.result == first.result
+        assert fetch_count(service) == fetches
+
+    async def test_a_run_degraded_by_a_failed_fetch_is_not_memoized(
+        self, tmp_path
+    ):
+        failing = make_service(
+            [h1_candle()], stop_loss_candles(), raise_on_m5=True
+        )
+        first_runner = BacktestJobRunner(RunStore(str(tmp_path)))
+        first = first_runner.submit(failing, DEFINITION, START, END, PARAMS)
+        done = await finished(first_runner, first.job_id)
+        assert done.status == BacktestJobStatus.DONE
+
+        # Saxo is back: the range is evaluated again, and kept this time
+        service = make_service([h1_candle()], stop_loss_candles())
+        runner = BacktestJobRunner(RunStore(str(tmp_path)))
+        again = runner.submit(service, DEFINITION, START, END, PARAMS)
+        assert not again.memoized
+        await finished(runner, again.job_id)
+        assert runner.submit(service, DEFINITION, START, END, PARAMS).memoized
+
+    async def test_other_parameters_are_another_run(self, runner):
+        service = make_service([h1_candle()], stop_loss_candles())
+        first = runner.submit(service, DEFINITION, START, END, PARAMS)
+        await finished(runner, first.job_id)
+
+        other = runner.submit(
+            service,
+            DEFINITION,
+            START,
+            END,
+            BacktestParameters(stop_loss_points=10),
+        )
+
+        assert not other.memoized
+        assert other.job_id != first.job_id
+        await finished(runner, other.job_id)
+
+    async def test_a_range_ending_today_is_not_memoized(self, runner, mocker):
+        mocker.patch.object(jobs, "is_memoizable", return_value=False)
+        service = make_service([h1_candle()], stop_loss_candles())
+        first = runner.submit(service, DEFINITION, START, END, PARAMS)
+        await finished(runner, first.job_id)
+
+        again = runner.submit(service, DEFINITION, START, END, PARAMS)
+
+        assert not again.memoized
+        assert again.status != BacktestJobStatus.DONE
+        await finished(runner, again.job_id)
+
+    async def test_progress_follows_every_day(self, runner, mocker):
+        service = make_service([h1_candle()], stop_loss_candles())
+        run = await service.run_range(DEFINITION, START, END, PARAMS)
+
+        async def slow_stream(*args):
+            # A day per turn of the event loop, as a cold range would
+            for day in run.days:
+                await asyncio.sleep(0)
+                yield day
+            yield run.summary
+
+        mocker.patch.object(service, "stream_range", side_effect=slow_stream)
+        job = runner.submit(service, DEFINITION, START, END, PARAMS)
+
+        seen = [
+            (update.status, update.days_done)
+            async for update in runner.progress(job.job_id)
+        ]
+
+        assert seen[0] == (BacktestJobStatus.PENDING, 0)
+        assert seen[-1] == (BacktestJobStatus.DONE, 10)
+        assert [days for _, days in seen[1:-1]] == list(range(11))
+
+    async def test_a_failing_run_fails_the_job(self, runner, mocker):
+        service = make_service([h1_candle()], stop_loss_candles())
+
+        async def failing(*args):
+            yield await asyncio.sleep(0)
+            raise SaxoException("boom")
+
+        mocker.patch.object(service, "stream_range", side_effect=failing)
+
+        job = runner.submit(service, DEFINITION, START, END, PARAMS)
+        done = await finished(runner, job.job_id)
+
+        assert done.status == BacktestJobStatus.FAILED
+        assert done.error is not None
+        assert done.result is None
+        # Not shared anymore: the next submission runs again
+        assert runner.submit(service, DEFINITION, START, END, PARAMS) is not (
+            job
+        )
+
+    def test_an_unrunnable_definition_creates_no_job(self, runner, mocker):
+        service = make_service([h1_candle()], stop_loss_candles())
+        mocker.patch.object(
+            service, "stream_range", side_effect=SaxoException("no engine")
+        )
+
+        with pytest.raises(SaxoException):
+            runner.submit(service, DEFINITION, START, END, PARAMS)
+
+    async def test_old_finished_jobs_are_forgotten(self, runner, mocker):
+        mocker.patch.object(jobs, "JOB_HISTORY", 2)
+        service = make_service([h1_candle()], stop_loss_candles())
+        submitted = []
+        for stop_loss in (10, 20, 30):
+            job = runner.submit(
+                service,
+                DEFINITION,
+                START,
+                START,
+                BacktestParameters(stop_loss_points=stop_loss),
+            )
+            await finished(runner, job.job_id)
+            submitted.append(job)
+
+        assert runner.get(submitted[0].job_id) is None
+        assert runner.get(submitted[2].job_id) is submitted[2]
+        assert runner.get("unknown") is None
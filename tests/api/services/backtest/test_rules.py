@@ -312,6 +312,12 @@ class TestRegisteredDefinitionChains:
             # G9HIC's, unchanged.
             "G9HICMH": [Stop, Target, ImpulsiveStop, ArmBreakEven],
             "G9HICMD": [Stop, Target, ImpulsiveStop, ArmBreakEven],
+            # The combo runner keeps its stop until TP1 moves it
+            # (FR-C07): no points-based break-even.
+            "C5M": [Stop, DoubleTarget],
+            "C15M": [Stop, DoubleTarget],
+            "C1H": [Stop, DoubleTarget],
+            "C1D": [Stop, DoubleTarget],
         }
         actual = {
             definition.code: _shape(definition)
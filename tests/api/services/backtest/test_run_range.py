@@ -222,6 +222,39 @@ class TestRunRange:
         assert result.summary.final_result == 0
 
 
+class TestStreamRange:
+    async def test_days_as_evaluated_then_the_summary(self):
+        service = make_service([h1_candle()], stop_loss_candles())
+        start = datetime.date(2026, 6, 1)
+        end = datetime.date(2026, 6, 12)
+
+        items = [
+            item async for item in service.stream_range(DEFINITION, start, end)
+        ]
+
+        run = await service.run_range(DEFINITION, start, end)
+        assert items[:-1] == run.days
+        assert items[-1] == run.summary
+
+    async def test_candles_are_prefetched_a_chunk_at_a_time(self, mocker):
+        service = make_service([h1_candle()], stop_loss_candles())
+        strategy = service.strategies.session_range
+        prefetch = mocker.spy(strategy.candle_source, "prefetch_range")
+        start = datetime.date(2026, 6, 1)
+        end = datetime.date(2026, 6, 12)
+
+        stream = strategy.stream_range(DEFINITION, start, end, prefetch_days=3)
+        first = await stream.__anext__()
+
+        # Only the first chunk is resolved before the first row
+        assert first.date == start
+        assert prefetch.call_count == 1
+        rest = [item async for item in stream]
+        chunks = [len(call.args[1]) for call in prefetch.call_args_list]
+        assert chunks == [3, 3, 3, 1]
+        assert len(rest) == 10
+
+
 class TestRunRangeThreadsRegime:
     async def test_mm50_slope_populated_on_summary(self):
         trading_date = datetime.date(2026, 6, 2)
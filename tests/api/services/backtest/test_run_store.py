@@ -0,0 +1,122 @@
+"""Memoized range runs: the key covers every input of a run, and a
+stored result reads back exactly."""
+
+import dataclasses
+import datetime
+import os
+
+from api.services.backtest import run_store
+from api.services.backtest.run_store import RunStore, is_memoizable, run_key
+from model import (
+    BacktestParameters,
+    BacktestRunResult,
+    BacktestSummary,
+    DayResultSummary,
+)
+from model.enum import DayStatus
+from tests.api.services.backtest.helpers import DEFINITION, GER_DEFINITION
+
+START = datetime.date(2026, 6, 1)
+END = datetime.date(2026, 6, 12)
+
+
+def run_result() -> BacktestRunResult:
+    return BacktestRunResult(
+        summary=BacktestSummary(
+            definition_code="B9H",
+            start_date=START,
+            end_date=END,
+            number_of_days=2,
+            number_of_trades=1,
+            number_of_winning_positions=1,
+            number_of_losing_positions=0,
+            number_of_be=0,
+            average_win=30.0,
+            average_loss=None,
+            final_result=30.0,
+        ),
+        days=[
+            DayResultSummary(
+                date=START,
+                status=DayStatus.NO_TRADE,
+                trade_count=0,
+                points=0.0,
+                h1_high=8050.0,
+                h1_low=8000.0,
+            ),
+            DayResultSummary(
+                date=datetime.date(2026, 6, 2),
+                status=DayStatus.TRADED,
+                trade_count=1,
+                points=30.0,
+                h1_high=8050.0,
+                h1_low=8000.0,
+                mm50_slope=1.2345,
+                adx14=27.5,
+                h1_open=8020.0,
+                overnight_gap=-12.5,
+            ),
+        ],
+    )
+
+
+class TestRunKey:
+    def test_every_input_changes_the_key(self, mocker):
+        params = BacktestParameters()
+        key = run_key(DEFINITION, params, START, END)
+
+        assert run_key(DEFINITION, params, START, END) == key
+        assert run_key(GER_DEFINITION, params, START, END) != key
+        assert (
+            run_key(
+                DEFINITION,
+                BacktestParameters(stop_loss_points=20),
+                START,
+                END,
+            )
+            != key
+        )
+        assert run_key(DEFINITION, params, START, START) != key
+        mocker.patch.object(run_store, "RUN_STORE_VERSION", 2)
+        assert run_key(DEFINITION, params, START, END) != key
+
+    def test_a_rule_change_under_the_same_code_changes_the_key(self):
+        edited = dataclasses.replace(DEFINITION, min_h1_range_points=40.0)
+
+        assert run_key(edited, BacktestParameters(), START, END) != run_key(
+            DEFINITION, BacktestParameters(), START, END
+        )
+
+
+class TestIsMemoizable:
+    def test_only_ranges_ending_before_today(self):
+        now = datetime.datetime(2026, 6, 12, 20, 0, tzinfo=run_store.PARIS_TZ)
+
+        assert is_memoizable(datetime.date(2026, 6, 11), now)
+        assert not is_memoizable(datetime.date(2026, 6, 12), now)
+
+
+class TestRunStore:
+    def test_round_trip_through_disk(self, tmp_path):
+        RunStore(str(tmp_path)).put("key", run_result())
+
+        # A new store, as after a restart: read from disk
+        assert RunStore(str(tmp_path)).get("key") == run_result()
+
+    def test_unknown_key_is_a_miss(self, tmp_path):
+        assert RunStore(str(tmp_path)).get("key") is None
+
+    def test_unreadable_document_is_a_miss(self, tmp_path):
+        with open(os.path.join(tmp_path, "key.json"), "w") as f:
+            f.write('{"summary": ')
+
+        assert RunStore(str(tmp_path)).get("key") is None
+
+    def test_unwritable_directory_still_memoizes_in_memory(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        store = RunStore(str(blocker / "runs"))
+
+        store.put("key", run_result())
+
+        assert store.get("key") == run_result()
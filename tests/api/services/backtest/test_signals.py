@@ -0,0 +1,104 @@
+"""From combo signals to entries: the triggered entry, the pending level
+of an untriggered one, and its one-candle life (FR-C02-FR-C04)."""
+
+import datetime
+
+from api.services.backtest.side import LONG, SHORT
+from api.services.backtest.signals import ComboEntrySearch
+from model import Candle, ComboSignal, SignalStrength, UnitTime
+from model.enum import Direction
+
+
+def candle(open, higher, lower, close):
+    return Candle(
+        lower=lower,
+        higher=higher,
+        open=open,
+        close=close,
+        ut=UnitTime.M15,
+        date=datetime.datetime(2026, 6, 2, 8, 0),
+    )
+
+
+def signal(
+    price,
+    direction=Direction.BUY,
+    triggered=True,
+    strength=SignalStrength.MEDIUM,
+):
+    return ComboSignal(
+        price=price,
+        has_been_triggered=triggered,
+        direction=direction,
+        strength=strength,
+        details={},
+    )
+
+
+SIGNAL_CANDLE = candle(24000, 24020, 23990, 24010)
+
+
+class TestSignal:
+    def test_a_triggered_signal_enters_at_its_price(self):
+        entry = ComboEntrySearch().signal(SIGNAL_CANDLE, signal(24010))
+        assert entry is not None
+        assert entry.side == LONG
+        assert entry.price == 24010
+        assert entry.signal_candle is SIGNAL_CANDLE
+
+    def test_a_sell_signal_enters_short(self):
+        entry = ComboEntrySearch().signal(
+            SIGNAL_CANDLE, signal(24010, direction=Direction.SELL)
+        )
+        assert entry is not None
+        assert entry.side == SHORT
+
+    def test_a_weak_signal_is_no_signal(self):
+        search = ComboEntrySearch()
+        weak = signal(24020, triggered=False, strength=SignalStrength.WEAK)
+        assert search.signal(SIGNAL_CANDLE, weak) is None
+        assert search.pending is None
+
+    def test_no_signal_is_no_entry(self):
+        assert ComboEntrySearch().signal(SIGNAL_CANDLE, None) is None
+
+    def test_an_untriggered_signal_arms_a_pending_level(self):
+        search = ComboEntrySearch()
+        untriggered = signal(24020, triggered=False)
+        assert search.signal(SIGNAL_CANDLE, untriggered) is None
+        assert search.pending is not None
+        assert search.pending.level == 24020
+
+
+class TestFill:
+    def _armed(self, direction=Direction.BUY, level=24020):
+        search = ComboEntrySearch()
+        search.signal(
+            SIGNAL_CANDLE, signal(level, direction=direction, triggered=False)
+        )
+        return search
+
+    def test_the_next_candle_fills_at_the_level(self):
+        entry = self._armed().fill(candle(24010, 24030, 24005, 24025))
+        assert entry is not None
+        assert entry.price == 24020
+        assert entry.signal_candle is SIGNAL_CANDLE
+
+    def test_a_gap_through_the_level_fills_at_the_open(self):
+        entry = self._armed().fill(candle(24028, 24040, 24025, 24035))
+        assert entry is not None
+        assert entry.price == 24028
+
+    def test_a_short_gap_fills_at_the_lower_open(self):
+        search = self._armed(Direction.SELL, level=23990)
+        entry = search.fill(candle(23980, 23985, 23970, 23975))
+        assert entry is not None
+        assert entry.side == SHORT
+        assert entry.price == 23980
+
+    def test_a_level_the_next_candle_misses_is_dropped(self):
+        search = self._armed()
+        assert search.fill(candle(24000, 24015, 23995, 24010)) is None
+        assert search.pending is None
+        # Not carried to the candle after
+        assert search.fill(candle(24010, 24050, 24005, 24040)) is None
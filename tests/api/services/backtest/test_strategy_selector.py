@@ -7,15 +7,13 @@ return a plausible result computed from rules it never applied.
 
 from unittest.mock import MagicMock
 
-import pytest
-
 from api.services.backtest import get_definition, list_definitions
+from api.services.backtest.combo_strategy import ComboStrategy
 from api.services.backtest.session_range import SessionRangeStrategy
 from api.services.backtest.strategy import StrategySelector
 from client.aws_client import DynamoDBClient
 from model import BacktestDefinition, UnitTime
 from services.candles_service import CandlesService
-from utils.exception import SaxoException
 
 
 def make_selector() -> StrategySelector:
@@ -61,25 +59,22 @@ class TestStrategySelector:
         second = selector.for_definition(get_definition("G9H"))
         assert first is second
 
-    def test_a_combo_definition_raises_instead_of_running(self):
-        """Until the combo engine lands, selecting one must fail loudly.
-        Returning the session-range engine would report a result for
-        rules that were never applied - the failure this seam exists to
-        prevent."""
-        with pytest.raises(SaxoException, match="not implemented yet"):
-            make_selector().for_definition(combo_definition())
+    def test_a_combo_definition_runs_on_the_combo_engine(self):
+        selector = make_selector()
+        assert selector.for_definition(combo_definition()) is selector.combo
+        assert isinstance(selector.combo, ComboStrategy)
+
+    def test_every_shipped_combo_definition_runs_on_the_combo_engine(self):
+        selector = make_selector()
+        combos = [d for d in list_definitions() if d.combo_entry]
+        assert combos
+        for definition in combos:
+            assert selector.for_definition(definition) is selector.combo
 
     def test_a_combo_definition_never_falls_back_to_session_range(self):
         selector = make_selector()
-        try:
-            returned = selector.for_definition(combo_definition())
-        except SaxoException:
-            return
+        returned = selector.for_definition(combo_definition())
         assert returned is not selector.session_range, (
             "a combo definition must not be silently routed to the "
             "session-range engine"
         )
-
-    def test_the_error_names_the_definition(self):
-        with pytest.raises(SaxoException, match="CTEST"):
-            make_selector().for_definition(combo_definition())
@@ -0,0 +1,121 @@
+"""Parameter sweeps: one range load, every combination of the grid, the
+same summaries run_range gives one combination at a time."""
+
+import datetime
+
+import pytest
+
+from api.services.backtest import sweep
+from api.services.backtest.sweep import SWEEP_MAX_COMBINATIONS, parameter_grid
+from model import BacktestParameters
+from tests.api.services.backtest.helpers import (
+    DEFINITION,
+    GER_DEFINITION,
+    h1_candle,
+    m5_candle,
+    make_service,
+    stop_loss_candles,
+)
+from utils.exception import SaxoException
+
+START = datetime.date(2026, 6, 1)
+END = datetime.date(2026, 6, 12)
+
+
+def sweep_candles():
+    """A long entry at 8015 followed by a 25-point adverse swing and a run
+    up to the top of the range: a tight stop loses, a wide one wins."""
+    return stop_loss_candles()[:3] + [
+        m5_candle(3, 8015, 8018, 7990, 7995),
+        m5_candle(4, 7995, 8049, 7994, 8045),
+    ]
+
+
+class TestParameterGrid:
+    def test_every_combination_with_defaults_for_the_rest(self):
+        grid = parameter_grid(
+            DEFINITION,
+            stop_loss_points=[20, 50],
+            break_even_trigger_points=[5],
+        )
+
+        defaults = DEFINITION.default_parameters
+        assert [p.stop_loss_points for p in grid] == [20, 50]
+        assert {p.break_even_trigger_points for p in grid} == {5}
+        assert {p.take_profit_offset_points for p in grid} == {
+            defaults.take_profit_offset_points
+        }
+
+    def test_an_empty_grid_is_the_default_parameters(self):
+        assert parameter_grid(GER_DEFINITION) == [
+            GER_DEFINITION.default_parameters
+        ]
+
+    def test_oversized_grids_are_refused(self):
+        # 11 * 11 * 11 * 2 combinations
+        values = list(range(1, 12))
+        assert len(values) ** 3 * 2 > SWEEP_MAX_COMBINATIONS
+
+        with pytest.raises(SaxoException):
+            parameter_grid(
+                DEFINITION,
+                stop_loss_points=values,
+                take_profit_offset_points=values,
+                break_even_trigger_points=values,
+                max_entry_distance_points=[1, 2],
+            )
+
+
+class TestSweep:
+    async def test_matches_one_range_run_per_combination(self):
+        grid = parameter_grid(
+            DEFINITION,
+            stop_loss_points=[10, 50],
+            break_even_trigger_points=[5, 100],
+        )
+        service = make_service([h1_candle()], sweep_candles())
+
+        results = await service.sweep(DEFINITION, START, END, grid)
+
+        for result in results:
+            run = await service.run_range(
+                DEFINITION, START, END, result.params
+            )
+            assert result.summary == run.summary
+        assert [r.summary.final_result for r in results] == sorted(
+            (r.summary.final_result for r in results), reverse=True
+        )
+        assert results[0].params.stop_loss_points == 50
+
+    async def test_candles_are_loaded_once(self):
+        grid = parameter_grid(DEFINITION, stop_loss_points=[10, 20, 30])
+        service = make_service([h1_candle()], sweep_candles())
+
+        await service.sweep(DEFINITION, START, END, grid)
+
+        # An H1 and a 5-minute fetch per weekday, whatever the grid size
+        candles_service = service.strategies.session_range.candles_service
+        assert candles_service.get_candles_in_window.call_count == 20
+
+    async def test_worker_processes_give_the_same_ranking(self, mocker):
+        mocker.patch.object(sweep, "SWEEP_MIN_PARALLEL_COMBINATIONS", 2)
+        grid = [
+            BacktestParameters(stop_loss_points=stop_loss)
+            for stop_loss in (10, 20, 30, 50)
+        ]
+        service = make_service([h1_candle()], sweep_candles())
+        (
+            days,
+            number_of_days,
+        ) = await service.strategies.session_range.sweep_days(
+            DEFINITION, START, END
+        )
+
+        inline = await sweep.run_sweep(
+            DEFINITION, START, END, number_of_days, days, grid, max_workers=1
+        )
+        parallel = await sweep.run_sweep(
+            DEFINITION, START, END, number_of_days, days, grid, max_workers=2
+        )
+
+        assert parallel == inline
@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+
+from api.services.report_service import ReportService
+from api.services.report_store import ReportStore
+from client.gsheet_client import ReportedOrders, order_row_key
+from model import Account, Currency, Direction, ReportOrder
+
+
+def _order(direction: Direction, price: float, day: int = 4) -> ReportOrder:
+    return ReportOrder(
+        code="SAN",
+        price=price,
+        quantity=10,
+        direction=direction,
+        currency=Currency.EURO,
+        date=datetime.datetime(2024, 3, day, 10, 15),
+        activity_id=f"{direction}-{day}",
+    )
+
+
+@pytest.fixture
+def report_service(mocker, tmp_path):
+    mocker.patch("api.services.report_service.GSheetClient")
+    client = mocker.Mock()
+    client.get_account.return_value = Account(key="key", name="PEA")
+    client.get_accounts.return_value = {
+        "Data": [{"AccountId": "acc", "AccountKey": "key"}]
+    }
+    return ReportService(
+        client,
+        mocker.Mock(currencies_rate={}),
+        ReportStore(None, directory=str(tmp_path)),
+    )
+
+
+async def test_summary_is_computed_from_the_synced_report(report_service):
+    orders = [_order(Direction.BUY, 10.0), _order(Direction.SELL, 12.0)]
+    report_service.client.iter_report_pages.return_value = [orders]
+
+    summary = await report_service.summarize_orders_report("acc", "2024")
+
+    assert summary == report_service.calculate_summary(orders)
+    assert summary["buy_orders"] == 1
+    assert summary["sell_volume_eur"] == 120.0
+
+
+def test_only_new_activities_are_fetched(report_service):
+    client = report_service.client
+    client.iter_report_pages.return_value = [
+        [_order(Direction.BUY, 10.0, day=4)]
+    ]
+    report_service.get_orders_report("acc", "2024-03-01")
+
+    client.iter_report_pages.return_value = [
+        [_order(Direction.BUY, 10.0, day=4)],
+        [_order(Direction.SELL, 12.0, day=6)],
+    ]
+    orders = report_service.get_orders_report("acc", "2024-03-05")
+
+    assert [o.price for o in orders] == [12.0]
+    assert client.iter_report_pages.call_args.args[1] == "2024-03-04"
+    assert len(report_service.get_orders_report("acc", "2024-03-01")) == 2
+
+
+def test_export_writes_closing_fills_into_their_opening_row(report_service):
+    """A position is one row of the sheet: a closing fill goes into the
+    row it closes, never into a new row of its own."""
+    sheet = report_service.gsheet_client
+    reported = ReportedOrders()
+    reported.fills[order_row_key(datetime.date(2024, 3, 4), "SAN", 10)] = 1
+    reported.opened(datetime.date(2024, 3, 4), "SAN", 10, Direction.BUY, 12)
+    sheet.get_reported_orders.return_value = reported
+    sheet.create_orders.return_value = {
+        "updates": {"updatedRange": "'Liste d’ordre'!A40:AP40"}
+    }
+    report_service.client.iter_report_pages.return_value = [
+        [
+            _order(Direction.BUY, 10.0, day=4),
+            _order(Direction.SELL, 12.0, day=6),
+            _order(Direction.BUY, 11.0, day=7),
+            _order(Direction.SELL, 13.0, day=8),
+        ]
+    ]
+
+    assert report_service.export_to_gsheet("acc", "2024-03-01") == 3
+
+    account, rows = sheet.create_orders.call_args.args
+    assert account.name == "PEA"
+    assert [original.price for _, original in rows] == [11.0]
+    (closings,) = sheet.update_orders.call_args.args
+    assert [
+        (original.price, original.open_position, line)
+        for _, original, line in closings
+    ] == [(12.0, False, 12), (13.0, False, 40)]
+
+
+def test_export_leaves_a_partial_close_out(report_service):
+    sheet = report_service.gsheet_client
+    reported = ReportedOrders()
+    reported.opened(datetime.date(2024, 3, 4), "SAN", 20, Direction.BUY, 12)
+    sheet.get_reported_orders.return_value = reported
+    report_service.client.iter_report_pages.return_value = [
+        [_order(Direction.SELL, 12.0, day=6)]
+    ]
+
+    assert report_service.export_to_gsheet("acc", "2024-03-01") == 0
+
+    sheet.create_orders.assert_not_called()
+    sheet.update_orders.assert_not_called()
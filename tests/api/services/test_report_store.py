@@ -0,0 +1,95 @@
+import datetime
+import threading
+
+from api.services.report_store import ReportStore
+from model import (
+    AssetType,
+    Currency,
+    Direction,
+    ReportOrder,
+    Taxes,
+    Underlying,
+)
+
+
+def _turbo(day: int) -> ReportOrder:
+    return ReportOrder(
+        code="TURBO",
+        name="Turbo on DAX",
+        price=1.5,
+        quantity=100,
+        direction=Direction.SELL,
+        asset_type=AssetType.TURBO,
+        currency=Currency.EURO,
+        date=datetime.datetime(2024, 3, day, 10, 15, tzinfo=datetime.UTC),
+        taxes=Taxes(cost=1.0, taxes=0.5),
+        underlying=Underlying(price=18000.0),
+        activity_id=f"order-{day}",
+    )
+
+
+def test_the_store_survives_a_restart(tmp_path):
+    fetched = []
+
+    def fetch(from_date):
+        fetched.append(from_date)
+        return [_turbo(4), _turbo(5)]
+
+    ReportStore(None, directory=str(tmp_path)).get_orders("acc", "2024", fetch)
+    orders = ReportStore(None, directory=str(tmp_path)).get_orders(
+        "acc", "2024-03-05", fetch
+    )
+
+    assert fetched == ["2024", "2024-03-05"]
+    assert len(orders) == 1
+    assert vars(orders[0]) == vars(_turbo(5))
+
+
+def test_an_older_range_is_backfilled(tmp_path):
+    store = ReportStore(None, directory=str(tmp_path))
+    fetched = []
+
+    def fetch(from_date):
+        fetched.append(from_date)
+        return [_turbo(4)] if from_date >= "2024-03" else [_turbo(1)]
+
+    store.get_orders("acc", "2024-03-03", fetch)
+    orders = store.get_orders("acc", "2024-02-01", fetch)
+
+    assert fetched == ["2024-03-03", "2024-02-01"]
+    assert [o.activity_id for o in orders] == ["order-1", "order-4"]
+
+
+def test_a_slow_sync_does_not_hold_up_another_account(tmp_path):
+    store = ReportStore(None, directory=str(tmp_path))
+    fetching = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch(from_date):
+        fetching.set()
+        release.wait(timeout=5)
+        return [_turbo(4)]
+
+    slow = threading.Thread(
+        target=store.get_orders, args=("slow", "2024", slow_fetch)
+    )
+    slow.start()
+    fetching.wait(timeout=5)
+    try:
+        orders = store.get_orders("other", "2024", lambda _: [_turbo(5)])
+        assert not release.is_set()
+    finally:
+        release.set()
+        slow.join()
+
+    assert [o.activity_id for o in orders] == ["order-5"]
+
+
+def test_orders_are_iterated_from_the_requested_day(tmp_path):
+    store = ReportStore(None, directory=str(tmp_path))
+
+    orders = store.iter_orders(
+        "acc", "2024/03/05", lambda _: iter([_turbo(4), _turbo(6)])
+    )
+
+    assert [o.activity_id for o in orders] == ["order-6"]
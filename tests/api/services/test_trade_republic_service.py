@@ -1,3 +1,4 @@
+import codecs
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -5,7 +6,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from api.services.trade_republic_service import TradeRepublicService
-from client.gsheet_client import GSheetClient
+from client.gsheet_client import EtfDcaRows, GSheetClient
 from model import AssetType, Currency, TradeRepublicTransaction
 
 FIXTURE_PATH = (
@@ -18,7 +19,9 @@ FIXTURE_PATH = (
 
 @pytest.fixture
 def service() -> TradeRepublicService:
-    return TradeRepublicService(MagicMock(spec=GSheetClient))
+    gsheet_client = MagicMock(spec=GSheetClient)
+    gsheet_client.get_etf_dca_rows.return_value = EtfDcaRows()
+    return TradeRepublicService(gsheet_client)
 
 
 @pytest.fixture
@@ -131,6 +134,18 @@ class TestParseCsv:
         assert len(transactions) == 1
         assert transactions[0].amount == -2.97
 
+    def test_streams_an_uploaded_file_line_by_line(self, service):
+        with open(FIXTURE_PATH, "rb") as f:
+            results = service.iter_csv(codecs.iterdecode(f, "utf-8"))
+            first = next(results)
+            consumed = f.tell()
+            rest = list(results)
+
+        expected, errors = service.parse_csv(FIXTURE_PATH.read_text())
+        assert first == expected[0]
+        assert len(rest) == len(expected) + len(errors) - 1
+        assert consumed < FIXTURE_PATH.stat().st_size
+
 
 def _stub_transaction(transaction_id: str) -> TradeRepublicTransaction:
     return TradeRepublicTransaction(
@@ -159,6 +174,23 @@ class TestExportTransactions:
         )
         assert count == 2
 
+    def test_skips_transactions_already_in_the_sheet(self, service):
+        service.gsheet_client.get_etf_dca_rows.return_value = EtfDcaRows(
+            ids={"tx-1"}
+        )
+        transactions = [
+            _stub_transaction("tx-1"),
+            _stub_transaction("tx-2"),
+            _stub_transaction("tx-2"),
+        ]
+
+        count = service.export_transactions(transactions)
+
+        service.gsheet_client.append_etf_dca_rows.assert_called_once_with(
+            [transactions[1]]
+        )
+        assert count == 1
+
     def test_propagates_gsheet_client_exceptions(self, service):
         service.gsheet_client.append_etf_dca_rows.side_effect = RuntimeError(
             "boom"
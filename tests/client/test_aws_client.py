@@ -192,6 +192,29 @@ class TestDynamoDBClient:
         # Should return success response
         assert result["ResponseMetadata"]["HTTPStatusCode"] == 200
 
+    async def test_get_workflow_orders_placed_after_queries_the_tail(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        mock_table.query.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Items": [{"workflow_id": "wf-1", "placed_at": 1785600000}],
+        }
+
+        orders = await client.get_workflow_orders(
+            "wf-1", placed_after=1785590000
+        )
+
+        assert orders == [{"workflow_id": "wf-1", "placed_at": 1785600000}]
+        query = mock_table.query.call_args[1]
+        assert query["KeyConditionExpression"] == (
+            "workflow_id = :wf_id AND placed_at > :placed_after"
+        )
+        assert query["ExpressionAttributeValues"] == {
+            ":wf_id": "wf-1",
+            ":placed_after": 1785590000,
+        }
+
 
 class TestDynamoDBErrorHandling:
     @pytest.fixture
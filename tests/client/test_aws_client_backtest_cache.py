@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from botocore.exceptions import ClientError
@@ -172,31 +173,65 @@ class TestConditionalStore:
 class TestScanAndDelete:
     """The two primitives the cache migration runs on."""
 
-    async def test_scan_follows_pagination(
+    async def test_a_page_carries_its_resume_key(
         self, mock_dynamodb_resource, client
     ):
         _, mock_table = mock_dynamodb_resource
-        mock_table.scan.side_effect = [
-            {
-                "ResponseMetadata": {"HTTPStatusCode": 200},
-                "Items": [{"definition_code": "B9H:FRA40.I:v1"}],
-                "LastEvaluatedKey": {"definition_code": "B9H:FRA40.I:v1"},
-            },
-            {
-                "ResponseMetadata": {"HTTPStatusCode": 200},
-                "Items": [{"definition_code": "B9HTC:FRA40.I:v1"}],
+        mock_table.scan.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Items": [{"definition_code": "B9H:FRA40.I:v1"}],
+            "LastEvaluatedKey": {"definition_code": "B9H:FRA40.I:v1"},
+        }
+
+        items, last_key = await client.scan_backtest_candles_page(
+            {"definition_code": "B9", "trading_date": "2026-07-14"}, 1, 4
+        )
+
+        assert items == [{"definition_code": "B9H:FRA40.I:v1"}]
+        assert last_key == {"definition_code": "B9H:FRA40.I:v1"}
+        assert mock_table.scan.call_args[1] == {
+            "Segment": 1,
+            "TotalSegments": 4,
+            "ExclusiveStartKey": {
+                "definition_code": "B9",
+                "trading_date": "2026-07-14",
             },
-        ]
+        }
+
+    async def test_the_last_page_has_no_resume_key(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        mock_table.scan.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Items": [],
+        }
 
-        items = await client.scan_backtest_candles()
+        items, last_key = await client.scan_backtest_candles_page()
 
-        assert [i["definition_code"] for i in items] == [
-            "B9H:FRA40.I:v1",
-            "B9HTC:FRA40.I:v1",
-        ]
-        second_call = mock_table.scan.call_args_list[1][1]
-        assert second_call["ExclusiveStartKey"] == {
-            "definition_code": "B9H:FRA40.I:v1"
+        assert (items, last_key) == ([], None)
+        assert mock_table.scan.call_args[1] == {}
+
+    async def test_batch_write_puts_then_deletes(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        batch = AsyncMock()
+        mock_table.batch_writer = MagicMock()
+        mock_table.batch_writer.return_value.__aenter__.return_value = batch
+
+        await client.batch_write_backtest_candles(
+            [{"definition_code": "FRA40.I:v2", "close": 8000.5}],
+            [("B9H:FRA40.I:v1", "2026-07-14")],
+        )
+
+        assert batch.put_item.call_args[1]["Item"] == {
+            "definition_code": "FRA40.I:v2",
+            "close": Decimal("8000.5"),
+        }
+        assert batch.delete_item.call_args[1]["Key"] == {
+            "definition_code": "B9H:FRA40.I:v1",
+            "trading_date": "2026-07-14",
         }
 
     async def test_delete_targets_the_composite_key(
@@ -213,3 +248,59 @@ class TestScanAndDelete:
             "definition_code": "B9H:FRA40.I:v1",
             "trading_date": "2026-07-14",
         }
+
+
+class TestBacktestSeries:
+    async def test_stores_the_day_as_a_candle_list(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        mock_table.put_item.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200}
+        }
+
+        await client.store_backtest_series(
+            "GER40.I:0200-2200@Europe/Paris:15m:v1",
+            "2026-07-14",
+            True,
+            [{"lower": 24000.0, "higher": 24020.0, "ut": "15m"}],
+        )
+
+        item = mock_table.put_item.call_args[1]["Item"]
+        assert item["definition_code"] == (
+            "GER40.I:0200-2200@Europe/Paris:15m:v1"
+        )
+        assert item["has_data"] is True
+        assert str(item["candles"][0]["higher"]) == "24020.0"
+        assert "h1_candle" not in item
+
+    async def test_stores_no_data_marker_without_candles(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        mock_table.put_item.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200}
+        }
+
+        await client.store_backtest_series("key", "2026-07-15", False)
+
+        item = mock_table.put_item.call_args[1]["Item"]
+        assert item["has_data"] is False
+        assert "candles" not in item
+
+    async def test_get_targets_the_composite_key(
+        self, mock_dynamodb_resource, client
+    ):
+        _, mock_table = mock_dynamodb_resource
+        mock_table.get_item.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Item": {"has_data": False},
+        }
+
+        item = await client.get_cached_backtest_series("key", "2026-07-14")
+
+        assert item == {"has_data": False}
+        assert mock_table.get_item.call_args[1]["Key"] == {
+            "definition_code": "key",
+            "trading_date": "2026-07-14",
+        }
@@ -1,8 +1,11 @@
+import threading
+import time
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 from unittest.mock import MagicMock
 
 import pytest
+from cachetools import TTLCache
 
 from client.binance_client import BinanceClient
 from model import Direction, ReportOrder, Taxes
@@ -11,7 +14,8 @@ from model.workflow import Candle, UnitTime
 
 class MockBinanceClient(BinanceClient):
     def __init__(self) -> None:
-        pass
+        self._klines = TTLCache(maxsize=256, ttl=BinanceClient.KLINES_TTL)
+        self._klines_lock = threading.Lock()
 
 
 class TestBinanceClient:
@@ -128,8 +132,10 @@ class TestBinanceClient:
         assert expected.taxes is not None
         assert order.taxes.cost == expected.taxes.cost
 
-    def test_map_kline_to_candle(self):
+    def test_get_latest_candle(self):
         client = MockBinanceClient()
+        client.client = MagicMock()
+        client.logger = MagicMock()
         kline = [
             1609459200000,
             "29000.12345678",
@@ -145,14 +151,16 @@ class TestBinanceClient:
             "0",
         ]
 
-        candle = client._map_kline_to_candle(kline, UnitTime.D)
+        client.client.klines.return_value = [kline]
+
+        candle = client.get_latest_candle("BTCUSDT")
 
         assert isinstance(candle, Candle)
         assert candle.open == 29000.1235
         assert candle.higher == 29500.9877
         assert candle.lower == 28900.1111
         assert candle.close == 29300.5556
-        assert candle.ut == UnitTime.D
+        assert candle.ut == UnitTime.M15
         assert candle.date == datetime.fromtimestamp(1609459200000 / 1000)
 
     def test_get_candles_newest_first(self):
@@ -216,3 +224,178 @@ class TestBinanceClient:
         assert candles[2].close == 100.5
         assert candles[0].date > candles[1].date
         assert candles[1].date > candles[2].date
+
+    def _kline(self, day: int, close: float) -> List:
+        open_time = 1609459200000 + day * 86_400_000
+        return [open_time, "1", "2", "0.5", str(close), "10", open_time]
+
+    def test_get_candles_only_fetches_new_klines(self):
+        mock_api = MagicMock()
+        mock_api.klines.side_effect = [
+            [self._kline(day, 100 + day) for day in range(3)],
+            [self._kline(2, 110), self._kline(3, 120)],
+        ]
+        client = MockBinanceClient()
+        client.client = mock_api
+        client.logger = MagicMock()
+
+        client.get_candles("BTCUSDT", UnitTime.D, limit=3)
+        candles = client.get_candles("BTCUSDT", UnitTime.D, limit=3)
+
+        assert [c.close for c in candles] == [120, 110, 101]
+        assert mock_api.klines.call_args_list[1].kwargs == {
+            "symbol": "BTCUSDT",
+            "interval": "1d",
+            "limit": 1000,
+            "startTime": 1609459200000 + 2 * 86_400_000,
+        }
+
+    def test_get_candles_refetches_when_more_are_needed(self):
+        mock_api = MagicMock()
+        mock_api.klines.side_effect = [
+            [self._kline(day, 100 + day) for day in range(2)],
+            [self._kline(day, 100 + day) for day in range(3)],
+        ]
+        client = MockBinanceClient()
+        client.client = mock_api
+        client.logger = MagicMock()
+
+        client.get_candles("BTCUSDT", UnitTime.D, limit=2)
+        candles = client.get_candles("BTCUSDT", UnitTime.D, limit=3)
+
+        assert len(candles) == 3
+        assert "startTime" not in mock_api.klines.call_args_list[1].kwargs
+
+    def test_a_series_left_alone_expires(self):
+        mock_api = MagicMock()
+        mock_api.klines.side_effect = [
+            [self._kline(day, 100 + day) for day in range(3)],
+            [self._kline(day, 200 + day) for day in range(3)],
+        ]
+        client = BinanceClient("key", "secret")
+        client.client = mock_api
+
+        client.get_candles("BTCUSDT", UnitTime.D, limit=3)
+        client._klines.expire(time.monotonic() + BinanceClient.KLINES_TTL)
+        candles = client.get_candles("BTCUSDT", UnitTime.D, limit=3)
+
+        assert [c.close for c in candles] == [202, 201, 200]
+        assert "startTime" not in mock_api.klines.call_args_list[1].kwargs
+
+
+class TestBinanceReport:
+    @staticmethod
+    def _timestamp(date: str) -> int:
+        return int(datetime.strptime(date, "%Y/%m/%d").timestamp() * 1000)
+
+    def _trade(self, pair: str, trade_id: int, time: int) -> Dict:
+        return {
+            "symbol": pair,
+            "id": trade_id,
+            "orderId": trade_id,
+            "price": "2000",
+            "qty": "1",
+            "commission": "0",
+            "commissionAsset": "USDT",
+            "isBuyer": False,
+            "time": 1_700_000_000_000 + time,
+        }
+
+    def test_only_listed_pairs_are_paged_from_the_last_trade(self, mocker):
+        exchange_info = mocker.patch("client.binance_client.requests.get")
+        exchange_info.return_value.json.return_value = {
+            "symbols": [
+                {"symbol": "ETHUSDT", "status": "TRADING"},
+                {"symbol": "ETHBUSD", "status": "BREAK"},
+            ]
+        }
+        client = BinanceClient("key", "secret")
+        client.client = MagicMock()
+        client.client.my_trades.side_effect = [
+            [self._trade("ETHBUSD", 7, 500)],
+            [self._trade("ETHUSDT", 1, 1000), self._trade("ETHUSDT", 2, 5000)],
+            [],
+            [self._trade("ETHUSDT", 3, 9000)],
+        ]
+
+        first = client.get_report("ETH", "2020/01/01", 1)
+        second = client.get_report("ETH", "2020/01/01", 1)
+
+        assert [o.activity_id for o in first] == [
+            "ETHBUSD:7",
+            "ETHUSDT:1",
+            "ETHUSDT:2",
+        ]
+        assert [o.activity_id for o in second][-1] == "ETHUSDT:3"
+        since = self._timestamp("2020/01/01")
+        assert [
+            (
+                call.args[0],
+                call.kwargs.get("startTime"),
+                call.kwargs.get("fromId"),
+            )
+            for call in client.client.my_trades.call_args_list
+        ] == [
+            ("ETHBUSD", since, None),
+            ("ETHUSDT", since, None),
+            ("ETHBUSD", None, 8),
+            ("ETHUSDT", None, 3),
+        ]
+        exchange_info.assert_called_once()
+
+    def test_an_earlier_report_seeds_the_pair_again(self, mocker):
+        """The first call starts at the report's date rather than at the
+        pair's first trade; only a report reaching further back than what
+        is kept asks for the older trades."""
+        mocker.patch(
+            "client.binance_client.requests.get"
+        ).return_value.json.return_value = {
+            "symbols": [{"symbol": "ETHUSDT", "status": "TRADING"}]
+        }
+        client = BinanceClient("key", "secret")
+        client.client = MagicMock()
+        client.client.my_trades.side_effect = [
+            [self._trade("ETHUSDT", 5, 9000)],
+            [self._trade("ETHUSDT", 2, 1000), self._trade("ETHUSDT", 5, 9000)],
+        ]
+
+        client.get_report("ETH", "2023/11/10", 1)
+        report = client.get_report("ETH", "2023/11/01", 1)
+
+        assert [
+            call.kwargs["startTime"]
+            for call in client.client.my_trades.call_args_list
+        ] == [self._timestamp("2023/11/10"), self._timestamp("2023/11/01")]
+        assert [o.activity_id for o in report] == ["ETHUSDT:2", "ETHUSDT:5"]
+
+    def test_a_report_does_not_change_the_next_one(self, mocker):
+        """The trade history is kept across reports: merging the fills of
+        an order must not add them up again on every call."""
+        exchange_info = mocker.patch("client.binance_client.requests.get")
+        exchange_info.return_value.json.return_value = {
+            "symbols": [{"symbol": "ETHUSDT", "status": "TRADING"}]
+        }
+        client = BinanceClient("key", "secret")
+        client.client = MagicMock()
+        first_fill = self._trade("ETHUSDT", 1, 1000)
+        second_fill = {**self._trade("ETHUSDT", 2, 1000), "orderId": 1}
+        client.client.my_trades.side_effect = [[first_fill, second_fill], []]
+
+        first = client.get_report("ETH", "2020/01/01", 1)
+        second = client.get_report("ETH", "2020/01/01", 1)
+
+        assert [o.quantity for o in first] == [2.0]
+        assert [o.quantity for o in second] == [2.0]
+
+    def test_report_all_keeps_the_watchlist_order(self, mocker):
+        client = BinanceClient("key", "secret")
+        mocker.patch.object(
+            client,
+            "get_report",
+            side_effect=lambda coin, date, rate: [coin],
+        )
+
+        assert (
+            client.get_report_all("2024/01/01", 1)
+            == BinanceClient.ASSET_WITHLIST
+        )
@@ -1,4 +1,4 @@
-from client.client_helper import get_tick_size
+from client.client_helper import TickSizeTable, get_tick_size
 
 
 class TestClientHelper:
@@ -31,3 +31,18 @@ class TestClientHelper:
         assert 0.0005 == get_tick_size(data, 0.49)
         assert 0.1 == get_tick_size(data, 90.6)
         assert 0.5 == get_tick_size(data, 207)
+
+    def test_tick_size_table_sorts_the_scheme(self):
+        table = TickSizeTable.from_scheme(
+            {
+                "DefaultTickSize": 1.0,
+                "Elements": [
+                    {"HighPrice": 9.99, "TickSize": 0.01},
+                    {"HighPrice": 0.999, "TickSize": 0.001},
+                ],
+            }
+        )
+        assert 0.001 == table.tick_size(0.5)
+        assert 0.001 == table.tick_size(0.999)
+        assert 0.01 == table.tick_size(1)
+        assert 1.0 == table.tick_size(10)
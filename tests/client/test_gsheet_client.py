@@ -1,8 +1,15 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Dict
 from unittest.mock import MagicMock
 
-from client.gsheet_client import GSheetClient
+import pytest
+from cachetools import TTLCache
+
+from client.gsheet_client import (
+    ETF_DCA_ID_HEADER,
+    GSheetClient,
+    order_row_key,
+)
 from model import (
     Account,
     AssetType,
@@ -29,7 +36,20 @@ class MockEtfDcaGsheetClient(GSheetClient):
         self.trade_republic_sheet_name = "ETF / DCA"
         self.spreadsheet_id = "spreadsheet-id"
         self.client = MagicMock()
+        self._sheets_cache = TTLCache(maxsize=1, ttl=60)
+        self._etf_dca_rows_cache = TTLCache(maxsize=1, ttl=60)
         self._starting_row_count = starting_row_count
+        self.sheet_columns(ids=[ETF_DCA_ID_HEADER])
+
+    def sheet_columns(self, **columns) -> None:
+        """The B, C, E, F and id columns the ETF / DCA sheet holds."""
+        values = self.client.spreadsheets().values()
+        values.batchGet.return_value.execute.return_value = {
+            "valueRanges": [
+                {"values": [[value] for value in columns.get(name, [])]}
+                for name in ("symbols", "dates", "prices", "shares", "ids")
+            ]
+        }
 
     def _get_number_rows_for_sheet(self, sheet_name: str) -> int:
         return self._starting_row_count
@@ -390,6 +410,7 @@ class TestAppendEtfDcaRows:
             -1.0,
             "=E6*F6",
             "=H6+G6",
+            "tx-1",
         ]
         assert rows[1] == [
             "iShares Core MSCI World",
@@ -401,6 +422,7 @@ class TestAppendEtfDcaRows:
             -1.0,
             "=E7*F7",
             "=H7+G7",
+            "tx-2",
         ]
 
     def test_sens_blank_for_non_trade_types(self):
@@ -421,3 +443,219 @@ class TestAppendEtfDcaRows:
         )
 
         assert [row[3] for row in rows] == ["", "", "", ""]
+
+    def test_large_imports_are_appended_in_batches(self, mocker):
+        mocker.patch("client.gsheet_client.ETF_DCA_APPEND_BATCH_SIZE", 2)
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        transactions = (
+            _make_transaction(transaction_id=f"tx-{i}") for i in range(5)
+        )
+
+        appended = client.append_etf_dca_rows(transactions)
+
+        append = client.client.spreadsheets().values().append
+        assert appended == 5
+        assert [
+            len(call.kwargs["body"]["values"])
+            for call in append.call_args_list
+        ] == [2, 2, 1]
+
+    def test_transaction_ids_are_read_once_and_extended(self):
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        client.sheet_columns(ids=[ETF_DCA_ID_HEADER, "tx-1"])
+        values = client.client.spreadsheets().values()
+
+        assert client.get_etf_dca_rows().claim(_make_transaction())
+        client.append_etf_dca_rows([_make_transaction(transaction_id="tx-2")])
+
+        assert client.get_etf_dca_rows().ids >= {"tx-1", "tx-2"}
+        values.batchGet.assert_called_once()
+        values.update.assert_not_called()
+
+    def test_rows_without_an_id_are_matched_on_their_content(self):
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        client.sheet_columns(
+            symbols=["Symbole", "US0378331005"],
+            dates=["Date", 46083],
+            prices=["Prix", 150.25],
+            shares=["Quantité", 2],
+        )
+        rows = client.get_etf_dca_rows()
+
+        # 46083 is 2026-03-02; the single row matches a single transaction
+        assert rows.claim(_make_transaction(transaction_id="tx-old"))
+        assert not rows.claim(_make_transaction(transaction_id="tx-twin"))
+        assert not rows.claim(
+            _make_transaction(transaction_id="tx-3", price=151.0)
+        )
+
+    def test_each_export_claims_against_the_whole_sheet(self):
+        """The rows are cached for a minute: an export using up the row of
+        a transaction must not make the next export append it again."""
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        client.sheet_columns(
+            symbols=["Symbole", "US0378331005"],
+            dates=["Date", 46083],
+            prices=["Prix", 150.25],
+            shares=["Quantité", 2],
+        )
+
+        for _ in range(2):
+            assert client.get_etf_dca_rows().claim(
+                _make_transaction(transaction_id="tx-old")
+            )
+        client.client.spreadsheets().values().batchGet.assert_called_once()
+
+    def test_an_empty_id_column_is_claimed_by_the_first_append(self):
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        client.sheet_columns(symbols=["Symbole"])
+
+        client.append_etf_dca_rows(
+            [_make_transaction(transaction_id=f"tx-{i}") for i in range(2)]
+        )
+
+        update = client.client.spreadsheets().values().update
+        update.assert_called_once()
+        assert update.call_args.kwargs["range"] == "ETF / DCA!J1"
+        assert update.call_args.kwargs["body"] == {
+            "values": [[ETF_DCA_ID_HEADER]]
+        }
+
+    def test_a_column_holding_something_else_is_not_taken_over(self):
+        client = MockEtfDcaGsheetClient(starting_row_count=5)
+        client.sheet_columns(ids=["Commentaire", "à revoir"])
+
+        with pytest.raises(ValueError, match="does not hold transaction"):
+            client.append_etf_dca_rows([_make_transaction()])
+
+        client.client.spreadsheets().values().append.assert_not_called()
+
+
+class TestCreateOrders:
+    def _client(self) -> GSheetClient:
+        client = GSheetClient.__new__(GSheetClient)
+        client.spreadsheet_id = "spreadsheet-id"
+        client.sheet_name = "Liste d’ordre"
+        client.client = MagicMock()
+        client._sheets_cache = TTLCache(maxsize=1, ttl=60)
+        spreadsheets = client.client.spreadsheets()
+        spreadsheets.get().execute.return_value = {
+            "sheets": [
+                {
+                    "properties": {
+                        "title": "Liste d’ordre",
+                        "sheetId": 7,
+                        "gridProperties": {"rowCount": 10},
+                    }
+                }
+            ]
+        }
+        spreadsheets.values().append().execute.side_effect = [
+            {"updates": {"updatedRange": "Liste d’ordre!A11:AN12"}},
+            {"updates": {"updatedRange": "Liste d’ordre!A13:AN13"}},
+        ]
+        return client
+
+    def _order(self, code: str) -> ReportOrder:
+        return ReportOrder(
+            code=code, price=10, quantity=2, date=datetime(2024, 3, 4)
+        )
+
+    def test_orders_are_written_in_two_requests(self):
+        client = self._client()
+        account = Account("key", "PEA")
+        spreadsheets = client.client.spreadsheets()
+        spreadsheets.get.reset_mock()
+        spreadsheets.values().append.reset_mock()
+
+        client.create_orders(
+            account,
+            [(self._order("SAN"), self._order("SAN"))]
+            + [(self._order("TTE"), self._order("TTE"))],
+        )
+        client.create_order(account, self._order("AIR"), self._order("AIR"))
+
+        appended = [
+            call.kwargs["body"]["values"]
+            for call in spreadsheets.values().append.call_args_list
+        ]
+        assert [row[1] for rows in appended for row in rows] == [
+            "SAN",
+            "TTE",
+            "AIR",
+        ]
+        assert [rows[0][5] for rows in appended] == ["=C11*E11", "=C13*E13"]
+        assert appended[0][1][5] == "=C12*E12"
+        spreadsheets.get.assert_called_once()
+        formats = spreadsheets.batchUpdate.call_args_list[0].kwargs["body"]
+        assert [
+            request["repeatCell"]["range"]["startRowIndex"]
+            for request in formats["requests"]
+        ] == [10, 11]
+
+    def test_reported_orders_are_read_unformatted(self):
+        client = self._client()
+        batch_get = client.client.spreadsheets().values().batchGet
+        batch_get().execute.return_value = {
+            "valueRanges": [
+                {"values": [["Code"], ["SAN"], ["san"], ["TTE"], [], ["AI"]]},
+                {"values": [["Quantité"], [10], [10], [2.5], [1], [4]]},
+                {
+                    "values": [
+                        ["Date"],
+                        [45355],
+                        [45355.5],
+                        [45356],
+                        [45356],
+                        [45357],
+                    ]
+                },
+                {"values": [["Date clôture"], [45358]]},
+                {
+                    "values": [
+                        ["Sens"],
+                        ["Achat"],
+                        ["Achat"],
+                        ["Vente"],
+                        [],
+                        ["Achat"],
+                    ]
+                },
+            ]
+        }
+
+        reported = client.get_reported_orders()
+
+        assert reported.fills == {
+            order_row_key(date(2024, 3, 4), "SAN", 10): 2,
+            order_row_key(date(2024, 3, 7), "SAN", 10): 1,
+            order_row_key(date(2024, 3, 5), "TTE", 2.5): 1,
+            order_row_key(date(2024, 3, 6), "AI", 4): 1,
+        }
+        # The first SAN row is closed, its AB cell is the only one left
+        # after the API trimmed the column
+        assert reported.open_rows == {
+            ("SAN", Direction.BUY): [(date(2024, 3, 4), 10, 3)],
+            ("TTE", Direction.SELL): [(date(2024, 3, 5), 2.5, 4)],
+            ("AI", Direction.BUY): [(date(2024, 3, 6), 4, 6)],
+        }
+
+    def test_closings_are_written_in_one_request(self):
+        client = self._client()
+        values = client.client.spreadsheets().values()
+        values.batchUpdate.reset_mock()
+
+        closings = []
+        for line, code in ((3, "SAN"), (6, "AI")):
+            order = self._order(code)
+            order.open_position = False
+            closings.append((order, order, line))
+        client.update_orders(closings)
+
+        values.batchUpdate.assert_called_once()
+        ranges = [
+            data["range"]
+            for data in values.batchUpdate.call_args.kwargs["body"]["data"]
+        ]
+        assert "Liste d’ordre!W3:AB3" in ranges
+        assert "Liste d’ordre!W6:AB6" in ranges
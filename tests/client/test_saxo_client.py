@@ -1,4 +1,5 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 import requests
@@ -247,3 +248,121 @@ class TestSaxoClient:
             )
             is False
         )
+
+    def test_get_report_batches_details_and_dedups_underlyings(self, mocker):
+        traded = [(1, "Stock"), (2, "WarrantKnockOut"), (2, "WarrantKnockOut")]
+        traded += [(3, "WarrantKnockOut"), (9, "Stock")]
+        activities = [
+            {
+                "ActivityTime": f"2024-03-04T10:15:{second:02d}+00:00",
+                "OrderId": second,
+                "Uic": uic,
+                "AssetType": asset_type,
+                "AveragePrice": 1.5,
+                "Amount": 100,
+                "BuySell": "Buy",
+            }
+            for second, (uic, asset_type) in enumerate(traded)
+        ]
+        details = {
+            uic: {
+                "Uic": uic,
+                "AssetType": asset_type,
+                "Symbol": f"CODE{uic}:xpar",
+                "Description": f"asset {uic}",
+                "CurrencyCode": "EUR",
+            }
+            for uic, asset_type in traded[:4]
+        }
+        for uic in (2, 3):
+            details[uic]["UnderlyingUic"] = 42
+            details[uic]["UnderlyingAssetType"] = "CfdOnIndex"
+
+        def get(url):
+            response = mocker.Mock(status_code=200, headers={}, text="{}")
+            if "orderactivities" in url:
+                data = activities
+            elif "instruments/details" in url:
+                uics = url.split("Uics=")[1].split("&")[0].split(",")
+                data = [details[int(u)] for u in uics if int(u) in details]
+            else:
+                data = [{"Close": 18000.0}]
+            response.json.return_value = {"Data": data}
+            return response
+
+        client = SaxoClient(configuration=MockConfiguration())
+        session_get = mocker.patch.object(
+            client.session, "get", side_effect=get
+        )
+
+        orders = client.get_report(
+            Account(key="account", name="account", client_key="client"),
+            "2024-03-01",
+        )
+
+        urls = [call.args[0] for call in session_get.call_args_list]
+        assert [o.code for o in orders] == ["CODE1", "CODE2", "CODE2", "CODE3"]
+        assert orders[0].underlying is None
+        assert {o.underlying.price for o in orders[1:]} == {18000.0}
+        assert sum("instruments/details" in url for url in urls) == 2
+        assert sum("chart/v3" in url for url in urls) == 1
+        assert "Time=2024-03-04T10:15:00Z" in urls[-1]
+
+    def test_report_follows_next_links(self, mocker):
+        pages = {
+            "first": {"Data": [{"Uic": 1}], "__next": "/openapi/next"},
+            "next": {"Data": [{"Uic": 2}, {"Uic": 3}]},
+        }
+        client = SaxoClient(configuration=MockConfiguration())
+        session_get = mocker.patch.object(
+            client.session,
+            "get",
+            side_effect=lambda url: mocker.Mock(
+                status_code=200,
+                headers={},
+                text="{}",
+                json=lambda: pages["next" if "next" in url else "first"],
+            ),
+        )
+        mocker.patch.object(
+            client,
+            "_build_report_orders",
+            side_effect=lambda activities: [a["Uic"] for a in activities],
+        )
+        account = Account(key="account", name="account", client_key="client")
+
+        assert client.get_report(account, "2024-01-01") == [1, 2, 3]
+        assert session_get.call_args_list[1].args[0] == "/openapi/next"
+
+    def test_search_is_cached_for_repeated_keywords(self, mocker):
+        client = SaxoClient(configuration=MockConfiguration())
+        find_asset = mocker.patch.object(
+            client,
+            "_find_asset",
+            return_value=[
+                {"Symbol": "SAN:xpar", "AssetType": "Stock", "Identifier": 1}
+            ],
+        )
+
+        client.search("san")
+        results = client.search("san")
+
+        assert [asset.symbol for asset in results] == ["SAN:xpar"]
+        find_asset.assert_called_once()
+
+    def test_search_is_safe_from_worker_threads(self, mocker):
+        client = SaxoClient(configuration=MockConfiguration())
+        mocker.patch.object(
+            client,
+            "_find_asset",
+            side_effect=lambda keyword, asset_type: [
+                {"Symbol": keyword, "AssetType": "Stock", "Identifier": 1}
+            ],
+        )
+        keywords = [f"k{index % 50}" for index in range(400)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(client.search, keywords))
+
+        assert [found[0].symbol for found in results] == keywords
+        assert len(client.search_cache) == 50
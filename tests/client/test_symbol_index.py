@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+from client.symbol_index import SymbolIndex
+from model import AssetType
+from model.asset import Asset
+from model.enum import Exchange
+
+PAIRS = [
+    ("ETHUSDT", "ETH", "USDT"),
+    ("BTCUSDT", "BTC", "USDT"),
+    ("ETHBTC", "ETH", "BTC"),
+    ("USDCUSDT", "USDC", "USDT"),
+    ("1INCHEUR", "1INCH", "EUR"),
+]
+
+
+def _index():
+    return SymbolIndex(
+        (
+            Asset(
+                symbol=symbol,
+                description=f"{base}/{quote}",
+                asset_type=AssetType.CRYPTO,
+                exchange=Exchange.BINANCE,
+            ),
+            (symbol, base, quote),
+        )
+        for symbol, base, quote in PAIRS
+    )
+
+
+@pytest.mark.parametrize(
+    "keyword",
+    ["", "e", "Eth", "usd", "usdt", "ETHUSDT", "inch", "hus", "xyz", "cus"],
+)
+def test_index_matches_a_linear_scan(keyword):
+    expected = [
+        symbol
+        for symbol, base, quote in PAIRS
+        if any(
+            keyword.lower() in term.lower() for term in (symbol, base, quote)
+        )
+    ]
+
+    assert [asset.symbol for asset in _index().search(keyword)] == expected
+
+
+def test_every_substring_of_a_symbol_finds_it():
+    index = _index()
+    for symbol, _, _ in PAIRS:
+        for start, end in itertools.combinations(range(len(symbol) + 1), 2):
+            found = index.search(symbol[start:end])
+            assert symbol in [asset.symbol for asset in found]
@@ -0,0 +1,118 @@
+from client.zone_bourse_client import ZONE_BOURSE_URL, ZoneBourseClient
+
+PAGE = """
+<html><body>
+<div><table id="news"><tr><td>Ignored</td><td>1</td></tr></table></div>
+<table id="valuationTable">
+  <tr><th></th><th>2022</th><th>2023</th></tr>
+  <tr><td>Capitalisation</td><td>155\u202f896</td><td>140\xa0000</td></tr>
+</table>
+<table id="iseTableA">
+  <tr><td>Résultat net</td><td>20526</td><td>21384</td></tr>
+</table>
+<table id="bsTable">
+  <tr><td>ROE (RN / Capitaux Propres)
+  </td><td>32,4%</td><td>28,1%</td></tr>
+</table>
+</body></html>
+"""
+
+
+class TestZoneBourseClient:
+    def _client(self, mocker, tmp_path) -> ZoneBourseClient:
+        client = ZoneBourseClient(cache_directory=str(tmp_path))
+        mocker.patch.object(
+            client.session, "get", return_value=mocker.Mock(text=PAGE)
+        )
+        return client
+
+    def test_parse_fundamental_reads_the_three_tables(self, mocker, tmp_path):
+        client = self._client(mocker, tmp_path)
+
+        zb = client.parse_fundamental("https://www.zonebourse.com/tte")
+
+        assert zb.data[2022]["Capitalisation"] == "155896"
+        assert zb.data[2023]["Capitalisation"] == "140000"
+        assert zb.data[2023]["Résultat net"] == "21384"
+        assert zb.data[2022]["ROE"] == "32,4%"
+        assert zb.data[2022]["Croissance résultat"] == 0
+        assert "Ignored" not in zb.data[2022]
+
+    def test_parsed_pages_are_cached_on_disk(self, mocker, tmp_path):
+        client = self._client(mocker, tmp_path)
+        url = "https://www.zonebourse.com/tte"
+
+        first = client.parse_fundamental(url)
+        first.add_data(2022, "Capitalisation", "mutated")
+        second = client.parse_fundamental(url)
+        third = self._client(mocker, tmp_path).parse_fundamental(url)
+
+        client.session.get.assert_called_once()
+        assert second.data[2022]["Capitalisation"] == "155896"
+        assert third.data == second.data
+
+    def test_parse_fundamentals_skips_broken_pages(self, mocker, tmp_path):
+        client = self._client(mocker, tmp_path)
+        client.session.get.side_effect = lambda url: mocker.Mock(
+            text=PAGE if "tte" in url else "<html></html>"
+        )
+
+        scraps = client.parse_fundamentals(
+            ["https://www.zonebourse.com/tte", "https://www.zonebourse.com/x"]
+        )
+
+        assert scraps["https://www.zonebourse.com/x"] is None
+        assert scraps["https://www.zonebourse.com/tte"] is not None
+
+    def test_tickers_are_resolved_by_search_once(self, mocker, tmp_path):
+        client = self._client(mocker, tmp_path)
+        pages = {
+            "/cours/action/TOTAL-GABON-4718/": "<title>Total Gabon : Cours"
+            " | EC | GA0000121459 | Zonebourse</title>",
+            "/cours/action/TOTALENERGIES-SE-4717/": "<title>TotalEnergies SE"
+            " : Cours | TTE | FR0014000MR3 | Zonebourse</title>",
+        }
+
+        def get(url, params=None):
+            if params is None:
+                return mocker.Mock(
+                    text=pages[url.removeprefix(ZONE_BOURSE_URL)]
+                )
+            if params["q"] != "TTE":
+                return mocker.Mock(text="<html>Aucun résultat</html>")
+            return mocker.Mock(
+                text='<a href="/actualite/">News</a>'
+                '<a href="/cours/action/TOTAL-GABON-4718/">Total Gabon</a>'
+                '<a href="/cours/action/TOTAL-GABON-4718/actualite/">EC</a>'
+                '<a href="/cours/action/TOTALENERGIES-SE-4717/actualite/">'
+                "TotalEnergies</a>"
+            )
+
+        client.session.get.side_effect = get
+
+        urls = client.find_fundamental_urls(["TTE", "UNKNOWN"])
+        again = self._client(mocker, tmp_path).find_fundamental_urls(["TTE"])
+
+        assert urls == {
+            "TTE": f"{ZONE_BOURSE_URL}/cours/action/TOTALENERGIES-SE-4717/"
+            "fondamentaux/",
+            "UNKNOWN": None,
+        }
+        assert again == {"TTE": urls["TTE"]}
+        assert client.session.get.call_count == 4
+
+    def test_unverified_matches_are_not_kept(self, mocker, tmp_path):
+        client = self._client(mocker, tmp_path)
+        client.session.get.side_effect = lambda url, params=None: mocker.Mock(
+            text=(
+                '<a href="/cours/action/ACCOR-4602/">Accor</a>'
+                if params
+                else "<title>Accor : Cours | AC | FR0000120404 | Zonebourse"
+                "</title>"
+            )
+        )
+
+        urls = client.find_fundamental_urls(["ACA"])
+
+        assert urls == {"ACA": None}
+        assert not (tmp_path / "urls.json").exists()
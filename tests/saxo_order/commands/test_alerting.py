@@ -1,11 +1,22 @@
+import asyncio
 import datetime
+import logging
 from typing import List
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from client.client_helper import TickSizeTable
 from model import AlertType, Candle, Direction, UnitTime
-from saxo_order.commands.alerting import run_detection_for_asset
+from saxo_order.commands.alerting import (
+    _TICK_SIZE_TABLES,
+    AssetUniverse,
+    DetectorPool,
+    _asset_tick_size,
+    _scan_assets,
+    detect_patterns,
+    run_detection_for_asset,
+)
 from utils.exception import SaxoException
 
 
@@ -29,6 +40,11 @@ def _mm50_touch_candles() -> List[Candle]:
     return _make_candles([100.5] + [102.1666666667] * 9 + [99.5] * 50)
 
 
+@pytest.fixture(autouse=True)
+def _no_cached_tick_size():
+    _TICK_SIZE_TABLES.clear()
+
+
 @pytest.fixture
 def patched_alerting(mocker):
     mocker.patch(
@@ -306,7 +322,7 @@ class TestStockTransformation:
             "Identifier": 23255427,
         }
 
-        # Transformation logic (same as in fetch_french_stocks)
+        # Transformation logic (same as in _fetch_french_stocks_page)
         stock = {
             "name": instrument.get("Description", ""),
             "code": instrument.get("Symbol", ""),
@@ -577,6 +593,36 @@ class TestRunDetectionForAssetIsolatesDetectors:
         dynamodb_client.store_alerts.assert_awaited_once()
         assert dynamodb_client.store_alerts.await_args.args[2] == alerts
 
+    async def test_a_failing_tick_lookup_names_both_patterns(
+        self, mocker, caplog
+    ):
+        """The tick is shared by double top and double bottom, so its
+        failure is reported once for the two rather than under double top
+        alone while double bottom goes silently missing."""
+        mocker.patch(
+            "saxo_order.commands.alerting._asset_tick_size",
+            side_effect=SaxoException("Nothing found for 12345"),
+        )
+        double_top = mocker.patch(
+            "saxo_order.commands.alerting._run_double_top"
+        )
+        double_bottom = mocker.patch(
+            "saxo_order.commands.alerting._run_double_bottom"
+        )
+        with caplog.at_level(logging.WARNING):
+            await self._run(mocker, _mm50_touch_candles())
+
+        double_top.assert_not_called()
+        double_bottom.assert_not_called()
+        assert [
+            record.getMessage()
+            for record in caplog.records
+            if "tick size" in record.getMessage()
+        ] == [
+            "double_top and double_bottom tick size skipped for Test Asset:"
+            " Nothing found for 12345"
+        ]
+
     async def test_a_failing_store_does_not_raise(self, mocker):
         mocker.patch(
             "saxo_order.commands.alerting._run_congestion_indicator",
@@ -600,3 +646,207 @@ class TestRunDetectionForAssetIsolatesDetectors:
             dynamodb_client=dynamodb_client,
         )
         assert len(alerts) > 0
+
+
+class TestAssetTickSize:
+    def test_a_scheme_is_fetched_and_sorted_once_per_asset(self, mocker):
+        saxo_client = MagicMock()
+        saxo_client.get_asset_detail.return_value = {
+            "TickSizeScheme": {
+                "DefaultTickSize": 5.0,
+                "Elements": [
+                    {"HighPrice": 4.995, "TickSize": 0.005},
+                    {"HighPrice": 0.4995, "TickSize": 0.0005},
+                ],
+            }
+        }
+        from_scheme = mocker.spy(TickSizeTable, "from_scheme")
+        asset = {"name": "Test Asset", "saxo_uic": 12345}
+
+        ticks = [
+            _asset_tick_size(saxo_client, asset, _make_candles([close]))
+            for close in (0.3, 3, 30)
+        ]
+
+        assert ticks == [0.0005, 0.005, 5.0]
+        saxo_client.get_asset_detail.assert_called_once()
+        assert from_scheme.call_count == 1
+
+    def test_an_asset_without_a_scheme_has_no_tick(self):
+        saxo_client = MagicMock()
+        saxo_client.get_asset_detail.return_value = {}
+        asset = {"name": "Test Asset", "saxo_uic": 12345}
+
+        for close in (1, 100):
+            assert 0.0 == _asset_tick_size(
+                saxo_client, asset, _make_candles([close])
+            )
+        saxo_client.get_asset_detail.assert_called_once()
+
+
+class TestDetectorPool:
+    def test_runs_inline_on_a_single_core(self):
+        with DetectorPool(max_workers=1) as pool:
+            assert not pool.is_parallel
+
+    def test_runs_inline_in_lambda(self, monkeypatch):
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "k-order")
+        with DetectorPool(max_workers=4) as pool:
+            assert not pool.is_parallel
+
+    async def test_workers_find_what_the_inline_scan_finds(self, monkeypatch):
+        monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+        asset = {"name": "Test Asset", "code": "TST", "saxo_uic": 12345}
+        candles = _mm50_touch_candles()
+
+        with DetectorPool(max_workers=2) as pool:
+            assert pool.is_parallel
+            result = await pool.detect(asset, candles, 0.01)
+
+        assert result == detect_patterns(asset, candles, 0.01)
+        assert result.mm50_touch is not None
+
+    def test_no_tick_skips_only_the_double_detectors(self, mocker):
+        double_top = mocker.patch(
+            "saxo_order.commands.alerting._run_double_top"
+        )
+        asset = {"name": "Test Asset", "code": "TST", "saxo_uic": 12345}
+
+        result = detect_patterns(asset, _mm50_touch_candles(), None)
+
+        double_top.assert_not_called()
+        assert result.mm50_touch is not None
+
+
+def _instrument_page(codes: List[str]) -> dict:
+    return {
+        "Data": [
+            {"Symbol": code, "Description": code, "Identifier": i}
+            for i, code in enumerate(codes)
+        ]
+    }
+
+
+class TestAssetUniverse:
+    @pytest.fixture(autouse=True)
+    def _page_size(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            "saxo_order.commands.alerting.FRENCH_STOCKS_PAGE_SIZE", 2
+        )
+        monkeypatch.chdir(tmp_path)
+
+    async def test_streams_pages_then_followups_without_excluded(
+        self, tmp_path
+    ):
+        (tmp_path / "followup-stocks.json").write_text(
+            '[{"name": "Apple", "code": "AAPL:xnas", "saxo_uic": 3},'
+            ' {"name": "Sanofi", "code": "SAN:xpar", "saxo_uic": 9}]'
+        )
+        saxo_client = MagicMock()
+        saxo_client.list_instruments.side_effect = [
+            _instrument_page(["SAN:xpar", "TTE:xpar"]),
+            _instrument_page(["BNP:xpar"]),
+        ]
+        universe = AssetUniverse(saxo_client, MagicMock(), ["TTE:xpar"])
+
+        codes = [asset["code"] async for asset in universe]
+
+        assert codes == ["SAN:xpar", "BNP:xpar", "AAPL:xnas"]
+        assert universe.scanned == 3
+        assert universe.excluded == 1
+        assert [
+            c.kwargs["skip"] for c in saxo_client.list_instruments.mock_calls
+        ] == [0, 2]
+
+    async def test_falls_back_to_stocks_json_mid_stream(self, tmp_path):
+        (tmp_path / "stocks.json").write_text(
+            '[{"name": "Sanofi", "code": "SAN:xpar", "saxo_uic": 1},'
+            ' {"name": "Orange", "code": "ORA:xpar", "saxo_uic": 2}]'
+        )
+        saxo_client = MagicMock()
+        saxo_client.list_instruments.side_effect = [
+            _instrument_page(["SAN:xpar", "TTE:xpar"]),
+            SaxoException("gateway timeout"),
+        ]
+        slack_client = MagicMock()
+        universe = AssetUniverse(saxo_client, slack_client, [])
+
+        codes = [asset["code"] async for asset in universe]
+
+        assert codes == ["SAN:xpar", "TTE:xpar", "ORA:xpar"]
+        slack_client.chat_postMessage.assert_called_once()
+
+    async def test_explicit_assets_are_only_filtered(self):
+        assets = [
+            {"name": "Sanofi", "code": "SAN:xpar", "saxo_uic": 1},
+            {"name": "Sanofi", "code": "SAN:xpar", "saxo_uic": 1},
+            {"name": "Bitcoin", "code": "BTCUSDT", "saxo_uic": None},
+        ]
+        universe = AssetUniverse(MagicMock(), MagicMock(), ["BTCUSDT"], assets)
+
+        codes = [asset["code"] async for asset in universe]
+
+        assert codes == ["SAN:xpar", "SAN:xpar"]
+
+
+async def _stream(assets):
+    for asset in assets:
+        yield asset
+
+
+class TestScanAssets:
+    async def test_a_failing_asset_is_skipped_not_fatal(self, mocker):
+        async def detect(**kwargs):
+            if kwargs["asset_code"] == "BAD":
+                raise SaxoException("no candles")
+            return [kwargs["asset_code"]]
+
+        mocker.patch(
+            "saxo_order.commands.alerting.run_detection_for_asset",
+            side_effect=detect,
+        )
+        scanned = {}
+        assets = [
+            {"name": name, "code": f"{name}:xpar", "saxo_uic": index}
+            for index, name in enumerate(["SAN", "BAD", "ORA"])
+        ]
+
+        with DetectorPool(max_workers=1) as pool:
+            alerts = await _scan_assets(
+                _stream(assets),
+                MagicMock(),
+                MagicMock(),
+                pool,
+                on_scanned=scanned.__setitem__,
+            )
+
+        assert alerts == ["SAN", "ORA"]
+        assert scanned == {0: ["SAN"], 1: [], 2: ["ORA"]}
+
+    async def test_a_failing_universe_cancels_the_started_scans(self, mocker):
+        started = asyncio.Event()
+        cancelled = []
+
+        async def detect(**kwargs):
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(kwargs["asset_code"])
+                raise
+
+        mocker.patch(
+            "saxo_order.commands.alerting.run_detection_for_asset",
+            side_effect=detect,
+        )
+
+        async def assets():
+            yield {"name": "SAN", "code": "SAN:xpar", "saxo_uic": 1}
+            await started.wait()
+            raise SaxoException("page 2 failed")
+
+        with DetectorPool(max_workers=1) as pool:
+            with pytest.raises(SaxoException):
+                await _scan_assets(assets(), MagicMock(), MagicMock(), pool)
+
+        assert cancelled == ["SAN"]
@@ -1,3 +1,7 @@
+import json
+
+from click.testing import CliRunner
+
 import saxo_order.commands.fundamental as command
 from model import ZoneBourseScore, ZoneBourseScrap
 
@@ -123,3 +127,40 @@ class TestFundamental:
         assert score_lines[12].endswith("1 1 1")
         assert score_lines[13].endswith("1 1 1")
         assert score_lines[14].endswith("2 1 2")
+
+    def test_get_scores_resolves_the_stocks_without_url(
+        self, mocker, tmp_path
+    ):
+        stocks_file = tmp_path / "stocks.json"
+        stocks_file.write_text(
+            json.dumps(
+                [
+                    {
+                        "name": "Accor",
+                        "code": "AC:xpar",
+                        "zone_bourse_url": "https://zb/accor",
+                    },
+                    {"name": "TotalEnergies", "code": "TTE:xpar"},
+                    {"name": "Unknown", "code": "UNKNOWN"},
+                ]
+            )
+        )
+        client = mocker.patch.object(command, "ZoneBourseClient").return_value
+        client.find_fundamental_urls.return_value = {
+            "TTE": "https://zb/tte",
+            "UNKNOWN": None,
+        }
+        client.parse_fundamentals.return_value = {}
+
+        result = CliRunner().invoke(
+            command.get_scores, ["--stocks-file", str(stocks_file)]
+        )
+
+        assert result.exit_code == 0, result.output
+        client.find_fundamental_urls.assert_called_once_with(
+            ["TTE", "UNKNOWN"]
+        )
+        client.parse_fundamentals.assert_called_once_with(
+            ["https://zb/accor", "https://zb/tte"]
+        )
+        assert "0/3 stocks scored" in result.output
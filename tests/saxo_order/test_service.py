@@ -1,9 +1,19 @@
+import datetime
 from typing import List
 
 import pytest
 
 import saxo_order.service as service
-from model import Account, AssetType, Currency, Order, Underlying
+from client.gsheet_client import ReportedOrders, order_row_key
+from model import (
+    Account,
+    AssetType,
+    Currency,
+    Direction,
+    Order,
+    ReportOrder,
+    Underlying,
+)
 
 
 class TestValiderOrder:
@@ -316,3 +326,62 @@ class TestValiderOrder:
         result = service.apply_rules(account, cfd_order, 10000, [])
         assert result is not None
         assert "10%" in result
+
+    def test_unreported_orders_consumes_one_row_per_fill(self):
+        def fill(quantity: float, currency: Currency) -> ReportOrder:
+            return ReportOrder(
+                code="aapl",
+                price=100,
+                quantity=quantity,
+                currency=currency,
+                direction=Direction.BUY,
+                date=datetime.datetime(2024, 3, 4, 15, 30),
+            )
+
+        reported = ReportedOrders()
+        reported.fills[
+            order_row_key(datetime.date(2024, 3, 4), "AAPL", 10)
+        ] = 1
+        orders = [fill(10, Currency.USD), fill(10, Currency.USD)]
+        orders.append(fill(5, Currency.EURO))
+
+        unreported = service.unreported_orders(
+            orders, reported, {"usdeur": 0.5}
+        )
+
+        rows = unreported.openings
+        assert [original.quantity for _, original in rows] == [10, 5]
+        assert rows[0][0].price == 50
+        assert rows[0][1].taxes == service.calculate_taxes(orders[1])
+
+    def test_unreported_orders_closes_the_first_open_row(self):
+        def fill(direction: Direction, day: int) -> ReportOrder:
+            return ReportOrder(
+                code="SAN",
+                price=100,
+                quantity=10,
+                direction=direction,
+                date=datetime.datetime(2024, 3, day, 15, 30),
+            )
+
+        reported = ReportedOrders()
+        for line, day in ((5, 4), (8, 5)):
+            reported.opened(
+                datetime.date(2024, 3, day), "SAN", 10, Direction.BUY, line
+            )
+        # A sell before the rows opened does not close them, it opens a
+        # short; the next one closes the row opened first
+        orders = [fill(Direction.SELL, 6), fill(Direction.SELL, 3)]
+
+        unreported = service.unreported_orders(orders, reported, {})
+
+        assert [
+            (original.date.day, line)
+            for _, original, line in unreported.closings
+        ] == [(6, 5)]
+        assert [original.date.day for _, original in unreported.openings] == [
+            3
+        ]
+        assert reported.open_rows[("SAN", Direction.BUY)] == [
+            (datetime.date(2024, 3, 5), 10, 8)
+        ]
@@ -16,6 +16,7 @@ from model import (
 from services.alert_triage_service import (
     TRIAGE_SYSTEM_PROMPT,
     TriageAgent,
+    TriageInput,
     current_run_date,
     format_slack_digest,
 )
@@ -227,6 +228,30 @@ def test_fallback_ranks_by_confluence_then_slope() -> None:
     assert digest.counts == {"high": 1, "watch": 1, "noise": 1}
 
 
+def test_triage_input_built_out_of_order_gives_the_same_payload() -> None:
+    per_asset = [
+        [
+            _alert("SAN", AlertType.DOUBLE_TOP, -2.3),
+            _alert("SAN", AlertType.MM50_TOUCH, -2.3),
+        ],
+        [_alert("TTE", AlertType.CONGESTION20, 3.0)],
+        [_alert("AIR", AlertType.CONGESTION20, 0.2)],
+    ]
+    triage_input = TriageInput()
+    for position in (2, 0, 1):
+        triage_input.add(position, per_asset[position])
+    whole_scan = FakeAnthropicClient({"assets": []})
+    incremental = FakeAnthropicClient({"assets": []})
+
+    TriageAgent(whole_scan).synthesize(
+        [alert for alerts in per_asset for alert in alerts]
+    )
+    TriageAgent(incremental).synthesize_input(triage_input)
+
+    assert incremental.last_payload == whole_scan.last_payload
+    assert triage_input.alerts == [a for alerts in per_asset for a in alerts]
+
+
 def test_fallback_treats_congestion20_and_100_as_one_family() -> None:
     # congestion20 and congestion100 are the same detector at two lookback
     # windows - they must not count as two distinct patterns toward
@@ -511,3 +511,36 @@ class TestGetCandlesInWindow:
         )
 
         assert candles == []
+
+    def test_range_pages_backward_until_the_start(self, mocker):
+        saxo_client = mocker.Mock()
+        mocker.patch.object(
+            saxo_client,
+            "get_asset",
+            return_value={"Identifier": 123, "AssetType": "CfdOnIndex"},
+        )
+        mocker.patch("services.candles_service.CHART_PAGE_SIZE", 4)
+        base = datetime.datetime(2026, 6, 2, 8, 0)
+        bars = [base + datetime.timedelta(hours=i) for i in range(10)]
+
+        def get_historical_data(saxo_uic, asset_type, horizon, count, date):
+            # Mode=UpTo: the `count` bars up to and including `date`
+            page = [t for t in bars if t <= date][-count:]
+            return [
+                {"Time": t, "Open": 1, "High": 2, "Low": 0, "Close": 1}
+                for t in reversed(page)
+            ]
+
+        mocker.patch.object(
+            saxo_client,
+            "get_historical_data",
+            side_effect=get_historical_data,
+        )
+        candles_service = CandlesService(saxo_client)
+
+        candles = candles_service.get_candles_in_range(
+            "FRA40.I", UnitTime.H1, 60, bars[1], bars[9]
+        )
+
+        assert [c.date for c in candles] == bars[1:9]
+        assert saxo_client.get_historical_data.call_count == 3
@@ -1,4 +1,5 @@
 import datetime
+import random
 from typing import List, Optional
 
 import pytest
@@ -13,6 +14,7 @@ from model import (
 )
 from services.indicator_service import (
     COMBO_MIN_CANDLES,
+    FeatureFrame,
     adx,
     apply_linear_function,
     average_true_range,
@@ -20,14 +22,17 @@ from services.indicator_service import (
     combo,
     containing_candle,
     double_bottom,
+    double_inside_bar,
     double_top,
     exponentiel_mobile_average,
     find_linear_function,
+    find_pivots,
     is_far_from_levels,
     is_price_within_bands,
     macd0lag,
     mm7_break,
     mm50_touch,
+    mobile_average,
     number_of_day_between_dates,
     slope_percentage,
 )
@@ -171,6 +176,41 @@ class TestIndicatorService:
         else:
             assert double_bottom(candles, tick).lower == expected
 
+    def test_find_pivots_shares_one_pass(self):
+        highs = [10, 9, 8, 10, 9]
+        lows = [8, 9, 7, 8, 8]
+        candles = [
+            Candle(low, high, 0, 0, UnitTime.D, datetime.datetime.now())
+            for low, high in zip(lows, highs)
+        ]
+        pivots = find_pivots(candles)
+        assert [c.higher for c in pivots.tops] == [10, 10]
+        assert [c.lower for c in pivots.bottoms] == [8, 7, 8]
+        assert double_top(candles, 0.5, pivots) is candles[0]
+        assert double_bottom(candles, 0.5, pivots) is candles[0]
+
+    def test_double_top_matches_every_pair_comparison(self):
+        """Sorting the pivots must pick the same candle as comparing every
+        pair of tops did: the first one with a partner within one tick."""
+        rng = random.Random(7)
+        for _ in range(200):
+            highs = [round(rng.uniform(10, 12), 2) for _ in range(30)]
+            candles = [
+                Candle(0, high, 0, 0, UnitTime.D, datetime.datetime.now())
+                for high in highs
+            ]
+            tops = find_pivots(candles).tops
+            expected = next(
+                (
+                    tops[i]
+                    for i in range(len(tops))
+                    for j in range(i + 1, len(tops))
+                    if round(abs(tops[i].higher - tops[j].higher), 4) <= 0.05
+                ),
+                None,
+            )
+            assert double_top(candles, 0.05) is expected
+
     @pytest.mark.parametrize(
         "candles, std, expected",
         [
@@ -1128,3 +1168,45 @@ class TestMm7Break:
         assert result is not None
         assert result["direction"] == Direction.SELL.value
         assert result["streak"] >= 3
+
+
+class TestFeatureFrame:
+    @staticmethod
+    def _candles() -> List[Candle]:
+        with open("tests/services/files/combo_buy_daily_cac.obj", "r") as f:
+            return eval(
+                f.read(),
+                {"datetime": datetime, "Candle": Candle, "UnitTime": UnitTime},
+            )
+
+    def test_values_match_the_standalone_indicators(self):
+        candles = self._candles()
+        frame = FeatureFrame(candles)
+
+        assert frame.mobile_average(50) == mobile_average(candles, 50)
+        assert frame.mobile_average(7, 3) == mobile_average(candles[3:], 7)
+        assert frame.bollinger_bands(2.5, offset=2) == bollinger_bands(
+            candles[2:], 2.5
+        )
+        assert frame.atr == average_true_range(candles)
+        assert frame.ma50_slope == slope_percentage(
+            0,
+            mobile_average(candles[10:], 50),
+            10,
+            mobile_average(candles, 50),
+        )
+
+    def test_detectors_give_the_same_answer_with_a_shared_frame(self):
+        candles = self._candles()
+        frame = FeatureFrame(candles)
+
+        assert combo(candles, frame) == combo(candles)
+        assert mm50_touch(candles, frame) == mm50_touch(candles)
+        assert mm7_break(candles, frame) == mm7_break(candles)
+        assert double_inside_bar(candles, frame) == double_inside_bar(candles)
+
+    def test_short_history_raises_like_mobile_average(self):
+        frame = FeatureFrame(_make_candles([100.0] * 59))
+
+        with pytest.raises(SaxoException):
+            frame.ma50_slope
@@ -1,12 +1,17 @@
 import datetime
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 import pytest
 
 from model import Alert, AlertType, Direction
-from services.workflow_trigger_service import collect_todays_triggers
+from services.workflow_trigger_service import (
+    collect_todays_triggers,
+    prefetch_todays_orders,
+    refresh_todays_orders,
+    resolve_todays_triggers,
+)
 
 RUN_DATE = "2026-08-01"
 PARIS = ZoneInfo("Europe/Paris")
@@ -41,10 +46,25 @@ class FakeDynamoDBClient:
     ) -> None:
         self._orders = orders
         self._workflows = workflows
+        self.scans = 0
 
     async def get_all_workflow_orders(self) -> List[Dict[str, Any]]:
+        self.scans += 1
         return self._orders
 
+    async def get_workflow_orders(
+        self,
+        workflow_id: str,
+        limit: Optional[int] = None,
+        placed_after: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        return [
+            order
+            for order in self._orders
+            if order["workflow_id"] == workflow_id
+            and (placed_after is None or order["placed_at"] > placed_after)
+        ]
+
     async def get_all_workflows(self) -> List[Dict[str, Any]]:
         return self._workflows
 
@@ -53,6 +73,14 @@ class RaisingDynamoDBClient:
     async def get_all_workflow_orders(self) -> List[Dict[str, Any]]:
         raise RuntimeError("DynamoDB unavailable")
 
+    async def get_workflow_orders(
+        self,
+        workflow_id: str,
+        limit: Optional[int] = None,
+        placed_after: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        raise RuntimeError("DynamoDB unavailable")
+
     async def get_all_workflows(self) -> List[Dict[str, Any]]:
         raise RuntimeError("DynamoDB unavailable")
 
@@ -347,3 +375,69 @@ async def test_window_start_follows_the_run_date():
 
     assert for_today == {}
     assert list(for_yesterday) == ["AI_xpar"]
+
+
+@pytest.mark.asyncio
+async def test_prefetched_orders_resolve_once_the_alerts_exist():
+    client = FakeDynamoDBClient([order()], [workflow()])
+
+    todays_orders = await prefetch_todays_orders(client, RUN_DATE)
+    triggers = resolve_todays_triggers(todays_orders, [alert()])
+
+    assert triggers == await collect_todays_triggers(
+        client, RUN_DATE, [alert()]
+    )
+    assert list(triggers) == ["AI_xpar"]
+
+
+@pytest.mark.asyncio
+async def test_a_failed_prefetch_resolves_to_no_trigger():
+    todays_orders = await prefetch_todays_orders(
+        RaisingDynamoDBClient(), RUN_DATE
+    )
+
+    assert todays_orders is None
+    assert resolve_todays_triggers(todays_orders, [alert()]) == {}
+
+
+@pytest.mark.asyncio
+async def test_orders_placed_during_the_scan_are_refreshed_in(monkeypatch):
+    """The 18:31 workflows place their orders while the 18:15 scan runs."""
+    late = order(id="order-2", placed_at=at_hour(18, 31))
+    client = FakeDynamoDBClient([order(), late], [workflow()])
+    todays_orders = await prefetch_todays_orders(client, RUN_DATE)
+    assert todays_orders is not None
+    assert [o["id"] for o in todays_orders.orders] == ["order-1"]
+
+    monkeypatch.setattr(
+        "services.workflow_trigger_service._now_paris",
+        lambda: FROZEN_NOW + datetime.timedelta(minutes=20),
+    )
+    refreshed = await refresh_todays_orders(client, RUN_DATE, todays_orders)
+
+    assert refreshed is not None
+    assert [o["id"] for o in refreshed.orders] == ["order-1", "order-2"]
+    assert len(resolve_todays_triggers(refreshed, [alert()])["AI_xpar"]) == 2
+    # Only the prefetch reads the whole table, the refresh queries the tail
+    assert client.scans == 1
+
+
+@pytest.mark.asyncio
+async def test_a_failed_refresh_keeps_the_prefetched_orders():
+    client = FakeDynamoDBClient([order()], [workflow()])
+    todays_orders = await prefetch_todays_orders(client, RUN_DATE)
+
+    refreshed = await refresh_todays_orders(
+        RaisingDynamoDBClient(), RUN_DATE, todays_orders
+    )
+
+    assert refreshed is todays_orders
+
+
+@pytest.mark.asyncio
+async def test_a_failed_prefetch_is_retried_on_refresh():
+    client = FakeDynamoDBClient([order()], [workflow()])
+
+    refreshed = await refresh_todays_orders(client, RUN_DATE, None)
+
+    assert list(resolve_todays_triggers(refreshed, [alert()])) == ["AI_xpar"]